@@ -0,0 +1,244 @@
+"""
+The Olympian Codex Database - Analytics Store Sync
+Team 42: RNA
+
+Copies the tables read by the analysis reports from the operational database
+into a local DuckDB file so report scans do not run on the database that
+serves writes. Each table is synced with one of two strategies:
+
+    version    - reload the whole table when its change counter moved
+    snapshot   - reload the whole table on every sync (small, untracked tables)
+
+The event tables use 'version' too. Their rows are inserted with backdated
+event times (journal replay, backfills), committed out of key order, updated
+and cascaded into by parent deletes, so no key or date watermark can tell
+which rows changed; the counters see every one of those writes. Without
+change tracking on the source every table falls back to 'snapshot'. --full
+reloads every table even if its counter has not moved.
+
+Event-table partitions archived by partition_manager.py are no longer in the
+source; their Parquet files are loaded into the store once each (tracked in
+Archive_Load) so the full history stays queryable here.
+
+Usage:
+    python analytics_sync.py --user root --password ... [--store analytics.duckdb] [--full]
+"""
+
+import argparse
+import getpass
+import os
+from datetime import datetime
+
+import pymysql
+
+from backends import (SCHEMA_PATH, DuckDBBackend, MySQLBackend, split_sql_script,
+                      translate_ddl)
+from partition_manager import DEFAULT_ARCHIVE_DIR, PARTITIONED_TABLES, archive_files
+
+DEFAULT_STORE_PATH = "olympian_analytics.duckdb"
+
+# Rows fetched from the source per round trip
+SYNC_BATCH_SIZE = 1000
+
+# table -> strategy
+SYNC_TABLES = {
+    'God': 'version',
+    'Demigod': 'version',
+    'Monster': 'version',
+    'Quest': 'version',
+    'Divine_Artifact': 'version',
+    'Prophecy': 'snapshot',
+    'Quest_Log': 'snapshot',
+    'Artifact_Ownership': 'snapshot',
+    'Combat_Encounter': 'version',
+    'Encounters': 'version',
+    'Sighting_Log': 'version',
+}
+
+# =====================================================
+# STORE SETUP
+# =====================================================
+
+def open_store(path=DEFAULT_STORE_PATH, schema_path=SCHEMA_PATH):
+    """
+    Open the DuckDB analytics store, creating the synced tables
+    (translated from schema.sql) and the Sync_State table if missing.
+    """
+    connection = DuckDBBackend(path).connect()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT table_name FROM information_schema.tables")
+        existing = {row['table_name'] for row in cursor.fetchall()}
+        with open(schema_path, encoding='utf-8') as f:
+            statements = split_sql_script(f.read())
+        for statement in statements:
+            words = statement.split(None, 3)
+            if len(words) < 3 or words[0].upper() != 'CREATE' or words[1].upper() != 'TABLE':
+                continue
+            table = words[2].rstrip('(')
+            if table in SYNC_TABLES and table not in existing:
+                for translated in translate_ddl(statement, 'duckdb'):
+                    cursor._cursor.execute(translated)
+        if 'Sync_State' not in existing:
+            cursor.execute("""
+                CREATE TABLE Sync_State (
+                    Table_Name VARCHAR(64) PRIMARY KEY,
+                    Strategy VARCHAR(16) NOT NULL,
+                    Source_Version BIGINT,
+                    Rows_Copied BIGINT NOT NULL,
+                    Synced_At TIMESTAMP NOT NULL
+                )
+            """)
+        if 'Archive_Load' not in existing:
+            cursor.execute("""
+                CREATE TABLE Archive_Load (
+                    File_Name VARCHAR(255) PRIMARY KEY,
+                    Table_Name VARCHAR(64) NOT NULL,
+                    Rows_Loaded BIGINT NOT NULL,
+                    Loaded_At TIMESTAMP NOT NULL
+                )
+            """)
+    connection.commit()
+    return connection
+
+def get_sync_state(store):
+    """Return {table: Sync_State row} for every table synced so far."""
+    with store.cursor() as cursor:
+        cursor.execute("SELECT * FROM Sync_State ORDER BY Table_Name")
+        return {row['Table_Name']: row for row in cursor.fetchall()}
+
+# =====================================================
+# SYNC
+# =====================================================
+
+def _read_source_versions(source):
+    """Read the per-table change counters from the source ({} if change tracking is absent)."""
+    if not getattr(source, 'has_triggers', True):
+        # Embedded DuckDB sources have the counter table but no triggers moving it
+        return {}
+    try:
+        with source.cursor() as cursor:
+            cursor.execute("SELECT Table_Name, SUM(Version) as Version FROM Table_Version_Slot GROUP BY Table_Name")
+            return {row['Table_Name']: int(row['Version']) for row in cursor.fetchall()}
+    except pymysql.Error:
+        return {}
+
+def _copy_rows(source, store, table):
+    """Stream every row of a source table into the store. Returns the number of rows copied."""
+    copied = 0
+    with source.cursor() as source_cursor, store.cursor() as store_cursor:
+        source_cursor.execute(f"SELECT * FROM {table}")
+        while True:
+            rows = source_cursor.fetchmany(SYNC_BATCH_SIZE)
+            if not rows:
+                break
+            columns = list(rows[0].keys())
+            store_cursor.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+                [tuple(row[column] for column in columns) for row in rows]
+            )
+            copied += len(rows)
+    return copied
+
+def sync_table(source, store, table, state=None, versions=None, full=False):
+    """
+    Bring one store table up to date with the source.
+    Returns a summary dict; Rows_Copied is None when the table was skipped
+    because its change counter has not moved since the last sync.
+    """
+    strategy = SYNC_TABLES[table]
+    previous = (state or {}).get(table)
+    version = (versions or {}).get(table)
+
+    if strategy == 'version' and version is None:
+        # Change tracking not installed on the source: reload every time
+        strategy = 'snapshot'
+    if (strategy == 'version' and not full and previous
+            and previous['Source_Version'] == version):
+        return {'Table': table, 'Strategy': strategy, 'Rows_Copied': None}
+
+    with store.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}")
+        # Archived rows went with the reload; load their files again
+        cursor.execute("DELETE FROM Archive_Load WHERE Table_Name = %s", (table,))
+
+    copied = _copy_rows(source, store, table)
+
+    with store.cursor() as cursor:
+        cursor.execute(
+            "REPLACE INTO Sync_State (Table_Name, Strategy, Source_Version, Rows_Copied, Synced_At) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            (table, strategy, version, copied, datetime.now())
+        )
+    return {'Table': table, 'Strategy': strategy, 'Rows_Copied': copied}
+
+def load_archives(store, table, archive_dir=DEFAULT_ARCHIVE_DIR):
+    """
+    Load archived partitions of a table that the store has not seen yet.
+    Returns the number of rows loaded.
+    """
+    loaded = 0
+    with store.cursor() as cursor:
+        cursor.execute("SELECT File_Name FROM Archive_Load WHERE Table_Name = %s", (table,))
+        seen = {row['File_Name'] for row in cursor.fetchall()}
+        for path in archive_files(table, archive_dir):
+            file_name = f"{table}/{os.path.basename(path)}"
+            if file_name in seen:
+                continue
+            # Upsert so rows still in the source (a partition archived but not yet dropped) are not duplicated
+            cursor.execute(f"REPLACE INTO {table} BY NAME SELECT * FROM read_parquet(%s)", (path,))
+            rows = cursor.rowcount
+            cursor.execute(
+                "INSERT INTO Archive_Load (File_Name, Table_Name, Rows_Loaded, Loaded_At) "
+                "VALUES (%s, %s, %s, %s)",
+                (file_name, table, rows, datetime.now())
+            )
+            loaded += rows
+    return loaded
+
+def sync_analytics_store(source, store, tables=None, full=False, archive_dir=DEFAULT_ARCHIVE_DIR):
+    """
+    Sync the analytics store from the source database.
+    Every table is written in its own store transaction; a failed table is
+    rolled back and re-raised, and the next run reloads it.
+    """
+    # End the source's REPEATABLE READ snapshot so committed writes are visible
+    source.commit()
+    versions = _read_source_versions(source)
+    state = get_sync_state(store)
+    summary = []
+    for table in tables or SYNC_TABLES:
+        try:
+            entry = sync_table(source, store, table, state, versions, full)
+            if table in PARTITIONED_TABLES:
+                entry['Archived_Rows'] = load_archives(store, table, archive_dir)
+            summary.append(entry)
+            store.commit()
+        except pymysql.Error:
+            store.rollback()
+            raise
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the Olympian Codex analytics store from MySQL.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--database", default="olympian_codex_db")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="DuckDB file to sync into")
+    parser.add_argument("--full", action="store_true", help="Reload every table, even if its change counter has not moved")
+    args = parser.parse_args()
+
+    password = args.password if args.password is not None else getpass.getpass("MySQL password: ")
+    source = MySQLBackend(args.host, args.user, password, args.database).connect()
+    store = open_store(args.store)
+    try:
+        for entry in sync_analytics_store(source, store, full=args.full):
+            copied = 'unchanged' if entry['Rows_Copied'] is None else f"{entry['Rows_Copied']} row(s)"
+            archived = f" (+{entry['Archived_Rows']} archived)" if entry.get('Archived_Rows') else ""
+            print(f"{entry['Table']:<18} {entry['Strategy']:<10} {copied}{archived}")
+    finally:
+        store.close()
+        source.close()
+
+if __name__ == "__main__":
+    main()
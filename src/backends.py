@@ -0,0 +1,647 @@
+"""
+The Olympian Codex Database - Storage Backends
+Team 42: RNA
+
+The data-access functions in main_app.py are written against PyMySQL's
+connection interface: row models (row_models.py), %s placeholders and
+pymysql.Error.
+MySQLBackend opens real PyMySQL connections. SQLiteBackend (OLTP-style
+development and testing) and DuckDBBackend (columnar analytical copies) open
+embedded databases behind an adapter that exposes the same interface and
+translates the MySQL-specific SQL used by the app. Both embedded backends can
+load src/schema.sql and src/populate.sql.
+"""
+
+import os
+import re
+import sqlite3
+from datetime import datetime, date
+
+import pymysql
+
+from row_models import RowCursor, row_type, source_entity
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_PATH = os.path.join(SRC_DIR, "schema.sql")
+POPULATE_PATH = os.path.join(SRC_DIR, "populate.sql")
+
+# =====================================================
+# SQL SCRIPT PARSING
+# =====================================================
+
+def split_sql_script(script):
+    """
+    Split a SQL script into statements.
+    Strips '--' comments and splits on ';' outside of string literals.
+    """
+    statements, current = [], []
+    i, length = 0, len(script)
+    quote = None
+    while i < length:
+        char = script[i]
+        if quote:
+            current.append(char)
+            if char == quote:
+                # A doubled quote is an escaped quote inside the literal
+                if i + 1 < length and script[i + 1] == quote:
+                    current.append(script[i + 1])
+                    i += 1
+                else:
+                    quote = None
+            elif char == '\\' and i + 1 < length:
+                current.append(script[i + 1])
+                i += 1
+        elif char in ("'", '"'):
+            quote = char
+            current.append(char)
+        elif script.startswith('--', i):
+            newline = script.find('\n', i)
+            i = length if newline == -1 else newline
+            continue
+        elif char == ';':
+            statement = ''.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    statement = ''.join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+def _split_top_level(text, separator=','):
+    """Split text on separator characters that are not nested in parentheses or quotes."""
+    parts, current, depth, quote = [], [], 0, None
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    if ''.join(current).strip():
+        parts.append(''.join(current).strip())
+    return parts
+
+def _matching_paren(text, open_index):
+    """Return the index of the parenthesis closing the one at open_index."""
+    depth, quote = 0, None
+    for i in range(open_index, len(text)):
+        char = text[i]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError(f"Unbalanced parentheses in: {text[open_index:open_index + 60]}")
+
+def _rewrite_calls(sql, function_name, rewrite):
+    """Replace every FUNCTION(args) call with rewrite(list_of_args)."""
+    pattern = re.compile(rf"\b{function_name}\s*\(", re.IGNORECASE)
+    while True:
+        match = pattern.search(sql)
+        if not match:
+            return sql
+        open_index = match.end() - 1
+        close_index = _matching_paren(sql, open_index)
+        args = _split_top_level(sql[open_index + 1:close_index])
+        sql = sql[:match.start()] + rewrite(args) + sql[close_index + 1:]
+
+# =====================================================
+# DIALECT TRANSLATION
+# =====================================================
+
+_GROUP_CONCAT = re.compile(
+    r"GROUP_CONCAT\(\s*(DISTINCT\s+)?(.*?)\s+SEPARATOR\s+('(?:[^']|'')*')\s*\)",
+    re.IGNORECASE | re.DOTALL
+)
+
+def translate_query(sql, dialect):
+    """
+    Translate a MySQL statement written for PyMySQL into the embedded dialect.
+    Covers the constructs the app uses: %s placeholders, CONCAT, LEFT,
+    GROUP_CONCAT ... SEPARATOR, REPLACE INTO, INSERT IGNORE and FOR UPDATE.
+    """
+    # Embedded engines serialize writers, so row locks are not needed
+    sql = re.sub(r"\s+FOR\s+UPDATE\s*$", "", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"^\s*INSERT\s+IGNORE\s+INTO\b", "INSERT OR IGNORE INTO", sql, flags=re.IGNORECASE)
+    # MySQL's CONCAT returns NULL if any argument is NULL, like the || operator
+    sql = _rewrite_calls(sql, "CONCAT", lambda args: "(" + " || ".join(args) + ")")
+
+    if dialect == 'sqlite':
+        sql = _rewrite_calls(sql, "LEFT", lambda args: f"SUBSTR({args[0]}, 1, {args[1]})")
+        # SQLite only allows DISTINCT with the default ',' separator
+        sql = _GROUP_CONCAT.sub(
+            lambda m: f"GROUP_CONCAT(DISTINCT {m.group(2)})" if m.group(1)
+            else f"GROUP_CONCAT({m.group(2)}, {m.group(3)})",
+            sql
+        )
+    elif dialect == 'duckdb':
+        sql = _GROUP_CONCAT.sub(
+            lambda m: f"STRING_AGG({m.group(1) or ''}{m.group(2)}, {m.group(3)})", sql
+        )
+        sql = re.sub(r"^\s*REPLACE\s+INTO\b", "INSERT OR REPLACE INTO", sql, flags=re.IGNORECASE)
+        # MySQL's default collation compares case-insensitively
+        sql = re.sub(r"\bLIKE\b", "ILIKE", sql, flags=re.IGNORECASE)
+
+    return sql.replace('%s', '?').replace('%%', '%')
+
+_ENUM_COLUMN = re.compile(r"^(\w+)\s+ENUM\s*\((.*?)\)(.*)$", re.IGNORECASE | re.DOTALL)
+_INLINE_INDEX = re.compile(r"^(?:INDEX|KEY)\s+(\w+)\s*\((.*)\)$", re.IGNORECASE | re.DOTALL)
+_TRIGGER = re.compile(
+    r"^CREATE\s+TRIGGER\s+(\w+)\s+(AFTER|BEFORE)\s+(INSERT|UPDATE|DELETE)\s+ON\s+(\w+)\s+"
+    r"FOR\s+EACH\s+ROW\s+(.*)$",
+    re.IGNORECASE | re.DOTALL
+)
+_SKIPPED_STATEMENTS = re.compile(
+    r"^(DROP\s+DATABASE|CREATE\s+DATABASE|USE\s|SET\s|SELECT\s)", re.IGNORECASE
+)
+
+def translate_column(definition, dialect):
+    """Translate one column definition of a CREATE TABLE statement."""
+    enum = _ENUM_COLUMN.match(definition)
+    if enum:
+        name, values, rest = enum.groups()
+        definition = f"{name} VARCHAR(50){rest} CHECK ({name} IN ({values}))"
+
+    if dialect == 'sqlite':
+        definition = re.sub(r"\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b",
+                            "INTEGER PRIMARY KEY AUTOINCREMENT", definition, flags=re.IGNORECASE)
+        definition = re.sub(r"\bJSON\b", "TEXT", definition)
+    else:
+        definition = re.sub(r"\s+AUTO_INCREMENT\b", "", definition, flags=re.IGNORECASE)
+        definition = re.sub(r"\bJSON\b", "VARCHAR", definition)
+        definition = re.sub(r"\bDATETIME\b", "TIMESTAMP", definition)
+    return re.sub(r"\bBIGINT\s+UNSIGNED\b", "BIGINT", definition, flags=re.IGNORECASE)
+
+def translate_ddl(statement, dialect):
+    """
+    Translate one schema.sql / populate.sql statement.
+    Returns a list of statements (inline indexes become CREATE INDEX);
+    MySQL session and server statements are dropped.
+    """
+    if _SKIPPED_STATEMENTS.match(statement):
+        return []
+
+    trigger = _TRIGGER.match(statement)
+    if trigger:
+        # DuckDB has no triggers; SQLite needs a BEGIN ... END body
+        if dialect != 'sqlite':
+            return []
+        name, timing, event, table, body = trigger.groups()
+        # SQLite allows one writer at a time, so every connection bumps change counter slot 0
+        body = re.sub(r"\bCONNECTION_ID\(\)", "0", body, flags=re.IGNORECASE)
+        return [f"CREATE TRIGGER {name} {timing} {event} ON {table} FOR EACH ROW BEGIN {body}; END"]
+
+    table_match = re.match(r"^CREATE\s+TABLE\s+(\w+)\s*\(", statement, re.IGNORECASE)
+    if not table_match:
+        return [translate_query(statement, dialect)]
+
+    table = table_match.group(1)
+    open_index = table_match.end() - 1
+    close_index = _matching_paren(statement, open_index)
+    columns, indexes = [], []
+    for definition in _split_top_level(statement[open_index + 1:close_index]):
+        index = _INLINE_INDEX.match(definition)
+        if index:
+            # MySQL index names are per table; embedded engines need them unique per database
+            indexes.append(f"CREATE INDEX {table}_{index.group(1)} ON {table} ({index.group(2)})")
+        elif dialect == 'duckdb' and re.match(r"^FOREIGN\s+KEY\b", definition, re.IGNORECASE):
+            # DuckDB does not support ON DELETE/UPDATE actions; analytical copies skip FKs
+            continue
+        else:
+            columns.append(translate_column(definition, dialect))
+    return [f"CREATE TABLE {table} (\n    " + ",\n    ".join(columns) + "\n)"] + indexes
+
+# =====================================================
+# EMBEDDED CONNECTION ADAPTER
+# =====================================================
+
+_UPSERT = re.compile(r"^\s*INSERT\s+OR\s+(REPLACE|IGNORE)\b", re.IGNORECASE)
+
+def _wrap_error(error, sql=None):
+    """
+    Map an embedded engine error onto the matching PyMySQL exception class.
+    Concurrency failures get InnoDB's retryable codes, so writers retry them
+    as they would a deadlock (1213) or lock wait timeout (1205) on MySQL.
+    """
+    message = str(error)
+    name = type(error).__name__
+    if 'Transaction' in name and ('Conflict' in message or 'Failed to commit' in message):
+        # DuckDB's optimistic concurrency: another transaction changed the same rows
+        return pymysql.err.OperationalError(1213, message)
+    if 'locked' in message and 'Operational' in name:
+        # SQLite: another connection held the database lock past the busy timeout
+        return pymysql.err.OperationalError(1205, message)
+    if 'Constraint' in name and sql and _UPSERT.match(sql) and 'Duplicate key' in message:
+        # An upsert only hits a duplicate key when a concurrent transaction inserted it
+        return pymysql.err.OperationalError(1213, message)
+    if 'Integrity' in name or 'Constraint' in name:
+        # Report MySQL's error codes so callers can tell constraint violations apart
+        if 'FOREIGN KEY' in message.upper():
+            return pymysql.err.IntegrityError(1452, message)
+        if 'UNIQUE' in message.upper() or 'DUPLICATE' in message.upper():
+            return pymysql.err.IntegrityError(1062, message)
+        return pymysql.err.IntegrityError(0, message)
+    if 'Operational' in name or 'IO' in name:
+        return pymysql.err.OperationalError(0, message)
+    if 'Programming' in name or 'Parser' in name or 'Catalog' in name or 'Binder' in name:
+        return pymysql.err.ProgrammingError(0, message)
+    return pymysql.err.DatabaseError(0, message)
+
+_DML = re.compile(r"^\s*(INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+_INSERT_TABLE = re.compile(r"^\s*INSERT\s+(?:OR\s+REPLACE\s+)?INTO\s+(\w+)", re.IGNORECASE)
+
+class EmbeddedCursor:
+    """RowCursor-compatible cursor over a SQLite or DuckDB connection."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        # DuckDB cursors are separate connections with their own transactions,
+        # so statements run directly on the shared connection instead
+        self._cursor = connection.raw.cursor() if connection.dialect == 'sqlite' else connection.raw
+        self._columns = None
+        self._row_type = None
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._cursor is not self.connection.raw:
+            self._cursor.close()
+
+    def _run(self, method, sql, args):
+        sql = translate_query(sql, self.connection.dialect)
+        insert = _INSERT_TABLE.match(sql) if self.connection.dialect == 'duckdb' else None
+        key_column = self.connection.sequences.get(insert.group(1)) if insert else None
+        if key_column and method == self._cursor.execute and not re.search(r"\bRETURNING\b", sql, re.IGNORECASE):
+            # Emulate AUTO_INCREMENT's last insert id with the ids this insert drew
+            # (currval is shared by every connection, so it may be another's)
+            sql = f"{sql.rstrip().rstrip(';')} RETURNING {key_column}"
+        else:
+            key_column = None
+        self.connection._begin_if_needed(sql)
+        try:
+            method(sql, args)
+        except self.connection.errors as e:
+            raise _wrap_error(e, sql) from e
+        if self.connection.dialect == 'duckdb' and _DML.match(sql):
+            self._columns = None
+            self.lastrowid = None
+            if key_column:
+                ids = self._cursor.fetchall()
+                self.rowcount = len(ids)
+                self.lastrowid = ids[-1][0] if ids else None
+                return
+            # DuckDB reports affected rows as a one-row result
+            row = self._cursor.fetchone()
+            self.rowcount = row[0] if row else 0
+            return
+        description = self._cursor.description
+        self._columns = [column[0] for column in description] if description else None
+        self._row_type = row_type(source_entity(sql), tuple(self._columns)) if self._columns else None
+        self.rowcount = getattr(self._cursor, 'rowcount', -1)
+        self.lastrowid = getattr(self._cursor, 'lastrowid', None)
+
+    def execute(self, sql, args=None):
+        self._run(self._cursor.execute, sql, tuple(args) if args is not None else ())
+        return self.rowcount
+
+    def executemany(self, sql, args):
+        self._run(self._cursor.executemany, sql, [tuple(row) for row in args])
+        return self.rowcount
+
+    def _to_row(self, values):
+        return self._row_type(*values)
+
+    def fetchone(self):
+        if not self._columns:
+            return None
+        values = self._cursor.fetchone()
+        return self._to_row(values) if values is not None else None
+
+    def fetchmany(self, size=1):
+        if not self._columns:
+            return []
+        return [self._to_row(values) for values in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        if not self._columns:
+            return []
+        return [self._to_row(values) for values in self._cursor.fetchall()]
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+class EmbeddedConnection:
+    """
+    PyMySQL-compatible connection over an embedded engine.
+    Runs with autocommit off like get_db_connection, and raises pymysql errors.
+    """
+
+    # Statements from PREPARED_STATEMENTS are executed as plain parameterized SQL
+    server_side_prepare = False
+
+    def __init__(self, raw, dialect, path, backend=None):
+        self.raw = raw
+        self.backend = backend
+        self.dialect = dialect
+        self.host = dialect
+        self.db = path
+        self.open = True
+        self._in_transaction = False
+        self.sequences = {}
+        # translate_ddl drops triggers for DuckDB, so nothing maintains the
+        # change counters, profiles or sketch logs that triggers keep elsewhere
+        self.has_triggers = dialect == 'sqlite'
+        if dialect == 'sqlite':
+            self.errors = (sqlite3.Error,)
+        else:
+            import duckdb
+            self.errors = (duckdb.Error,)
+            self.load_sequences()
+
+    def load_sequences(self):
+        """Map tables to the key column a sequence fills in for AUTO_INCREMENT (DuckDB only)."""
+        rows = self.raw.execute(
+            "SELECT table_name, column_name FROM information_schema.columns "
+            "WHERE column_default LIKE 'nextval(''seq_%'"
+        ).fetchall()
+        self.sequences = dict(rows)
+
+    def _begin_if_needed(self, sql):
+        # sqlite3 opens transactions implicitly; DuckDB autocommits unless told otherwise
+        if self.dialect == 'duckdb' and not self._in_transaction:
+            self.raw.execute("BEGIN TRANSACTION")
+            self._in_transaction = True
+
+    def cursor(self):
+        return EmbeddedCursor(self)
+
+    def commit(self):
+        try:
+            if self.dialect == 'duckdb':
+                if self._in_transaction:
+                    # A failed COMMIT (e.g. a write conflict) ends the transaction too
+                    self._in_transaction = False
+                    self.raw.execute("COMMIT")
+            else:
+                self.raw.commit()
+        except self.errors as e:
+            raise _wrap_error(e) from e
+
+    def rollback(self):
+        if self.dialect == 'duckdb':
+            if self._in_transaction:
+                self._in_transaction = False
+                try:
+                    self.raw.execute("ROLLBACK")
+                except self.errors:
+                    # DuckDB already ended the transaction that failed
+                    pass
+        else:
+            self.raw.rollback()
+
+    def ping(self, reconnect=True):
+        return True
+
+    def interrupt(self):
+        """Abort the statement running on this connection (the embedded KILL QUERY)."""
+        try:
+            self.raw.interrupt()
+        except self.errors:
+            pass
+
+    def thread_id(self):
+        return id(self)
+
+    def close(self):
+        if self.open:
+            self.raw.close()
+            self.open = False
+
+# =====================================================
+# BACKENDS
+# =====================================================
+
+class MySQLBackend:
+    """The production backend: a PyMySQL connection to a MySQL server."""
+
+    name = 'mysql'
+
+    def __init__(self, host, user, password, database, statement_timeout=None,
+                 server_side_prepare=False, **options):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+        # Seconds a read-only SELECT may run before the server aborts it
+        self.statement_timeout = statement_timeout
+        # True runs registered statements with PREPARE/EXECUTE instead of plain queries
+        self.server_side_prepare = server_side_prepare
+        self.options = options
+
+    def connect(self):
+        options = dict(self.options)
+        if self.statement_timeout:
+            options.setdefault(
+                'init_command', f"SET SESSION max_execution_time = {int(self.statement_timeout * 1000)}"
+            )
+        connection = pymysql.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            cursorclass=RowCursor,
+            autocommit=False,
+            **options
+        )
+        # Remembered so the connection can be cloned and its queries killed
+        connection.backend = self
+        connection.server_side_prepare = self.server_side_prepare
+        return connection
+
+class SQLiteBackend:
+    """Embedded SQLite database for OLTP-style local development and tests."""
+
+    name = 'sqlite'
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+
+    def connect(self):
+        raw = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        raw.execute("PRAGMA foreign_keys = ON")
+        return EmbeddedConnection(raw, self.name, self.path, backend=self)
+
+    def is_loaded(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) as count FROM sqlite_master WHERE type = 'table' AND name = 'God'")
+            return cursor.fetchone()['count'] > 0
+
+    def load(self, connection, schema_path=SCHEMA_PATH, data_path=POPULATE_PATH):
+        """Create the schema and load sample data (foreign keys are checked after loading)."""
+        connection.raw.execute("PRAGMA foreign_keys = OFF")
+        try:
+            load_sql_files(connection, [schema_path, data_path])
+        finally:
+            connection.raw.execute("PRAGMA foreign_keys = ON")
+
+class DuckDBBackend:
+    """Embedded DuckDB database for columnar analytical copies of the codex."""
+
+    name = 'duckdb'
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+
+    def connect(self):
+        try:
+            import duckdb
+        except ImportError:
+            raise pymysql.err.OperationalError(0, "The DuckDB backend requires the 'duckdb' package")
+        return EmbeddedConnection(duckdb.connect(self.path), self.name, self.path, backend=self)
+
+    def is_loaded(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) as count FROM information_schema.tables WHERE table_name = 'God'")
+            return cursor.fetchone()['count'] > 0
+
+    def load(self, connection, schema_path=SCHEMA_PATH, data_path=POPULATE_PATH):
+        """
+        Create the schema and load sample data.
+        AUTO_INCREMENT columns get a sequence starting after the loaded rows.
+        """
+        load_sql_files(connection, [schema_path, data_path])
+        with open(schema_path, encoding='utf-8') as f:
+            columns = auto_increment_columns(f.read())
+        for table, column in columns:
+            start = connection.raw.execute(f"SELECT COALESCE(MAX({column}), 0) + 1 FROM {table}").fetchone()[0]
+            connection.raw.execute(f"CREATE SEQUENCE seq_{table} START {start}")
+            connection.raw.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT nextval('seq_{table}')")
+        connection.load_sequences()
+
+BACKENDS = {
+    'mysql': MySQLBackend,
+    'sqlite': SQLiteBackend,
+    'duckdb': DuckDBBackend,
+}
+
+def create_backend(kind, **options):
+    """Create a backend by name ('mysql', 'sqlite' or 'duckdb')."""
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown backend: {kind}")
+    return BACKENDS[kind](**options)
+
+# =====================================================
+# QUERY CONTROL
+# =====================================================
+
+# Seconds the client keeps reading past a statement's time limit before giving up
+READ_TIMEOUT_GRACE = 5
+
+def open_query_connection(connection, time_limit=None):
+    """
+    Open a dedicated connection to the same database as `connection`, so one
+    long read can be limited and cancelled without holding the shared one.
+    MySQL connections get the limit as max_execution_time plus a client read
+    timeout just above it. Returns None for in-memory embedded databases,
+    which no other connection can see.
+    """
+    backend = getattr(connection, 'backend', None)
+    if backend is None:
+        return None
+    if isinstance(backend, MySQLBackend):
+        options = dict(backend.options)
+        if time_limit:
+            options['read_timeout'] = time_limit + READ_TIMEOUT_GRACE
+        return MySQLBackend(backend.host, backend.user, backend.password, backend.database,
+                            statement_timeout=time_limit or backend.statement_timeout,
+                            server_side_prepare=backend.server_side_prepare, **options).connect()
+    if backend.path == ':memory:':
+        return None
+    return backend.connect()
+
+def cancel_query(connection):
+    """
+    Abort the statement running on a connection and keep the connection usable:
+    KILL QUERY from a short-lived second connection on MySQL, interrupt() on
+    embedded engines. Does nothing if the statement already finished.
+    """
+    if isinstance(connection, EmbeddedConnection):
+        connection.interrupt()
+        return
+    try:
+        killer = connection.backend.connect()
+        try:
+            with killer.cursor() as cursor:
+                cursor.execute("KILL QUERY %s", (connection.thread_id(),))
+        finally:
+            killer.close()
+    except pymysql.Error:
+        # Unknown thread id: the query (or connection) ended first
+        pass
+
+def auto_increment_columns(schema_script):
+    """Return (table, column) pairs declared AUTO_INCREMENT in a MySQL schema script."""
+    columns = []
+    for statement in split_sql_script(schema_script):
+        table = re.match(r"^CREATE\s+TABLE\s+(\w+)", statement, re.IGNORECASE)
+        column = re.search(r"(\w+)\s+INT\s+AUTO_INCREMENT\b", statement, re.IGNORECASE)
+        if table and column:
+            columns.append((table.group(1), column.group(1)))
+    return columns
+
+def run_sql_script(connection, script):
+    """Run a MySQL script (schema or data statements) on an embedded connection."""
+    with connection.cursor() as cursor:
+        for statement in split_sql_script(script):
+            for translated in translate_ddl(statement, connection.dialect):
+                # Raw execution: translate_ddl already produced engine SQL
+                try:
+                    cursor._cursor.execute(translated)
+                except connection.errors as e:
+                    raise _wrap_error(e) from e
+    connection.commit()
+
+def load_sql_files(connection, paths):
+    """Run MySQL scripts such as schema.sql and populate.sql on an embedded connection."""
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            run_sql_script(connection, f.read())
+
+def open_embedded(kind='sqlite', path=':memory:'):
+    """Open an embedded database, loading schema and sample data if it is empty."""
+    backend = create_backend(kind, path=path)
+    connection = backend.connect()
+    if not backend.is_loaded(connection):
+        backend.load(connection)
+    return connection
+
+# SQLite stores dates as ISO strings; convert declared DATE/DATETIME columns back
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
@@ -0,0 +1,86 @@
+"""
+The Olympian Codex Database - Import Time Check
+Team 42: RNA
+
+Guards the app's cold start. Imports main_app in fresh interpreters with
+-X importtime and fails (exit 1) if:
+
+    - the median import time of main_app, on top of Streamlit itself (which
+      `streamlit run` has already loaded), is over the budget, or
+    - a module that must only load when a page needs it (pandas, numpy,
+      pyarrow, duckdb) is imported up front.
+
+Run it before every release, next to the load test.
+
+Usage:
+    python check_import_time.py [--budget-ms 150] [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Import time budget for main_app beyond Streamlit, in milliseconds
+IMPORT_BUDGET_MS = 150
+
+# Heavy modules that pages import on demand
+LAZY_MODULES = ('pandas', 'numpy', 'pyarrow', 'duckdb')
+
+def measure_import(module="main_app"):
+    """
+    Import a module after Streamlit in a fresh interpreter.
+    Returns (cumulative import time in ms, names of all modules it imported).
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import streamlit; import {module}"],
+        cwd=SRC_DIR, capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{process.stderr}")
+    lines = [line for line in process.stderr.splitlines() if line.startswith("import time:")]
+    names = [line.rsplit("|", 1)[1].strip() for line in lines]
+    # Lines are printed as modules finish loading, so everything after
+    # streamlit's own line was imported by the module under test
+    first = names.index("streamlit") + 1
+    total_ms = None
+    for line, name in zip(lines[first:], names[first:]):
+        if name == module:
+            total_ms = int(line.split("|")[1]) / 1000
+    return total_ms, set(names[first:])
+
+def check_import_time(budget_ms=IMPORT_BUDGET_MS, runs=5):
+    """Return (median import time in ms, list of failure messages)."""
+    timings, imported = [], set()
+    for _ in range(runs):
+        elapsed, modules = measure_import()
+        timings.append(elapsed)
+        imported |= modules
+    median = statistics.median(timings)
+    failures = []
+    if median > budget_ms:
+        failures.append(f"main_app imports in {median:.1f} ms (budget {budget_ms} ms)")
+    eager = sorted(name for name in imported if name.split(".")[0] in LAZY_MODULES and "." not in name)
+    if eager:
+        failures.append(f"imported at startup instead of on demand: {', '.join(eager)}")
+    return median, failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the Olympian Codex app's import-time budget.")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time (median is used)")
+    args = parser.parse_args()
+
+    median, failures = check_import_time(args.budget_ms, args.runs)
+    print(f"main_app import time: {median:.1f} ms (budget {args.budget_ms:g} ms)")
+    if failures:
+        for failure in failures:
+            print(f"FAILED: {failure}")
+        sys.exit(1)
+    print("OK")
+
+if __name__ == "__main__":
+    main()
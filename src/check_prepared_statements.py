@@ -0,0 +1,119 @@
+"""
+The Olympian Codex Database - Prepared Statement Check
+Team 42: RNA
+
+Decides whether server-side prepared statements are worth turning on for MySQL.
+Runs every read-only registered statement through execute_prepared twice on
+the same server: once with server-side PREPARE/EXECUTE (a SET of the
+parameters, then the EXECUTE) and once as plain cursor.execute queries. Fails
+(exit 1) if the prepared path is not faster overall. SERVER_SIDE_PREPARE in
+main_app.py ships off; turn it on only after this check passes on the
+production server.
+
+Only reads are timed, so it is safe against a live database; the parameters
+are taken from the first rows of the sample data.
+
+Usage:
+    python check_prepared_statements.py --user root --database olympian_codex_db [--rounds 200]
+"""
+
+import argparse
+import getpass
+import statistics
+import sys
+import time
+
+from backends import MySQLBackend
+import main_app
+
+# Timed calls of each statement per mode (the median is used)
+DEFAULT_ROUNDS = 200
+
+# Registered statements that only read, with a query for a sample parameter (as Value)
+READ_STATEMENTS = {
+    'demigods_by_parent': "SELECT g.Name as Value FROM God g JOIN Demigod d ON d.Divine_Parent_ID = g.Divine_ID LIMIT 1",
+    'monster_encounters': "SELECT Hero_ID as Value FROM Encounters LIMIT 1",
+    'quest_participants': "SELECT Quest_ID as Value FROM Quest_Log LIMIT 1",
+    'hero_abilities': "SELECT Hero_ID as Value FROM Known_Abilities LIMIT 1",
+    'hero_profile': "SELECT Hero_ID as Value FROM Demigod LIMIT 1",
+    'monster_dossier': "SELECT Monster_ID as Value FROM Monster LIMIT 1",
+}
+
+def sample_params(connection):
+    """One parameter tuple per statement in READ_STATEMENTS."""
+    params = {}
+    with connection.cursor() as cursor:
+        for name, sql in READ_STATEMENTS.items():
+            cursor.execute(sql)
+            row = cursor.fetchone()
+            if row is None:
+                raise RuntimeError(f"No sample data for {name}: {sql}")
+            params[name] = (row['Value'],)
+    connection.rollback()
+    return params
+
+def time_statements(backend, params, rounds):
+    """Median seconds per call of each statement on a fresh connection."""
+    connection = backend.connect()
+    try:
+        timings = {name: [] for name in params}
+        with connection.cursor() as cursor:
+            # Warm-up: the prepared mode sends its PREPAREs here
+            for name, values in params.items():
+                main_app.execute_prepared(cursor, name, values)
+                cursor.fetchall()
+            for _ in range(rounds):
+                for name, values in params.items():
+                    start = time.perf_counter()
+                    main_app.execute_prepared(cursor, name, values)
+                    cursor.fetchall()
+                    timings[name].append(time.perf_counter() - start)
+        connection.rollback()
+        return {name: statistics.median(samples) for name, samples in timings.items()}
+    finally:
+        connection.close()
+
+def check_prepared_statements(host, user, password, database, rounds=DEFAULT_ROUNDS):
+    """Return ({statement: (prepared ms, plain ms)}, list of failure messages)."""
+    prepared_backend = MySQLBackend(host, user, password, database, server_side_prepare=True)
+    plain_backend = MySQLBackend(host, user, password, database)
+    connection = prepared_backend.connect()
+    try:
+        params = sample_params(connection)
+    finally:
+        connection.close()
+
+    prepared = time_statements(prepared_backend, params, rounds)
+    plain = time_statements(plain_backend, params, rounds)
+    results = {name: (prepared[name] * 1000, plain[name] * 1000) for name in params}
+
+    failures = []
+    prepared_total = sum(ms for ms, _ in results.values())
+    plain_total = sum(ms for _, ms in results.values())
+    if prepared_total >= plain_total:
+        failures.append(f"prepared statements take {prepared_total:.3f} ms per round, "
+                        f"plain queries {plain_total:.3f} ms; keep SERVER_SIDE_PREPARE off")
+    return results, failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare prepared and plain execution of the registered statements.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--database", default="olympian_codex_db")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Timed calls per statement and mode")
+    args = parser.parse_args()
+
+    password = args.password if args.password is not None else getpass.getpass("MySQL password: ")
+    results, failures = check_prepared_statements(args.host, args.user, password, args.database, args.rounds)
+    print(f"{'statement':<22} {'prepared ms':>12} {'plain ms':>10}")
+    for name, (prepared_ms, plain_ms) in results.items():
+        print(f"{name:<22} {prepared_ms:>12.3f} {plain_ms:>10.3f}")
+    if failures:
+        for failure in failures:
+            print(f"FAILED: {failure}")
+        sys.exit(1)
+    print("OK: prepared statements are faster; SERVER_SIDE_PREPARE can be turned on")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+"""
+The Olympian Codex Database - Load Test Harness
+Team 42: RNA
+
+Simulates many analysts using the app at once by driving the data-access
+functions of main_app.py (dashboard panels, query page, reports and the
+insert/update/delete paths) from concurrent virtual users.
+
+Each virtual user is a thread that picks operations from a weighted workload
+mix and pauses for an exponentially distributed think time between them.
+The report gives throughput, latency percentiles and error rates per
+operation, write retries (deadlocks and lock wait timeouts) and connection
+usage. With --report-every, interim reports cover only the last interval,
+so a long soak run shows whether latency drifts over time.
+
+Connections:
+    default              one connection per virtual user
+    --shared-connection  all users share one connection behind a lock, as
+                         Streamlit sessions share get_db_connection's cached
+                         connection; time spent waiting for it is reported
+
+The 'mixed' and 'write' workloads change data. Run them against a
+disposable database: embedded backends use a fresh temporary file unless
+--db-path is given. On embedded backends the run fails (exit status 1) if
+more than EMBEDDED_MAX_WRITE_ERROR_RATE of the writes fail, as write
+conflicts there are retried; --max-write-error-rate overrides the limit.
+
+Usage:
+    python load_test.py --backend sqlite --users 20 --duration 60 --workload mixed
+    python load_test.py --backend mysql --user root --database olympian_codex_test \\
+        --users 50 --duration 1800 --report-every 60 --max-error-rate 0.01 --max-p95-ms 500
+"""
+
+import argparse
+import getpass
+import logging
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from datetime import date
+
+import pymysql
+import streamlit as st
+
+# Data functions run outside a Streamlit session here
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+
+import main_app
+from backends import MySQLBackend, create_backend, open_embedded
+
+STATUSES = ["Active", "Deceased", "Missing", "Retired"]
+OUTCOMES = ["Success", "Failure", "Ongoing", "Abandoned"]
+SEARCH_TERMS = ["Blade", "Sword", "Shield", "Bow", "Helm", "Trident"]
+# What a user has typed into a picker's search box so far
+TYPEAHEAD_PREFIXES = ["p", "ja", "ann", "the", "ret", "hy", "sw", "de"]
+
+# Error messages kept per operation for the report
+MAX_ERROR_SAMPLES = 3
+# Write error rate above which a run on an embedded backend fails. Write
+# conflicts there are retried like InnoDB deadlocks, so only the rare write
+# that exhausts its retries should fail.
+EMBEDDED_MAX_WRITE_ERROR_RATE = 0.02
+
+# =====================================================
+# OPERATIONS
+# =====================================================
+
+class VirtualUser:
+    """Per-user state: random source, sampled ids and a session's dashboard cache."""
+
+    def __init__(self, index, sample, seed=None):
+        self.index = index
+        self.rng = random.Random(None if seed is None else seed + index)
+        self.sample = sample
+        self.dashboard_cache = {'versions': {}, 'data': {}, 'refreshed_at': None}
+
+    def pick(self, key):
+        return self.rng.choice(self.sample[key])
+
+def _quest_lifecycle(connection, user):
+    """Create a quest and delete it again, keeping the data set stable."""
+    success, result = main_app.insert_new_quest(connection, "Load test quest", date.today())
+    if not success:
+        return success, result
+    return main_app.delete_quest(connection, result)
+
+def _hero_profile(connection, user):
+    """Open a hero profile as the page does: build it if missing, then read it."""
+    hero_id = user.pick('heroes')
+    main_app.ensure_hero_profiles(connection, [hero_id])
+    return main_app.get_hero_profile(connection, hero_id)
+
+# name -> function(connection, user); write functions return (success, result)
+OPERATIONS = {
+    'dashboard': lambda c, u: main_app.refresh_dashboard_panels(c, u.dashboard_cache),
+    'demigods_by_parent': lambda c, u: main_app.query_demigods_by_parent(c, u.pick('gods')),
+    'quest_details': lambda c, u: main_app.query_quests_with_details(c, statuses=[u.rng.choice(OUTCOMES)]),
+    'monster_encounters': lambda c, u: main_app.query_monster_encounters(c, u.pick('heroes')),
+    'artifacts_and_wielders': lambda c, u: main_app.query_artifacts_and_wielders(c),
+    'dangerous_monsters': lambda c, u: main_app.query_most_dangerous_monsters(c, u.rng.randint(1, 10)),
+    'quest_participants': lambda c, u: main_app.query_quest_participants(c, u.pick('quests')),
+    'hero_profile': _hero_profile,
+    'monster_dossier': lambda c, u: main_app.get_monster_dossier(c, u.pick('monsters')),
+    'artifact_search': lambda c, u: main_app.query_artifacts_search_blade(c, u.rng.choice(SEARCH_TERMS)),
+    'typeahead': lambda c, u: main_app.typeahead_search(
+        c, u.rng.choice(list(main_app.TYPEAHEAD_ENTITIES)), u.rng.choice(TYPEAHEAD_PREFIXES)),
+    'recommend_artifacts': lambda c, u: main_app.recommend_artifacts(
+        c, [u.pick('monsters') for _ in range(u.rng.randint(1, 4))]),
+    'report_quests_by_parent': lambda c, u: main_app.report_quests_by_divine_parent(c),
+    'report_artifact_success': lambda c, u: main_app.report_demigod_artifact_success_rate(c),
+    'report_prophecy_monsters': lambda c, u: main_app.report_prophecy_monster_correlation(c),
+    'report_sighting': lambda c, u: main_app.insert_monster_sighting(
+        c, u.pick('monsters'), f"Load test site {u.rng.randint(1, 1000)}", u.pick('heroes')),
+    'journaled_sighting': lambda c, u: main_app.submit_write(
+        c, 'insert_monster_sighting', u.pick('monsters'), f"Load test site {u.rng.randint(1, 1000)}", u.pick('heroes')),
+    'update_status': lambda c, u: main_app.update_demigod_status(c, u.pick('heroes'), u.rng.choice(STATUSES)),
+    'update_quest_outcome': lambda c, u: main_app.update_quest_outcome(c, u.pick('quests'), u.rng.choice(OUTCOMES)),
+    'change_wielder': lambda c, u: main_app.update_artifact_wielder(
+        c, u.pick('artifacts'), u.rng.choice(u.sample['heroes'] + [None])),
+    'quest_lifecycle': _quest_lifecycle,
+}
+
+_READ_MIX = {
+    'dashboard': 20,
+    'demigods_by_parent': 10,
+    'quest_details': 10,
+    'monster_encounters': 10,
+    'artifacts_and_wielders': 5,
+    'dangerous_monsters': 5,
+    'quest_participants': 5,
+    'hero_profile': 10,
+    'monster_dossier': 5,
+    'artifact_search': 5,
+    'typeahead': 10,
+    'recommend_artifacts': 5,
+    'report_quests_by_parent': 5,
+    'report_artifact_success': 5,
+    'report_prophecy_monsters': 5,
+}
+
+_WRITE_MIX = {
+    'report_sighting': 20,
+    'journaled_sighting': 10,
+    'update_status': 20,
+    'update_quest_outcome': 20,
+    'change_wielder': 20,
+    'quest_lifecycle': 10,
+}
+
+# workload -> {operation: weight}
+WORKLOADS = {
+    'read': _READ_MIX,
+    'mixed': {**_READ_MIX, **{name: weight // 5 for name, weight in _WRITE_MIX.items()}},
+    'write': _WRITE_MIX,
+}
+
+def sample_ids(connection):
+    """Ids and names the virtual users pick their parameters from."""
+    return {
+        'gods': [g['Name'] for g in main_app.get_all_gods(connection)],
+        'heroes': [d['Hero_ID'] for d in main_app.get_all_demigods(connection)],
+        'monsters': [m['Monster_ID'] for m in main_app.get_all_monsters(connection)],
+        'artifacts': [a['Artifact_ID'] for a in main_app.get_all_artifacts(connection)],
+        'quests': [q['Quest_ID'] for q in main_app.get_all_quests(connection)],
+    }
+
+# =====================================================
+# STATISTICS
+# =====================================================
+
+_local = threading.local()
+
+def _record_streamlit_error(message, *args, **kwargs):
+    # Read functions report failures through st.error and return empty results
+    errors = getattr(_local, 'errors', None)
+    if errors is not None:
+        errors.append(str(message))
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+class OperationStats:
+    """Latencies (seconds), connection waits and errors of one operation."""
+
+    def __init__(self):
+        self.latencies = []
+        self.waits = []
+        self.errors = 0
+        self.error_samples = []
+
+    def add(self, latency, wait, error):
+        self.latencies.append(latency)
+        self.waits.append(wait)
+        if error:
+            self.errors += 1
+            if len(self.error_samples) < MAX_ERROR_SAMPLES:
+                self.error_samples.append(error)
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        waits = sorted(self.waits)
+        return {
+            'count': len(latencies),
+            'errors': self.errors,
+            'error_rate': self.errors / len(latencies) if latencies else 0.0,
+            'p50': percentile(latencies, 0.50),
+            'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99),
+            'max': latencies[-1] if latencies else None,
+            'wait_p95': percentile(waits, 0.95),
+            'error_samples': list(self.error_samples),
+        }
+
+class LoadStats:
+    """Thread-safe collector with run totals and a resettable reporting window."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = {}
+        self.window = {}
+        self.window_started = time.perf_counter()
+
+    def record(self, operation, latency, wait, error):
+        with self._lock:
+            for bucket in (self.total, self.window):
+                bucket.setdefault(operation, OperationStats()).add(latency, wait, error)
+
+    def take_window(self):
+        with self._lock:
+            window, self.window = self.window, {}
+            started, self.window_started = self.window_started, time.perf_counter()
+        return window, time.perf_counter() - started
+
+def summarize(buckets, elapsed):
+    """Combine per-operation stats into a report dict."""
+    operations = {name: stats.summary() for name, stats in sorted(buckets.items())}
+    overall = OperationStats()
+    for stats in buckets.values():
+        overall.latencies.extend(stats.latencies)
+        overall.waits.extend(stats.waits)
+        overall.errors += stats.errors
+    totals = overall.summary()
+    totals['throughput'] = totals['count'] / elapsed if elapsed > 0 else 0.0
+    totals['elapsed'] = elapsed
+    writes = [operations[name] for name in _WRITE_MIX if name in operations]
+    write_count = sum(op['count'] for op in writes)
+    totals['write_error_rate'] = sum(op['errors'] for op in writes) / write_count if write_count else 0.0
+    return {'operations': operations, 'totals': totals}
+
+# =====================================================
+# CONNECTION MONITOR
+# =====================================================
+
+def _server_status(connection, name):
+    connection.commit()
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW GLOBAL STATUS LIKE %s", (name,))
+        row = cursor.fetchone()
+    return int(row['Value']) if row else None
+
+class ConnectionMonitor(threading.Thread):
+    """Samples the MySQL server's Threads_connected once a second and keeps the peak."""
+
+    def __init__(self, connection, stop):
+        super().__init__(daemon=True)
+        self.connection = connection
+        self.stop = stop
+        self.peak = None
+
+    def run(self):
+        while not self.stop.is_set():
+            try:
+                connected = _server_status(self.connection, 'Threads_connected')
+            except pymysql.Error:
+                return
+            if connected is not None:
+                self.peak = connected if self.peak is None else max(self.peak, connected)
+            self.stop.wait(1.0)
+
+# =====================================================
+# RUNNER
+# =====================================================
+
+def _virtual_user(user, connect, shared, operations, weights, stats, stop, think_time, start_delay):
+    if stop.wait(start_delay):
+        return
+    connection, lock = shared if shared else (connect(), None)
+    try:
+        while not stop.is_set():
+            operation = user.rng.choices(operations, weights)[0]
+            _local.errors = []
+            queued = time.perf_counter()
+            with lock or nullcontext():
+                started = time.perf_counter()
+                try:
+                    result = OPERATIONS[operation](connection, user)
+                except Exception as e:
+                    result = None
+                    _local.errors.append(f"{type(e).__name__}: {e}")
+                finished = time.perf_counter()
+            error = _local.errors[0] if _local.errors else None
+            if error is None and isinstance(result, tuple) and result and result[0] is False:
+                error = str(result[1])
+            stats.record(operation, finished - queued, started - queued, error)
+            if think_time > 0:
+                stop.wait(user.rng.expovariate(1.0 / think_time))
+    finally:
+        if not shared:
+            connection.close()
+
+def run_load_test(connect, users=10, duration=60.0, workload='read', think_time=0.5, ramp_up=0.0,
+                  shared_connection=False, report_every=None, seed=None, on_report=None,
+                  monitor_connect=None):
+    """
+    Run virtual users against the connections returned by connect() and
+    return the final report dict. on_report(report, interim) is called for
+    each interval report and for the final one.
+    monitor_connect opens a MySQL connection for connection-usage sampling.
+    """
+    if workload not in WORKLOADS:
+        raise ValueError(f"Unknown workload: {workload}")
+    mix = WORKLOADS[workload]
+    operations, weights = list(mix), list(mix.values())
+
+    setup = connect()
+    try:
+        sample = sample_ids(setup)
+    finally:
+        setup.close()
+    if not all(sample.values()):
+        raise RuntimeError("The database has no sample data to drive the workload")
+
+    st.error = _record_streamlit_error
+    stats = LoadStats()
+    stop = threading.Event()
+    shared = (connect(), threading.Lock()) if shared_connection else None
+    monitor = ConnectionMonitor(monitor_connect(), stop) if monitor_connect else None
+    retries_before = dict(main_app.write_retry_stats)
+
+    threads = [
+        threading.Thread(
+            target=_virtual_user, name=f"vu-{index}", daemon=True,
+            args=(VirtualUser(index, sample, seed), connect, shared, operations, weights,
+                  stats, stop, think_time, ramp_up * index / users)
+        )
+        for index in range(users)
+    ]
+    started = time.perf_counter()
+    if monitor:
+        monitor.start()
+    for thread in threads:
+        thread.start()
+    try:
+        deadline = started + duration
+        while time.perf_counter() < deadline:
+            interval = min(report_every or duration, deadline - time.perf_counter())
+            time.sleep(max(interval, 0))
+            if report_every and on_report and time.perf_counter() < deadline:
+                window, elapsed = stats.take_window()
+                on_report(summarize(window, elapsed), True)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+
+    report = summarize(stats.total, elapsed)
+    report['workload'] = workload
+    report['users'] = users
+    report['write_retries'] = {key: main_app.write_retry_stats[key] - retries_before.get(key, 0)
+                               for key in main_app.write_retry_stats}
+    report['connections'] = {'opened': 1 if shared_connection else users, 'shared': shared_connection}
+    if monitor:
+        monitor.join()
+        report['connections']['server_peak'] = monitor.peak
+        try:
+            report['connections']['max_used'] = _server_status(monitor.connection, 'Max_used_connections')
+        finally:
+            monitor.connection.close()
+    if shared:
+        shared[0].close()
+    if on_report:
+        on_report(report, False)
+    return report
+
+# =====================================================
+# REPORTING
+# =====================================================
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+def print_report(report, interim=False):
+    totals = report['totals']
+    title = "Interval" if interim else "Final report"
+    print(f"\n{title}: {totals['count']} ops in {totals['elapsed']:.1f}s, "
+          f"{totals['throughput']:.1f} ops/s, error rate {totals['error_rate']:.2%}")
+    print(f"{'operation':<26}{'count':>7}{'err%':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'max ms':>9}{'wait p95':>10}")
+    for name, op in report['operations'].items():
+        print(f"{name:<26}{op['count']:>7}{op['error_rate'] * 100:>7.1f}%{_ms(op['p50']):>9}"
+              f"{_ms(op['p95']):>9}{_ms(op['p99']):>9}{_ms(op['max']):>9}{_ms(op['wait_p95']):>10}")
+    if interim:
+        return
+    print(f"{'all':<26}{totals['count']:>7}{totals['error_rate'] * 100:>7.1f}%{_ms(totals['p50']):>9}"
+          f"{_ms(totals['p95']):>9}{_ms(totals['p99']):>9}{_ms(totals['max']):>9}{_ms(totals['wait_p95']):>10}")
+    retries = report['write_retries']
+    print(f"\nWrite retries: {retries['retries']} (gave up {retries['gave_up']}), "
+          f"write error rate {totals['write_error_rate']:.2%}")
+    connections = report['connections']
+    usage = f"{connections['opened']} opened" + (" (shared)" if connections['shared'] else "")
+    if 'server_peak' in connections:
+        usage += f", server peak {connections['server_peak']}, max used {connections['max_used']}"
+    print(f"Connections: {usage}")
+    for name, op in report['operations'].items():
+        for message in op['error_samples']:
+            print(f"  {name}: {message}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and soak test the Olympian Codex data layer.")
+    parser.add_argument("--backend", choices=["mysql", "sqlite", "duckdb"], default="sqlite")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--database", default="olympian_codex_db")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password")
+    parser.add_argument("--db-path", help="Embedded database file (default: a fresh temporary copy)")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Run time in seconds")
+    parser.add_argument("--workload", choices=list(WORKLOADS), default="read")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean pause between operations (s)")
+    parser.add_argument("--ramp-up", type=float, default=0, help="Seconds over which users start")
+    parser.add_argument("--shared-connection", action="store_true",
+                        help="Share one connection between all users, like the app's cached connection")
+    parser.add_argument("--report-every", type=float, help="Print an interval report every N seconds")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible operation sequences")
+    parser.add_argument("--max-error-rate", type=float, help="Exit 1 if the error rate is above this fraction")
+    parser.add_argument("--max-p95-ms", type=float, help="Exit 1 if overall p95 latency is above this")
+    parser.add_argument("--max-write-error-rate", type=float,
+                        help="Exit 1 if the write operations' error rate is above this fraction "
+                             f"(default {EMBEDDED_MAX_WRITE_ERROR_RATE} on embedded backends)")
+    args = parser.parse_args()
+    if args.max_write_error_rate is None and args.backend != "mysql":
+        args.max_write_error_rate = EMBEDDED_MAX_WRITE_ERROR_RATE
+
+    monitor_connect = None
+    if args.backend == "mysql":
+        password = args.password if args.password is not None else getpass.getpass("MySQL password: ")
+        backend = MySQLBackend(args.host, args.user, password, args.database)
+        connect = monitor_connect = backend.connect
+    else:
+        path = args.db_path or os.path.join(tempfile.mkdtemp(prefix="codex_load_"), f"codex.{args.backend}")
+        # Journaled writes of a throwaway database belong next to it, not in the user's journal directory
+        os.environ.setdefault(main_app.JOURNAL_DIR_ENV, os.path.join(os.path.dirname(os.path.abspath(path)), "journal"))
+        open_embedded(args.backend, path).close()
+        connect = create_backend(args.backend, path=path).connect
+        print(f"Embedded {args.backend} database: {path}")
+
+    report = run_load_test(
+        connect, users=args.users, duration=args.duration, workload=args.workload,
+        think_time=args.think_time, ramp_up=args.ramp_up, shared_connection=args.shared_connection,
+        report_every=args.report_every, seed=args.seed, on_report=print_report,
+        monitor_connect=monitor_connect
+    )
+
+    failed = []
+    totals = report['totals']
+    if args.max_error_rate is not None and totals['error_rate'] > args.max_error_rate:
+        failed.append(f"error rate {totals['error_rate']:.2%} > {args.max_error_rate:.2%}")
+    if args.max_write_error_rate is not None and totals['write_error_rate'] > args.max_write_error_rate:
+        failed.append(f"write error rate {totals['write_error_rate']:.2%} > {args.max_write_error_rate:.2%}")
+    if args.max_p95_ms is not None and totals['p95'] is not None and totals['p95'] * 1000 > args.max_p95_ms:
+        failed.append(f"p95 {totals['p95'] * 1000:.1f} ms > {args.max_p95_ms:.1f} ms")
+    if failed:
+        print(f"\nFAILED: {'; '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -8,17 +8,34 @@ A beautiful Streamlit-based interface for managing the Greek mythology database.
 
 import streamlit as st
 import pymysql
-import pandas as pd
-from datetime import datetime, date
+from backends import MySQLBackend, cancel_query, open_embedded, open_query_connection
+from row_models import row_type, rows_to_frame
+from sketches import SKETCH_TYPES
+from typeahead import PrefixIndex
+from write_journal import JournalEntry, JournalReplayer, WriteJournal
+from analytics_sync import DEFAULT_STORE_PATH, open_store, get_sync_state, sync_analytics_store
+from partition_manager import PARTITIONED_TABLES, archive_files, retention_cutoff
+from datetime import datetime, date, timedelta
+import os
+import re
 import sys
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from itertools import count
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # =====================================================
 # PAGE CONFIGURATION
 # =====================================================
 
+# A Material icon instead of the ⚡ emoji: validating an emoji page icon
+# imports Streamlit's full emoji table (~0.1s) on every cold start
 st.set_page_config(
     page_title="The Olympian Codex",
-    page_icon="⚡",
+    page_icon=":material/bolt:",
     layout="wide",
     initial_sidebar_state="expanded"
 )
@@ -27,10 +44,7 @@ st.set_page_config(
 # CUSTOM CSS FOR AESTHETIC STYLING
 # =====================================================
 
-def load_custom_css():
-    """Apply custom CSS for a beautiful Greek mythology theme."""
-    st.markdown("""
-        <style>
+CUSTOM_CSS = """
         /* Main theme colors inspired by Greek mythology */
         :root {
             --primary-color: #DAA520;
@@ -121,37 +135,783 @@ def load_custom_css():
             font-size: 2rem;
             color: #667eea;
         }
-        </style>
-    """, unsafe_allow_html=True)
+"""
+
+def load_custom_css():
+    """
+    Apply custom CSS for a beautiful Greek mythology theme.
+    The stylesheet is appended to the page <head> once per session by a
+    zero-height component, so later reruns do not re-send it; the <style>
+    element outlives the component, which Streamlit clears on the next rerun.
+    """
+    if st.session_state.get('custom_css_loaded'):
+        return
+    from streamlit.components.v1 import html
+    
+    css = json.dumps(CUSTOM_CSS).replace("</", "<\\/")
+    html(f"""
+        <script>
+        const head = window.parent.document.head;
+        if (!head.querySelector('#olympian-codex-css')) {{
+            const style = window.parent.document.createElement('style');
+            style.id = 'olympian-codex-css';
+            style.textContent = {css};
+            head.appendChild(style);
+        }}
+        </script>
+    """, height=0)
+    st.session_state.custom_css_loaded = True
 
 # =====================================================
 # DATABASE CONNECTION
 # =====================================================
 
+# Longest a SELECT may run on the shared connection (MySQL max_execution_time)
+QUERY_TIMEOUT_SECONDS = 30
+# Limit for analysis reports, which run on their own cancellable connection
+REPORT_TIMEOUT_SECONDS = 120
+# PREPARE/EXECUTE for the PREPARED_STATEMENTS registry. Off until
+# check_prepared_statements.py measures a gain over plain queries on the server
+SERVER_SIDE_PREPARE = False
+# Cancellable queries one database user may have running at once
+MAX_RUNNING_QUERIES_PER_USER = 2
+
 @st.cache_resource
 def get_db_connection(db_user, db_pass, db_host, db_name):
     """
     Establishes a connection to the MySQL database.
     Uses Streamlit's caching to maintain connection across reruns.
+    Every SELECT on it is aborted by the server after QUERY_TIMEOUT_SECONDS.
     """
     try:
-        connection = pymysql.connect(
-            host=db_host,
-            user=db_user,
-            password=db_pass,
-            database=db_name,
-            cursorclass=pymysql.cursors.DictCursor,
-            autocommit=False
-        )
+        connection = MySQLBackend(db_host, db_user, db_pass, db_name,
+                                  statement_timeout=QUERY_TIMEOUT_SECONDS,
+                                  server_side_prepare=SERVER_SIDE_PREPARE).connect()
         return connection
     except pymysql.Error as e:
         st.error(f"❌ Error connecting to MySQL Database: {e}")
         return None
 
+@st.cache_resource
+def get_embedded_connection(backend_name, db_path):
+    """
+    Opens an embedded SQLite or DuckDB database (see backends.py).
+    An empty database is loaded from schema.sql and populate.sql.
+    """
+    try:
+        return open_embedded(backend_name, db_path)
+    except pymysql.Error as e:
+        st.error(f"❌ Error opening embedded database: {e}")
+        return None
+
+@st.cache_resource
+def get_analytics_store(store_path):
+    """
+    Opens the DuckDB analytics store that reports can read from (see analytics_sync.py).
+    """
+    try:
+        return open_store(store_path)
+    except pymysql.Error as e:
+        st.error(f"❌ Error opening analytics store: {e}")
+        return None
+
+# One sync at a time: the store connection is shared by all sessions
+_analytics_sync_lock = threading.Lock()
+
 def check_connection():
     """Check if database connection exists in session state."""
     return 'db_connection' in st.session_state and st.session_state.db_connection is not None
 
+# =====================================================
+# QUERY LIMITS AND CANCELLATION
+# =====================================================
+
+# Seconds between checks on a running query (each one lets Streamlit interrupt the page)
+QUERY_POLL_SECONDS = 0.25
+# Seconds to wait for a killed query to return before rerunning the page
+CANCEL_GRACE_SECONDS = 2
+
+# Cancellable queries running in this process: token -> (user, label, started)
+running_queries = {}
+_running_queries_lock = threading.Lock()
+_query_tokens = count(1)
+
+def connection_user(connection):
+    """The database user a connection logs in as ('local' for embedded databases)."""
+    user = getattr(connection, 'user', None)
+    return user.decode() if isinstance(user, bytes) else user or 'local'
+
+def _claim_query_slot(user, label):
+    """Register a running query, or return None if the user is at their quota."""
+    with _running_queries_lock:
+        if sum(1 for owner, _, _ in running_queries.values() if owner == user) >= MAX_RUNNING_QUERIES_PER_USER:
+            return None
+        token = next(_query_tokens)
+        running_queries[token] = (user, label, datetime.now())
+        return token
+
+def _release_query_slot(token):
+    with _running_queries_lock:
+        running_queries.pop(token, None)
+
+def run_cancellable(connection, label, func, *args, time_limit=QUERY_TIMEOUT_SECONDS, **kwargs):
+    """
+    Run a read function with a time limit, a cancel button and the per-user quota.
+    The query runs on its own connection in a worker thread, so it never holds
+    the shared connection, while the page polls it. The cancel button (or any
+    other widget that reruns the page) kills the statement.
+    Returns the function's result, or None if the query was refused, cancelled
+    or timed out.
+    """
+    user = connection_user(connection)
+    token = _claim_query_slot(user, label)
+    if token is None:
+        st.warning(f"⏳ {user} already has {MAX_RUNNING_QUERIES_PER_USER} queries running. "
+                   "Wait for one to finish or cancel it.")
+        return None
+    try:
+        query_connection = open_query_connection(connection, time_limit)
+    except pymysql.Error as e:
+        _release_query_slot(token)
+        st.error(f"Error opening query connection: {e}")
+        return None
+    # In-memory databases cannot be opened twice; run on the shared connection
+    dedicated = query_connection is not None
+    query_connection = query_connection or connection
+    
+    outcome = {}
+    def work():
+        try:
+            outcome['result'] = func(query_connection, *args, **kwargs)
+        finally:
+            if dedicated:
+                query_connection.close()
+            _release_query_slot(token)
+    
+    def time_out():
+        outcome['timed_out'] = True
+        cancel_query(query_connection)
+    
+    worker = threading.Thread(target=work, daemon=True)
+    # Lets st.error calls made by the data function render on this page
+    add_script_run_ctx(worker, get_script_run_ctx())
+    timer = threading.Timer(time_limit, time_out)
+    started = time.monotonic()
+    worker.start()
+    timer.start()
+    
+    status = st.empty()
+    try:
+        with status.container():
+            st.button("⛔ Cancel query", key=f"cancel_query_{token}")
+            progress = st.empty()
+        while worker.is_alive():
+            # Every update is a point where Streamlit can stop this run for a rerun
+            progress.caption(f"⏳ {label}: running for {time.monotonic() - started:.0f}s "
+                             f"(limit {time_limit}s)")
+            worker.join(QUERY_POLL_SECONDS)
+    except BaseException:
+        # The page is rerunning (cancel button or another widget): stop the statement too
+        cancel_query(query_connection)
+        worker.join(CANCEL_GRACE_SECONDS)
+        st.session_state.cancelled_query = label
+        raise
+    finally:
+        timer.cancel()
+    status.empty()
+    
+    if outcome.get('timed_out'):
+        st.warning(f"⌛ {label} was cancelled after reaching its {time_limit}s limit.")
+        return None
+    return outcome.get('result')
+
+# =====================================================
+# PREPARED STATEMENTS
+# =====================================================
+
+# Named statements for the high-frequency lookups and writes. Each one is
+# parsed once per connection session with PREPARE and then run with EXECUTE.
+# PyMySQL has no binary-protocol prepare, so parameters are passed through
+# session user variables (@p0, @p1, ...).
+PREPARED_STATEMENTS = {
+    'demigods_by_parent': """
+        SELECT 
+            d.Hero_ID,
+            d.First_Name,
+            d.Last_Name,
+            g.Name as Divine_Parent,
+            d.Date_of_Birth,
+            d.Fatal_Flaw,
+            d.Status
+        FROM Demigod d
+        JOIN God g ON d.Divine_Parent_ID = g.Divine_ID
+        WHERE g.Name = ?
+        ORDER BY d.First_Name
+    """,
+    'monster_encounters': """
+        SELECT 
+            d.First_Name,
+            d.Last_Name,
+            m.Species,
+            m.Threat_Level,
+            e.Encounter_Date,
+            e.Location,
+            e.Outcome
+        FROM Encounters e
+        JOIN Demigod d ON e.Hero_ID = d.Hero_ID
+        JOIN Monster m ON e.Monster_ID = m.Monster_ID
+        WHERE d.Hero_ID = ?
+        ORDER BY e.Encounter_Date DESC
+    """,
+    'quest_participants': """
+        SELECT 
+            CONCAT(d.First_Name, ' ', d.Last_Name) as Hero_Name,
+            g.Name as Divine_Parent,
+            ql.Role,
+            ql.Outcome,
+            GROUP_CONCAT(ka.Ability SEPARATOR ', ') as Abilities
+        FROM Quest_Log ql
+        JOIN Demigod d ON ql.Hero_ID = d.Hero_ID
+        LEFT JOIN God g ON d.Divine_Parent_ID = g.Divine_ID
+        LEFT JOIN Known_Abilities ka ON d.Hero_ID = ka.Hero_ID
+        WHERE ql.Quest_ID = ?
+        GROUP BY d.Hero_ID, d.First_Name, d.Last_Name, g.Name, ql.Role, ql.Outcome
+        ORDER BY ql.Role
+    """,
+    'hero_abilities': """
+        SELECT Ability FROM Known_Abilities 
+        WHERE Hero_ID = ?
+        ORDER BY Ability
+    """,
+    'hero_profile': """
+        SELECT Profile FROM Hero_Profile
+        WHERE Hero_ID = ?
+    """,
+    'monster_dossier': """
+        SELECT Dossier FROM Monster_Dossier
+        WHERE Monster_ID = ?
+    """,
+    'insert_monster_sighting': """
+        INSERT INTO Sighting_Log (Monster_ID, Sighting_Timestamp, Location, Reported_By)
+        VALUES (?, ?, ?, ?)
+    """,
+    'delete_monster_sighting': """
+        DELETE FROM Sighting_Log 
+        WHERE Monster_ID = ? AND Sighting_Timestamp = ?
+    """,
+    'delete_demigod_ability': """
+        DELETE FROM Known_Abilities 
+        WHERE Hero_ID = ? AND Ability = ?
+    """,
+}
+
+# Process-wide prepare counters: a hit reuses a statement already prepared on
+# the connection's current session, a miss sends a PREPARE.
+prepared_statement_stats = {'hits': 0, 'misses': 0}
+_prepared_stats_lock = threading.Lock()
+
+def _prepare_statement(cursor, name):
+    """Send PREPARE for a registered statement on the cursor's session."""
+    cursor.execute(f"PREPARE stmt_{name} FROM %s", (PREPARED_STATEMENTS[name],))
+
+def _execute_statement(cursor, name, params):
+    """
+    Run EXECUTE for a prepared statement, binding params through user variables.
+    The SET is its own call: connections do not allow multi-statement queries,
+    so a prepared call with parameters costs two round trips.
+    """
+    if not params:
+        cursor.execute(f"EXECUTE stmt_{name}")
+        return
+    cursor.execute("SET " + ", ".join(f"@p{i} = %s" for i in range(len(params))), tuple(params))
+    cursor.execute(f"EXECUTE stmt_{name} USING " + ", ".join(f"@p{i}" for i in range(len(params))))
+
+def execute_prepared(cursor, name, params=()):
+    """
+    Execute a statement from PREPARED_STATEMENTS by name.
+    Statements are prepared lazily and tracked per server session (thread id),
+    so a reconnect transparently prepares them again. Connections without
+    server_side_prepare (the default) run the statement as a plain query.
+    """
+    connection = cursor.connection
+    if not getattr(connection, 'server_side_prepare', False):
+        # Embedded backends (backends.py) cache parsed statements themselves
+        cursor.execute(PREPARED_STATEMENTS[name].replace('?', '%s'), tuple(params))
+        return
+    
+    session_id = connection.thread_id()
+    prepared = getattr(connection, 'prepared_statements', None)
+    if prepared is None or prepared[0] != session_id:
+        prepared = (session_id, set())
+        connection.prepared_statements = prepared
+    
+    if name in prepared[1]:
+        with _prepared_stats_lock:
+            prepared_statement_stats['hits'] += 1
+    else:
+        _prepare_statement(cursor, name)
+        prepared[1].add(name)
+        with _prepared_stats_lock:
+            prepared_statement_stats['misses'] += 1
+    
+    try:
+        _execute_statement(cursor, name, tuple(params))
+    except pymysql.err.OperationalError as e:
+        # ER_UNKNOWN_STMT_HANDLER: the server dropped the statement (e.g. a reset); prepare again
+        if e.args[0] != 1243:
+            raise
+        _prepare_statement(cursor, name)
+        with _prepared_stats_lock:
+            prepared_statement_stats['misses'] += 1
+        _execute_statement(cursor, name, tuple(params))
+
+# =====================================================
+# LAZY TEXT LOADING
+# =====================================================
+
+# List views fetch TEXT columns as LEFT(...) previews of this many characters;
+# the full text is fetched on demand with get_full_text.
+TEXT_PREVIEW_CHARS = 80
+
+# Whitelisted long-text columns: kind -> (table, text column, key column)
+FULL_TEXT_COLUMNS = {
+    'quest_objective': ('Quest', 'Objective', 'Quest_ID'),
+    'prophecy_text': ('Prophecy', 'Full_Text', 'Prophecy_ID'),
+    'combat_notes': ('Combat_Encounter', 'Notes', 'Encounter_ID'),
+    'beast_description': ('Beast', 'Physical_Description', 'Monster_ID'),
+}
+
+FULL_TEXT_CACHE_SIZE = 256
+_full_text_cache = OrderedDict()
+_full_text_cache_lock = threading.Lock()
+
+def _full_text_cache_key(connection, kind, row_id):
+    """Cache keys include the server and schema so different databases never share entries."""
+    return (connection.host, connection.db, kind, row_id)
+
+def get_full_text(connection, kind, row_id):
+    """
+    Get the full text of one long-text column, e.g. when a row is expanded.
+    Results are kept in a small LRU cache shared across sessions.
+    """
+    key = _full_text_cache_key(connection, kind, row_id)
+    with _full_text_cache_lock:
+        if key in _full_text_cache:
+            _full_text_cache.move_to_end(key)
+            return _full_text_cache[key]
+    
+    table, column, key_column = FULL_TEXT_COLUMNS[kind]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {column} as Text FROM {table} WHERE {key_column} = %s", (row_id,))
+            row = cursor.fetchone()
+    except pymysql.Error as e:
+        st.error(f"Error fetching text: {e}")
+        return None
+    if row is None:
+        return None
+    
+    with _full_text_cache_lock:
+        _full_text_cache[key] = row['Text']
+        if len(_full_text_cache) > FULL_TEXT_CACHE_SIZE:
+            _full_text_cache.popitem(last=False)
+    return row['Text']
+
+def invalidate_full_text(connection, kind, row_id):
+    """Drop a cached full text after the row was changed or deleted."""
+    with _full_text_cache_lock:
+        _full_text_cache.pop(_full_text_cache_key(connection, kind, row_id), None)
+
+def render_full_text_expander(connection, kind, row_id, label):
+    """Show an expander that loads the full text only when opened."""
+    with st.expander(label):
+        if st.toggle("Load full text", key=f"full_text_{kind}_{row_id}"):
+            st.write(get_full_text(connection, kind, row_id) or "—")
+
+# =====================================================
+# POLYMORPHIC ENTITY LOADING
+# =====================================================
+
+# hierarchy -> (key column, base columns, {subclass table: subclass columns})
+ENTITY_HIERARCHIES = {
+    'God': ('Divine_ID', ('Name', 'Domain', 'Symbol_of_Power', 'Roman_Counterpart'), {
+        'Olympian': ('Council_Seat_Number', 'Palace_Location'),
+        'Chthonic_God': ('Underworld_Domain', 'Associated_River'),
+        'Primordial': ('Creation_Aspect', 'Era_of_Power'),
+    }),
+    'Monster': ('Monster_ID', ('Species', 'Threat_Level'), {
+        'Beast': ('Physical_Description', 'Natural_Habitat'),
+        'Titan': ('Titan_Name', 'Domain_of_Rule', 'Imprisonment_Location'),
+        'Spirit': ('Ethereal_Form', 'Binding_Object'),
+    }),
+}
+
+# Long-text subclass columns are loaded as previews (full text via FULL_TEXT_COLUMNS)
+ENTITY_PREVIEW_COLUMNS = {'Physical_Description': 'beast_description'}
+
+ENTITY_MAP_SIZE = 2048
+
+# Identity map shared across sessions: (host, db, hierarchy, id) -> typed entity row.
+# Loading an id that is already mapped returns the same object without a query.
+_entity_map = OrderedDict()
+# (host, db, hierarchy) -> table versions the mapped entities were loaded at
+_entity_map_versions = {}
+_entity_map_lock = threading.Lock()
+
+def _entity_query(hierarchy, count):
+    """
+    One query resolving the subtype and attributes of a batch of ids.
+    Subclass tables are 1:1 with their parent, so the LEFT JOINs cannot fan out;
+    the hierarchies are disjoint, and the first matching subclass wins otherwise.
+    """
+    key, base_columns, subclasses = ENTITY_HIERARCHIES[hierarchy]
+    columns = [f"b.{key}"] + [f"b.{column}" for column in base_columns]
+    subtype_cases, joins = [], []
+    for i, (table, subclass_columns) in enumerate(subclasses.items()):
+        alias = f"s{i}"
+        subtype_cases.append(f"WHEN {alias}.{key} IS NOT NULL THEN '{table}'")
+        joins.append(f"LEFT JOIN {table} {alias} ON b.{key} = {alias}.{key}")
+        for column in subclass_columns:
+            if column in ENTITY_PREVIEW_COLUMNS:
+                columns.append(f"LEFT({alias}.{column}, {TEXT_PREVIEW_CHARS}) as {column}")
+            else:
+                columns.append(f"{alias}.{column}")
+    columns.append(f"CASE {' '.join(subtype_cases)} END as Subtype")
+    return (f"SELECT {', '.join(columns)} FROM {hierarchy} b {' '.join(joins)} "
+            f"WHERE b.{key} IN " + _in_clause(range(count)))
+
+def _typed_entity(hierarchy, row):
+    """Build the typed row for one loaded entity: base columns, Subtype, its subclass columns."""
+    key, base_columns, subclasses = ENTITY_HIERARCHIES[hierarchy]
+    subtype = row['Subtype']
+    fields = (key,) + base_columns + ('Subtype',) + (subclasses[subtype] if subtype else ())
+    values = [row[field] for field in fields]
+    if 'Ethereal_Form' in fields and row['Ethereal_Form'] is not None:
+        values[fields.index('Ethereal_Form')] = bool(row['Ethereal_Form'])
+    return row_type(subtype or hierarchy, fields)(*values)
+
+def _sync_entity_map(connection, hierarchy):
+    """
+    Drop a hierarchy's mapped entities if any of its tables changed since they
+    were loaded. Returns False if change tracking is unavailable (nothing is mapped).
+    """
+    versions = get_table_versions(connection)
+    if not versions:
+        return False
+    scope = (connection.host, connection.db, hierarchy)
+    current = tuple(versions.get(table) for table in (hierarchy, *ENTITY_HIERARCHIES[hierarchy][2]))
+    with _entity_map_lock:
+        if _entity_map_versions.get(scope) != current:
+            for map_key in [k for k in _entity_map if k[:3] == scope]:
+                del _entity_map[map_key]
+            _entity_map_versions[scope] = current
+    return True
+
+def load_entities(connection, hierarchy, ids):
+    """
+    Load God or Monster entities with their subtype resolved, e.g. a Titan row
+    carrying Titan_Name and Domain_of_Rule alongside Species and Threat_Level.
+    Ids missing from the identity map are fetched together in one query.
+    Returns {id: entity} in the order of the given ids (unknown ids are left out).
+    """
+    ids = list(dict.fromkeys(entity_id for entity_id in ids if entity_id is not None))
+    if not ids:
+        return {}
+    try:
+        mapped = _sync_entity_map(connection, hierarchy)
+        scope = (connection.host, connection.db, hierarchy)
+        found = {}
+        if mapped:
+            with _entity_map_lock:
+                for entity_id in ids:
+                    entity = _entity_map.get(scope + (entity_id,))
+                    if entity is not None:
+                        _entity_map.move_to_end(scope + (entity_id,))
+                        found[entity_id] = entity
+        
+        missing = [entity_id for entity_id in ids if entity_id not in found]
+        if missing:
+            with connection.cursor() as cursor:
+                cursor.execute(_entity_query(hierarchy, len(missing)), tuple(missing))
+                loaded = {row[ENTITY_HIERARCHIES[hierarchy][0]]: _typed_entity(hierarchy, row)
+                          for row in cursor.fetchall()}
+            if mapped:
+                with _entity_map_lock:
+                    for entity_id, entity in loaded.items():
+                        # Another session may have mapped it meanwhile; keep one object per id
+                        entity = _entity_map.setdefault(scope + (entity_id,), entity)
+                        loaded[entity_id] = entity
+                    while len(_entity_map) > ENTITY_MAP_SIZE:
+                        _entity_map.popitem(last=False)
+            found.update(loaded)
+        return {entity_id: found[entity_id] for entity_id in ids if entity_id in found}
+    except pymysql.Error as e:
+        st.error(f"Error loading {hierarchy.lower()} details: {e}")
+        return {}
+
+def load_entity(connection, hierarchy, entity_id):
+    """Load a single God or Monster entity with its subtype resolved (None if unknown)."""
+    return load_entities(connection, hierarchy, [entity_id]).get(entity_id)
+
+def load_all_entities(connection, hierarchy):
+    """Load every God or Monster with its subtype resolved, ordered by name/species."""
+    key, base_columns, _ = ENTITY_HIERARCHIES[hierarchy]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {key} FROM {hierarchy} ORDER BY {base_columns[0]}")
+            ids = [row[key] for row in cursor.fetchall()]
+    except pymysql.Error as e:
+        st.error(f"Error during query: {e}")
+        return []
+    return list(load_entities(connection, hierarchy, ids).values())
+
+def entity_columns(hierarchy):
+    """All columns a mixed list of a hierarchy's entities can have."""
+    key, base_columns, subclasses = ENTITY_HIERARCHIES[hierarchy]
+    return [key, *base_columns, 'Subtype'] + [column for columns in subclasses.values() for column in columns]
+
+# =====================================================
+# QUERY BUILDER
+# =====================================================
+
+# Whitelisted views for server-side filtering, sorting and projection.
+# Only the column names listed here can be projected, filtered or sorted on.
+# Each column maps to (SQL expression, join alias it needs or None); joins are
+# to-one lookups, so unused ones are left out of the query entirely.
+# Filters compare bare columns (never wrapped in functions) so indexes apply;
+# 'indexed' lists the columns backed by an index in schema.sql, and
+# 'full_text' names the lazily loaded text (see FULL_TEXT_COLUMNS) per row key.
+QUERY_VIEWS = {
+    'Quests': {
+        'from': "Quest q",
+        'joins': {'p': "LEFT JOIN Prophecy p ON q.Prophecy_ID = p.Prophecy_ID"},
+        'columns': {
+            'Quest_ID': ("q.Quest_ID", None),
+            'Objective_Preview': (f"LEFT(q.Objective, {TEXT_PREVIEW_CHARS})", None),
+            'Start_Date': ("q.Start_Date", None),
+            'End_Date': ("q.End_Date", None),
+            'Outcome': ("q.Outcome", None),
+            'Prophecy_Preview': (f"LEFT(p.Full_Text, {TEXT_PREVIEW_CHARS})", 'p'),
+            'Prophecy_Status': ("p.Status", 'p'),
+        },
+        'filters': {
+            'Start_Date': 'date_range',
+            'End_Date': 'date_range',
+            'Outcome': ('set', ['Success', 'Failure', 'Ongoing', 'Abandoned']),
+            'Prophecy_Status': ('set', ['Pending', 'In Progress', 'Fulfilled', 'Failed']),
+        },
+        'indexed': {'Quest_ID', 'Outcome', 'Prophecy_Status'},
+        'default_order': [('Start_Date', 'DESC')],
+        'full_text': ('quest_objective', 'Quest_ID'),
+    },
+    'Combat Encounters': {
+        'from': "Combat_Encounter ce",
+        'joins': {
+            'd': "LEFT JOIN Demigod d ON ce.Hero_ID = d.Hero_ID",
+            'm': "LEFT JOIN Monster m ON ce.Monster_ID = m.Monster_ID",
+            'a': "LEFT JOIN Divine_Artifact a ON ce.Artifact_ID = a.Artifact_ID",
+        },
+        'columns': {
+            'Encounter_ID': ("ce.Encounter_ID", None),
+            'Combat_Date': ("ce.Combat_Date", None),
+            'Hero_Name': ("CONCAT(d.First_Name, ' ', d.Last_Name)", 'd'),
+            'Monster_Species': ("m.Species", 'm'),
+            'Threat_Level': ("m.Threat_Level", 'm'),
+            'Artifact': ("a.Name", 'a'),
+            'Combat_Location': ("ce.Combat_Location", None),
+            'Result': ("ce.Result", None),
+            'Quest_ID': ("ce.Quest_ID", None),
+            'Notes_Preview': (f"LEFT(ce.Notes, {TEXT_PREVIEW_CHARS})", None),
+        },
+        'filters': {
+            'Combat_Date': 'date_range',
+            'Result': ('set', ['Hero Victory', 'Monster Victory', 'Draw', 'Interrupted']),
+            'Threat_Level': ('range', (1, 10)),
+        },
+        'indexed': {'Encounter_ID', 'Combat_Date', 'Threat_Level'},
+        'default_order': [('Combat_Date', 'DESC')],
+        'full_text': ('combat_notes', 'Encounter_ID'),
+    },
+    'Monsters': {
+        'from': "Monster m",
+        'joins': {},
+        'columns': {
+            'Monster_ID': ("m.Monster_ID", None),
+            'Species': ("m.Species", None),
+            'Threat_Level': ("m.Threat_Level", None),
+        },
+        'filters': {
+            'Threat_Level': ('range', (1, 10)),
+        },
+        'indexed': {'Monster_ID', 'Threat_Level'},
+        'default_order': [('Threat_Level', 'DESC')],
+    },
+    'Demigods': {
+        'from': "Demigod d",
+        'joins': {'g': "LEFT JOIN God g ON d.Divine_Parent_ID = g.Divine_ID"},
+        'columns': {
+            'Hero_ID': ("d.Hero_ID", None),
+            'First_Name': ("d.First_Name", None),
+            'Last_Name': ("d.Last_Name", None),
+            'Divine_Parent': ("g.Name", 'g'),
+            'Date_of_Birth': ("d.Date_of_Birth", None),
+            'Date_of_Arrival': ("d.Date_of_Arrival", None),
+            'Fatal_Flaw': ("d.Fatal_Flaw", None),
+            'Status': ("d.Status", None),
+        },
+        'filters': {
+            'Date_of_Arrival': 'date_range',
+            'Status': ('set', ['Active', 'Deceased', 'Missing', 'Retired']),
+        },
+        'indexed': {'Hero_ID', 'Status'},
+        'default_order': [('Last_Name', 'ASC'), ('First_Name', 'ASC')],
+    },
+    'Monster Sightings': {
+        'from': "Sighting_Log sl",
+        'joins': {
+            'm': "LEFT JOIN Monster m ON sl.Monster_ID = m.Monster_ID",
+            'd': "LEFT JOIN Demigod d ON sl.Reported_By = d.Hero_ID",
+        },
+        'columns': {
+            'Sighting_Timestamp': ("sl.Sighting_Timestamp", None),
+            'Monster_Species': ("m.Species", 'm'),
+            'Threat_Level': ("m.Threat_Level", 'm'),
+            'Location': ("sl.Location", None),
+            'Reporter': ("CONCAT(d.First_Name, ' ', d.Last_Name)", 'd'),
+        },
+        'filters': {
+            'Sighting_Timestamp': 'date_range',
+            'Threat_Level': ('range', (1, 10)),
+        },
+        'indexed': {'Sighting_Timestamp', 'Location', 'Threat_Level'},
+        'default_order': [('Sighting_Timestamp', 'DESC')],
+    },
+}
+
+QUERY_BUILDER_DEFAULT_LIMIT = 500
+QUERY_BUILDER_MAX_LIMIT = 5000
+
+def build_view_query(view_name, columns=None, filters=None, order_by=None, limit=None):
+    """
+    Build a SELECT for a whitelisted view.
+    filters maps column -> value: (start, end) dates for 'date_range',
+    a list of values for 'set', (low, high) for 'range'; None bounds are open.
+    order_by is a list of (column, 'ASC'|'DESC').
+    Raises ValueError for anything outside the whitelist.
+    Returns (sql, params).
+    """
+    if view_name not in QUERY_VIEWS:
+        raise ValueError(f"Unknown view: {view_name}")
+    view = QUERY_VIEWS[view_name]
+    columns = list(columns) if columns else list(view['columns'])
+    order_by = order_by if order_by is not None else view['default_order']
+    filters = filters or {}
+    
+    for name in list(columns) + list(filters) + [col for col, _ in order_by]:
+        if name not in view['columns']:
+            raise ValueError(f"Column {name} is not available in {view_name}")
+    
+    needed_joins = set()
+    select_parts = []
+    for name in columns:
+        expr, join = view['columns'][name]
+        select_parts.append(f"{expr} as {name}")
+        needed_joins.add(join)
+    
+    where_parts, params = [], []
+    for name, value in filters.items():
+        if name not in view['filters']:
+            raise ValueError(f"Column {name} cannot be filtered in {view_name}")
+        expr, join = view['columns'][name]
+        kind = view['filters'][name]
+        kind = kind[0] if isinstance(kind, tuple) else kind
+        if kind == 'date_range':
+            start, end = value
+            # Half-open range on the bare column works for DATE and DATETIME alike
+            if start:
+                where_parts.append(f"{expr} >= %s")
+                params.append(start)
+            if end:
+                where_parts.append(f"{expr} < %s")
+                params.append(end + timedelta(days=1))
+        elif kind == 'set':
+            allowed = view['filters'][name][1]
+            if any(v not in allowed for v in value):
+                raise ValueError(f"Invalid value for {name}")
+            if not value:
+                where_parts.append("1 = 0")
+            else:
+                where_parts.append(f"{expr} IN " + _in_clause(value))
+                params.extend(value)
+        elif kind == 'range':
+            low, high = value
+            if low is not None:
+                where_parts.append(f"{expr} >= %s")
+                params.append(low)
+            if high is not None:
+                where_parts.append(f"{expr} <= %s")
+                params.append(high)
+        needed_joins.add(join)
+    
+    order_parts = []
+    for name, direction in order_by:
+        direction = direction.upper()
+        if direction not in ('ASC', 'DESC'):
+            raise ValueError(f"Invalid sort direction: {direction}")
+        expr, join = view['columns'][name]
+        order_parts.append(f"{expr} {direction}")
+        needed_joins.add(join)
+    
+    sql = f"SELECT {', '.join(select_parts)} FROM {view['from']}"
+    for alias, join_sql in view['joins'].items():
+        if alias in needed_joins:
+            sql += f" {join_sql}"
+    if where_parts:
+        sql += " WHERE " + " AND ".join(where_parts)
+    if order_parts:
+        sql += " ORDER BY " + ", ".join(order_parts)
+    if limit is not None:
+        sql += f" LIMIT {min(int(limit), QUERY_BUILDER_MAX_LIMIT)}"
+    return sql, tuple(params)
+
+def run_view_query(connection, view_name, columns=None, filters=None, order_by=None, limit=None):
+    """Run a whitelisted view query built by build_view_query."""
+    try:
+        sql_query, params = build_view_query(view_name, columns, filters, order_by, limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql_query, params)
+            return cursor.fetchall()
+    except ValueError as e:
+        st.error(f"Invalid query: {e}")
+        return []
+    except pymysql.Error as e:
+        st.error(f"Error during query: {e}")
+        return []
+
+def view_query_source(connection, view_name, filters=None):
+    """
+    The connection a view query should run on. Partitions of the event
+    tables past the retention window are archived out of the database
+    (partition_manager.py) and only the analytics store holds their rows, so
+    a date range starting before the window runs on the store once it has
+    been synced.
+    """
+    table = QUERY_VIEWS[view_name]['from'].split()[0]
+    if table not in PARTITIONED_TABLES or not archive_files(table):
+        return connection
+    cutoff = retention_cutoff()
+    start = (filters or {}).get(PARTITIONED_TABLES[table][0], (None, None))[0]
+    if start is None or start >= cutoff:
+        st.caption(f"Rows before {cutoff} are archived; set a start date before it to search them.")
+        return connection
+    store = get_analytics_store(DEFAULT_STORE_PATH)
+    if store is None or not get_sync_state(store):
+        st.warning(f"Rows before {cutoff} are archived and the analytics store has not been synced; "
+                   "showing rows still in the database only.")
+        return connection
+    st.caption(f"Rows before {cutoff} are archived; this query runs on the analytics store as of its last sync.")
+    return store
+
 # =====================================================
 # QUERY FUNCTIONS (READ OPERATIONS)
 # =====================================================
@@ -163,70 +923,29 @@ def query_demigods_by_parent(connection, god_name):
     """
     try:
         with connection.cursor() as cursor:
-            sql_query = """
-                SELECT 
-                    d.Hero_ID,
-                    d.First_Name,
-                    d.Last_Name,
-                    g.Name as Divine_Parent,
-                    d.Date_of_Birth,
-                    d.Fatal_Flaw,
-                    d.Status
-                FROM Demigod d
-                JOIN God g ON d.Divine_Parent_ID = g.Divine_ID
-                WHERE g.Name = %s
-                ORDER BY d.First_Name
-            """
-            cursor.execute(sql_query, (god_name,))
+            execute_prepared(cursor, 'demigods_by_parent', (god_name,))
             results = cursor.fetchall()
             return results
     except pymysql.Error as e:
         st.error(f"Error during query: {e}")
         return []
 
-def query_quests_with_details(connection, status=None):
+def query_quests_with_details(connection, status=None, statuses=None, start_dates=None,
+                              columns=None, order_by=None, limit=None):
     """
     Query 2: Get detailed quest information including prophecies.
     Complex query with LEFT JOIN to include quests without prophecies.
+    Filtering, sorting and projection are pushed down through the 'Quests' view.
     """
-    try:
-        with connection.cursor() as cursor:
-            if status:
-                sql_query = """
-                    SELECT 
-                        q.Quest_ID,
-                        q.Objective,
-                        q.Start_Date,
-                        q.End_Date,
-                        q.Outcome,
-                        p.Full_Text as Prophecy,
-                        p.Status as Prophecy_Status
-                    FROM Quest q
-                    LEFT JOIN Prophecy p ON q.Prophecy_ID = p.Prophecy_ID
-                    WHERE q.Outcome = %s
-                    ORDER BY q.Start_Date DESC
-                """
-                cursor.execute(sql_query, (status,))
-            else:
-                sql_query = """
-                    SELECT 
-                        q.Quest_ID,
-                        q.Objective,
-                        q.Start_Date,
-                        q.End_Date,
-                        q.Outcome,
-                        p.Full_Text as Prophecy,
-                        p.Status as Prophecy_Status
-                    FROM Quest q
-                    LEFT JOIN Prophecy p ON q.Prophecy_ID = p.Prophecy_ID
-                    ORDER BY q.Start_Date DESC
-                """
-                cursor.execute(sql_query)
-            results = cursor.fetchall()
-            return results
-    except pymysql.Error as e:
-        st.error(f"Error during query: {e}")
-        return []
+    filters = {}
+    if status:
+        filters['Outcome'] = [status]
+    if statuses is not None:
+        filters['Outcome'] = list(statuses)
+    if start_dates:
+        filters['Start_Date'] = start_dates
+    return run_view_query(connection, 'Quests', columns=columns, filters=filters,
+                          order_by=order_by, limit=limit)
 
 def query_monster_encounters(connection, hero_id):
     """
@@ -235,22 +954,7 @@ def query_monster_encounters(connection, hero_id):
     """
     try:
         with connection.cursor() as cursor:
-            sql_query = """
-                SELECT 
-                    d.First_Name,
-                    d.Last_Name,
-                    m.Species,
-                    m.Threat_Level,
-                    e.Encounter_Date,
-                    e.Location,
-                    e.Outcome
-                FROM Encounters e
-                JOIN Demigod d ON e.Hero_ID = d.Hero_ID
-                JOIN Monster m ON e.Monster_ID = m.Monster_ID
-                WHERE d.Hero_ID = %s
-                ORDER BY e.Encounter_Date DESC
-            """
-            cursor.execute(sql_query, (hero_id,))
+            execute_prepared(cursor, 'monster_encounters', (hero_id,))
             results = cursor.fetchall()
             return results
     except pymysql.Error as e:
@@ -287,33 +991,24 @@ def query_artifacts_and_wielders(connection):
 def query_most_dangerous_monsters(connection, min_threat_level):
     """
     Query 5: Find monsters above a certain threat level with their weaknesses.
-    Complex query with aggregation and GROUP BY.
+    Served from Monster_Dossier by a range read on (Threat_Level, Times_Encountered)
+    instead of joining weaknesses x habitats x encounters and regrouping.
     """
+    success, result = ensure_monster_dossiers(connection, min_threat_level)
+    if not success:
+        st.error(f"Error building monster dossiers: {result}")
     try:
         with connection.cursor() as cursor:
-            sql_query = """
-                SELECT 
-                    m.Monster_ID,
-                    m.Species,
-                    m.Threat_Level,
-                    GROUP_CONCAT(DISTINCT kw.Weakness SEPARATOR ', ') as Weaknesses,
-                    GROUP_CONCAT(DISTINCT ch.Habitat SEPARATOR ', ') as Habitats,
-                    COUNT(DISTINCT e.Hero_ID) as Times_Encountered
-                FROM Monster m
-                LEFT JOIN Known_Weaknesses kw ON m.Monster_ID = kw.Monster_ID
-                LEFT JOIN Common_Habitats ch ON m.Monster_ID = ch.Monster_ID
-                LEFT JOIN Encounters e ON m.Monster_ID = e.Monster_ID
-                WHERE m.Threat_Level >= %s
-                GROUP BY m.Monster_ID, m.Species, m.Threat_Level
-                ORDER BY m.Threat_Level DESC, Times_Encountered DESC
-            """
-            cursor.execute(sql_query, (min_threat_level,))
-            results = cursor.fetchall()
-            # Convert Decimal types to int for Streamlit compatibility
-            for result in results:
-                result['Times_Encountered'] = int(result['Times_Encountered']) if result['Times_Encountered'] else 0
-            return results
+            cursor.execute("""
+                SELECT Monster_ID, Species, Threat_Level, Monster_Type,
+                       Weaknesses, Habitats, Times_Encountered, Combat_Count
+                FROM Monster_Dossier
+                WHERE Threat_Level >= %s
+                ORDER BY Threat_Level DESC, Times_Encountered DESC
+            """, (min_threat_level,))
+            return cursor.fetchall()
     except pymysql.Error as e:
+        connection.rollback()
         st.error(f"Error during query: {e}")
         return []
 
@@ -323,22 +1018,7 @@ def query_quest_participants(connection, quest_id):
     """
     try:
         with connection.cursor() as cursor:
-            sql_query = """
-                SELECT 
-                    CONCAT(d.First_Name, ' ', d.Last_Name) as Hero_Name,
-                    g.Name as Divine_Parent,
-                    ql.Role,
-                    ql.Outcome,
-                    GROUP_CONCAT(ka.Ability SEPARATOR ', ') as Abilities
-                FROM Quest_Log ql
-                JOIN Demigod d ON ql.Hero_ID = d.Hero_ID
-                LEFT JOIN God g ON d.Divine_Parent_ID = g.Divine_ID
-                LEFT JOIN Known_Abilities ka ON d.Hero_ID = ka.Hero_ID
-                WHERE ql.Quest_ID = %s
-                GROUP BY d.Hero_ID, d.First_Name, d.Last_Name, g.Name, ql.Role, ql.Outcome
-                ORDER BY ql.Role
-            """
-            cursor.execute(sql_query, (quest_id,))
+            execute_prepared(cursor, 'quest_participants', (quest_id,))
             results = cursor.fetchall()
             return results
     except pymysql.Error as e:
@@ -385,7 +1065,7 @@ def query_active_prophecies_no_quest(connection):
             sql_query = """
                 SELECT 
                     p.Prophecy_ID,
-                    p.Full_Text,
+                    LEFT(p.Full_Text, %s) as Text_Preview,
                     p.Date_Issued,
                     p.Status
                 FROM Prophecy p
@@ -395,7 +1075,7 @@ def query_active_prophecies_no_quest(connection):
                   AND p.Status != 'Failed'
                 ORDER BY p.Date_Issued DESC
             """
-            cursor.execute(sql_query)
+            cursor.execute(sql_query, (TEXT_PREVIEW_CHARS,))
             results = cursor.fetchall()
             return results
     except pymysql.Error as e:
@@ -494,7 +1174,7 @@ def report_quests_by_divine_parent(connection):
                     COUNT(DISTINCT q.Quest_ID) as Total_Quests,
                     COUNT(DISTINCT d.Hero_ID) as Children_Participated,
                     SUM(CASE WHEN q.Outcome = 'Success' THEN 1 ELSE 0 END) as Successful_Quests,
-                    GROUP_CONCAT(DISTINCT q.Objective SEPARATOR ' | ') as Quest_Objectives
+                    GROUP_CONCAT(DISTINCT LEFT(q.Objective, %s) SEPARATOR ' | ') as Quest_Objectives
                 FROM God g
                 JOIN Demigod d ON g.Divine_ID = d.Divine_Parent_ID
                 JOIN Quest_Log ql ON d.Hero_ID = ql.Hero_ID
@@ -502,7 +1182,7 @@ def report_quests_by_divine_parent(connection):
                 GROUP BY g.Divine_ID, g.Name, g.Domain
                 ORDER BY Total_Quests DESC, Successful_Quests DESC
             """
-            cursor.execute(sql_query)
+            cursor.execute(sql_query, (TEXT_PREVIEW_CHARS,))
             results = cursor.fetchall()
             # Convert Decimal types to int for Streamlit compatibility
             for result in results:
@@ -576,7 +1256,7 @@ def report_prophecy_monster_correlation(connection):
                     p.Prophecy_ID,
                     LEFT(p.Full_Text, 100) as Prophecy_Text,
                     p.Status as Prophecy_Status,
-                    q.Objective as Quest_Objective,
+                    LEFT(q.Objective, 100) as Quest_Objective,
                     m.Species as Monster_Species,
                     m.Threat_Level,
                     COUNT(*) as Encounter_Count
@@ -584,7 +1264,7 @@ def report_prophecy_monster_correlation(connection):
                 JOIN Quest q ON p.Prophecy_ID = q.Prophecy_ID
                 JOIN Combat_Encounter ce ON q.Quest_ID = ce.Quest_ID
                 JOIN Monster m ON ce.Monster_ID = m.Monster_ID
-                GROUP BY p.Prophecy_ID, p.Full_Text, p.Status, q.Objective, m.Species, m.Threat_Level
+                GROUP BY p.Prophecy_ID, Prophecy_Text, p.Status, q.Quest_ID, Quest_Objective, m.Species, m.Threat_Level
                 ORDER BY p.Prophecy_ID, Encounter_Count DESC
             """
             cursor.execute(sql_query)
@@ -597,285 +1277,1853 @@ def report_prophecy_monster_correlation(connection):
         st.error(f"Error during query: {e}")
         return []
 
-def query_database_statistics(connection):
+# Dashboard stat panels: each entry lists the tables it reads (matched against
+# table versions) and a single query producing its metrics.
+DASHBOARD_STAT_PANELS = {
+    'gods': (('God',), "SELECT COUNT(*) as total_gods FROM God"),
+    'demigods': (('Demigod',), """
+        SELECT COUNT(*) as total_demigods,
+               SUM(CASE WHEN Status = 'Active' THEN 1 ELSE 0 END) as active_demigods
+        FROM Demigod
+    """),
+    'monsters': (('Monster',), "SELECT COUNT(*) as total_monsters FROM Monster"),
+    'quests': (('Quest',), """
+        SELECT COUNT(*) as total_quests,
+               SUM(CASE WHEN Outcome = 'Success' THEN 1 ELSE 0 END) as completed_quests
+        FROM Quest
+    """),
+    'artifacts': (('Divine_Artifact',), "SELECT COUNT(*) as total_artifacts FROM Divine_Artifact"),
+    'encounters': (('Encounters',), "SELECT COUNT(*) as total_encounters FROM Encounters"),
+}
+
+# The council table depends on seats, god details and children counts
+COUNCIL_PANEL_TABLES = ('God', 'Olympian', 'Demigod')
+
+def query_stat_panel(connection, panel):
     """
-    Query 8: Get overall database statistics.
+    Run the metric query for one dashboard panel.
+    Decimal sums are converted to int for Streamlit compatibility.
     """
     try:
         with connection.cursor() as cursor:
-            stats = {}
-            
-            # Total gods
-            cursor.execute("SELECT COUNT(*) as count FROM God")
-            stats['total_gods'] = cursor.fetchone()['count']
-            
-            # Total demigods
-            cursor.execute("SELECT COUNT(*) as count FROM Demigod")
-            stats['total_demigods'] = cursor.fetchone()['count']
-            
-            # Active demigods
-            cursor.execute("SELECT COUNT(*) as count FROM Demigod WHERE Status = 'Active'")
-            stats['active_demigods'] = cursor.fetchone()['count']
-            
-            # Total monsters
-            cursor.execute("SELECT COUNT(*) as count FROM Monster")
-            stats['total_monsters'] = cursor.fetchone()['count']
-            
-            # Total quests
-            cursor.execute("SELECT COUNT(*) as count FROM Quest")
-            stats['total_quests'] = cursor.fetchone()['count']
-            
-            # Completed quests
-            cursor.execute("SELECT COUNT(*) as count FROM Quest WHERE Outcome = 'Success'")
-            stats['completed_quests'] = cursor.fetchone()['count']
-            
-            # Total artifacts
-            cursor.execute("SELECT COUNT(*) as count FROM Divine_Artifact")
-            stats['total_artifacts'] = cursor.fetchone()['count']
-            
-            # Total encounters
-            cursor.execute("SELECT COUNT(*) as count FROM Encounters")
-            stats['total_encounters'] = cursor.fetchone()['count']
-            
-            return stats
+            cursor.execute(DASHBOARD_STAT_PANELS[panel][1])
+            result = cursor.fetchone()
+            return {key: int(value) if value else 0 for key, value in result.items()}
     except pymysql.Error as e:
         st.error(f"Error during query: {e}")
         return {}
 
+def query_database_statistics(connection):
+    """
+    Query 8: Get overall database statistics.
+    One query per source table (see DASHBOARD_STAT_PANELS).
+    """
+    stats = {}
+    for panel in DASHBOARD_STAT_PANELS:
+        panel_stats = query_stat_panel(connection, panel)
+        if not panel_stats:
+            return {}
+        stats.update(panel_stats)
+    return stats
+
+def get_table_versions(connection):
+    """
+    Get the per-table change counters maintained by the change tracking
+    triggers (the sum of each table's Table_Version_Slot rows).
+    Returns an empty dict if change tracking is not installed, or the backend
+    has no triggers to keep the counters moving (DuckDB), so callers reload.
+    """
+    if not getattr(connection, 'has_triggers', True):
+        return {}
+    try:
+        # End the current read snapshot so counters committed by other sessions are visible
+        connection.commit()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT Table_Name, SUM(Version) as Version FROM Table_Version_Slot GROUP BY Table_Name")
+            return {row['Table_Name']: int(row['Version']) for row in cursor.fetchall()}
+    except pymysql.Error:
+        return {}
+
+def refresh_dashboard_panels(connection, cache):
+    """
+    Bring the cached dashboard panels up to date.
+    Only panels whose source tables changed since the last refresh are re-queried;
+    without change tracking every panel is reloaded.
+    Returns the list of panels that were reloaded.
+    """
+    versions = get_table_versions(connection)
+    panel_tables = {panel: tables for panel, (tables, _) in DASHBOARD_STAT_PANELS.items()}
+    panel_tables['council'] = COUNCIL_PANEL_TABLES
+    
+    reloaded = []
+    for panel, tables in panel_tables.items():
+        current = tuple(versions.get(table) for table in tables) if versions else None
+        if current is not None and panel in cache['data'] and cache['versions'].get(panel) == current:
+            continue
+        if panel == 'council':
+            data = query_olympian_council(connection)
+        else:
+            data = query_stat_panel(connection, panel)
+        cache['data'][panel] = data
+        # A failed query leaves no version behind so the panel is retried next refresh
+        cache['versions'][panel] = current if data else None
+        reloaded.append(panel)
+    cache['refreshed_at'] = datetime.now()
+    return reloaded
+
 # =====================================================
-# UPDATE FUNCTIONS (WRITE OPERATIONS)
+# ARTIFACT OWNERSHIP HISTORY
 # =====================================================
 
-def insert_new_demigod(connection, first_name, last_name, divine_parent_id, date_of_birth, 
-                       fatal_flaw, date_of_arrival, status, abilities=None):
+# Valid_To of the open-ended (current) holding; a sentinel instead of NULL
+# keeps "Valid_From <= T < Valid_To" a plain range predicate on the index
+OWNERSHIP_OPEN_END = datetime(9999, 12, 31, 23, 59, 59)
+
+def record_ownership_change(cursor, artifact_id, new_wielder_id, changed_at):
     """
-    REQUIRED - INSERT Operation: Add a new demigod to the database.
-    The system checks that the Divine Parent exists before insertion.
-    Also inserts Known_Abilities (multi-valued attribute).
+    Close the artifact's open ownership interval at changed_at and open one
+    for the new wielder. Runs inside the caller's transaction so history and
+    Divine_Artifact.Current_Wielder always change together.
+    A changed_at before the open interval's start would rewrite history; it
+    is refused and the message returned (None on success). A change in the
+    same second leaves a zero-length interval, ordered by Ownership_ID.
+    """
+    cursor.execute("""
+        SELECT Valid_From FROM Artifact_Ownership
+        WHERE Artifact_ID = %s AND Valid_To = %s
+        FOR UPDATE
+    """, (artifact_id, OWNERSHIP_OPEN_END))
+    current = cursor.fetchone()
+    if current and changed_at < current['Valid_From']:
+        return (f"This wielder change is dated {changed_at:%Y-%m-%d %H:%M:%S}, before the current holding "
+                f"began at {current['Valid_From']:%Y-%m-%d %H:%M:%S}. Reload the artifact and try again.")
+    cursor.execute("""
+        UPDATE Artifact_Ownership
+        SET Valid_To = %s
+        WHERE Artifact_ID = %s AND Valid_To = %s
+    """, (changed_at, artifact_id, OWNERSHIP_OPEN_END))
+    if new_wielder_id is not None:
+        cursor.execute("""
+            INSERT INTO Artifact_Ownership (Artifact_ID, Hero_ID, Valid_From, Valid_To)
+            VALUES (%s, %s, %s, %s)
+        """, (artifact_id, new_wielder_id, changed_at, OWNERSHIP_OPEN_END))
+    return None
+
+def query_artifact_holder_as_of(connection, artifact_id, as_of):
+    """
+    Who held an artifact at a point in time. Intervals of one artifact do not
+    overlap, so the only candidate is the latest interval starting at or
+    before as_of: one backwards probe of idx_artifact_holding. Intervals
+    starting in the same second are ordered by Ownership_ID, so a
+    zero-length interval never hides the holding that replaced it.
+    Returns None if the artifact was unwielded at that time.
     """
     try:
         with connection.cursor() as cursor:
-            # First check if divine parent exists
-            if divine_parent_id:
-                check_sql = "SELECT Divine_ID FROM God WHERE Divine_ID = %s"
-                cursor.execute(check_sql, (divine_parent_id,))
-                if not cursor.fetchone():
-                    return False, f"Divine Parent with ID {divine_parent_id} does not exist. Please select a valid god."
-            
-            # Insert demigod
-            sql_insert = """
-                INSERT INTO Demigod 
-                (First_Name, Last_Name, Divine_Parent_ID, Date_of_Birth, Fatal_Flaw, Date_of_Arrival, Status)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            sql_query = """
+                SELECT
+                    ao.Hero_ID,
+                    CONCAT(d.First_Name, ' ', d.Last_Name) as Holder,
+                    ao.Valid_From,
+                    ao.Valid_To
+                FROM Artifact_Ownership ao
+                LEFT JOIN Demigod d ON ao.Hero_ID = d.Hero_ID
+                WHERE ao.Artifact_ID = %s AND ao.Valid_From <= %s
+                ORDER BY ao.Valid_From DESC, ao.Ownership_ID DESC
+                LIMIT 1
             """
-            cursor.execute(sql_insert, (first_name, last_name, divine_parent_id, date_of_birth, 
-                                       fatal_flaw, date_of_arrival, status))
-            hero_id = cursor.lastrowid
-            
-            # Insert abilities if provided
-            if abilities:
-                for ability in abilities:
-                    if ability.strip():  # Only insert non-empty abilities
-                        sql_ability = "INSERT INTO Known_Abilities (Hero_ID, Ability) VALUES (%s, %s)"
-                        cursor.execute(sql_ability, (hero_id, ability.strip()))
-            
-            connection.commit()
-            return True, hero_id
+            cursor.execute(sql_query, (artifact_id, as_of))
+            result = cursor.fetchone()
+            if result is None or result['Valid_To'] <= as_of:
+                return None
+            if result['Valid_To'] == OWNERSHIP_OPEN_END:
+                result['Valid_To'] = None
+            return result
     except pymysql.Error as e:
-        connection.rollback()
-        return False, str(e)
+        st.error(f"Error during query: {e}")
+        return None
 
-def insert_new_quest(connection, objective, start_date, outcome='Ongoing', prophecy_id=None):
+def query_artifact_ownership_timeline(connection, artifact_id):
     """
-    INSERT Operation 2: Add a new quest.
-    Links quest to a prophecy if provided (1:1 relationship).
+    Ownership timeline of an artifact, oldest holding first.
+    Valid_To is None for the current holding.
     """
     try:
         with connection.cursor() as cursor:
-            # Check if prophecy_id is provided and not already linked to another quest
-            if prophecy_id:
-                check_sql = "SELECT Quest_ID FROM Quest WHERE Prophecy_ID = %s"
-                cursor.execute(check_sql, (prophecy_id,))
-                if cursor.fetchone():
-                    return False, "This prophecy is already linked to another quest."
-            
-            sql_insert = """
-                INSERT INTO Quest (Objective, Start_Date, Outcome, Prophecy_ID)
-                VALUES (%s, %s, %s, %s)
+            sql_query = """
+                SELECT
+                    CONCAT(d.First_Name, ' ', d.Last_Name) as Holder,
+                    ao.Valid_From,
+                    ao.Valid_To
+                FROM Artifact_Ownership ao
+                LEFT JOIN Demigod d ON ao.Hero_ID = d.Hero_ID
+                WHERE ao.Artifact_ID = %s
+                ORDER BY ao.Valid_From, ao.Ownership_ID
             """
-            cursor.execute(sql_insert, (objective, start_date, outcome, prophecy_id))
-            connection.commit()
-            return True, cursor.lastrowid
+            cursor.execute(sql_query, (artifact_id,))
+            results = cursor.fetchall()
+            for result in results:
+                if result['Valid_To'] == OWNERSHIP_OPEN_END:
+                    result['Valid_To'] = None
+            return results
     except pymysql.Error as e:
-        connection.rollback()
-        return False, str(e)
+        st.error(f"Error during query: {e}")
+        return []
 
-def insert_monster_sighting(connection, monster_id, location, reported_by):
+def report_artifact_holder_success_rate(connection):
     """
-    INSERT Operation 3: Add a new monster sighting.
+    Analysis Report: Combat success rate of each artifact, attributed to whoever
+    held the artifact when the combat took place. Each encounter joins to its
+    holding interval through a range probe on idx_artifact_holding.
     """
     try:
         with connection.cursor() as cursor:
-            sighting_timestamp = datetime.now()
-            sql_insert = """
-                INSERT INTO Sighting_Log (Monster_ID, Sighting_Timestamp, Location, Reported_By)
-                VALUES (%s, %s, %s, %s)
+            sql_query = """
+                SELECT 
+                    a.Name as Artifact,
+                    COALESCE(CONCAT(d.First_Name, ' ', d.Last_Name), 'Unknown') as Holder_At_Time,
+                    COUNT(*) as Total_Encounters,
+                    SUM(CASE WHEN ce.Hero_ID = ao.Hero_ID THEN 1 ELSE 0 END) as Fought_By_Holder,
+                    SUM(CASE WHEN ce.Result = 'Hero Victory' THEN 1 ELSE 0 END) as Victories,
+                    ROUND(SUM(CASE WHEN ce.Result = 'Hero Victory' THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) as Success_Rate_Percentage
+                FROM Combat_Encounter ce
+                JOIN Divine_Artifact a ON ce.Artifact_ID = a.Artifact_ID
+                LEFT JOIN Artifact_Ownership ao
+                    ON ao.Artifact_ID = ce.Artifact_ID
+                    AND ao.Valid_From <= ce.Combat_Date
+                    AND ce.Combat_Date < ao.Valid_To
+                LEFT JOIN Demigod d ON ao.Hero_ID = d.Hero_ID
+                GROUP BY a.Artifact_ID, a.Name, ao.Hero_ID, d.First_Name, d.Last_Name
+                ORDER BY Artifact, Success_Rate_Percentage DESC
             """
-            cursor.execute(sql_insert, (monster_id, sighting_timestamp, location, reported_by))
-            connection.commit()
-            return True, "Sighting recorded successfully"
-    except pymysql.Error as e:
-        connection.rollback()
+            cursor.execute(sql_query)
+            results = cursor.fetchall()
+            # Convert Decimal types to int/float for Streamlit compatibility
+            for result in results:
+                result['Total_Encounters'] = int(result['Total_Encounters']) if result['Total_Encounters'] else 0
+                result['Fought_By_Holder'] = int(result['Fought_By_Holder']) if result['Fought_By_Holder'] else 0
+                result['Victories'] = int(result['Victories']) if result['Victories'] else 0
+                result['Success_Rate_Percentage'] = float(result['Success_Rate_Percentage']) if result['Success_Rate_Percentage'] else 0.0
+            return results
+    except pymysql.Error as e:
+        st.error(f"Error during query: {e}")
+        return []
+
+# =====================================================
+# HERO PROFILE CACHE
+# =====================================================
+
+# Objectives are stored truncated to keep profile documents compact
+PROFILE_OBJECTIVE_CHARS = 100
+
+def _in_clause(values):
+    """Return an IN (...) placeholder list for the given values."""
+    return "(" + ", ".join(["%s"] * len(values)) + ")"
+
+def _build_hero_profiles(cursor, hero_ids=None):
+    """
+    Assemble profile documents for the given heroes (all heroes if None).
+    Uses one set-based query per facet rather than one query per hero.
+    """
+    if hero_ids is not None:
+        hero_ids = sorted(set(hero_ids))
+        if not hero_ids:
+            return {}
+        where, params = "WHERE {col} IN " + _in_clause(hero_ids), tuple(hero_ids)
+    else:
+        where, params = "", ()
+    
+    profiles = {}
+    cursor.execute(f"""
+        SELECT d.Hero_ID, d.First_Name, d.Last_Name, d.Status, d.Date_of_Birth,
+               d.Date_of_Arrival, d.Fatal_Flaw, g.Divine_ID, g.Name as Divine_Parent
+        FROM Demigod d
+        LEFT JOIN God g ON d.Divine_Parent_ID = g.Divine_ID
+        {where.format(col='d.Hero_ID')}
+    """, params)
+    for row in cursor.fetchall():
+        profiles[row['Hero_ID']] = {
+            'hero_id': row['Hero_ID'],
+            'full_name': f"{row['First_Name']} {row['Last_Name']}",
+            'status': row['Status'],
+            'date_of_birth': row['Date_of_Birth'],
+            'date_of_arrival': row['Date_of_Arrival'],
+            'fatal_flaw': row['Fatal_Flaw'],
+            'parent': {'divine_id': row['Divine_ID'], 'name': row['Divine_Parent']},
+            'abilities': [],
+            'artifacts': [],
+            'quests': [],
+            'encounters': {'total': 0, 'by_outcome': {}, 'last_date': None, 'species': []},
+        }
+    
+    cursor.execute(f"""
+        SELECT Hero_ID, Ability FROM Known_Abilities
+        {where.format(col='Hero_ID')}
+        ORDER BY Hero_ID, Ability
+    """, params)
+    for row in cursor.fetchall():
+        if row['Hero_ID'] in profiles:
+            profiles[row['Hero_ID']]['abilities'].append(row['Ability'])
+    
+    cursor.execute(f"""
+        SELECT Current_Wielder as Hero_ID, Artifact_ID, Name FROM Divine_Artifact
+        {where.format(col='Current_Wielder') if where else 'WHERE Current_Wielder IS NOT NULL'}
+        ORDER BY Name
+    """, params)
+    for row in cursor.fetchall():
+        if row['Hero_ID'] in profiles:
+            profiles[row['Hero_ID']]['artifacts'].append(
+                {'artifact_id': row['Artifact_ID'], 'name': row['Name']}
+            )
+    
+    cursor.execute(f"""
+        SELECT ql.Hero_ID, q.Quest_ID, LEFT(q.Objective, {PROFILE_OBJECTIVE_CHARS}) as Objective,
+               q.Outcome as Quest_Outcome, ql.Role, ql.Outcome
+        FROM Quest_Log ql
+        JOIN Quest q ON ql.Quest_ID = q.Quest_ID
+        {where.format(col='ql.Hero_ID')}
+        ORDER BY ql.Hero_ID, q.Start_Date DESC
+    """, params)
+    for row in cursor.fetchall():
+        if row['Hero_ID'] in profiles:
+            profiles[row['Hero_ID']]['quests'].append({
+                'quest_id': row['Quest_ID'], 'objective': row['Objective'],
+                'quest_outcome': row['Quest_Outcome'], 'role': row['Role'], 'outcome': row['Outcome'],
+            })
+    
+    cursor.execute(f"""
+        SELECT e.Hero_ID, m.Species, e.Outcome, e.Encounter_Date
+        FROM Encounters e
+        JOIN Monster m ON e.Monster_ID = m.Monster_ID
+        {where.format(col='e.Hero_ID')}
+        ORDER BY e.Hero_ID, e.Encounter_Date
+    """, params)
+    for row in cursor.fetchall():
+        if row['Hero_ID'] not in profiles:
+            continue
+        summary = profiles[row['Hero_ID']]['encounters']
+        summary['total'] += 1
+        outcome = row['Outcome'] or 'Unknown'
+        summary['by_outcome'][outcome] = summary['by_outcome'].get(outcome, 0) + 1
+        summary['last_date'] = row['Encounter_Date']
+        if row['Species'] not in summary['species']:
+            summary['species'].append(row['Species'])
+    
+    return profiles
+
+def refresh_hero_profiles(cursor, hero_ids=None):
+    """
+    Rebuild and store profile documents for the given heroes (all if None).
+    Runs on the caller's cursor; the caller commits.
+    Returns the number of profiles written.
+    """
+    hero_ids = [hero_id for hero_id in hero_ids if hero_id] if hero_ids is not None else None
+    profiles = _build_hero_profiles(cursor, hero_ids)
+    if profiles:
+        now = datetime.now()
+        cursor.executemany(
+            "REPLACE INTO Hero_Profile (Hero_ID, Profile, Updated_At) VALUES (%s, %s, %s)",
+            [(hero_id, json.dumps(profile, default=str), now) for hero_id, profile in profiles.items()]
+        )
+    return len(profiles)
+
+def rebuild_all_hero_profiles(connection):
+    """Bulk-build the profile document for every hero."""
+    def work(cursor):
+        count = refresh_hero_profiles(cursor)
+        return True, f"Rebuilt {count} hero profile(s)"
+    
+    return run_write_transaction(connection, work)
+
+def invalidate_hero_profiles(cursor, hero_ids=(), quest_ids=()):
+    """
+    Drop the stored profiles of the given heroes and of every participant of
+    the given quests. The Hero_Profile triggers do this on MySQL and SQLite,
+    so it only runs on backends without triggers (DuckDB). Runs on the
+    caller's cursor; ensure_hero_profiles rebuilds what it dropped.
+    """
+    if getattr(cursor.connection, 'has_triggers', True):
+        return
+    hero_ids = sorted({hero_id for hero_id in hero_ids if hero_id})
+    if hero_ids:
+        cursor.execute(f"DELETE FROM Hero_Profile WHERE Hero_ID IN {_in_clause(hero_ids)}", tuple(hero_ids))
+    quest_ids = sorted(set(quest_ids))
+    if quest_ids:
+        cursor.execute(f"""
+            DELETE FROM Hero_Profile
+            WHERE Hero_ID IN (SELECT Hero_ID FROM Quest_Log WHERE Quest_ID IN {_in_clause(quest_ids)})
+        """, tuple(quest_ids))
+
+def _missing_profiles(cursor, hero_ids):
+    """Heroes among hero_ids with no profile (new or invalidated)."""
+    cursor.execute(f"""
+        SELECT d.Hero_ID
+        FROM Demigod d
+        LEFT JOIN Hero_Profile hp ON d.Hero_ID = hp.Hero_ID
+        WHERE d.Hero_ID IN {_in_clause(hero_ids)} AND hp.Hero_ID IS NULL
+    """, tuple(hero_ids))
+    return [row['Hero_ID'] for row in cursor.fetchall()]
+
+def ensure_hero_profiles(connection, hero_ids):
+    """
+    Build the profiles missing for the given heroes, before they are read.
+    As with ensure_monster_dossiers, the build runs through
+    run_write_transaction and re-reads the missing set inside it.
+    Returns (success, number of profiles written).
+    """
+    hero_ids = sorted({hero_id for hero_id in hero_ids if hero_id})
+    if not hero_ids:
+        return True, 0
+    try:
+        with connection.cursor() as cursor:
+            if not _missing_profiles(cursor, hero_ids):
+                return True, 0
+    except pymysql.Error as e:
         return False, str(e)
+    
+    def work(cursor):
+        missing = _missing_profiles(cursor, hero_ids)
+        return True, refresh_hero_profiles(cursor, missing) if missing else 0
+    
+    return run_write_transaction(connection, work)
 
-def update_demigod_status(connection, hero_id, new_status):
+def get_hero_profile(connection, hero_id):
     """
-    REQUIRED - UPDATE Operation: Update a demigod's status to 'Deceased'.
-    This will trigger an update on their associated 'Quest_Log' records.
+    Get the precomputed profile document for a hero with a single keyed read.
+    Returns None if the hero has no profile; call ensure_hero_profiles first
+    to build missing or invalidated ones.
     """
     try:
         with connection.cursor() as cursor:
-            # Update demigod status
-            sql_update = """
-                UPDATE Demigod 
-                SET Status = %s
-                WHERE Hero_ID = %s
-            """
-            cursor.execute(sql_update, (new_status, hero_id))
-            
-            # If status is 'Deceased', update related Quest_Log entries
-            if new_status == 'Deceased':
-                sql_update_quest_log = """
-                    UPDATE Quest_Log
-                    SET Outcome = 'Deceased'
-                    WHERE Hero_ID = %s AND Outcome = 'Ongoing'
-                """
-                cursor.execute(sql_update_quest_log, (hero_id,))
-            
-            connection.commit()
-            if cursor.rowcount > 0:
-                return True, "Status updated successfully"
-            else:
-                return False, "No demigod found with that ID"
+            execute_prepared(cursor, 'hero_profile', (hero_id,))
+            row = cursor.fetchone()
+            return json.loads(row['Profile']) if row else None
+    except pymysql.Error as e:
+        st.error(f"Error fetching hero profile: {e}")
+        return None
+
+# =====================================================
+# MONSTER DOSSIER CACHE
+# =====================================================
+
+# Beast descriptions are stored truncated to keep dossiers compact
+DOSSIER_DESCRIPTION_CHARS = 200
+
+def _build_monster_dossiers(cursor, monster_ids=None):
+    """
+    Assemble dossiers for the given monsters (all monsters if None).
+    Each facet is read with its own set-based query, so multi-valued tables
+    are never joined against each other.
+    """
+    if monster_ids is not None:
+        monster_ids = sorted(set(monster_ids))
+        if not monster_ids:
+            return {}
+        where, params = "WHERE {col} IN " + _in_clause(monster_ids), tuple(monster_ids)
+    else:
+        where, params = "", ()
+    
+    dossiers = {}
+    subclasses = ENTITY_HIERARCHIES['Monster'][2]
+    # Subclass tables are 1:1 with Monster, so these joins cannot fan out
+    cursor.execute(f"""
+        SELECT m.Monster_ID, m.Species, m.Threat_Level,
+               b.Monster_ID as Beast_ID,
+               LEFT(b.Physical_Description, {DOSSIER_DESCRIPTION_CHARS}) as Physical_Description,
+               b.Natural_Habitat,
+               t.Monster_ID as Titan_ID, t.Titan_Name, t.Domain_of_Rule, t.Imprisonment_Location,
+               s.Monster_ID as Spirit_ID, s.Ethereal_Form, s.Binding_Object
+        FROM Monster m
+        LEFT JOIN Beast b ON m.Monster_ID = b.Monster_ID
+        LEFT JOIN Titan t ON m.Monster_ID = t.Monster_ID
+        LEFT JOIN Spirit s ON m.Monster_ID = s.Monster_ID
+        {where.format(col='m.Monster_ID')}
+    """, params)
+    for row in cursor.fetchall():
+        monster_type = next((table for table in subclasses if row[f"{table}_ID"] is not None), None)
+        attributes = {}
+        if monster_type:
+            attributes = {column.lower(): row[column] for column in subclasses[monster_type]}
+            if 'ethereal_form' in attributes and attributes['ethereal_form'] is not None:
+                attributes['ethereal_form'] = bool(attributes['ethereal_form'])
+        dossiers[row['Monster_ID']] = {
+            'monster_id': row['Monster_ID'],
+            'species': row['Species'],
+            'threat_level': row['Threat_Level'],
+            'type': monster_type,
+            'attributes': attributes,
+            'weaknesses': [],
+            'habitats': [],
+            'encounters': {'total': 0, 'heroes': 0, 'by_outcome': {}, 'last_date': None},
+            'combat': {'total': 0, 'by_result': {}, 'last_date': None},
+        }
+    
+    for table, column, key in (('Known_Weaknesses', 'Weakness', 'weaknesses'),
+                               ('Common_Habitats', 'Habitat', 'habitats')):
+        cursor.execute(f"""
+            SELECT Monster_ID, {column} FROM {table}
+            {where.format(col='Monster_ID')}
+            ORDER BY Monster_ID, {column}
+        """, params)
+        for row in cursor.fetchall():
+            if row['Monster_ID'] in dossiers:
+                dossiers[row['Monster_ID']][key].append(row[column])
+    
+    cursor.execute(f"""
+        SELECT Monster_ID, Outcome, COUNT(*) as Total, MAX(Encounter_Date) as Last_Date
+        FROM Encounters
+        {where.format(col='Monster_ID')}
+        GROUP BY Monster_ID, Outcome
+    """, params)
+    for row in cursor.fetchall():
+        if row['Monster_ID'] not in dossiers:
+            continue
+        summary = dossiers[row['Monster_ID']]['encounters']
+        summary['total'] += int(row['Total'])
+        summary['by_outcome'][row['Outcome'] or 'Unknown'] = int(row['Total'])
+        if row['Last_Date'] and (summary['last_date'] is None or row['Last_Date'] > summary['last_date']):
+            summary['last_date'] = row['Last_Date']
+    
+    # Heroes can meet a monster with different outcomes, so distinct heroes need their own count
+    cursor.execute(f"""
+        SELECT Monster_ID, COUNT(DISTINCT Hero_ID) as Heroes
+        FROM Encounters
+        {where.format(col='Monster_ID')}
+        GROUP BY Monster_ID
+    """, params)
+    for row in cursor.fetchall():
+        if row['Monster_ID'] in dossiers:
+            dossiers[row['Monster_ID']]['encounters']['heroes'] = int(row['Heroes'])
+    
+    cursor.execute(f"""
+        SELECT Monster_ID, Result, COUNT(*) as Total, MAX(Combat_Date) as Last_Date
+        FROM Combat_Encounter
+        {where.format(col='Monster_ID')}
+        GROUP BY Monster_ID, Result
+    """, params)
+    for row in cursor.fetchall():
+        if row['Monster_ID'] not in dossiers:
+            continue
+        summary = dossiers[row['Monster_ID']]['combat']
+        summary['total'] += int(row['Total'])
+        summary['by_result'][row['Result'] or 'Unknown'] = int(row['Total'])
+        if row['Last_Date'] and (summary['last_date'] is None or row['Last_Date'] > summary['last_date']):
+            summary['last_date'] = row['Last_Date']
+    
+    return dossiers
+
+def refresh_monster_dossiers(cursor, monster_ids=None):
+    """
+    Rebuild and store dossiers for the given monsters (all if None).
+    Runs on the caller's cursor; the caller commits.
+    Returns the number of dossiers written.
+    """
+    monster_ids = [monster_id for monster_id in monster_ids if monster_id] if monster_ids is not None else None
+    dossiers = _build_monster_dossiers(cursor, monster_ids)
+    if dossiers:
+        now = datetime.now()
+        cursor.executemany(
+            "REPLACE INTO Monster_Dossier (Monster_ID, Species, Threat_Level, Monster_Type, Weaknesses, "
+            "Habitats, Times_Encountered, Combat_Count, Dossier, Updated_At) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+            [(monster_id, dossier['species'], dossier['threat_level'], dossier['type'],
+              ", ".join(dossier['weaknesses']) or None, ", ".join(dossier['habitats']) or None,
+              dossier['encounters']['heroes'], dossier['combat']['total'],
+              json.dumps(dossier, default=str), now)
+             for monster_id, dossier in dossiers.items()]
+        )
+    return len(dossiers)
+
+def _missing_dossiers(cursor, min_threat_level):
+    """
+    Monsters at or above a threat level with no dossier (new or invalidated).
+    The anti-join probes idx_threat_level and the dossier primary key, so it is
+    cheap when every dossier is current.
+    """
+    cursor.execute("""
+        SELECT m.Monster_ID
+        FROM Monster m
+        LEFT JOIN Monster_Dossier md ON m.Monster_ID = md.Monster_ID
+        WHERE m.Threat_Level >= %s AND md.Monster_ID IS NULL
+    """, (min_threat_level,))
+    return [row['Monster_ID'] for row in cursor.fetchall()]
+
+def ensure_monster_dossiers(connection, min_threat_level=1):
+    """
+    Build the dossiers missing for monsters at or above a threat level.
+    Readers never write on their own cursor: the build runs through
+    run_write_transaction, and the missing set is re-read inside it so a
+    retry after another reader built the same dossiers writes nothing.
+    Returns (success, number of dossiers written).
+    """
+    try:
+        with connection.cursor() as cursor:
+            if not _missing_dossiers(cursor, min_threat_level):
+                return True, 0
     except pymysql.Error as e:
-        connection.rollback()
         return False, str(e)
+    
+    def work(cursor):
+        missing = _missing_dossiers(cursor, min_threat_level)
+        return True, refresh_monster_dossiers(cursor, missing) if missing else 0
+    
+    return run_write_transaction(connection, work)
 
-def update_quest_outcome(connection, quest_id, outcome, end_date=None):
+def rebuild_all_monster_dossiers(connection):
+    """Bulk-build the dossier for every monster (e.g. after deleting heroes)."""
+    def work(cursor):
+        count = refresh_monster_dossiers(cursor)
+        return True, f"Rebuilt {count} monster dossier(s)"
+    
+    return run_write_transaction(connection, work)
+
+def get_monster_dossier(connection, monster_id):
     """
-    UPDATE Operation 2: Update a quest's outcome and end date.
+    Get the dossier for a monster with a single keyed read.
+    A missing or invalidated dossier is built on demand and stored.
     """
     try:
         with connection.cursor() as cursor:
-            if end_date:
-                sql_update = """
-                    UPDATE Quest 
-                    SET Outcome = %s, End_Date = %s
-                    WHERE Quest_ID = %s
-                """
-                cursor.execute(sql_update, (outcome, end_date, quest_id))
-            else:
-                sql_update = """
-                    UPDATE Quest 
-                    SET Outcome = %s
-                    WHERE Quest_ID = %s
-                """
-                cursor.execute(sql_update, (outcome, quest_id))
-            connection.commit()
-            if cursor.rowcount > 0:
-                return True, "Quest updated successfully"
-            else:
-                return False, "No quest found with that ID"
+            execute_prepared(cursor, 'monster_dossier', (monster_id,))
+            row = cursor.fetchone()
+            if row:
+                return json.loads(row['Dossier'])
+    except pymysql.Error as e:
+        st.error(f"Error fetching monster dossier: {e}")
+        return None
+    
+    def work(cursor):
+        # Another reader may have built it since the read above
+        execute_prepared(cursor, 'monster_dossier', (monster_id,))
+        row = cursor.fetchone()
+        if row:
+            return True, row['Dossier']
+        refresh_monster_dossiers(cursor, [monster_id])
+        execute_prepared(cursor, 'monster_dossier', (monster_id,))
+        row = cursor.fetchone()
+        return True, row['Dossier'] if row else None
+    
+    success, result = run_write_transaction(connection, work)
+    if not success:
+        st.error(f"Error fetching monster dossier: {result}")
+        return None
+    return json.loads(result) if result else None
+
+# =====================================================
+# APPROXIMATE AGGREGATES
+# =====================================================
+
+# Row sources for the sketches: queries returning Entity_ID and Day plus the
+# sketched columns for the half-open day range [%s, %s)
+SKETCH_SOURCES = {
+    'quest_participation': ["""
+        SELECT d.Divine_Parent_ID as Entity_ID, q.Start_Date as Day, q.Quest_ID, q.Outcome, d.Hero_ID
+        FROM Quest q
+        JOIN Quest_Log ql ON q.Quest_ID = ql.Quest_ID
+        JOIN Demigod d ON ql.Hero_ID = d.Hero_ID
+        WHERE d.Divine_Parent_ID IS NOT NULL AND q.Start_Date >= %s AND q.Start_Date < %s
+    """],
+    'quest_duration': ["""
+        SELECT DISTINCT d.Divine_Parent_ID as Entity_ID, q.Start_Date as Day, q.Quest_ID, q.End_Date
+        FROM Quest q
+        JOIN Quest_Log ql ON q.Quest_ID = ql.Quest_ID
+        JOIN Demigod d ON ql.Hero_ID = d.Hero_ID
+        WHERE d.Divine_Parent_ID IS NOT NULL AND q.End_Date IS NOT NULL
+          AND q.Start_Date >= %s AND q.Start_Date < %s
+    """],
+    # Separate queries rather than a UNION: DATE and DATETIME days do not share a column type
+    'monster_encounters': ["""
+        SELECT Monster_ID as Entity_ID, Encounter_Date as Day, Hero_ID
+        FROM Encounters
+        WHERE Encounter_Date >= %s AND Encounter_Date < %s
+    """, """
+        SELECT Monster_ID as Entity_ID, Combat_Date as Day, Hero_ID
+        FROM Combat_Encounter
+        WHERE Combat_Date >= %s AND Combat_Date < %s
+    """],
+}
+
+# sketch name -> (source, sketch type, value of a source row; None adds nothing)
+SKETCHES = {
+    'parent_quests': ('quest_participation', 'hll', lambda row: row['Quest_ID']),
+    'parent_children': ('quest_participation', 'hll', lambda row: row['Hero_ID']),
+    'parent_successful_quests': ('quest_participation', 'hll',
+                                 lambda row: row['Quest_ID'] if row['Outcome'] == 'Success' else None),
+    'parent_quest_days': ('quest_duration', 'tdigest',
+                          lambda row: (row['End_Date'] - row['Day']).days),
+    'monster_heroes': ('monster_encounters', 'hll', lambda row: row['Hero_ID']),
+}
+
+# Sketches that depend on quest rows (refreshed by quest writes)
+QUEST_SKETCHES = [name for name, (source, _, _) in SKETCHES.items() if source.startswith('quest_')]
+
+# Sketch_Change groups: the sketches rebuilt for a day logged under each group
+SKETCH_GROUPS = {
+    'quest': QUEST_SKETCHES,
+    'encounter': [name for name, (source, _, _) in SKETCHES.items() if source == 'monster_encounters'],
+}
+SKETCH_GROUP_OF = {name: group for group, names in SKETCH_GROUPS.items() for name in names}
+
+# Consumed Sketch_Change entries removed per DELETE
+SKETCH_CHANGE_BATCH = 500
+
+# Bounds of an unlimited range (MySQL's DATE range)
+SKETCH_FIRST_DAY = date(1000, 1, 1)
+SKETCH_LAST_DAY = date(9999, 12, 30)
+
+# Error bounds are shown at ~95% confidence (two standard errors)
+SKETCH_CONFIDENCE_SIGMAS = 2
+
+def _as_day(value):
+    """Sketch day of a DATE or DATETIME value."""
+    return value.date() if isinstance(value, datetime) else value
+
+def refresh_sketches(cursor, start=None, end=None, names=None):
+    """
+    Rebuild the per-entity, per-day sketches for every day in [start, end]
+    (all days if None). Sketches cannot forget values, so a day is always
+    rebuilt whole from its source rows. Runs on the caller's cursor; the
+    caller commits. Returns the number of sketches written.
+    """
+    names = list(names or SKETCHES)
+    start = start or SKETCH_FIRST_DAY
+    end_exclusive = (end or SKETCH_LAST_DAY) + timedelta(days=1)
+    
+    built = {}
+    for source in dict.fromkeys(SKETCHES[name][0] for name in names):
+        rows = []
+        for sql in SKETCH_SOURCES[source]:
+            cursor.execute(sql, (start, end_exclusive))
+            rows.extend(cursor.fetchall())
+        for name in names:
+            sketch_source, kind, value_of = SKETCHES[name]
+            if sketch_source != source:
+                continue
+            for row in rows:
+                value = value_of(row)
+                if value is None:
+                    continue
+                key = (name, _as_day(row['Day']), row['Entity_ID'])
+                if key not in built:
+                    built[key] = [SKETCH_TYPES[kind](), 0]
+                built[key][0].add(value)
+                built[key][1] += 1
+    
+    cursor.execute(
+        f"DELETE FROM Report_Sketch WHERE Sketch_Name IN {_in_clause(names)} "
+        "AND Sketch_Date >= %s AND Sketch_Date < %s",
+        names + [start, end_exclusive]
+    )
+    if built:
+        now = datetime.now()
+        cursor.executemany(
+            "INSERT INTO Report_Sketch (Sketch_Name, Sketch_Date, Entity_ID, Sketch, Item_Count, Updated_At) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [(name, day, entity_id, sketch.to_bytes(), items, now)
+             for (name, day, entity_id), (sketch, items) in built.items()]
+        )
+    return len(built)
+
+def refresh_quest_sketches(cursor, quest_ids=None, days=None):
+    """
+    Rebuild the quest sketches of the start days of the given quests (plus any
+    extra days, e.g. of quests about to be deleted). The caller commits.
+    """
+    days = set(days or ())
+    if quest_ids:
+        cursor.execute(f"SELECT DISTINCT Start_Date FROM Quest WHERE Quest_ID IN {_in_clause(quest_ids)}",
+                       list(quest_ids))
+        days.update(row['Start_Date'] for row in cursor.fetchall())
+    for day in sorted(day for day in days if day is not None):
+        refresh_sketches(cursor, day, day, QUEST_SKETCHES)
+
+def _consume_sketch_changes(cursor, group, full=False):
+    """
+    Rebuild the days of a sketch group logged in Sketch_Change (every day
+    with full, or while the group has no sketches yet) and remove the
+    entries read. Only entries visible to this transaction are removed, so
+    a change committed meanwhile stays logged for the next merge.
+    The caller commits. Returns the number of sketches written.
+    """
+    names = SKETCH_GROUPS[group]
+    cursor.execute("SELECT Change_ID, Sketch_Date FROM Sketch_Change WHERE Sketch_Group = %s", (group,))
+    changes = cursor.fetchall()
+    if not full:
+        cursor.execute(f"SELECT 1 FROM Report_Sketch WHERE Sketch_Name IN {_in_clause(names)} LIMIT 1", names)
+        full = cursor.fetchone() is None
+    
+    if full:
+        count = refresh_sketches(cursor, names=names)
+    else:
+        count = 0
+        for day in sorted({_as_day(row['Sketch_Date']) for row in changes if row['Sketch_Date'] is not None}):
+            count += refresh_sketches(cursor, day, day, names)
+    
+    change_ids = [row['Change_ID'] for row in changes]
+    for i in range(0, len(change_ids), SKETCH_CHANGE_BATCH):
+        batch = change_ids[i:i + SKETCH_CHANGE_BATCH]
+        cursor.execute(f"DELETE FROM Sketch_Change WHERE Change_ID IN {_in_clause(batch)}", batch)
+    return count
+
+def refresh_changed_sketches(connection, group):
+    """
+    Bring a sketch group up to date before it is merged: rebuild the days
+    whose sources changed, or everything if the group was never built.
+    The check is a plain read; the rebuild runs in its own write transaction.
+    Returns (success, number of sketches written).
+    """
+    names = SKETCH_GROUPS[group]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM Sketch_Change WHERE Sketch_Group = %s LIMIT 1", (group,))
+            changed = cursor.fetchone() is not None
+            cursor.execute(f"SELECT 1 FROM Report_Sketch WHERE Sketch_Name IN {_in_clause(names)} LIMIT 1", names)
+            if not changed and cursor.fetchone() is not None:
+                return True, 0
     except pymysql.Error as e:
-        connection.rollback()
         return False, str(e)
+    
+    def work(cursor):
+        return True, _consume_sketch_changes(cursor, group)
+    
+    return run_write_transaction(connection, work)
 
-def update_artifact_wielder(connection, artifact_id, new_wielder_id):
+def rebuild_all_sketches(connection):
+    """Rebuild every sketch for every day (e.g. after bulk loads outside the app)."""
+    def work(cursor):
+        count = sum(_consume_sketch_changes(cursor, group, full=True) for group in SKETCH_GROUPS)
+        return True, f"Rebuilt {count} sketch(es)"
+    
+    return run_write_transaction(connection, work)
+
+def merge_sketches(connection, name, start=None, end=None):
     """
-    UPDATE Operation 3: Change the wielder of a divine artifact.
+    Merge the stored day sketches of each entity over [start, end].
+    Days logged as changed are rebuilt first, and a group never built is
+    built whole. Returns {entity_id: (sketch, items added)}.
+    """
+    success, result = refresh_changed_sketches(connection, SKETCH_GROUP_OF[name])
+    if not success:
+        st.error(f"Error refreshing sketches: {result}")
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT Entity_ID, Sketch, Item_Count FROM Report_Sketch
+            WHERE Sketch_Name = %s AND Sketch_Date >= %s AND Sketch_Date <= %s
+        """, (name, start or SKETCH_FIRST_DAY, end or SKETCH_LAST_DAY))
+        rows = cursor.fetchall()
+    
+    sketch_type = SKETCH_TYPES[SKETCHES[name][1]]
+    merged = {}
+    for row in rows:
+        sketch = sketch_type.from_bytes(bytes(row['Sketch']))
+        if row['Entity_ID'] in merged:
+            merged_sketch, items = merged[row['Entity_ID']]
+            merged[row['Entity_ID']] = (merged_sketch.merge(sketch), items + row['Item_Count'])
+        else:
+            merged[row['Entity_ID']] = (sketch, row['Item_Count'])
+    return merged
+
+def _distinct_estimate(merged, entity_id):
+    """(estimated distinct count, +/- bound) of an entity's merged HyperLogLog."""
+    if entity_id not in merged:
+        return 0, 0
+    sketch, items = merged[entity_id]
+    # Never more distinct values than values added
+    estimate = min(sketch.count(), items)
+    bound = SKETCH_CONFIDENCE_SIGMAS * sketch.standard_error * estimate
+    return round(estimate), max(round(bound), 0)
+
+def report_quests_by_divine_parent_approx(connection, start=None, end=None):
+    """
+    Approximate Analysis Report 1: quests and participating children per divine
+    parent for quests started in [start, end], from merged day sketches instead
+    of COUNT(DISTINCT ...) over the participation join. Counts come with +/-
+    bounds; quest durations are t-digest percentiles with their rank error.
+    """
+    try:
+        quests = merge_sketches(connection, 'parent_quests', start, end)
+        children = merge_sketches(connection, 'parent_children', start, end)
+        successful = merge_sketches(connection, 'parent_successful_quests', start, end)
+        durations = merge_sketches(connection, 'parent_quest_days', start, end)
+    except pymysql.Error as e:
+        connection.rollback()
+        st.error(f"Error during query: {e}")
+        return []
+    
+    gods = load_entities(connection, 'God', sorted(quests))
+    results = []
+    for divine_id, god in gods.items():
+        total, total_bound = _distinct_estimate(quests, divine_id)
+        participated, participated_bound = _distinct_estimate(children, divine_id)
+        success, success_bound = _distinct_estimate(successful, divine_id)
+        digest = durations.get(divine_id, (None, 0))[0]
+        median = digest.quantile(0.5) if digest else None
+        p90 = digest.quantile(0.9) if digest else None
+        results.append({
+            'Divine_Parent': god['Name'],
+            'Domain': god['Domain'],
+            'Total_Quests': total,
+            'Total_Quests_Error': total_bound,
+            'Children_Participated': participated,
+            'Children_Error': participated_bound,
+            'Successful_Quests': success,
+            'Successful_Error': success_bound,
+            'Median_Quest_Days': round(median, 1) if median is not None else None,
+            'P90_Quest_Days': round(p90, 1) if p90 is not None else None,
+            'Days_Rank_Error': round(max(digest.rank_error(0.5), digest.rank_error(0.9)), 3) if digest else None,
+        })
+    results.sort(key=lambda r: (r['Total_Quests'], r['Successful_Quests']), reverse=True)
+    return results
+
+def query_monster_heroes_approx(connection, min_threat_level, start=None, end=None):
+    """
+    Approximate distinct heroes who encountered or fought each monster at or
+    above a threat level in [start, end], merged from day sketches.
+    """
+    try:
+        heroes = merge_sketches(connection, 'monster_heroes', start, end)
+    except pymysql.Error as e:
+        connection.rollback()
+        st.error(f"Error during query: {e}")
+        return []
+    
+    monsters = load_entities(connection, 'Monster', sorted(heroes))
+    results = []
+    for monster_id, monster in monsters.items():
+        if monster['Threat_Level'] < min_threat_level:
+            continue
+        estimate, bound = _distinct_estimate(heroes, monster_id)
+        results.append({
+            'Monster_ID': monster_id,
+            'Species': monster['Species'],
+            'Threat_Level': monster['Threat_Level'],
+            'Heroes_Encountered': estimate,
+            'Heroes_Error': bound,
+        })
+    results.sort(key=lambda r: (r['Threat_Level'], r['Heroes_Encountered']), reverse=True)
+    return results
+
+# =====================================================
+# ARTIFACT RECOMMENDATIONS
+# =====================================================
+
+# Pseudo-encounters pulling sparse species x artifact cells toward the artifact's overall record
+RECOMMENDATION_PRIOR_STRENGTH = 5.0
+RECOMMENDATION_LIMIT = 10
+
+# Combat outcomes after an Encounter_ID watermark, with the monster's species
+_COMBAT_OUTCOMES_SQL = """
+    SELECT ce.Encounter_ID, m.Species, ce.Artifact_ID, ce.Hero_ID, ce.Result
+    FROM Combat_Encounter ce
+    JOIN Monster m ON ce.Monster_ID = m.Monster_ID
+    WHERE ce.Encounter_ID > %s
+    ORDER BY ce.Encounter_ID
+"""
+
+# Process-wide outcome matrices: (host, db) -> state dict
+_outcome_matrices = {}
+_outcome_matrices_lock = threading.Lock()
+
+def _new_outcome_state():
+    from recommender import OutcomeMatrix
+    return {'artifacts': OutcomeMatrix(), 'heroes': OutcomeMatrix(), 'watermark': 0, 'versions': {}}
+
+def _load_combat_outcomes(connection, state):
+    """Add the combat rows past the state's watermark to its matrices; returns the rows added."""
+    with connection.cursor() as cursor:
+        cursor.execute(_COMBAT_OUTCOMES_SQL, (state['watermark'],))
+        rows = cursor.fetchall()
+    if rows:
+        state['artifacts'].add((r['Species'], r['Artifact_ID'], r['Result'] == 'Hero Victory') for r in rows)
+        state['heroes'].add((r['Species'], r['Hero_ID'], r['Result'] == 'Hero Victory') for r in rows)
+        state['watermark'] = rows[-1]['Encounter_ID']
+    return len(rows)
+
+def get_outcome_matrices(connection):
+    """
+    The species x artifact and species x hero outcome matrices, brought up to date.
+    New Combat_Encounter rows are added in place by Encounter_ID watermark. If the
+    table versions show more combat changes than rows appended (updates,
+    deletes, cascades) or a monster changed, the matrices are rebuilt instead;
+    without change tracking they are rebuilt on every call.
+    """
+    versions = get_table_versions(connection)
+    watched = {table: versions.get(table) for table in ('Combat_Encounter', 'Monster')}
+    scope = (connection.host, connection.db)
+    with _outcome_matrices_lock:
+        state = _outcome_matrices.get(scope)
+        if state is not None and versions and state['versions']['Monster'] == watched['Monster']:
+            appended = _load_combat_outcomes(connection, state)
+            if watched['Combat_Encounter'] is not None:
+                changes = watched['Combat_Encounter'] - state['versions']['Combat_Encounter']
+                if changes != appended:
+                    state = None
+        else:
+            state = None
+        if state is None:
+            state = _new_outcome_state()
+            _load_combat_outcomes(connection, state)
+        state['versions'] = watched
+        _outcome_matrices[scope] = state
+        return state
+
+def rebuild_outcome_matrices(connection):
+    """Drop the cached matrices so the next recommendation rebuilds them (e.g. on DuckDB, which has no triggers)."""
+    with _outcome_matrices_lock:
+        _outcome_matrices.pop((connection.host, connection.db), None)
+
+def recommend_artifacts(connection, monster_ids, limit=RECOMMENDATION_LIMIT):
     """
+    Rank artifacts for a quest against its expected monsters (an id listed twice
+    counts twice), by smoothed win probability against their species.
+    Each artifact comes with its current wielder if they are active; otherwise the
+    best-scoring active demigod without an artifact is suggested, one per artifact.
+    """
+    if not monster_ids:
+        return []
     try:
         with connection.cursor() as cursor:
-            sql_update = """
-                UPDATE Divine_Artifact 
-                SET Current_Wielder = %s
-                WHERE Artifact_ID = %s
-            """
-            cursor.execute(sql_update, (new_wielder_id, artifact_id))
-            connection.commit()
-            if cursor.rowcount > 0:
-                return True, "Artifact wielder updated successfully"
+            placeholders = ", ".join(["%s"] * len(set(monster_ids)))
+            cursor.execute(f"SELECT Monster_ID, Species FROM Monster WHERE Monster_ID IN ({placeholders})",
+                           list(set(monster_ids)))
+            species = {row['Monster_ID']: row['Species'] for row in cursor.fetchall()}
+        weights = {}
+        for monster_id in monster_ids:
+            if monster_id in species:
+                weights[species[monster_id]] = weights.get(species[monster_id], 0) + 1
+        
+        state = get_outcome_matrices(connection)
+        ranked = state['artifacts'].rank(weights, limit, RECOMMENDATION_PRIOR_STRENGTH)
+        if not ranked:
+            return []
+        # Enough top heroes to cover every artifact after filtering out busy ones
+        hero_ranking = state['heroes'].rank(weights, 5 * len(ranked), RECOMMENDATION_PRIOR_STRENGTH)
+        
+        with connection.cursor() as cursor:
+            artifact_ids = [artifact_id for artifact_id, _, _ in ranked]
+            cursor.execute(f"""
+                SELECT a.Artifact_ID, a.Name, d.Hero_ID as Wielder_ID, d.Status as Wielder_Status,
+                       CONCAT(d.First_Name, ' ', d.Last_Name) as Wielder_Name
+                FROM Divine_Artifact a
+                LEFT JOIN Demigod d ON a.Current_Wielder = d.Hero_ID
+                WHERE a.Artifact_ID IN ({", ".join(["%s"] * len(artifact_ids))})
+            """, artifact_ids)
+            artifacts = {row['Artifact_ID']: row for row in cursor.fetchall()}
+            
+            candidate_ids = [hero_id for hero_id, _, _ in hero_ranking]
+            free_heroes = {}
+            if candidate_ids:
+                cursor.execute(f"""
+                    SELECT d.Hero_ID, CONCAT(d.First_Name, ' ', d.Last_Name) as Full_Name
+                    FROM Demigod d
+                    WHERE d.Hero_ID IN ({", ".join(["%s"] * len(candidate_ids))})
+                      AND d.Status = 'Active'
+                      AND NOT EXISTS (SELECT 1 FROM Divine_Artifact a WHERE a.Current_Wielder = d.Hero_ID)
+                """, candidate_ids)
+                free_heroes = {row['Hero_ID']: row['Full_Name'] for row in cursor.fetchall()}
+            
+            # Not enough free heroes with a combat record: fill up with untested ones
+            unwielded = sum(1 for artifact in artifacts.values() if artifact['Wielder_Status'] != 'Active')
+            newcomers = {}
+            if len(free_heroes) < unwielded:
+                cursor.execute("""
+                    SELECT d.Hero_ID, CONCAT(d.First_Name, ' ', d.Last_Name) as Full_Name
+                    FROM Demigod d
+                    WHERE d.Status = 'Active'
+                      AND NOT EXISTS (SELECT 1 FROM Divine_Artifact a WHERE a.Current_Wielder = d.Hero_ID)
+                      AND NOT EXISTS (SELECT 1 FROM Combat_Encounter ce WHERE ce.Hero_ID = d.Hero_ID)
+                    ORDER BY d.Hero_ID
+                    LIMIT %s
+                """, (unwielded - len(free_heroes),))
+                newcomers = {row['Hero_ID']: row['Full_Name'] for row in cursor.fetchall()}
+    except pymysql.Error as e:
+        st.error(f"Error during query: {e}")
+        return []
+    
+    wielder_ids = [artifact['Wielder_ID'] for artifact in artifacts.values() if artifact['Wielder_ID'] is not None]
+    hero_chances = state['heroes'].probabilities(weights, wielder_ids + candidate_ids, RECOMMENDATION_PRIOR_STRENGTH)
+    available = iter([hero_id for hero_id, _, _ in hero_ranking if hero_id in free_heroes] + list(newcomers))
+    free_heroes.update(newcomers)
+    results = []
+    for artifact_id, probability, encounters in ranked:
+        artifact = artifacts.get(artifact_id)
+        if artifact is None:
+            continue
+        if artifact['Wielder_Status'] == 'Active':
+            wielder, wielder_id, source = artifact['Wielder_Name'], artifact['Wielder_ID'], "Current wielder"
+        else:
+            wielder_id = next(available, None)
+            wielder = free_heroes.get(wielder_id)
+            if wielder_id is None:
+                source = "No free demigod"
             else:
-                return False, "No artifact found with that ID"
+                source = "Suggested (no combat record)" if wielder_id in newcomers else "Suggested"
+        results.append({
+            'Artifact': artifact['Name'],
+            'Win_Chance_Percentage': round(probability * 100, 1),
+            'Encounters_vs_Species': encounters,
+            'Wielder': wielder,
+            'Wielder_Win_Chance_Percentage': (round(hero_chances[wielder_id] * 100, 1)
+                                              if wielder_id in hero_chances else None),
+            'Wielder_Source': source,
+        })
+    return results
+
+# =====================================================
+# PROPHECY SIMILARITY
+# =====================================================
+
+# Estimated Jaccard similarity of the texts' 5-character shingles
+PROPHECY_SIMILAR_THRESHOLD = 0.4
+PROPHECY_DUPLICATE_THRESHOLD = 0.7
+# New prophecies are picked up by Prophecy_ID on every lookup; edits and
+# deletes made outside the app show up when the index is rebuilt after this long
+PROPHECY_INDEX_MAX_AGE_SECONDS = 600
+
+# Process-wide MinHash indexes: (host, db) -> {'index', 'watermark', 'built_at'}
+_prophecy_indexes = {}
+_prophecy_index_lock = threading.Lock()
+
+def _fetch_prophecy_texts(connection, after):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT Prophecy_ID, Full_Text FROM Prophecy WHERE Prophecy_ID > %s ORDER BY Prophecy_ID",
+                       (after,))
+        return cursor.fetchall()
+
+def _with_prophecy_index(connection, func):
+    """
+    Call func(index) on the prophecy MinHash index, brought up to date, under
+    the index lock. The index is bulk-built on first use or once stale, and
+    prophecies past the Prophecy_ID watermark are added in place.
+    """
+    from similarity import MinHashIndex
+    scope = (connection.host, connection.db)
+    with _prophecy_index_lock:
+        state = _prophecy_indexes.get(scope)
+        if state is None or time.monotonic() - state['built_at'] >= PROPHECY_INDEX_MAX_AGE_SECONDS:
+            rows = _fetch_prophecy_texts(connection, 0)
+            state = {
+                'index': MinHashIndex((row['Prophecy_ID'], row['Full_Text']) for row in rows),
+                'watermark': rows[-1]['Prophecy_ID'] if rows else 0,
+                'built_at': time.monotonic(),
+            }
+            _prophecy_indexes[scope] = state
+        else:
+            for row in _fetch_prophecy_texts(connection, state['watermark']):
+                state['index'].add(row['Prophecy_ID'], row['Full_Text'])
+                state['watermark'] = row['Prophecy_ID']
+        return func(state['index'])
+
+def note_prophecy_change(connection, prophecy_id, text=None):
+    """Update a built index after a write: index the new text, or drop the entry when text is None."""
+    with _prophecy_index_lock:
+        state = _prophecy_indexes.get((connection.host, connection.db))
+        if state is None:
+            return
+        if text is None:
+            state['index'].remove(prophecy_id)
+        else:
+            state['index'].add(prophecy_id, text)
+            state['watermark'] = max(state['watermark'], prophecy_id)
+
+def find_similar_prophecies(connection, prophecy_id=None, text=None,
+                            threshold=PROPHECY_SIMILAR_THRESHOLD, limit=10):
+    """
+    Prophecies similar to an existing prophecy (by id) or to a new text,
+    most similar first, with their status and the quest pursuing them (if any).
+    """
+    try:
+        if prophecy_id is not None:
+            matches = _with_prophecy_index(connection, lambda index: index.similar_to(prophecy_id, threshold))
+        else:
+            matches = _with_prophecy_index(connection, lambda index: index.query(text, threshold))
+        matches = matches[:limit]
+        if not matches:
+            return []
+        
+        ids = [match_id for match_id, _ in matches]
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT p.Prophecy_ID, LEFT(p.Full_Text, %s) as Text_Preview, p.Date_Issued, p.Status,
+                       q.Quest_ID
+                FROM Prophecy p
+                LEFT JOIN Quest q ON p.Prophecy_ID = q.Prophecy_ID
+                WHERE p.Prophecy_ID IN ({", ".join(["%s"] * len(ids))})
+            """, [TEXT_PREVIEW_CHARS, *ids])
+            rows = {row['Prophecy_ID']: row for row in cursor.fetchall()}
     except pymysql.Error as e:
-        connection.rollback()
+        st.error(f"Error during query: {e}")
+        return []
+    
+    return [{
+        'Prophecy_ID': match_id,
+        'Similarity_Percentage': round(similarity * 100),
+        'Text_Preview': rows[match_id]['Text_Preview'],
+        'Date_Issued': rows[match_id]['Date_Issued'],
+        'Status': rows[match_id]['Status'],
+        'Quest_ID': rows[match_id]['Quest_ID'],
+    } for match_id, similarity in matches if match_id in rows]
+
+def get_prophecy_duplicate_groups(connection, threshold=PROPHECY_DUPLICATE_THRESHOLD):
+    """
+    Groups of likely duplicate prophecies as {Prophecy_ID: group id}, the
+    group id being the lowest Prophecy_ID in the group. Prophecies without
+    a near-duplicate are left out.
+    """
+    try:
+        groups = _with_prophecy_index(connection, lambda index: index.groups(threshold))
+    except pymysql.Error as e:
+        st.error(f"Error during query: {e}")
+        return {}
+    return {prophecy_id: group[0] for group in groups for prophecy_id in group}
+
+def describe_duplicate_prophecies(duplicates):
+    """One line per likely duplicate, for warnings."""
+    return "\n".join(
+        f"- Prophecy {d['Prophecy_ID']} ({d['Similarity_Percentage']}% similar"
+        + (f", pursued by Quest {d['Quest_ID']})" if d['Quest_ID'] is not None else ")")
+        + f": {d['Text_Preview']}..."
+        for d in duplicates
+    )
+
+# =====================================================
+# WRITE TRANSACTIONS
+# =====================================================
+
+# InnoDB errors that abort a transaction which can succeed when re-run
+RETRYABLE_WRITE_ERRORS = {
+    1205: "Lock wait timeout exceeded",
+    1213: "Deadlock found",
+}
+WRITE_RETRY_ATTEMPTS = 4
+WRITE_RETRY_BASE_DELAY = 0.05  # seconds, doubled on every retry
+
+write_retry_stats = {'retries': 0, 'gave_up': 0}
+_write_retry_stats_lock = threading.Lock()
+
+# Client errors meaning the database could not be reached (not that it refused the write)
+DATABASE_UNAVAILABLE_ERRORS = {
+    2003: "Can't connect to MySQL server",
+    2006: "MySQL server has gone away",
+    2013: "Lost connection to MySQL server during query",
+    2055: "Lost connection to MySQL server",
+}
+
+# Set while a write is replayed from the write journal: its idempotency key
+# is recorded in the write's transaction, and lost connections are raised
+# so the replay is retried instead of reported as a conflict
+_journal_replay = threading.local()
+
+def run_write_transaction(connection, work):
+    """
+    Run work(cursor) -> (success, result) as one transaction.
+    Commits when work succeeds and rolls back when it reports failure.
+    Deadlocks and lock wait timeouts roll back and re-run the whole
+    transaction with jittered exponential backoff; any other database
+    error is returned as (False, message).
+    """
+    replay_key = getattr(_journal_replay, 'key', None)
+    for attempt in range(WRITE_RETRY_ATTEMPTS):
+        try:
+            with connection.cursor() as cursor:
+                success, result = work(cursor)
+                if success and replay_key:
+                    cursor.execute("""
+                        INSERT INTO Journal_Applied (Idempotency_Key, Operation, Result, Applied_At)
+                        VALUES (%s, %s, %s, %s)
+                    """, (replay_key, _journal_replay.operation, str(result)[:255], datetime.now()))
+            if success:
+                connection.commit()
+            else:
+                connection.rollback()
+            return success, result
+        except pymysql.err.OperationalError as e:
+            if replay_key and e.args[0] in DATABASE_UNAVAILABLE_ERRORS:
+                raise
+            connection.rollback()
+            if e.args[0] not in RETRYABLE_WRITE_ERRORS:
+                return False, str(e)
+            if attempt == WRITE_RETRY_ATTEMPTS - 1:
+                with _write_retry_stats_lock:
+                    write_retry_stats['gave_up'] += 1
+                return False, f"{RETRYABLE_WRITE_ERRORS[e.args[0]]}; gave up after {WRITE_RETRY_ATTEMPTS} attempts"
+            with _write_retry_stats_lock:
+                write_retry_stats['retries'] += 1
+            time.sleep(WRITE_RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.5))
+        except pymysql.err.InterfaceError:
+            # The connection is closed; a replay retries on a new one
+            if replay_key:
+                raise
+            return False, "The database connection is closed"
+        except pymysql.Error as e:
+            connection.rollback()
+            return False, str(e)
+
+def _version_conflict(cursor, table, key_column, key, label):
+    """Explain why a versioned UPDATE matched no row: missing row or concurrent change."""
+    cursor.execute(f"SELECT Row_Version FROM {table} WHERE {key_column} = %s", (key,))
+    if cursor.fetchone():
+        return False, f"This {label} was changed by someone else since you loaded it. Review the latest values and try again."
+    return False, f"No {label} found with that ID"
+
+# =====================================================
+# UPDATE FUNCTIONS (WRITE OPERATIONS)
+# =====================================================
+
+def insert_new_demigod(connection, first_name, last_name, divine_parent_id, date_of_birth,
+                       fatal_flaw, date_of_arrival, status, abilities=None):
+    """
+    REQUIRED - INSERT Operation: Add a new demigod to the database.
+    The foreign key on Divine_Parent_ID checks that the Divine Parent exists.
+    Also inserts Known_Abilities (multi-valued attribute).
+    """
+    def work(cursor):
+        # Insert demigod; a missing god fails the foreign key (1452)
+        sql_insert = """
+            INSERT INTO Demigod
+            (First_Name, Last_Name, Divine_Parent_ID, Date_of_Birth, Fatal_Flaw, Date_of_Arrival, Status)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        try:
+            cursor.execute(sql_insert, (first_name, last_name, divine_parent_id, date_of_birth,
+                                        fatal_flaw, date_of_arrival, status))
+        except pymysql.err.IntegrityError as e:
+            if e.args[0] == 1452:
+                return False, f"Divine Parent with ID {divine_parent_id} does not exist. Please select a valid god."
+            raise
+        hero_id = cursor.lastrowid
+        
+        # Insert abilities if provided; repeated abilities are ignored by the primary key
+        abilities_to_insert = [(hero_id, ability.strip()) for ability in abilities or [] if ability.strip()]
+        if abilities_to_insert:
+            cursor.executemany("INSERT IGNORE INTO Known_Abilities (Hero_ID, Ability) VALUES (%s, %s)",
+                               abilities_to_insert)
+        
+        invalidate_hero_profiles(cursor, [hero_id])
+        return True, hero_id
+    
+    success, result = run_write_transaction(connection, work)
+    if success:
+        note_typeahead_change(connection, 'demigod', result, f"{first_name} {last_name}")
+    return success, result
+
+def insert_new_quest(connection, objective, start_date, outcome='Ongoing', prophecy_id=None,
+                     allow_duplicate_prophecy=False):
+    """
+    INSERT Operation 2: Add a new quest.
+    Links quest to a prophecy if provided (1:1 relationship, enforced by UNIQUE).
+    A prophecy that looks like a duplicate of one another quest already pursues
+    is refused unless allow_duplicate_prophecy is set.
+    """
+    if prophecy_id is not None and not allow_duplicate_prophecy:
+        pursued = [d for d in find_similar_prophecies(connection, prophecy_id=prophecy_id,
+                                                      threshold=PROPHECY_DUPLICATE_THRESHOLD)
+                   if d['Quest_ID'] is not None]
+        if pursued:
+            return False, (f"Prophecy {prophecy_id} looks like a duplicate of a prophecy that is already "
+                           f"being pursued:\n{describe_duplicate_prophecies(pursued)}")
+    
+    def work(cursor):
+        sql_insert = """
+            INSERT INTO Quest (Objective, Start_Date, Outcome, Prophecy_ID)
+            VALUES (%s, %s, %s, %s)
+        """
+        try:
+            cursor.execute(sql_insert, (objective, start_date, outcome, prophecy_id))
+        except pymysql.err.IntegrityError as e:
+            if e.args[0] == 1062:
+                return False, "This prophecy is already linked to another quest."
+            if e.args[0] == 1452:
+                return False, f"Prophecy with ID {prophecy_id} does not exist."
+            raise
+        return True, cursor.lastrowid
+    
+    success, result = run_write_transaction(connection, work)
+    if success:
+        note_typeahead_change(connection, 'quest', result, objective[:TEXT_PREVIEW_CHARS])
+    return success, result
+
+def insert_monster_sighting(connection, monster_id, location, reported_by, sighting_timestamp=None):
+    """
+    INSERT Operation 3: Add a new monster sighting.
+    The sighting is timestamped now unless a time is given (journaled
+    reports keep the time they were made).
+    """
+    sighting_timestamp = sighting_timestamp or datetime.now()
+    
+    def work(cursor):
+        execute_prepared(cursor, 'insert_monster_sighting',
+                         (monster_id, sighting_timestamp, location, reported_by))
+        return True, "Sighting recorded successfully"
+    
+    return run_write_transaction(connection, work)
+
+def insert_new_prophecy(connection, full_text, date_issued, status='Pending', allow_duplicate=False):
+    """
+    INSERT Operation 4: Record a newly issued prophecy.
+    A text that looks like a duplicate of an existing prophecy is refused
+    unless allow_duplicate is set.
+    """
+    if not allow_duplicate:
+        duplicates = find_similar_prophecies(connection, text=full_text, threshold=PROPHECY_DUPLICATE_THRESHOLD)
+        if duplicates:
+            return False, f"This prophecy looks like a duplicate of:\n{describe_duplicate_prophecies(duplicates)}"
+    
+    def work(cursor):
+        cursor.execute("INSERT INTO Prophecy (Full_Text, Date_Issued, Status) VALUES (%s, %s, %s)",
+                       (full_text, date_issued, status))
+        return True, cursor.lastrowid
+    
+    success, result = run_write_transaction(connection, work)
+    if success:
+        note_prophecy_change(connection, result, full_text)
+    return success, result
+
+def update_demigod_status(connection, hero_id, new_status, expected_version=None):
+    """
+    REQUIRED - UPDATE Operation: Update a demigod's status to 'Deceased'.
+    This will trigger an update on their associated 'Quest_Log' records.
+    With expected_version, the update only applies if the row is unchanged.
+    """
+    def work(cursor):
+        # Update demigod status
+        sql_update = """
+            UPDATE Demigod
+            SET Status = %s, Row_Version = Row_Version + 1
+            WHERE Hero_ID = %s
+        """
+        params = [new_status, hero_id]
+        if expected_version is not None:
+            sql_update += " AND Row_Version = %s"
+            params.append(expected_version)
+        cursor.execute(sql_update, params)
+        if cursor.rowcount == 0:
+            return _version_conflict(cursor, 'Demigod', 'Hero_ID', hero_id, 'demigod')
+        
+        # If status is 'Deceased', update related Quest_Log entries
+        if new_status == 'Deceased':
+            sql_update_quest_log = """
+                UPDATE Quest_Log
+                SET Outcome = 'Deceased'
+                WHERE Hero_ID = %s AND Outcome = 'Ongoing'
+            """
+            cursor.execute(sql_update_quest_log, (hero_id,))
+        
+        invalidate_hero_profiles(cursor, [hero_id])
+        return True, "Status updated successfully"
+    
+    return run_write_transaction(connection, work)
+
+def update_quest_outcome(connection, quest_id, outcome, end_date=None, expected_version=None):
+    """
+    UPDATE Operation 2: Update a quest's outcome and end date.
+    With expected_version, the update only applies if the row is unchanged.
+    """
+    def work(cursor):
+        if end_date:
+            sql_update = """
+                UPDATE Quest
+                SET Outcome = %s, End_Date = %s, Row_Version = Row_Version + 1
+                WHERE Quest_ID = %s
+            """
+            params = [outcome, end_date, quest_id]
+        else:
+            sql_update = """
+                UPDATE Quest
+                SET Outcome = %s, Row_Version = Row_Version + 1
+                WHERE Quest_ID = %s
+            """
+            params = [outcome, quest_id]
+        if expected_version is not None:
+            sql_update += " AND Row_Version = %s"
+            params.append(expected_version)
+        cursor.execute(sql_update, params)
+        if cursor.rowcount == 0:
+            return _version_conflict(cursor, 'Quest', 'Quest_ID', quest_id, 'quest')
+        
+        # Participants' profiles list the quest outcome
+        invalidate_hero_profiles(cursor, quest_ids=[quest_id])
+        refresh_quest_sketches(cursor, [quest_id])
+        return True, "Quest updated successfully"
+    
+    return run_write_transaction(connection, work)
+
+def update_artifact_wielder(connection, artifact_id, new_wielder_id, expected_version=None, changed_at=None):
+    """
+    UPDATE Operation 3: Change the wielder of a divine artifact.
+    The change is also recorded in the Artifact_Ownership history, as of
+    changed_at (default now).
+    With expected_version, the update only applies if the row is unchanged.
+    """
+    changed_at = (changed_at or datetime.now()).replace(microsecond=0)
+    
+    def work(cursor):
+        cursor.execute("SELECT Current_Wielder FROM Divine_Artifact WHERE Artifact_ID = %s FOR UPDATE",
+                       (artifact_id,))
+        previous = cursor.fetchone()
+        
+        sql_update = """
+            UPDATE Divine_Artifact
+            SET Current_Wielder = %s, Row_Version = Row_Version + 1
+            WHERE Artifact_ID = %s
+        """
+        params = [new_wielder_id, artifact_id]
+        if expected_version is not None:
+            sql_update += " AND Row_Version = %s"
+            params.append(expected_version)
+        cursor.execute(sql_update, params)
+        if cursor.rowcount == 0:
+            return _version_conflict(cursor, 'Divine_Artifact', 'Artifact_ID', artifact_id, 'artifact')
+        
+        if previous['Current_Wielder'] != new_wielder_id:
+            conflict = record_ownership_change(cursor, artifact_id, new_wielder_id, changed_at)
+            if conflict:
+                return False, conflict
+        
+        # Both the previous and the new wielder's artifact lists change
+        invalidate_hero_profiles(cursor, [previous['Current_Wielder'], new_wielder_id])
+        return True, "Artifact wielder updated successfully"
+    
+    return run_write_transaction(connection, work)
+
+def delete_monster_sighting(connection, monster_id, sighting_timestamp):
+    """
+    DELETE Operation 1: Remove a monster sighting record.
+    """
+    def work(cursor):
+        execute_prepared(cursor, 'delete_monster_sighting', (monster_id, sighting_timestamp))
+        if cursor.rowcount > 0:
+            return True, "Sighting deleted successfully"
+        else:
+            return False, "No sighting found with those parameters"
+    
+    return run_write_transaction(connection, work)
+
+def delete_quest(connection, quest_id):
+    """
+    REQUIRED - DELETE Operation: Remove a quest record.
+    All associated 'Quest_Log' entries will also be deleted due to CASCADE constraint.
+    """
+    def work(cursor):
+        # Check how many quest log entries will be affected
+        cursor.execute("SELECT Hero_ID FROM Quest_Log WHERE Quest_ID = %s", (quest_id,))
+        participants = [row['Hero_ID'] for row in cursor.fetchall()]
+        affected_logs = len(participants)
+        cursor.execute("SELECT Start_Date FROM Quest WHERE Quest_ID = %s", (quest_id,))
+        start_days = [row['Start_Date'] for row in cursor.fetchall()]
+        
+        # Delete the quest (CASCADE will handle Quest_Log entries)
+        sql_delete = """
+            DELETE FROM Quest
+            WHERE Quest_ID = %s
+        """
+        cursor.execute(sql_delete, (quest_id,))
+        if cursor.rowcount == 0:
+            return False, "No quest found with that ID"
+        
+        invalidate_hero_profiles(cursor, participants)
+        refresh_quest_sketches(cursor, days=start_days)
+        return True, f"Quest deleted successfully. {affected_logs} quest log entries also removed due to CASCADE."
+    
+    success, result = run_write_transaction(connection, work)
+    if success:
+        invalidate_full_text(connection, 'quest_objective', quest_id)
+        note_typeahead_change(connection, 'quest', quest_id)
+    return success, result
+
+def delete_demigod_ability(connection, hero_id, ability):
+    """
+    DELETE Operation 3: Remove a specific ability from a demigod.
+    """
+    def work(cursor):
+        execute_prepared(cursor, 'delete_demigod_ability', (hero_id, ability))
+        if cursor.rowcount == 0:
+            return False, "No such ability found for this hero"
+        
+        invalidate_hero_profiles(cursor, [hero_id])
+        return True, "Ability deleted successfully"
+    
+    return run_write_transaction(connection, work)
+
+# =====================================================
+# BULK UPDATE FUNCTIONS
+# =====================================================
+
+def _bulk_where(conditions):
+    """
+    AND together (sql, params) filter conditions. Raises ValueError when no
+    filter was given so a bulk update never targets a whole table by accident.
+    """
+    if not conditions:
+        raise ValueError("Select at least one filter for a bulk update")
+    sql = " AND ".join(condition for condition, _ in conditions)
+    params = [param for _, condition_params in conditions for param in condition_params]
+    return sql, params
+
+def bulk_update_demigod_status(connection, new_status, hero_ids=None, current_statuses=None,
+                               arrived_before=None, dry_run=False):
+    """
+    Bulk variant of update_demigod_status: move every demigod matching the
+    filters to new_status in one transaction. 'Deceased' also marks their
+    ongoing Quest_Log entries 'Deceased'. Demigods already in new_status are
+    left alone. With dry_run, only counts the rows that would change.
+    """
+    conditions = []
+    if hero_ids:
+        conditions.append((f"Hero_ID IN {_in_clause(hero_ids)}", list(hero_ids)))
+    if current_statuses:
+        conditions.append((f"Status IN {_in_clause(current_statuses)}", list(current_statuses)))
+    if arrived_before:
+        conditions.append(("Date_of_Arrival < %s", [arrived_before]))
+    try:
+        where, params = _bulk_where(conditions)
+    except ValueError as e:
+        return False, str(e)
+    where, params = f"Status <> %s AND {where}", [new_status] + params
+    
+    if dry_run:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT COUNT(*) as count FROM Demigod WHERE {where}", params)
+                demigods = int(cursor.fetchone()['count'])
+                logs = 0
+                if new_status == 'Deceased':
+                    cursor.execute(f"""
+                        SELECT COUNT(*) as count FROM Quest_Log
+                        WHERE Outcome = 'Ongoing'
+                          AND Hero_ID IN (SELECT Hero_ID FROM Demigod WHERE {where})
+                    """, params)
+                    logs = int(cursor.fetchone()['count'])
+                return True, (f"Dry run: {demigods} demigod(s) would become '{new_status}' and "
+                              f"{logs} ongoing quest log entries would be marked 'Deceased'")
+        except pymysql.Error as e:
+            return False, str(e)
+    
+    def work(cursor):
+        # Lock the targets so the status update and the Quest_Log cascade
+        # apply to the same set of demigods
+        cursor.execute(f"SELECT Hero_ID FROM Demigod WHERE {where} FOR UPDATE", params)
+        target_ids = [row['Hero_ID'] for row in cursor.fetchall()]
+        if not target_ids:
+            return False, "No demigods match the selected filters"
+        
+        cursor.execute(f"UPDATE Demigod SET Status = %s, Row_Version = Row_Version + 1 "
+                       f"WHERE Hero_ID IN {_in_clause(target_ids)}",
+                       [new_status] + target_ids)
+        updated = cursor.rowcount
+        
+        logs = 0
+        if new_status == 'Deceased':
+            cursor.execute(f"""
+                UPDATE Quest_Log
+                SET Outcome = 'Deceased'
+                WHERE Outcome = 'Ongoing' AND Hero_ID IN {_in_clause(target_ids)}
+            """, target_ids)
+            logs = cursor.rowcount
+        
+        invalidate_hero_profiles(cursor, target_ids)
+        return True, (f"{updated} demigod(s) updated to '{new_status}'; "
+                      f"{logs} ongoing quest log entries marked 'Deceased'")
+    
+    return run_write_transaction(connection, work)
+
+def bulk_update_quest_outcome(connection, outcome, quest_ids=None, current_outcomes=None,
+                              started_before=None, end_date=None, dry_run=False):
+    """
+    Bulk variant of update_quest_outcome: set the outcome (and optionally the
+    end date) of every quest matching the filters in one transaction, e.g.
+    all 'Ongoing' quests started before a date. Quests already at the outcome
+    are left alone. With dry_run, only counts the rows that would change.
+    """
+    conditions = []
+    if quest_ids:
+        conditions.append((f"Quest_ID IN {_in_clause(quest_ids)}", list(quest_ids)))
+    if current_outcomes:
+        conditions.append((f"Outcome IN {_in_clause(current_outcomes)}", list(current_outcomes)))
+    if started_before:
+        conditions.append(("Start_Date < %s", [started_before]))
+    try:
+        where, params = _bulk_where(conditions)
+    except ValueError as e:
         return False, str(e)
+    where, params = f"Outcome <> %s AND {where}", [outcome] + params
+    
+    if dry_run:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT COUNT(*) as count FROM Quest WHERE {where}", params)
+                quests = int(cursor.fetchone()['count'])
+                return True, f"Dry run: {quests} quest(s) would be set to '{outcome}'"
+        except pymysql.Error as e:
+            return False, str(e)
+    
+    def work(cursor):
+        cursor.execute(f"SELECT Quest_ID FROM Quest WHERE {where} FOR UPDATE", params)
+        target_ids = [row['Quest_ID'] for row in cursor.fetchall()]
+        if not target_ids:
+            return False, "No quests match the selected filters"
+        
+        id_list = _in_clause(target_ids)
+        if end_date:
+            cursor.execute(f"UPDATE Quest SET Outcome = %s, End_Date = %s, Row_Version = Row_Version + 1 "
+                           f"WHERE Quest_ID IN {id_list}",
+                           [outcome, end_date] + target_ids)
+        else:
+            cursor.execute(f"UPDATE Quest SET Outcome = %s, Row_Version = Row_Version + 1 "
+                           f"WHERE Quest_ID IN {id_list}",
+                           [outcome] + target_ids)
+        updated = cursor.rowcount
+        
+        # Participants' profiles list the quest outcome
+        invalidate_hero_profiles(cursor, quest_ids=target_ids)
+        refresh_quest_sketches(cursor, target_ids)
+        return True, f"{updated} quest(s) set to '{outcome}'"
+    
+    return run_write_transaction(connection, work)
+
+# =====================================================
+# WRITE JOURNAL
+# =====================================================
+
+# Journal files, one per database: <dir>/<host>_<database>.journal. They hold
+# unapplied writes, so they live in the user's state directory rather than the
+# source tree; set OLYMPIAN_CODEX_JOURNAL_DIR to keep them elsewhere
+JOURNAL_DIR_ENV = "OLYMPIAN_CODEX_JOURNAL_DIR"
+DEFAULT_JOURNAL_DIR = os.path.join(
+    os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state"),
+    "olympian_codex", "journal"
+)
+# How long a submit waits for the replay to report the write's outcome before
+# acknowledging it as queued (it is already durable in the journal)
+JOURNAL_ACK_WAIT_SECONDS = 0.5
+# Replayed writes' idempotency keys are kept this long in Journal_Applied
+JOURNAL_KEY_RETENTION_DAYS = 7
+
+# Writes that can go through the journal: operation -> (function, keyword
+# argument that receives the submission time, or None)
+JOURNALED_WRITES = {
+    'insert_new_demigod': (insert_new_demigod, None),
+    'insert_new_quest': (insert_new_quest, None),
+    'insert_monster_sighting': (insert_monster_sighting, 'sighting_timestamp'),
+    'insert_new_prophecy': (insert_new_prophecy, None),
+    'update_demigod_status': (update_demigod_status, None),
+    'update_quest_outcome': (update_quest_outcome, None),
+    'update_artifact_wielder': (update_artifact_wielder, 'changed_at'),
+    'delete_monster_sighting': (delete_monster_sighting, None),
+    'delete_quest': (delete_quest, None),
+    'delete_demigod_ability': (delete_demigod_ability, None),
+}
+
+# Process-wide journals: (host, db) -> (WriteJournal, JournalReplayer)
+_write_journals = {}
+_write_journals_lock = threading.Lock()
+_journal_keys_purged = {}
+
+def journal_dir():
+    """The write journal directory: $OLYMPIAN_CODEX_JOURNAL_DIR or DEFAULT_JOURNAL_DIR."""
+    return os.environ.get(JOURNAL_DIR_ENV) or DEFAULT_JOURNAL_DIR
+
+def _journal_path(connection, directory=None):
+    directory = directory or journal_dir()
+    name = f"{connection.host}_{os.path.basename(str(connection.db))}"
+    return os.path.join(directory, re.sub(r"[^\w.-]", "_", name) + ".journal")
 
-def delete_monster_sighting(connection, monster_id, sighting_timestamp):
+def apply_journaled_write(connection, entry):
     """
-    DELETE Operation 1: Remove a monster sighting record.
+    Replay one journaled write. Returns ('applied', result) or ('conflict',
+    message); raises pymysql errors when the database is unavailable.
+    A key already in Journal_Applied was committed before; it is not re-run.
     """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT Result FROM Journal_Applied WHERE Idempotency_Key = %s", (entry.key,))
+        applied = cursor.fetchone()
+    connection.commit()
+    if applied:
+        return 'applied', applied['Result']
+    
+    func, _ = JOURNALED_WRITES[entry.operation]
+    _journal_replay.key, _journal_replay.operation = entry.key, entry.operation
+    try:
+        success, result = func(connection, *entry.args, **entry.kwargs)
+    except pymysql.Error:
+        raise
+    except Exception as e:
+        return 'conflict', f"{type(e).__name__}: {e}"
+    finally:
+        _journal_replay.key = None
+    return ('applied' if success else 'conflict'), result
+
+def _purge_journal_keys(connection):
+    """Drop old idempotency keys, at most once an hour per database."""
+    cache_key = (connection.host, connection.db)
+    if time.monotonic() - _journal_keys_purged.get(cache_key, float('-inf')) < 3600:
+        return
     try:
         with connection.cursor() as cursor:
-            sql_delete = """
-                DELETE FROM Sighting_Log 
-                WHERE Monster_ID = %s AND Sighting_Timestamp = %s
-            """
-            cursor.execute(sql_delete, (monster_id, sighting_timestamp))
-            connection.commit()
-            if cursor.rowcount > 0:
-                return True, "Sighting deleted successfully"
-            else:
-                return False, "No sighting found with those parameters"
-    except pymysql.Error as e:
+            cursor.execute("DELETE FROM Journal_Applied WHERE Applied_At < %s",
+                           (datetime.now() - timedelta(days=JOURNAL_KEY_RETENTION_DAYS),))
+        connection.commit()
+    except pymysql.Error:
+        # Housekeeping only; the next idle pass tries again
         connection.rollback()
-        return False, str(e)
+        return
+    _journal_keys_purged[cache_key] = time.monotonic()
 
-def delete_quest(connection, quest_id):
+def get_write_journal(connection):
     """
-    REQUIRED - DELETE Operation: Remove a quest record.
-    All associated 'Quest_Log' entries will also be deleted due to CASCADE constraint.
+    The process-wide journal for the connection's database and its replay
+    worker, started on first use (pending writes from an earlier run are
+    replayed then), or (None, None) for in-memory embedded databases, which
+    do not outlive the process and cannot be opened by a second connection.
     """
-    try:
-        with connection.cursor() as cursor:
-            # Check how many quest log entries will be affected
-            cursor.execute("SELECT COUNT(*) as count FROM Quest_Log WHERE Quest_ID = %s", (quest_id,))
-            affected_logs = cursor.fetchone()['count']
-            
-            # Delete the quest (CASCADE will handle Quest_Log entries)
-            sql_delete = """
-                DELETE FROM Quest 
-                WHERE Quest_ID = %s
-            """
-            cursor.execute(sql_delete, (quest_id,))
-            connection.commit()
-            if cursor.rowcount > 0:
-                return True, f"Quest deleted successfully. {affected_logs} quest log entries also removed due to CASCADE."
-            else:
-                return False, "No quest found with that ID"
-    except pymysql.Error as e:
-        connection.rollback()
-        return False, str(e)
+    backend = getattr(connection, 'backend', None)
+    if backend is None or getattr(backend, 'path', None) == ':memory:':
+        return None, None
+    cache_key = (connection.host, connection.db)
+    with _write_journals_lock:
+        if cache_key not in _write_journals:
+            journal = WriteJournal(_journal_path(connection))
+            replayer = JournalReplayer(journal, backend.connect, apply_journaled_write,
+                                       on_idle=_purge_journal_keys).start()
+            _write_journals[cache_key] = (journal, replayer)
+        return _write_journals[cache_key]
 
-def delete_demigod_ability(connection, hero_id, ability):
+def submit_write(connection, operation, *args, key=None, **kwargs):
     """
-    DELETE Operation 3: Remove a specific ability from a demigod.
+    Journal a write and return (success, result) like the write function.
+    The write is acknowledged once it is fsynced to the local journal. If the
+    replay worker applies it within JOURNAL_ACK_WAIT_SECONDS, its own result
+    is returned; otherwise (True, entry) with the still-pending JournalEntry.
+    `key` makes resubmitting the same write idempotent. Without a journal
+    (in-memory databases) the write runs directly.
     """
+    func, time_argument = JOURNALED_WRITES[operation]
+    if time_argument:
+        kwargs.setdefault(time_argument, datetime.now())
+    journal, replayer = get_write_journal(connection)
+    if journal is None:
+        return func(connection, *args, **kwargs)
     try:
-        with connection.cursor() as cursor:
-            sql_delete = """
-                DELETE FROM Known_Abilities 
-                WHERE Hero_ID = %s AND Ability = %s
-            """
-            cursor.execute(sql_delete, (hero_id, ability))
-            connection.commit()
-            if cursor.rowcount > 0:
-                return True, "Ability deleted successfully"
-            else:
-                return False, "No such ability found for this hero"
-    except pymysql.Error as e:
-        connection.rollback()
-        return False, str(e)
+        entry = journal.append(operation, args, kwargs, key)
+    except OSError as e:
+        return False, f"Could not save the write to the local journal: {e}"
+    replayer.wake()
+    journal.wait(entry, JOURNAL_ACK_WAIT_SECONDS)
+    if entry.state == 'pending':
+        return True, entry
+    return entry.state == 'applied', entry.result
+
+def show_write_result(success, result, message):
+    """Report a submitted write: `message` on success, the queued notice, or the error."""
+    if isinstance(result, JournalEntry):
+        st.info(f"📒 Saved to the local write journal (ref {result.key[:8]}). The database has not confirmed "
+                f"it yet; it will be applied in order as soon as the database responds. "
+                f"See **Write Journal** for its outcome.")
+    elif success:
+        st.success(message.format(result=result))
+    else:
+        st.error(f"❌ Error: {result}")
+    return success and not isinstance(result, JournalEntry)
 
 # =====================================================
 # HELPER FUNCTIONS
@@ -892,11 +3140,11 @@ def get_all_gods(connection):
         return []
 
 def get_all_demigods(connection):
-    """Get all demigods for dropdown menus."""
+    """Get all demigods (ids, names and row versions), e.g. to sample load-test parameters."""
     try:
         with connection.cursor() as cursor:
             cursor.execute("""
-                SELECT Hero_ID, CONCAT(First_Name, ' ', Last_Name) as Full_Name 
+                SELECT Hero_ID, CONCAT(First_Name, ' ', Last_Name) as Full_Name, Row_Version
                 FROM Demigod 
                 ORDER BY First_Name
             """)
@@ -906,7 +3154,7 @@ def get_all_demigods(connection):
         return []
 
 def get_all_monsters(connection):
-    """Get all monsters for dropdown menus."""
+    """Get all monsters (ids and species)."""
     try:
         with connection.cursor() as cursor:
             cursor.execute("SELECT Monster_ID, Species FROM Monster ORDER BY Species")
@@ -916,42 +3164,187 @@ def get_all_monsters(connection):
         return []
 
 def get_all_artifacts(connection):
-    """Get all artifacts for dropdown menus."""
+    """Get all artifacts (ids, names and row versions)."""
     try:
         with connection.cursor() as cursor:
-            cursor.execute("SELECT Artifact_ID, Name FROM Divine_Artifact ORDER BY Name")
+            cursor.execute("SELECT Artifact_ID, Name, Row_Version FROM Divine_Artifact ORDER BY Name")
             return cursor.fetchall()
     except pymysql.Error as e:
         st.error(f"Error fetching artifacts: {e}")
         return []
 
 def get_all_quests(connection):
-    """Get all quests for dropdown menus."""
+    """Get all quests with objective previews, newest first."""
     try:
         with connection.cursor() as cursor:
-            cursor.execute("SELECT Quest_ID, Objective FROM Quest ORDER BY Quest_ID DESC")
+            cursor.execute(
+                "SELECT Quest_ID, LEFT(Objective, %s) as Objective_Preview, Row_Version FROM Quest ORDER BY Quest_ID DESC",
+                (TEXT_PREVIEW_CHARS,)
+            )
             return cursor.fetchall()
     except pymysql.Error as e:
         st.error(f"Error fetching quests: {e}")
         return []
 
 def get_available_prophecies(connection):
-    """Get prophecies that are not yet linked to any quest."""
+    """Get prophecies that are not yet linked to any quest, with text previews."""
     try:
         with connection.cursor() as cursor:
             sql_query = """
-                SELECT p.Prophecy_ID, p.Full_Text, p.Date_Issued, p.Status
+                SELECT p.Prophecy_ID, LEFT(p.Full_Text, %s) as Text_Preview, p.Date_Issued, p.Status
                 FROM Prophecy p
                 LEFT JOIN Quest q ON p.Prophecy_ID = q.Prophecy_ID
                 WHERE q.Quest_ID IS NULL
                 ORDER BY p.Date_Issued DESC
             """
-            cursor.execute(sql_query)
+            cursor.execute(sql_query, (TEXT_PREVIEW_CHARS,))
             return cursor.fetchall()
     except pymysql.Error as e:
         st.error(f"Error fetching available prophecies: {e}")
         return []
 
+# Dropdown labels: selectboxes take the fetched rows as options and show these
+def god_label(god):
+    return "None" if god is None else god['Name']
+
+def demigod_label(demigod):
+    return "None" if demigod is None else demigod['Full_Name']
+
+def monster_label(monster):
+    return monster['Species']
+
+def artifact_label(artifact):
+    return artifact['Name']
+
+def quest_label(quest):
+    return f"Quest {quest['Quest_ID']}: {quest['Objective_Preview']}..."
+
+# =====================================================
+# TYPEAHEAD SEARCH
+# =====================================================
+
+# Pickable entities: entity -> (table, key column, picker columns, indexed column).
+# Picker rows have the same columns as the get_all_* rows and use the same labels.
+TYPEAHEAD_ENTITIES = {
+    'demigod': ('Demigod', 'Hero_ID',
+                "Hero_ID, CONCAT(First_Name, ' ', Last_Name) as Full_Name, Row_Version", 'Full_Name'),
+    'monster': ('Monster', 'Monster_ID', "Monster_ID, Species", 'Species'),
+    'artifact': ('Divine_Artifact', 'Artifact_ID', "Artifact_ID, Name, Row_Version", 'Name'),
+    'quest': ('Quest', 'Quest_ID',
+              f"Quest_ID, LEFT(Objective, {TEXT_PREVIEW_CHARS}) as Objective_Preview, Row_Version",
+              'Objective_Preview'),
+}
+
+TYPEAHEAD_LABELS = {
+    'demigod': demigod_label,
+    'monster': monster_label,
+    'artifact': artifact_label,
+    'quest': quest_label,
+}
+
+# Matches offered per keystroke
+TYPEAHEAD_LIMIT = 20
+# App writes update the indexes in place; rows written by other clients
+# show up when an index is rebuilt after this many seconds
+TYPEAHEAD_MAX_AGE_SECONDS = 600
+
+# Process-wide prefix indexes: (host, db, entity) -> (PrefixIndex, built at)
+_typeahead_indexes = {}
+_typeahead_lock = threading.Lock()
+
+def get_typeahead_index(connection, entity):
+    """The prefix index for one entity, built with a single scan on first use or once stale."""
+    scope = (connection.host, connection.db, entity)
+    with _typeahead_lock:
+        entry = _typeahead_indexes.get(scope)
+    if entry is not None and time.monotonic() - entry[1] < TYPEAHEAD_MAX_AGE_SECONDS:
+        return entry[0]
+    
+    table, key_column, columns, text_column = TYPEAHEAD_ENTITIES[entity]
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {columns} FROM {table}")
+        index = PrefixIndex((row[key_column], row[text_column]) for row in cursor.fetchall())
+    with _typeahead_lock:
+        _typeahead_indexes[scope] = (index, time.monotonic())
+    return index
+
+def get_picker_rows(connection, entity, ids):
+    """Fetch picker rows by key, in the order of ids (so Row_Version is always current)."""
+    if not ids:
+        return []
+    table, key_column, columns, _ = TYPEAHEAD_ENTITIES[entity]
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {columns} FROM {table} WHERE {key_column} IN ({placeholders})", list(ids))
+        rows = {row[key_column]: row for row in cursor.fetchall()}
+    return [rows[row_id] for row_id in ids if row_id in rows]
+
+def typeahead_search(connection, entity, query, limit=TYPEAHEAD_LIMIT, include_ids=()):
+    """
+    Picker rows for up to `limit` entries with a word starting with `query`,
+    after the rows of include_ids (e.g. the current selection).
+    """
+    try:
+        index = get_typeahead_index(connection, entity)
+        with _typeahead_lock:
+            matches = index.search(query, limit)
+        return get_picker_rows(connection, entity, list(dict.fromkeys([*include_ids, *matches])))
+    except pymysql.Error as e:
+        st.error(f"Error during search: {e}")
+        return []
+
+def note_typeahead_change(connection, entity, entity_id, text=None):
+    """Update a built index after a write: index the new text, or drop the entry when text is None."""
+    with _typeahead_lock:
+        entry = _typeahead_indexes.get((connection.host, connection.db, entity))
+        if entry is None:
+            return
+        if text is None:
+            entry[0].remove(entity_id)
+        else:
+            entry[0].add(entity_id, text)
+
+def typeahead_select(connection, entity, label, key, allow_none=False):
+    """
+    A search box with a selectbox of the best matches below it.
+    Returns the chosen picker row, or None (nothing typed, no match, or the
+    "None" option when allow_none is set).
+    """
+    key_column = TYPEAHEAD_ENTITIES[entity][1]
+    query = st.text_input(f"🔎 Search — {label}", key=f"{key}_query", placeholder="Start typing a name...")
+    rows = typeahead_search(connection, entity, query) if query.strip() else []
+    by_id = {row[key_column]: row for row in rows}
+    if not by_id and not allow_none:
+        st.caption("No matches." if query.strip() else "Type a few letters to search.")
+        return None
+    
+    options = ([None] if allow_none else []) + list(by_id)
+    selected_id = st.selectbox(
+        label, options, key=key,
+        format_func=lambda row_id: TYPEAHEAD_LABELS[entity](by_id.get(row_id))
+    )
+    return by_id.get(selected_id)
+
+def typeahead_multiselect(connection, entity, label, key):
+    """
+    A search box feeding a multiselect; chosen entries stay selected while
+    the search text changes. Returns the chosen picker rows.
+    """
+    key_column = TYPEAHEAD_ENTITIES[entity][1]
+    query = st.text_input(f"🔎 Search — {label}", key=f"{key}_query", placeholder="Start typing a name...")
+    selected_ids = st.session_state.get(key, [])
+    rows = typeahead_search(connection, entity, query, include_ids=selected_ids)
+    by_id = {row[key_column]: row for row in rows}
+    if any(row_id not in by_id for row_id in selected_ids):
+        # Drop selections whose rows were deleted meanwhile
+        st.session_state[key] = [row_id for row_id in selected_ids if row_id in by_id]
+    
+    chosen_ids = st.multiselect(
+        label, list(by_id), key=key,
+        format_func=lambda row_id: TYPEAHEAD_LABELS[entity](by_id[row_id])
+    )
+    return [by_id[row_id] for row_id in chosen_ids if row_id in by_id]
+
 # =====================================================
 # UI PAGES
 # =====================================================
@@ -965,10 +3358,32 @@ def show_dashboard(connection):
         </div>
     """, unsafe_allow_html=True)
     
-    # Get statistics
-    stats = query_database_statistics(connection)
+    if 'dashboard_cache' not in st.session_state:
+        st.session_state.dashboard_cache = {'versions': {}, 'data': {}, 'refreshed_at': None}
+    cache = st.session_state.dashboard_cache
     
-    if stats:
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        live_mode = st.toggle("🔴 Live mode", key="dashboard_live")
+    with col2:
+        refresh_seconds = st.select_slider(
+            "Refresh every (seconds):", options=[2, 5, 10, 30, 60], value=5,
+            disabled=not live_mode
+        )
+    
+    # In live mode only this fragment reruns on the timer; it re-queries
+    # panels whose source tables changed according to their table versions.
+    @st.fragment(run_every=refresh_seconds if live_mode else None)
+    def render_panels():
+        reloaded = refresh_dashboard_panels(connection, cache)
+        if not all(cache['data'].get(panel) for panel in DASHBOARD_STAT_PANELS):
+            st.error("Unable to fetch database statistics.")
+            return
+        
+        stats = {}
+        for panel in DASHBOARD_STAT_PANELS:
+            stats.update(cache['data'][panel])
+        
         st.header("📊 Database Overview")
         
         # Display metrics in columns
@@ -992,24 +3407,138 @@ def show_dashboard(connection):
         
         # Show Olympian Council
         st.header("🏛️ The Olympian Council")
-        council_results = query_olympian_council(connection)
+        council_results = cache['data'].get('council')
         if council_results:
-            df = pd.DataFrame(council_results)
+            df = rows_to_frame(council_results)
             st.dataframe(df, use_container_width=True, hide_index=True)
         else:
             st.info("No council members found.")
+        
+        st.caption(
+            f"Last refreshed {cache['refreshed_at']:%H:%M:%S} · "
+            f"re-queried: {', '.join(reloaded) if reloaded else 'nothing changed'}"
+        )
+    
+    render_panels()
+
+def render_view_controls(view_name, key, filter_names=None):
+    """
+    Render projection, filter and sort widgets for a query view.
+    Returns keyword arguments for run_view_query; only filters the user
+    narrowed are included so untouched widgets add no predicates.
+    """
+    view = QUERY_VIEWS[view_name]
+    all_columns = list(view['columns'])
+    label = lambda column: f"{column} ⚡" if column in view['indexed'] else column
+    
+    columns = st.multiselect("Columns to fetch:", all_columns, default=all_columns,
+                             format_func=label, key=f"{key}_columns")
+    
+    filters = {}
+    for name, kind in view['filters'].items():
+        if filter_names is not None and name not in filter_names:
+            continue
+        kind_name = kind[0] if isinstance(kind, tuple) else kind
+        if kind_name == 'date_range':
+            if st.checkbox(f"Filter by {label(name)}", key=f"{key}_{name}_on"):
+                dates = st.date_input(
+                    f"{name} between:", value=(date.today() - timedelta(days=90), date.today()),
+                    key=f"{key}_{name}"
+                )
+                if len(dates) == 2:
+                    filters[name] = dates
+        elif kind_name == 'set':
+            chosen = st.multiselect(f"{label(name)}:", kind[1], default=kind[1], key=f"{key}_{name}")
+            if len(chosen) < len(kind[1]):
+                filters[name] = chosen
+        elif kind_name == 'range':
+            bounds = st.slider(f"{label(name)}:", kind[1][0], kind[1][1], kind[1], key=f"{key}_{name}")
+            if tuple(bounds) != tuple(kind[1]):
+                filters[name] = tuple(bounds)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        default_sort = view['default_order'][0]
+        sort_column = st.selectbox("Sort by:", all_columns, index=all_columns.index(default_sort[0]),
+                                   format_func=label, key=f"{key}_sort")
+    with col2:
+        directions = ["DESC", "ASC"]
+        direction = st.radio("Direction:", directions, index=directions.index(default_sort[1]),
+                             horizontal=True, key=f"{key}_direction")
+    with col3:
+        limit = st.number_input("Max rows:", min_value=1, max_value=QUERY_BUILDER_MAX_LIMIT,
+                                value=QUERY_BUILDER_DEFAULT_LIMIT, key=f"{key}_limit")
+    st.caption("⚡ = indexed column (cheap to filter and sort on)")
+    
+    return {'columns': columns, 'filters': filters, 'order_by': [(sort_column, direction)], 'limit': limit}
+
+def render_report_source(connection):
+    """
+    Let the user run reports on the live database or on the analytics store.
+    Returns the connection the report should read from.
+    """
+    source = st.radio("Report source:", ["Live database", "Analytics store"],
+                      horizontal=True, key="report_source")
+    if source == "Live database":
+        return connection
+    
+    store = get_analytics_store(DEFAULT_STORE_PATH)
+    if store is None:
+        st.warning("Falling back to the live database.")
+        return connection
+    
+    if st.button("🔄 Sync Analytics Store", key="sync_store"):
+        try:
+            with _analytics_sync_lock:
+                summary = sync_analytics_store(connection, store)
+            copied = sum(entry['Rows_Copied'] or 0 for entry in summary)
+            skipped = sum(1 for entry in summary if entry['Rows_Copied'] is None)
+            st.success(f"Copied {copied} row(s); {skipped} unchanged table(s) skipped.")
+        except pymysql.Error as e:
+            st.error(f"Error syncing analytics store: {e}")
+    
+    state = get_sync_state(store)
+    if state:
+        last_synced = min(row['Synced_At'] for row in state.values())
+        st.caption(f"Analytics store as of {last_synced:%Y-%m-%d %H:%M:%S}")
     else:
-        st.error("Unable to fetch database statistics.")
+        st.warning("The analytics store is empty. Sync it before generating reports.")
+    return store
+
+def render_entity_details(connection, entity):
+    """Show the subtype and subclass attributes of an entity from load_entities."""
+    if entity['Subtype'] is None:
+        st.caption("No subclass recorded.")
+        return
+    st.markdown(f"**{entity['Subtype'].replace('_', ' ')}**")
+    attributes = entity.keys()[entity.keys().index('Subtype') + 1:]
+    for name in attributes:
+        value = entity[name]
+        if isinstance(value, bool):
+            value = "Yes" if value else "No"
+        st.markdown(f"**{name.replace('_', ' ')}:** {value if value is not None else '—'}")
+        if name in ENTITY_PREVIEW_COLUMNS and value:
+            # Entities start with their key column
+            render_full_text_expander(connection, ENTITY_PREVIEW_COLUMNS[name], entity[entity.keys()[0]],
+                                      f"📜 Full {name.replace('_', ' ').lower()}")
 
 def show_query_page(connection):
     """Display the query/read operations page."""
     st.header("🔍 Query Operations")
     
+    cancelled = st.session_state.pop('cancelled_query', None)
+    if cancelled:
+        st.info(f"⛔ {cancelled} was cancelled.")
+    
     query_option = st.selectbox(
         "Select a query to execute:",
         [
             "Find Demigods by Divine Parent",
             "View Quest Details",
+            "Hero Profile",
+            "Monster Dossiers",
+            "Pantheon & Bestiary",
+            "Custom Query Builder",
             # "View Monster Encounters by Hero",
             # "List Divine Artifacts",
             # "Find Dangerous Monsters",
@@ -1019,7 +3548,10 @@ def show_query_page(connection):
             "All Demigods with Divine Parents",
             "Average Threat Level of Titans",
             "Search Artifacts (Contains Text)",
+            "Artifact Ownership History",
             "Report: Quests by Divine Parent",
+            "Report: Success Rate by Artifact Holder",
+            "Artifact Recommendations",
             # "Report: Demigod Success with Artifacts",
             # "Report: Prophecy-Monster Correlation"
         ]
@@ -1031,34 +3563,211 @@ def show_query_page(connection):
         st.subheader("⚡ Find Demigods by Divine Parent")
         gods = get_all_gods(connection)
         if gods:
-            god_names = [god['Name'] for god in gods]
-            selected_god = st.selectbox("Select a god:", god_names)
+            selected_god = st.selectbox("Select a god:", gods, format_func=god_label)
+            god = load_entity(connection, 'God', selected_god['Divine_ID'])
+            if god:
+                with st.expander(f"⚡ {god['Name']}: {god['Domain'] or 'Unknown domain'}"):
+                    render_entity_details(connection, god)
             
             if st.button("🔍 Search", key="query1"):
-                results = query_demigods_by_parent(connection, selected_god)
+                results = query_demigods_by_parent(connection, selected_god['Name'])
                 if results:
-                    st.success(f"Found {len(results)} demigod(s) with {selected_god} as their divine parent:")
-                    df = pd.DataFrame(results)
+                    st.success(f"Found {len(results)} demigod(s) with {selected_god['Name']} as their divine parent:")
+                    df = rows_to_frame(results)
                     st.dataframe(df, use_container_width=True, hide_index=True)
                 else:
-                    st.warning(f"No demigods found for {selected_god}.")
+                    st.warning(f"No demigods found for {selected_god['Name']}.")
     
     elif query_option == "View Quest Details":
         st.subheader("🗺️ View Quest Details")
-        status_filter = st.selectbox(
-            "Filter by outcome:",
-            ["All", "Success", "Failure", "Ongoing", "Abandoned"]
-        )
+        controls = render_view_controls('Quests', "query2", filter_names=['Outcome', 'Start_Date'])
         
         if st.button("🔍 Search", key="query2"):
-            status = None if status_filter == "All" else status_filter
-            results = query_quests_with_details(connection, status)
+            columns = controls['columns'] or list(QUERY_VIEWS['Quests']['columns'])
+            if 'Quest_ID' not in columns:
+                columns = ['Quest_ID'] + columns
+            st.session_state.quest_results = run_cancellable(
+                connection, "Quest search", query_quests_with_details,
+                statuses=controls['filters'].get('Outcome'),
+                start_dates=controls['filters'].get('Start_Date'),
+                columns=columns,
+                order_by=controls['order_by'],
+                limit=controls['limit']
+            )
+        
+        # Results persist across reruns so a row can be expanded without searching again
+        results = st.session_state.get('quest_results')
+        if results:
+            st.success(f"Found {len(results)} quest(s):")
+            df = rows_to_frame(results)
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            
+            quest_ids = [r['Quest_ID'] for r in results]
+            expanded_id = st.selectbox("Expand quest:", quest_ids)
+            render_full_text_expander(connection, 'quest_objective', expanded_id, f"📜 Quest {expanded_id} objective")
+        elif results is not None:
+            st.warning("No quests found.")
+    
+    elif query_option == "Hero Profile":
+        st.subheader("🦸 Hero Profile")
+        selected_demigod = typeahead_select(connection, 'demigod', "Select a demigod:", key="profile_demigod")
+        if selected_demigod:
+            
+            success, result = ensure_hero_profiles(connection, [selected_demigod['Hero_ID']])
+            if not success:
+                st.error(f"Error building hero profile: {result}")
+            profile = get_hero_profile(connection, selected_demigod['Hero_ID'])
+            if profile:
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Divine Parent", profile['parent']['name'] or "Unknown")
+                with col2:
+                    st.metric("Status", profile['status'])
+                with col3:
+                    st.metric("Quests", len(profile['quests']))
+                with col4:
+                    st.metric("Encounters", profile['encounters']['total'])
+                
+                st.markdown(f"**Fatal Flaw:** {profile['fatal_flaw'] or '—'}")
+                st.markdown(f"**Abilities:** {', '.join(profile['abilities']) or '—'}")
+                st.markdown(
+                    f"**Artifacts Wielded:** {', '.join(a['name'] for a in profile['artifacts']) or '—'}"
+                )
+                
+                if profile['quests']:
+                    st.markdown("**Quests**")
+                    st.dataframe(rows_to_frame(profile['quests']), use_container_width=True, hide_index=True)
+                
+                encounters = profile['encounters']
+                if encounters['total']:
+                    outcomes = ", ".join(f"{k}: {v}" for k, v in encounters['by_outcome'].items())
+                    st.markdown(
+                        f"**Encounter Summary:** {outcomes} · last on {encounters['last_date']} · "
+                        f"monsters faced: {', '.join(encounters['species'])}"
+                    )
+            else:
+                st.warning(f"No profile found for {selected_demigod['Full_Name']}.")
+        
+        if st.button("🔄 Rebuild All Profiles", key="rebuild_profiles"):
+            success, result = rebuild_all_hero_profiles(connection)
+            if success:
+                st.success(f"✅ {result}")
+            else:
+                st.error(f"❌ Error: {result}")
+    
+    elif query_option == "Monster Dossiers":
+        st.subheader("👹 Monster Dossiers")
+        min_threat = st.slider("Minimum threat level:", 1, 10, 7, key="dossier_threat")
+        
+        briefing = query_most_dangerous_monsters(connection, min_threat)
+        if briefing:
+            st.success(f"Threat briefing: {len(briefing)} monster(s) at threat level {min_threat} or above")
+            st.dataframe(rows_to_frame(briefing), use_container_width=True, hide_index=True)
+            
+            selected_monster = st.selectbox("Monster details:", briefing, format_func=monster_label)
+            dossier = get_monster_dossier(connection, selected_monster['Monster_ID'])
+            if dossier:
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Threat Level", dossier['threat_level'])
+                with col2:
+                    st.metric("Type", dossier['type'] or "Unclassified")
+                with col3:
+                    st.metric("Heroes Encountered", dossier['encounters']['heroes'])
+                with col4:
+                    st.metric("Combat Encounters", dossier['combat']['total'])
+                
+                for name, value in dossier['attributes'].items():
+                    if isinstance(value, bool):
+                        value = "Yes" if value else "No"
+                    st.markdown(f"**{name.replace('_', ' ').title()}:** {value or '—'}")
+                st.markdown(f"**Weaknesses:** {', '.join(dossier['weaknesses']) or '—'}")
+                st.markdown(f"**Habitats:** {', '.join(dossier['habitats']) or '—'}")
+                
+                encounters = dossier['encounters']
+                if encounters['total']:
+                    outcomes = ", ".join(f"{k}: {v}" for k, v in encounters['by_outcome'].items())
+                    st.markdown(f"**Encounters:** {outcomes} · last on {encounters['last_date']}")
+                combat = dossier['combat']
+                if combat['total']:
+                    results = ", ".join(f"{k}: {v}" for k, v in combat['by_result'].items())
+                    st.markdown(f"**Combat:** {results} · last on {combat['last_date']}")
+        else:
+            st.warning(f"No monsters found with threat level >= {min_threat}.")
+        
+        with st.expander("📅 Heroes faced in a date range (approximate)"):
+            col1, col2 = st.columns(2)
+            with col1:
+                start = st.date_input("From:", value=None, key="monster_heroes_start")
+            with col2:
+                end = st.date_input("Until:", value=None, key="monster_heroes_end")
+            results = query_monster_heroes_approx(connection, min_threat, start, end)
             if results:
-                st.success(f"Found {len(results)} quest(s):")
-                df = pd.DataFrame(results)
-                st.dataframe(df, use_container_width=True, hide_index=True)
+                st.caption("Distinct heroes from merged per-day HyperLogLog sketches of encounters and "
+                           "combat; ± values are ~95% bounds.")
+                st.dataframe(rows_to_frame(results), use_container_width=True, hide_index=True)
+            else:
+                st.info("No encounters in this range.")
+        
+        if st.button("🔄 Rebuild All Dossiers", key="rebuild_dossiers"):
+            success, result = rebuild_all_monster_dossiers(connection)
+            if success:
+                st.success(f"✅ {result}")
             else:
-                st.warning("No quests found.")
+                st.error(f"❌ Error: {result}")
+    
+    elif query_option == "Pantheon & Bestiary":
+        st.subheader("🏛️ Pantheon & Bestiary")
+        st.info("Gods and monsters with their subclass resolved: every entity is loaded with its subtype "
+                "attributes in one batched query and reused from an identity map.")
+        hierarchy = st.radio("Show:", ["God", "Monster"], horizontal=True,
+                             format_func=lambda name: "Gods" if name == "God" else "Monsters")
+        entities = load_all_entities(connection, hierarchy)
+        subtypes = list(ENTITY_HIERARCHIES[hierarchy][2])
+        selected_subtypes = st.multiselect("Subtypes:", subtypes + ["Unclassified"],
+                                           default=subtypes + ["Unclassified"], key=f"subtypes_{hierarchy}")
+        entities = [e for e in entities if (e['Subtype'] or "Unclassified") in selected_subtypes]
+        if entities:
+            # Only the subclass columns of the subtypes shown
+            columns = [c for c in entity_columns(hierarchy)
+                       if any(c in entity for entity in entities)]
+            st.success(f"Found {len(entities)} {hierarchy.lower()}(s):")
+            st.dataframe(rows_to_frame(entities, columns), use_container_width=True, hide_index=True)
+            
+            label = god_label if hierarchy == "God" else monster_label
+            selected = st.selectbox("Details:", entities, format_func=label, key=f"entity_{hierarchy}")
+            render_entity_details(connection, selected)
+        else:
+            st.warning("No entities match these subtypes.")
+    
+    elif query_option == "Custom Query Builder":
+        st.subheader("🧮 Custom Query Builder")
+        st.info("Filters, sorting and column selection run in the database; only the chosen columns and rows are fetched.")
+        view_name = st.selectbox("Table:", list(QUERY_VIEWS.keys()))
+        controls = render_view_controls(view_name, f"builder_{view_name}")
+        
+        full_text = QUERY_VIEWS[view_name].get('full_text')
+        if st.button("🔍 Run Query", key="query_builder"):
+            if full_text and controls['columns'] and full_text[1] not in controls['columns']:
+                controls['columns'] = [full_text[1]] + controls['columns']
+            source = view_query_source(connection, view_name, controls.get('filters'))
+            st.session_state.builder_results = (
+                view_name, run_cancellable(source, f"{view_name} query", run_view_query, view_name, **controls)
+            )
+        
+        # Results persist across reruns so a row can be expanded without querying again
+        result_view, results = st.session_state.get('builder_results', (None, None))
+        if result_view == view_name and results:
+            st.success(f"Found {len(results)} row(s):")
+            df = rows_to_frame(results)
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            
+            if full_text:
+                kind, key_column = full_text
+                expanded_id = st.selectbox("Expand row:", [r[key_column] for r in results])
+                render_full_text_expander(connection, kind, expanded_id, f"📜 {key_column} {expanded_id} full text")
+        elif result_view == view_name:
+            st.warning("No rows match these filters.")
     
     # elif query_option == "View Monster Encounters by Hero":
     #     st.subheader("⚔️ View Monster Encounters")
@@ -1072,7 +3781,7 @@ def show_query_page(connection):
     #             results = query_monster_encounters(connection, hero_id)
     #             if results:
     #                 st.success(f"Found {len(results)} encounter(s) for {selected_demigod}:")
-    #                 df = pd.DataFrame(results)
+    #                 df = rows_to_frame(results)
     #                 st.dataframe(df, use_container_width=True, hide_index=True)
     #             else:
     #                 st.warning(f"No encounters found for {selected_demigod}.")
@@ -1083,7 +3792,7 @@ def show_query_page(connection):
     #         results = query_artifacts_and_wielders(connection)
     #         if results:
     #             st.success(f"Found {len(results)} artifact(s):")
-    #             df = pd.DataFrame(results)
+    #             df = rows_to_frame(results)
     #             st.dataframe(df, use_container_width=True, hide_index=True)
     #         else:
     #             st.warning("No artifacts found.")
@@ -1096,7 +3805,7 @@ def show_query_page(connection):
     #         results = query_most_dangerous_monsters(connection, min_threat)
     #         if results:
     #             st.success(f"Found {len(results)} dangerous monster(s):")
-    #             df = pd.DataFrame(results)
+    #             df = rows_to_frame(results)
     #             st.dataframe(df, use_container_width=True, hide_index=True)
     #         else:
     #             st.warning(f"No monsters found with threat level >= {min_threat}.")
@@ -1105,7 +3814,7 @@ def show_query_page(connection):
     #     st.subheader("👥 View Quest Participants")
     #     quests = get_all_quests(connection)
     #     if quests:
-    #         quest_dict = {f"Quest {q['Quest_ID']}: {q['Objective'][:50]}...": q['Quest_ID'] for q in quests}
+    #         quest_dict = {f"Quest {q['Quest_ID']}: {q['Objective_Preview']}...": q['Quest_ID'] for q in quests}
     #         selected_quest = st.selectbox("Select a quest:", list(quest_dict.keys()))
     #         
     #         if st.button("🔍 Search", key="query6"):
@@ -1113,7 +3822,7 @@ def show_query_page(connection):
     #             results = query_quest_participants(connection, quest_id)
     #             if results:
     #                 st.success(f"Found {len(results)} participant(s):")
-    #                 df = pd.DataFrame(results)
+    #                 df = rows_to_frame(results)
     #                 st.dataframe(df, use_container_width=True, hide_index=True)
     #             else:
     #                 st.warning("No participants found for this quest.")
@@ -1124,7 +3833,7 @@ def show_query_page(connection):
     #         results = query_olympian_council(connection)
     #         if results:
     #             st.success(f"The Olympian Council ({len(results)} members):")
-    #             df = pd.DataFrame(results)
+    #             df = rows_to_frame(results)
     #             st.dataframe(df, use_container_width=True, hide_index=True)
     #         else:
     #             st.warning("No council members found.")
@@ -1136,13 +3845,29 @@ def show_query_page(connection):
         st.info("**REQUIRED Query - Selection**: Retrieves all active prophecies that have no quest assigned.")
         
         if st.button("🔍 Execute Query", key="req_query1"):
-            results = query_active_prophecies_no_quest(connection)
-            if results:
-                st.success(f"Found {len(results)} active prophecy/prophecies without assigned quests:")
-                df = pd.DataFrame(results)
-                st.dataframe(df, use_container_width=True, hide_index=True)
-            else:
-                st.info("All active prophecies have quests assigned, or no active prophecies exist.")
+            st.session_state.active_prophecy_results = query_active_prophecies_no_quest(connection)
+        
+        results = st.session_state.get('active_prophecy_results')
+        if results:
+            st.success(f"Found {len(results)} active prophecy/prophecies without assigned quests:")
+            df = rows_to_frame(results)
+            # Likely duplicates share a group id (the lowest Prophecy_ID among them)
+            duplicate_groups = get_prophecy_duplicate_groups(connection)
+            df['Duplicate_Group'] = [duplicate_groups.get(r['Prophecy_ID']) for r in results]
+            if st.toggle("Group near-duplicates", key="group_prophecies"):
+                df = df.sort_values(['Duplicate_Group', 'Prophecy_ID'], na_position='last')
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            
+            prophecy_ids = [r['Prophecy_ID'] for r in results]
+            expanded_id = st.selectbox("Expand prophecy:", prophecy_ids)
+            render_full_text_expander(connection, 'prophecy_text', expanded_id, f"📜 Prophecy {expanded_id} full text")
+            
+            similar = find_similar_prophecies(connection, prophecy_id=expanded_id)
+            if similar:
+                st.caption(f"Prophecies similar to Prophecy {expanded_id}:")
+                st.dataframe(rows_to_frame(similar), use_container_width=True, hide_index=True)
+        elif results is not None:
+            st.info("All active prophecies have quests assigned, or no active prophecies exist.")
     
     elif query_option == "All Demigods with Divine Parents":
         st.subheader("👤 All Demigods with Their Divine Parents")
@@ -1152,7 +3877,7 @@ def show_query_page(connection):
             results = query_demigods_projection(connection)
             if results:
                 st.success(f"Found {len(results)} registered demigod(s):")
-                df = pd.DataFrame(results)
+                df = rows_to_frame(results)
                 st.dataframe(df, use_container_width=True, hide_index=True)
             else:
                 st.warning("No demigods found in the database.")
@@ -1188,7 +3913,7 @@ def show_query_page(connection):
                 results = query_artifacts_search_blade(connection, search_term)
                 if results:
                     st.success(f"Found {len(results)} artifact(s) matching '{search_term}':")
-                    df = pd.DataFrame(results)
+                    df = rows_to_frame(results)
                     st.dataframe(df, use_container_width=True, hide_index=True)
                 else:
                     st.warning(f"No artifacts found matching '{search_term}'.")
@@ -1197,32 +3922,153 @@ def show_query_page(connection):
     
     # ========== ANALYSIS REPORTS ==========
     
+    elif query_option == "Artifact Ownership History":
+        st.subheader("⚔️ Artifact Ownership History")
+        
+        selected_artifact = typeahead_select(connection, 'artifact', "Select Artifact:", key="ownership_artifact")
+        if selected_artifact:
+            artifact_id = selected_artifact['Artifact_ID']
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                as_of_date = st.date_input("As of date:", value=date.today(), key="ownership_date")
+            with col2:
+                as_of_time = st.time_input("Time:", value=datetime.min.time(), key="ownership_time")
+            
+            if st.button("🔍 Who Held It?", key="ownership_as_of"):
+                as_of = datetime.combine(as_of_date, as_of_time)
+                holder = query_artifact_holder_as_of(connection, artifact_id, as_of)
+                if holder:
+                    until = holder['Valid_To'] or "present"
+                    st.success(f"{selected_artifact['Name']} was held by **{holder['Holder'] or 'a deleted hero'}** "
+                               f"(from {holder['Valid_From']} until {until}).")
+                else:
+                    st.warning(f"{selected_artifact['Name']} was not wielded on {as_of}.")
+            
+            st.markdown("**Ownership timeline:**")
+            timeline = query_artifact_ownership_timeline(connection, artifact_id)
+            if timeline:
+                st.dataframe(rows_to_frame(timeline), use_container_width=True, hide_index=True)
+            else:
+                st.info("No ownership history recorded for this artifact.")
+    
     elif query_option == "Report: Quests by Divine Parent":
         st.subheader("📊 Analysis Report: Quests by Divine Parent")
         st.info("**REQUIRED Report 1**: Generates a report of quests grouped by the divine parent of participating demigods.")
+        mode = st.radio("Mode:", ["Exact", "Approximate (sketches)"], horizontal=True, key="report1_mode")
+        
+        if mode == "Approximate (sketches)":
+            st.caption("Merges per-parent, per-day HyperLogLog and t-digest sketches instead of counting "
+                       "distinct quests and children; ± values are ~95% bounds.")
+            col1, col2 = st.columns(2)
+            with col1:
+                start = st.date_input("Quests started from:", value=None, key="report1_start")
+            with col2:
+                end = st.date_input("Until:", value=None, key="report1_end")
+            
+            if st.button("📊 Generate Report", key="report1_approx"):
+                results = report_quests_by_divine_parent_approx(connection, start, end)
+                if results:
+                    st.success(f"Approximate report for {len(results)} divine parent(s):")
+                    st.dataframe(rows_to_frame(results), use_container_width=True, hide_index=True)
+                    
+                    st.subheader("Summary Statistics")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        # Parents share quests, so these are sums of per-parent estimates
+                        st.metric("Total Quests Across All Parents", sum(r['Total_Quests'] for r in results))
+                    with col2:
+                        st.metric("Total Successful Quests", sum(r['Successful_Quests'] for r in results))
+                    st.caption("Quest durations: median and 90th percentile in days; Days_Rank_Error is the "
+                               "largest rank error of those percentiles as a fraction of the quests.")
+                else:
+                    st.warning("No quest data found for this range.")
+            
+            if st.button("🔄 Rebuild Sketches", key="rebuild_sketches"):
+                success, result = rebuild_all_sketches(connection)
+                if success:
+                    st.success(f"✅ {result}")
+                else:
+                    st.error(f"❌ Error: {result}")
+        
+        else:
+            report_connection = render_report_source(connection)
+            
+            if st.button("📊 Generate Report", key="report1"):
+                results = run_cancellable(report_connection, "Quests by Divine Parent report",
+                                          report_quests_by_divine_parent, time_limit=REPORT_TIMEOUT_SECONDS)
+                if results:
+                    st.success(f"Report generated for {len(results)} divine parent(s):")
+                    df = rows_to_frame(results)
+                    st.dataframe(df, use_container_width=True, hide_index=True)
+                    
+                    # Summary statistics
+                    st.subheader("Summary Statistics")
+                    total_quests = sum(r['Total_Quests'] for r in results)
+                    total_successful = sum(r['Successful_Quests'] for r in results)
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.metric("Total Quests Across All Parents", total_quests)
+                    with col2:
+                        st.metric("Total Successful Quests", total_successful)
+                elif results is not None:
+                    st.warning("No quest data found.")
+    
+    elif query_option == "Report: Success Rate by Artifact Holder":
+        st.subheader("📊 Analysis Report: Success Rate by Artifact Holder")
+        st.info("Attributes every combat encounter to whoever held the artifact at the time of the combat.")
+        report_connection = render_report_source(connection)
         
-        if st.button("📊 Generate Report", key="report1"):
-            results = report_quests_by_divine_parent(connection)
+        if st.button("📊 Generate Report", key="report_holder"):
+            results = run_cancellable(report_connection, "Success Rate by Artifact Holder report",
+                                      report_artifact_holder_success_rate, time_limit=REPORT_TIMEOUT_SECONDS)
             if results:
-                st.success(f"Report generated for {len(results)} divine parent(s):")
-                df = pd.DataFrame(results)
+                st.success(f"Report generated for {len(results)} artifact holding(s):")
+                df = rows_to_frame(results)
                 st.dataframe(df, use_container_width=True, hide_index=True)
-                
-                # Summary statistics
-                st.subheader("Summary Statistics")
-                total_quests = sum(r['Total_Quests'] for r in results)
-                total_successful = sum(r['Successful_Quests'] for r in results)
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric("Total Quests Across All Parents", total_quests)
-                with col2:
-                    st.metric("Total Successful Quests", total_successful)
-            else:
-                st.warning("No quest data found.")
+            elif results is not None:
+                st.warning("No combat encounter data found with artifacts.")
+    
+    elif query_option == "Artifact Recommendations":
+        st.subheader("🎯 Artifact Recommendations")
+        st.info("Ranks artifacts by their smoothed win rate against the species a quest expects to face, "
+                "with an active demigod to wield each one.")
+        
+        expected_monsters = typeahead_multiselect(connection, 'monster', "Expected monsters:",
+                                                  key="recommend_monsters")
+        counts = {}
+        if expected_monsters:
+            st.caption("Expected count of each monster:")
+            columns = st.columns(min(len(expected_monsters), 4))
+            for i, monster in enumerate(expected_monsters):
+                with columns[i % len(columns)]:
+                    counts[monster['Monster_ID']] = st.number_input(
+                        monster_label(monster), min_value=1, max_value=20, value=1,
+                        key=f"recommend_count_{monster['Monster_ID']}"
+                    )
+        limit = st.slider("Artifacts to recommend:", 3, 25, RECOMMENDATION_LIMIT)
+        
+        results = None
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            if st.button("🎯 Recommend", key="recommend", disabled=not counts):
+                monster_ids = [monster_id for monster_id, count in counts.items() for _ in range(count)]
+                results = recommend_artifacts(connection, monster_ids, limit)
+        with col2:
+            if st.button("🔄 Rebuild Matrices", key="recommend_rebuild"):
+                rebuild_outcome_matrices(connection)
+                st.success("Outcome matrices will be rebuilt on the next recommendation.")
+        
+        if results:
+            st.success(f"Top {len(results)} artifact(s):")
+            st.dataframe(rows_to_frame(results), use_container_width=True, hide_index=True)
+        elif results is not None:
+            st.warning("No combat history with artifacts yet.")
     
     # elif query_option == "Report: Demigod Success with Artifacts":
     #     st.subheader("📊 Analysis Report: Demigod Success Rate with Artifacts")
     #     st.info("**REQUIRED Report 2**: Analyzes the success rate of demigods when using divine artifacts against specific monster species.")
+    #     report_connection = render_report_source(connection)
     #     
     #     monsters = get_all_monsters(connection)
     #     if monsters:
@@ -1231,10 +4077,10 @@ def show_query_page(connection):
     #         
     #         if st.button("📊 Generate Report", key="report2"):
     #             species = None if selected_species == "All Species" else selected_species
-    #             results = report_demigod_artifact_success_rate(connection, species)
+    #             results = report_demigod_artifact_success_rate(report_connection, species)
     #             if results:
     #                 st.success(f"Report generated for {len(results)} encounter(s):")
-    #                 df = pd.DataFrame(results)
+    #                 df = rows_to_frame(results)
     #                 st.dataframe(df, use_container_width=True, hide_index=True)
     #             else:
     #                 st.warning("No combat encounter data found with artifacts.")
@@ -1242,12 +4088,13 @@ def show_query_page(connection):
     # elif query_option == "Report: Prophecy-Monster Correlation":
     #     st.subheader("📊 Analysis Report: Prophecy-Monster Correlation")
     #     st.info("**REQUIRED Report 3**: Correlates prophecies with the monsters most frequently encountered in their associated quests.")
+    #     report_connection = render_report_source(connection)
     #     
     #     if st.button("📊 Generate Report", key="report3"):
-    #         results = report_prophecy_monster_correlation(connection)
+    #         results = report_prophecy_monster_correlation(report_connection)
     #         if results:
     #             st.success(f"Report generated for {len(results)} prophecy-monster correlation(s):")
-    #             df = pd.DataFrame(results)
+    #             df = rows_to_frame(results)
     #             st.dataframe(df, use_container_width=True, hide_index=True)
     #         else:
     #             st.warning("No prophecy-quest-monster correlations found.")
@@ -1261,7 +4108,8 @@ def show_insert_page(connection):
         [
             "Add New Demigod",
             "Create New Quest",
-            "Report Monster Sighting"
+            "Report Monster Sighting",
+            "Issue New Prophecy"
         ]
     )
     
@@ -1279,9 +4127,8 @@ def show_insert_page(connection):
             
             gods = get_all_gods(connection)
             if gods:
-                god_dict = {g['Name']: g['Divine_ID'] for g in gods}
-                selected_god = st.selectbox("Divine Parent:", ["None"] + list(god_dict.keys()))
-                divine_parent_id = None if selected_god == "None" else god_dict[selected_god]
+                selected_god = st.selectbox("Divine Parent:", [None] + gods, format_func=god_label)
+                divine_parent_id = None if selected_god is None else selected_god['Divine_ID']
         
         with col2:
             date_of_birth = st.date_input("Date of Birth:", value=date(2000, 1, 1))
@@ -1302,16 +4149,13 @@ def show_insert_page(connection):
                 # Parse abilities from text area
                 abilities = [ability.strip() for ability in abilities_text.split('\n') if ability.strip()]
                 
-                success, result = insert_new_demigod(
-                    connection, first_name, last_name, divine_parent_id,
+                success, result = submit_write(
+                    connection, 'insert_new_demigod', first_name, last_name, divine_parent_id,
                     date_of_birth, fatal_flaw, date_of_arrival, status, abilities
                 )
-                if success:
-                    st.success(f"✅ Demigod registered successfully! Hero ID: {result}")
+                if show_write_result(success, result, "✅ Demigod registered successfully! Hero ID: {result}"):
                     if abilities:
                         st.info(f"📋 Added {len(abilities)} ability/abilities.")
-                else:
-                    st.error(f"❌ Error: {result}")
             else:
                 st.warning("Please fill in all required fields.")
     
@@ -1327,9 +4171,13 @@ def show_insert_page(connection):
         available_prophecies = get_available_prophecies(connection)
         
         prophecy_id = None
+        allow_duplicate_prophecy = False
         if available_prophecies:
+            duplicate_groups = get_prophecy_duplicate_groups(connection)
             prophecy_options = ["None - No Prophecy"] + [
-                f"Prophecy {p['Prophecy_ID']}: {p['Full_Text'][:80]}..." 
+                f"Prophecy {p['Prophecy_ID']}: {p['Text_Preview']}..."
+                + (f" [near-duplicate group {duplicate_groups[p['Prophecy_ID']]}]"
+                   if p['Prophecy_ID'] in duplicate_groups else "")
                 for p in available_prophecies
             ]
             selected_prophecy = st.selectbox("Select a Prophecy:", prophecy_options)
@@ -1338,21 +4186,26 @@ def show_insert_page(connection):
                 # Extract prophecy_id from selection
                 prophecy_id = available_prophecies[prophecy_options.index(selected_prophecy) - 1]['Prophecy_ID']
                 
-                # Show full prophecy text
-                selected_prophecy_data = available_prophecies[prophecy_options.index(selected_prophecy) - 1]
-                st.info(f"**Full Prophecy Text:**\n{selected_prophecy_data['Full_Text']}")
+                # Show full prophecy text (fetched only for the selected prophecy)
+                st.info(f"**Full Prophecy Text:**\n{get_full_text(connection, 'prophecy_text', prophecy_id)}")
+                
+                pursued = [d for d in find_similar_prophecies(connection, prophecy_id=prophecy_id,
+                                                              threshold=PROPHECY_DUPLICATE_THRESHOLD)
+                           if d['Quest_ID'] is not None]
+                if pursued:
+                    st.warning("⚠️ This prophecy looks like a duplicate of one a quest already pursues:\n"
+                               + describe_duplicate_prophecies(pursued))
+                    allow_duplicate_prophecy = st.checkbox("It is a different prophecy - create the quest anyway")
         else:
             st.warning("⚠️ No available prophecies. All prophecies are already linked to quests.")
         
         if st.button("✅ Create Quest", key="insert2"):
             if objective:
-                success, result = insert_new_quest(connection, objective, start_date, outcome, prophecy_id)
-                if success:
-                    st.success(f"✅ Quest created successfully! Quest ID: {result}")
+                success, result = submit_write(connection, 'insert_new_quest', objective, start_date, outcome,
+                                               prophecy_id, allow_duplicate_prophecy=allow_duplicate_prophecy)
+                if show_write_result(success, result, "✅ Quest created successfully! Quest ID: {result}"):
                     if prophecy_id:
                         st.info(f"🔗 Quest linked to Prophecy ID: {prophecy_id}")
-                else:
-                    st.error(f"❌ Error: {result}")
             else:
                 st.warning("Please provide a quest objective.")
     
@@ -1362,30 +4215,58 @@ def show_insert_page(connection):
         col1, col2 = st.columns(2)
         
         with col1:
-            monsters = get_all_monsters(connection)
-            if monsters:
-                monster_dict = {m['Species']: m['Monster_ID'] for m in monsters}
-                selected_monster = st.selectbox("Monster Species:", list(monster_dict.keys()))
-                monster_id = monster_dict[selected_monster]
+            selected_monster = typeahead_select(connection, 'monster', "Monster Species:", key="sighting_monster")
         
         with col2:
-            demigods = get_all_demigods(connection)
-            if demigods:
-                demigod_dict = {d['Full_Name']: d['Hero_ID'] for d in demigods}
-                selected_reporter = st.selectbox("Reported By:", list(demigod_dict.keys()))
-                reporter_id = demigod_dict[selected_reporter]
+            selected_reporter = typeahead_select(connection, 'demigod', "Reported By:", key="sighting_reporter")
         
         location = st.text_input("Location:")
         
         if st.button("✅ Report Sighting", key="insert3"):
-            if location:
-                success, result = insert_monster_sighting(connection, monster_id, location, reporter_id)
-                if success:
-                    st.success(f"✅ Sighting reported successfully!")
-                else:
-                    st.error(f"❌ Error: {result}")
+            if location and selected_monster and selected_reporter:
+                monster_id = selected_monster['Monster_ID']
+                reporter_id = selected_reporter['Hero_ID']
+                success, result = submit_write(connection, 'insert_monster_sighting', monster_id, location, reporter_id)
+                show_write_result(success, result, "✅ Sighting reported successfully!")
+            else:
+                st.warning("Please choose a monster and a reporter and provide a location.")
+    
+    elif insert_option == "Issue New Prophecy":
+        st.subheader("📜 Issue a New Prophecy")
+        
+        full_text = st.text_area("Prophecy Text:", height=120)
+        date_issued = st.date_input("Date Issued:", value=date.today(), key="prophecy_date")
+        status = st.selectbox("Status:", ["Pending", "In Progress", "Fulfilled", "Failed"], key="prophecy_status")
+        
+        allow_duplicate = False
+        if full_text.strip():
+            similar = find_similar_prophecies(connection, text=full_text)
+            if similar:
+                st.caption("Similar existing prophecies:")
+                st.dataframe(rows_to_frame(similar), use_container_width=True, hide_index=True)
+                if similar[0]['Similarity_Percentage'] >= PROPHECY_DUPLICATE_THRESHOLD * 100:
+                    st.warning("⚠️ This looks like a duplicate of an existing prophecy.")
+                    allow_duplicate = st.checkbox("It is a new prophecy - record it anyway")
+        
+        if st.button("✅ Record Prophecy", key="insert4"):
+            if full_text.strip():
+                success, result = submit_write(connection, 'insert_new_prophecy', full_text.strip(), date_issued,
+                                               status, allow_duplicate=allow_duplicate)
+                show_write_result(success, result, "✅ Prophecy recorded successfully! Prophecy ID: {result}")
             else:
-                st.warning("Please provide a location.")
+                st.warning("Please enter the prophecy text.")
+
+def remember_row_version(entity, row_id, version):
+    """
+    Return the Row_Version the user first saw for a row and keep it across
+    reruns, so an update submitted later is rejected if the row changed since.
+    """
+    versions = st.session_state.setdefault('row_versions', {})
+    return versions.setdefault((entity, row_id), version)
+
+def forget_row_version(entity, row_id):
+    """Drop a remembered Row_Version after the update went through or conflicted."""
+    st.session_state.setdefault('row_versions', {}).pop((entity, row_id), None)
 
 def show_update_page(connection):
     """Display the update operations page."""
@@ -1396,7 +4277,9 @@ def show_update_page(connection):
         [
             "Update Demigod Status",
             "Update Quest Outcome",
-            "Change Artifact Wielder"
+            "Change Artifact Wielder",
+            "Bulk Demigod Status Update",
+            "Bulk Quest Outcome Update"
         ]
     )
     
@@ -1406,11 +4289,10 @@ def show_update_page(connection):
         st.subheader("✏️ Update Demigod Status")
         st.info("**REQUIRED Update**: When updating to 'Deceased', this triggers an update on associated 'Quest_Log' records.")
         
-        demigods = get_all_demigods(connection)
-        if demigods:
-            demigod_dict = {d['Full_Name']: d['Hero_ID'] for d in demigods}
-            selected_demigod = st.selectbox("Select Demigod:", list(demigod_dict.keys()))
-            hero_id = demigod_dict[selected_demigod]
+        selected_demigod = typeahead_select(connection, 'demigod', "Select Demigod:", key="update_demigod")
+        if selected_demigod:
+            hero_id = selected_demigod['Hero_ID']
+            expected_version = remember_row_version('demigod', hero_id, selected_demigod['Row_Version'])
             
             new_status = st.selectbox("New Status:", ["Active", "Deceased", "Missing", "Retired"])
             
@@ -1418,20 +4300,18 @@ def show_update_page(connection):
                 st.warning("⚠️ Updating to 'Deceased' will also update all ongoing Quest_Log entries for this hero.")
             
             if st.button("✅ Update Status", key="update1"):
-                success, result = update_demigod_status(connection, hero_id, new_status)
-                if success:
-                    st.success(f"✅ {result}")
-                else:
-                    st.error(f"❌ Error: {result}")
+                success, result = submit_write(connection, 'update_demigod_status', hero_id, new_status,
+                                               expected_version)
+                forget_row_version('demigod', hero_id)
+                show_write_result(success, result, "✅ {result}")
     
     elif update_option == "Update Quest Outcome":
         st.subheader("✏️ Update Quest Outcome")
         
-        quests = get_all_quests(connection)
-        if quests:
-            quest_dict = {f"Quest {q['Quest_ID']}: {q['Objective'][:50]}...": q['Quest_ID'] for q in quests}
-            selected_quest = st.selectbox("Select Quest:", list(quest_dict.keys()))
-            quest_id = quest_dict[selected_quest]
+        selected_quest = typeahead_select(connection, 'quest', "Select Quest:", key="update_quest")
+        if selected_quest:
+            quest_id = selected_quest['Quest_ID']
+            expected_version = remember_row_version('quest', quest_id, selected_quest['Row_Version'])
             
             outcome = st.selectbox("New Outcome:", ["Success", "Failure", "Ongoing", "Abandoned"])
             
@@ -1441,29 +4321,94 @@ def show_update_page(connection):
                 end_date = st.date_input("End Date:", value=date.today())
             
             if st.button("✅ Update Quest", key="update2"):
-                success, result = update_quest_outcome(connection, quest_id, outcome, end_date)
-                if success:
-                    st.success(f"✅ {result}")
-                else:
-                    st.error(f"❌ Error: {result}")
+                success, result = submit_write(connection, 'update_quest_outcome', quest_id, outcome, end_date,
+                                               expected_version)
+                forget_row_version('quest', quest_id)
+                show_write_result(success, result, "✅ {result}")
     
     elif update_option == "Change Artifact Wielder":
         st.subheader("⚔️ Change Artifact Wielder")
         
-        artifacts = get_all_artifacts(connection)
-        demigods = get_all_demigods(connection)
-        
-        if artifacts and demigods:
-            artifact_dict = {a['Name']: a['Artifact_ID'] for a in artifacts}
-            selected_artifact = st.selectbox("Select Artifact:", list(artifact_dict.keys()))
-            artifact_id = artifact_dict[selected_artifact]
+        selected_artifact = typeahead_select(connection, 'artifact', "Select Artifact:", key="update_artifact")
+        if selected_artifact:
+            artifact_id = selected_artifact['Artifact_ID']
+            expected_version = remember_row_version('artifact', artifact_id, selected_artifact['Row_Version'])
             
-            demigod_dict = {d['Full_Name']: d['Hero_ID'] for d in demigods}
-            selected_wielder = st.selectbox("New Wielder:", ["None"] + list(demigod_dict.keys()))
-            new_wielder_id = None if selected_wielder == "None" else demigod_dict[selected_wielder]
+            selected_wielder = typeahead_select(connection, 'demigod', "New Wielder:", key="update_wielder",
+                                                allow_none=True)
+            new_wielder_id = None if selected_wielder is None else selected_wielder['Hero_ID']
             
             if st.button("✅ Change Wielder", key="update3"):
-                success, result = update_artifact_wielder(connection, artifact_id, new_wielder_id)
+                success, result = submit_write(connection, 'update_artifact_wielder', artifact_id, new_wielder_id,
+                                               expected_version)
+                forget_row_version('artifact', artifact_id)
+                show_write_result(success, result, "✅ {result}")
+    
+    elif update_option == "Bulk Demigod Status Update":
+        st.subheader("✏️ Bulk Demigod Status Update")
+        st.info("Updates every demigod matching the filters in a single transaction. "
+                "Preview the row counts with a dry run before applying.")
+        
+        selected_demigods = typeahead_multiselect(connection, 'demigod', "Demigods (leave empty to match by filters):",
+                                                  key="bulk1_demigods")
+        current_statuses = st.multiselect("Current Status:", ["Active", "Deceased", "Missing", "Retired"])
+        arrived_before = None
+        if st.checkbox("Only demigods who arrived before a date"):
+            arrived_before = st.date_input("Arrived Before:", value=date.today(), key="bulk1_date")
+        new_status = st.selectbox("New Status:", ["Active", "Deceased", "Missing", "Retired"], key="bulk1_status")
+        
+        if new_status == "Deceased":
+            st.warning("⚠️ Updating to 'Deceased' will also update all ongoing Quest_Log entries for these heroes.")
+        
+        bulk_args = dict(hero_ids=[d['Hero_ID'] for d in selected_demigods],
+                         current_statuses=current_statuses, arrived_before=arrived_before)
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("🔎 Dry Run", key="bulk1_dry_run"):
+                success, result = bulk_update_demigod_status(connection, new_status, dry_run=True, **bulk_args)
+                if success:
+                    st.info(f"🔎 {result}")
+                else:
+                    st.error(f"❌ Error: {result}")
+        with col2:
+            if st.button("✅ Apply Bulk Update", key="bulk1"):
+                success, result = bulk_update_demigod_status(connection, new_status, **bulk_args)
+                if success:
+                    st.success(f"✅ {result}")
+                else:
+                    st.error(f"❌ Error: {result}")
+    
+    elif update_option == "Bulk Quest Outcome Update":
+        st.subheader("✏️ Bulk Quest Outcome Update")
+        st.info("Updates every quest matching the filters in a single transaction, "
+                "e.g. all 'Ongoing' quests started before a date.")
+        
+        selected_quests = typeahead_multiselect(connection, 'quest', "Quests (leave empty to match by filters):",
+                                                key="bulk2_quests")
+        current_outcomes = st.multiselect("Current Outcome:", ["Success", "Failure", "Ongoing", "Abandoned"],
+                                          default=["Ongoing"])
+        started_before = None
+        if st.checkbox("Only quests started before a date"):
+            started_before = st.date_input("Started Before:", value=date.today(), key="bulk2_date")
+        outcome = st.selectbox("New Outcome:", ["Success", "Failure", "Ongoing", "Abandoned"],
+                               index=3, key="bulk2_outcome")
+        end_date = None
+        if st.checkbox("Set End Date", key="bulk2_set_end"):
+            end_date = st.date_input("End Date:", value=date.today(), key="bulk2_end")
+        
+        bulk_args = dict(quest_ids=[q['Quest_ID'] for q in selected_quests],
+                         current_outcomes=current_outcomes, started_before=started_before)
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("🔎 Dry Run", key="bulk2_dry_run"):
+                success, result = bulk_update_quest_outcome(connection, outcome, dry_run=True, **bulk_args)
+                if success:
+                    st.info(f"🔎 {result}")
+                else:
+                    st.error(f"❌ Error: {result}")
+        with col2:
+            if st.button("✅ Apply Bulk Update", key="bulk2"):
+                success, result = bulk_update_quest_outcome(connection, outcome, end_date=end_date, **bulk_args)
                 if success:
                     st.success(f"✅ {result}")
                 else:
@@ -1508,25 +4453,21 @@ def show_delete_page(connection):
                 sightings = cursor.fetchall()
                 
                 if sightings:
-                    df = pd.DataFrame(sightings)
+                    df = rows_to_frame(sightings)
                     st.dataframe(df, use_container_width=True, hide_index=True)
                     
-                    sighting_dict = {
-                        f"{s['Species']} at {s['Location']} ({s['Sighting_Timestamp']})": 
-                        (s['Monster_ID'], s['Sighting_Timestamp']) 
-                        for s in sightings
-                    }
-                    
-                    selected_sighting = st.selectbox("Select Sighting to Delete:", list(sighting_dict.keys()))
+                    selected_sighting = st.selectbox(
+                        "Select Sighting to Delete:", sightings,
+                        format_func=lambda s: f"{s['Species']} at {s['Location']} ({s['Sighting_Timestamp']})"
+                    )
                     
                     if st.button("🗑️ Delete Sighting", key="delete1"):
-                        monster_id, timestamp = sighting_dict[selected_sighting]
-                        success, result = delete_monster_sighting(connection, monster_id, timestamp)
-                        if success:
-                            st.success(f"✅ {result}")
+                        success, result = submit_write(
+                            connection, 'delete_monster_sighting',
+                            selected_sighting['Monster_ID'], selected_sighting['Sighting_Timestamp']
+                        )
+                        if show_write_result(success, result, "✅ {result}"):
                             st.rerun()
-                        else:
-                            st.error(f"❌ Error: {result}")
                 else:
                     st.info("No sightings found.")
         except pymysql.Error as e:
@@ -1536,41 +4477,30 @@ def show_delete_page(connection):
         st.subheader("🗑️ Delete a Quest")
         st.info("**REQUIRED Delete**: All associated 'Quest_Log' entries will also be deleted due to CASCADE constraint.")
         
-        quests = get_all_quests(connection)
-        if quests:
-            quest_dict = {f"Quest {q['Quest_ID']}: {q['Objective'][:50]}...": q['Quest_ID'] for q in quests}
-            selected_quest = st.selectbox("Select Quest to Delete:", list(quest_dict.keys()))
-            quest_id = quest_dict[selected_quest]
+        selected_quest = typeahead_select(connection, 'quest', "Select Quest to Delete:", key="delete_quest")
+        if selected_quest:
+            quest_id = selected_quest['Quest_ID']
             
             st.warning("⚠️ This will CASCADE delete all quest logs associated with this quest!")
             
             confirm = st.checkbox("I understand this action is permanent")
             
             if st.button("🗑️ Delete Quest", key="delete2", disabled=not confirm):
-                success, result = delete_quest(connection, quest_id)
-                if success:
-                    st.success(f"✅ {result}")
+                success, result = submit_write(connection, 'delete_quest', quest_id)
+                if show_write_result(success, result, "✅ {result}"):
                     st.rerun()
-                else:
-                    st.error(f"❌ Error: {result}")
     
     elif delete_option == "Remove Demigod Ability":
         st.subheader("🗑️ Remove a Demigod Ability")
         
-        demigods = get_all_demigods(connection)
-        if demigods:
-            demigod_dict = {d['Full_Name']: d['Hero_ID'] for d in demigods}
-            selected_demigod = st.selectbox("Select Demigod:", list(demigod_dict.keys()))
-            hero_id = demigod_dict[selected_demigod]
+        selected_demigod = typeahead_select(connection, 'demigod', "Select Demigod:", key="delete_ability_demigod")
+        if selected_demigod:
+            hero_id = selected_demigod['Hero_ID']
             
             # Get abilities for selected demigod
             try:
                 with connection.cursor() as cursor:
-                    cursor.execute("""
-                        SELECT Ability FROM Known_Abilities 
-                        WHERE Hero_ID = %s
-                        ORDER BY Ability
-                    """, (hero_id,))
+                    execute_prepared(cursor, 'hero_abilities', (hero_id,))
                     abilities = cursor.fetchall()
                     
                     if abilities:
@@ -1578,17 +4508,78 @@ def show_delete_page(connection):
                         selected_ability = st.selectbox("Select Ability to Remove:", ability_list)
                         
                         if st.button("🗑️ Remove Ability", key="delete3"):
-                            success, result = delete_demigod_ability(connection, hero_id, selected_ability)
-                            if success:
-                                st.success(f"✅ {result}")
+                            success, result = submit_write(connection, 'delete_demigod_ability', hero_id,
+                                                           selected_ability)
+                            if show_write_result(success, result, "✅ {result}"):
                                 st.rerun()
-                            else:
-                                st.error(f"❌ Error: {result}")
                     else:
-                        st.info(f"No abilities found for {selected_demigod}.")
+                        st.info(f"No abilities found for {selected_demigod['Full_Name']}.")
             except pymysql.Error as e:
                 st.error(f"Error fetching abilities: {e}")
 
+def _journal_rows(entries):
+    """Table rows describing journaled writes."""
+    return [{
+        'Ref': entry.key[:8],
+        'Operation': entry.operation,
+        'Submitted': entry.submitted_at,
+        'Arguments': ", ".join([repr(arg) for arg in entry.args]
+                               + [f"{name}={value!r}" for name, value in entry.kwargs.items()]),
+        'Result': entry.result,
+    } for entry in entries]
+
+def show_journal_page(connection):
+    """Display the local write journal: writes waiting for the database and writes it refused."""
+    st.header("📒 Write Journal")
+    st.info("Writes are saved to a local journal before they reach the database and applied in order by a "
+            "background worker, so nothing is lost while the database is slow or down.")
+    
+    journal, replayer = get_write_journal(connection)
+    if journal is None:
+        st.warning("⚠️ In-memory databases do not use the journal; their writes go straight to the database.")
+        return
+    pending, conflicts = journal.pending(), journal.conflicts()
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Pending Writes", len(pending))
+    col2.metric("Conflicts", len(conflicts))
+    col3.metric("Replay", "Waiting for database" if replayer.last_error else "Running")
+    
+    if replayer.last_error:
+        retry_in = max(0, int(replayer.retry_at - time.time())) if replayer.retry_at else 0
+        st.warning(f"⚠️ The database is not responding; retrying in {retry_in} s. Last error: {replayer.last_error}")
+    
+    if st.button("🔄 Replay Now", key="journal_replay"):
+        replayer.wake()
+        time.sleep(JOURNAL_ACK_WAIT_SECONDS)
+        st.rerun()
+    
+    st.subheader("⏳ Pending")
+    if pending:
+        st.dataframe(rows_to_frame(_journal_rows(pending)), use_container_width=True, hide_index=True)
+    else:
+        st.success("✅ Every journaled write has been applied.")
+    
+    st.subheader("⚠️ Conflicts")
+    if conflicts:
+        st.caption("The database refused these writes. Retry once the cause is fixed, or dismiss them.")
+        st.dataframe(rows_to_frame(_journal_rows(conflicts)), use_container_width=True, hide_index=True)
+        selected = st.selectbox("Select Conflict:", conflicts,
+                                format_func=lambda entry: f"{entry.key[:8]} - {entry.operation}: {entry.result}")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("🔁 Retry", key="journal_retry", use_container_width=True):
+                journal.retry(selected)
+                replayer.wake()
+                time.sleep(JOURNAL_ACK_WAIT_SECONDS)
+                st.rerun()
+        with col2:
+            if st.button("🗑️ Dismiss", key="journal_dismiss", use_container_width=True):
+                journal.dismiss(selected)
+                st.rerun()
+    else:
+        st.info("No conflicts.")
+
 def show_about_page():
     """Display the about page."""
     st.header("ℹ️ About The Olympian Codex")
@@ -1679,13 +4670,26 @@ def main():
         if not check_connection():
             st.header("🔐 Database Connection")
             
-            db_host = st.text_input("Host:", value="localhost")
-            db_name = st.text_input("Database:", value="olympian_codex_db")
-            db_user = st.text_input("Username:", value="root")
-            db_pass = st.text_input("Password:", type="password")
+            backend_labels = {
+                "MySQL": "mysql",
+                "SQLite (embedded)": "sqlite",
+                "DuckDB (embedded, analytics)": "duckdb",
+            }
+            backend_name = backend_labels[st.selectbox("Backend:", list(backend_labels.keys()))]
+            
+            if backend_name == "mysql":
+                db_host = st.text_input("Host:", value="localhost")
+                db_name = st.text_input("Database:", value="olympian_codex_db")
+                db_user = st.text_input("Username:", value="root")
+                db_pass = st.text_input("Password:", type="password")
+            else:
+                db_path = st.text_input("Database file:", value=f"olympian_codex.{backend_name}")
             
             if st.button("🔌 Connect", use_container_width=True):
-                connection = get_db_connection(db_user, db_pass, db_host, db_name)
+                if backend_name == "mysql":
+                    connection = get_db_connection(db_user, db_pass, db_host, db_name)
+                else:
+                    connection = get_embedded_connection(backend_name, db_path)
                 if connection:
                     st.session_state.db_connection = connection
                     st.success("✅ Connected successfully!")
@@ -1713,12 +4717,25 @@ def main():
                     "➕ Insert Operations",
                     "✏️ Update Operations",
                     "🗑️ Delete Operations",
+                    "📒 Write Journal",
                     "ℹ️ About"
                 ],
                 label_visibility="collapsed"
             )
             
             st.divider()
+            if SERVER_SIDE_PREPARE:
+                st.caption(
+                    f"Prepared statements: {prepared_statement_stats['hits']} hits / "
+                    f"{prepared_statement_stats['misses']} misses"
+                )
+            st.caption(
+                f"Write retries: {write_retry_stats['retries']} "
+                f"({write_retry_stats['gave_up']} gave up)"
+            )
+            journal, _ = get_write_journal(st.session_state.db_connection)
+            if journal is not None:
+                st.caption(f"Write journal: {len(journal)} pending / {len(journal.conflicts())} conflicts")
             st.caption("Team 42: RNA | Phase 4")
     
     # Main content area
@@ -1773,6 +4790,8 @@ def main():
             show_update_page(connection)
         elif page == "🗑️ Delete Operations":
             show_delete_page(connection)
+        elif page == "📒 Write Journal":
+            show_journal_page(connection)
         elif page == "ℹ️ About":
             show_about_page()
 
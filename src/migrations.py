@@ -0,0 +1,1104 @@
+"""
+The Olympian Codex Database - Schema Migrations
+Team 42: RNA
+
+Versioned schema changes for databases that are already live.
+
+schema.sql creates a new database in its current shape; MIGRATIONS brings
+an existing one there. Every step of a migration checks the live schema and
+only changes what is missing, so a migration interrupted half way is simply
+run again, and migrating a database created from the current schema.sql
+just records the versions. Applied versions, when they were applied and a
+checksum of their steps are kept in Schema_Migration.
+
+On MySQL each change uses an online algorithm, so the table stays writable
+while it runs:
+
+    new column      ALGORITHM=INSTANT, else ALGORITHM=INPLACE, LOCK=NONE
+    new index       ALGORITHM=INPLACE, LOCK=NONE
+    anything else   shadow-table copy
+
+A shadow-table copy creates the altered table empty, keeps it in step with
+triggers on the original, backfills it in primary-key chunks (sleeping
+between chunks and pausing while the server is busy) and swaps the two with
+one RENAME TABLE under a short write lock. DDL waits at most
+LOCK_WAIT_SECONDS for its metadata lock and then backs off and retries, so a
+long transaction delays the migration instead of queueing every other
+query behind it.
+
+SQLite and DuckDB databases get the equivalent plain DDL.
+
+'compress' switches the tables holding the long TEXT columns to InnoDB's
+ROW_FORMAT=COMPRESSED with the same online ALTER, so they take up to half
+the disk and less of the buffer pool while every query still reads plain
+text.
+
+Usage:
+    python migrations.py --user root status
+    python migrations.py --user root migrate [--to VERSION] [--chunk-rows 1000] [--chunk-pause 0.05] [--dry-run]
+    python migrations.py --backend sqlite --db-path codex.sqlite migrate
+    python migrations.py --user root compress [--dry-run]
+    python migrations.py --user root decompress [--dry-run]
+"""
+
+import argparse
+import getpass
+import hashlib
+import re
+import time
+from datetime import datetime
+
+import pymysql
+
+from backends import MySQLBackend, auto_increment_columns, open_embedded, translate_column, translate_ddl
+
+# Seconds DDL waits for a metadata lock, and attempts before giving up
+LOCK_WAIT_SECONDS = 5
+DDL_ATTEMPTS = 5
+# Shadow-copy backfill: rows per chunk, seconds between chunks, and the
+# Threads_running level above which copying pauses
+CHUNK_ROWS = 1000
+CHUNK_PAUSE = 0.05
+MAX_THREADS_RUNNING = 25
+
+# MySQL errors: the requested ALGORITHM/LOCK cannot make this change, and lock wait timeout
+ONLINE_DDL_UNSUPPORTED_ERRORS = {1845, 1846}
+LOCK_WAIT_TIMEOUT_ERROR = 1205
+
+# Advisory lock held while migrating, so two runs never interleave
+MIGRATION_LOCK = 'olympian_codex_migrations'
+
+SCHEMA_MIGRATION_DDL = """
+CREATE TABLE Schema_Migration (
+    Version INT PRIMARY KEY,
+    Name VARCHAR(100) NOT NULL,
+    Checksum CHAR(16) NOT NULL,
+    Applied_At DATETIME NOT NULL,
+    Duration_Ms INT NOT NULL
+) ENGINE=InnoDB
+"""
+
+class MigrationError(Exception):
+    """A schema change that cannot be made safely."""
+
+# =====================================================
+# SCHEMA INSPECTION
+# =====================================================
+
+def _dialect(connection):
+    return getattr(connection, 'dialect', 'mysql')
+
+def _fetch(connection, sql, args=None):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, args)
+        return cursor.fetchall()
+
+def _normalize(sql):
+    return " ".join(sql.split())
+
+def table_exists(connection, table):
+    dialect = _dialect(connection)
+    if dialect == 'sqlite':
+        sql = "SELECT name FROM sqlite_master WHERE type = 'table' AND name = %s"
+    elif dialect == 'duckdb':
+        sql = "SELECT table_name FROM information_schema.tables WHERE table_name = %s"
+    else:
+        sql = "SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+    return bool(_fetch(connection, sql, (table,)))
+
+def table_columns(connection, table):
+    """Column names of a table in definition order."""
+    dialect = _dialect(connection)
+    if dialect == 'sqlite':
+        return [row['name'] for row in _fetch(connection, f"PRAGMA table_info({table})")]
+    if dialect == 'duckdb':
+        rows = _fetch(connection, """
+            SELECT column_name FROM information_schema.columns
+            WHERE table_name = %s ORDER BY ordinal_position
+        """, (table,))
+        return [row['column_name'] for row in rows]
+    rows = _fetch(connection, """
+        SELECT COLUMN_NAME FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION
+    """, (table,))
+    return [row['COLUMN_NAME'] for row in rows]
+
+def table_indexes(connection, table):
+    """{index name: column tuple} of a table's indexes."""
+    dialect = _dialect(connection)
+    if dialect == 'sqlite':
+        indexes = {}
+        for index in _fetch(connection, f"PRAGMA index_list({table})"):
+            columns = sorted(_fetch(connection, f"PRAGMA index_info({index['name']})"), key=lambda row: row['seqno'])
+            indexes[index['name']] = tuple(row['name'] for row in columns)
+        return indexes
+    if dialect == 'duckdb':
+        rows = _fetch(connection, "SELECT index_name, expressions FROM duckdb_indexes() WHERE table_name = %s",
+                      (table,))
+        return {row['index_name']: tuple(column.strip() for column in row['expressions'].strip('[]').split(','))
+                for row in rows}
+    rows = _fetch(connection, """
+        SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+    """, (table,))
+    indexes = {}
+    for row in rows:
+        indexes.setdefault(row['INDEX_NAME'], ())
+        indexes[row['INDEX_NAME']] += (row['COLUMN_NAME'],)
+    return indexes
+
+def trigger_definition(connection, name):
+    """A trigger's CREATE TRIGGER statement, or None if it does not exist (always None on DuckDB)."""
+    dialect = _dialect(connection)
+    if dialect == 'duckdb':
+        return None
+    if dialect == 'sqlite':
+        rows = _fetch(connection, "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = %s", (name,))
+        return rows[0]['sql'] if rows else None
+    rows = _fetch(connection, """
+        SELECT ACTION_TIMING, EVENT_MANIPULATION, EVENT_OBJECT_TABLE, ACTION_STATEMENT
+        FROM information_schema.TRIGGERS
+        WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME = %s
+    """, (name,))
+    if not rows:
+        return None
+    row = rows[0]
+    return (f"CREATE TRIGGER {name} {row['ACTION_TIMING']} {row['EVENT_MANIPULATION']} "
+            f"ON {row['EVENT_OBJECT_TABLE']} FOR EACH ROW {row['ACTION_STATEMENT']}")
+
+def _primary_key(connection, table):
+    rows = _fetch(connection, """
+        SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_NAME = 'PRIMARY'
+        ORDER BY ORDINAL_POSITION
+    """, (table,))
+    return [row['COLUMN_NAME'] for row in rows]
+
+def table_options(connection, table):
+    """(ROW_FORMAT, KEY_BLOCK_SIZE) of an InnoDB table as declared; KEY_BLOCK_SIZE 0 if unset."""
+    rows = _fetch(connection, """
+        SELECT ROW_FORMAT, CREATE_OPTIONS FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    if not rows:
+        return None
+    options = rows[0]['CREATE_OPTIONS'] or ''
+    # Partitioned tables report their options only in CREATE_OPTIONS
+    row_format = re.search(r"row_format=(\w+)", options, re.IGNORECASE)
+    key_block_size = re.search(r"key_block_size=(\d+)", options, re.IGNORECASE)
+    return ((row_format.group(1) if row_format else rows[0]['ROW_FORMAT'] or 'DYNAMIC').upper(),
+            int(key_block_size.group(1)) if key_block_size else 0)
+
+# =====================================================
+# ONLINE DDL
+# =====================================================
+
+class OnlineDDL:
+    """
+    Runs schema changes on one connection, online where the engine allows.
+    With dry_run set, statements are only collected in `statements`.
+    """
+
+    def __init__(self, connection, chunk_rows=CHUNK_ROWS, chunk_pause=CHUNK_PAUSE,
+                 max_threads_running=MAX_THREADS_RUNNING, dry_run=False):
+        self.connection = connection
+        self.dialect = _dialect(connection)
+        self.chunk_rows = chunk_rows
+        self.chunk_pause = chunk_pause
+        self.max_threads_running = max_threads_running
+        self.dry_run = dry_run
+        self.statements = []
+        if self.dialect == 'mysql' and not dry_run:
+            self._execute(f"SET SESSION lock_wait_timeout = {LOCK_WAIT_SECONDS}")
+
+    def _execute(self, statement, args=None):
+        """Run one statement and commit; lock wait timeouts back off and retry."""
+        for attempt in range(1, DDL_ATTEMPTS + 1):
+            try:
+                with self.connection.cursor() as cursor:
+                    cursor.execute(statement, args)
+                    rowcount = cursor.rowcount
+                self.connection.commit()
+                return rowcount
+            except pymysql.Error as e:
+                self.connection.rollback()
+                if e.args[0] != LOCK_WAIT_TIMEOUT_ERROR or attempt == DDL_ATTEMPTS:
+                    raise
+                time.sleep(attempt * LOCK_WAIT_SECONDS)
+
+    def run(self, statement, args=None):
+        self.statements.append(statement)
+        if not self.dry_run:
+            self._execute(statement, args)
+
+    def alter(self, table, clause, algorithms=('INPLACE',)):
+        """
+        ALTER TABLE with the first of `algorithms` MySQL accepts for the change
+        (INPLACE with LOCK=NONE, so writes continue), else a shadow-table copy.
+        """
+        for algorithm in algorithms:
+            lock = "" if algorithm == 'INSTANT' else ", LOCK=NONE"
+            statement = f"ALTER TABLE {table} {clause}, ALGORITHM={algorithm}{lock}"
+            if self.dry_run:
+                self.statements.append(statement)
+                return
+            try:
+                self.run(statement)
+                return
+            except pymysql.Error as e:
+                if e.args[0] not in ONLINE_DDL_UNSUPPORTED_ERRORS:
+                    raise
+                self.statements.pop()
+        self.shadow_copy(table, clause)
+
+    def shadow_copy(self, table, clause):
+        """
+        Rebuild `table` with `clause` applied while it stays writable: copy
+        into a shadow table kept current by triggers, then swap the two.
+        The clause must not add unique keys (the copy would drop duplicates),
+        and tables referenced by foreign keys cannot be swapped.
+        """
+        if re.search(r"\b(UNIQUE|PRIMARY\s+KEY)\b", clause, re.IGNORECASE):
+            raise MigrationError(f"Shadow copy of {table} cannot add unique keys: {clause}")
+        shadow, old = f"_{table}_new", f"_{table}_old"
+        mirrors = {event: f"trg_{table.lower()}_copy_{event.lower()}" for event in ('INSERT', 'UPDATE', 'DELETE')}
+        if self.dry_run:
+            self.statements.append(f"-- shadow copy of {table} ({clause}) via {shadow}")
+            return
+
+        referencing = _fetch(self.connection, """
+            SELECT DISTINCT TABLE_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS
+            WHERE CONSTRAINT_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME = %s AND TABLE_NAME != %s
+        """, (table, table))
+        if referencing:
+            names = ", ".join(row['TABLE_NAME'] for row in referencing)
+            raise MigrationError(f"{table} is referenced by foreign keys of {names}; it cannot be swapped online")
+        key = _primary_key(self.connection, table)
+        if not key:
+            raise MigrationError(f"{table} has no primary key to copy by")
+        triggers = _fetch(self.connection, """
+            SELECT TRIGGER_NAME, ACTION_TIMING, EVENT_MANIPULATION, ACTION_STATEMENT
+            FROM information_schema.TRIGGERS
+            WHERE TRIGGER_SCHEMA = DATABASE() AND EVENT_OBJECT_TABLE = %s
+            ORDER BY EVENT_MANIPULATION, ACTION_TIMING, ACTION_ORDER
+        """, (table,))
+        triggers = [trigger for trigger in triggers if trigger['TRIGGER_NAME'] not in mirrors.values()]
+
+        # Leftovers of an interrupted copy
+        for name in mirrors.values():
+            self.run(f"DROP TRIGGER IF EXISTS {name}")
+        self.run(f"DROP TABLE IF EXISTS {shadow}")
+
+        create = _fetch(self.connection, f"SHOW CREATE TABLE {table}")[0]['Create Table']
+        # Generated constraint names are unique per schema; the shadow gets its
+        # own, and RENAME TABLE renames them along with the table
+        create = re.sub(r"CONSTRAINT `[^`]+` ", "", create)
+        self.run(create.replace(f"CREATE TABLE `{table}`", f"CREATE TABLE `{shadow}`", 1))
+        self.run(f"ALTER TABLE {shadow} {clause}")
+
+        shadow_columns = set(table_columns(self.connection, shadow))
+        columns = [column for column in table_columns(self.connection, table) if column in shadow_columns]
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"NEW.{column}" for column in columns)
+        old_key = " AND ".join(f"{column} = OLD.{column}" for column in key)
+        self.run(f"CREATE TRIGGER {mirrors['INSERT']} AFTER INSERT ON {table} FOR EACH ROW "
+                 f"REPLACE INTO {shadow} ({column_list}) VALUES ({new_values})")
+        self.run(f"CREATE TRIGGER {mirrors['UPDATE']} AFTER UPDATE ON {table} FOR EACH ROW BEGIN "
+                 f"DELETE IGNORE FROM {shadow} WHERE {old_key}; "
+                 f"REPLACE INTO {shadow} ({column_list}) VALUES ({new_values}); END")
+        self.run(f"CREATE TRIGGER {mirrors['DELETE']} AFTER DELETE ON {table} FOR EACH ROW "
+                 f"DELETE IGNORE FROM {shadow} WHERE {old_key}")
+
+        self._backfill(table, shadow, key, column_list)
+
+        # Cut-over: with both tables write-locked, move the table's own
+        # triggers to the shadow and swap the names in one RENAME
+        self.run(f"LOCK TABLES {table} WRITE, {shadow} WRITE")
+        try:
+            for name in mirrors.values():
+                self.run(f"DROP TRIGGER {name}")
+            for trigger in triggers:
+                self.run(f"DROP TRIGGER {trigger['TRIGGER_NAME']}")
+                self.run(f"CREATE TRIGGER {trigger['TRIGGER_NAME']} {trigger['ACTION_TIMING']} "
+                         f"{trigger['EVENT_MANIPULATION']} ON {shadow} FOR EACH ROW {trigger['ACTION_STATEMENT']}")
+            self.run(f"RENAME TABLE {table} TO {old}, {shadow} TO {table}")
+        finally:
+            self.run("UNLOCK TABLES")
+        self.run(f"DROP TABLE {old}")
+
+    def _backfill(self, table, shadow, key, column_list):
+        """Copy existing rows in primary-key order, one committed chunk at a time."""
+        key_list = ", ".join(key)
+        placeholders = ", ".join(["%s"] * len(key))
+        last = None
+        while True:
+            self._wait_for_capacity()
+            after = f"WHERE ({key_list}) > ({placeholders})" if last else ""
+            boundary = _fetch(self.connection, f"SELECT {key_list} FROM {table} {after} ORDER BY {key_list} "
+                                               f"LIMIT 1 OFFSET {self.chunk_rows - 1}", last)
+            upper = tuple(boundary[0][column] for column in key) if boundary else None
+            conditions, args = [], []
+            if last:
+                conditions.append(f"({key_list}) > ({placeholders})")
+                args.extend(last)
+            if upper:
+                conditions.append(f"({key_list}) <= ({placeholders})")
+                args.extend(upper)
+            where = " WHERE " + " AND ".join(conditions) if conditions else ""
+            # IGNORE: rows the triggers already copied are newer than this read
+            self._execute(f"INSERT IGNORE INTO {shadow} ({column_list}) "
+                          f"SELECT {column_list} FROM {table}{where} LOCK IN SHARE MODE", args)
+            if upper is None:
+                return
+            last = upper
+            time.sleep(self.chunk_pause)
+
+    def _wait_for_capacity(self):
+        """Hold the copy back while more than max_threads_running queries are running."""
+        while True:
+            rows = _fetch(self.connection, "SHOW GLOBAL STATUS LIKE 'Threads_running'")
+            self.connection.commit()
+            if not rows or int(rows[0]['Value']) <= self.max_threads_running:
+                return
+            time.sleep(max(self.chunk_pause, 1.0))
+
+# =====================================================
+# MIGRATION STEPS
+# =====================================================
+
+class CreateTable:
+    """Create a table (with its indexes) from a MySQL CREATE TABLE statement."""
+
+    def __init__(self, ddl):
+        self.ddl = ddl.strip()
+        self.table = re.match(r"^CREATE\s+TABLE\s+(\w+)", self.ddl, re.IGNORECASE).group(1)
+
+    def describe(self):
+        return _normalize(self.ddl)
+
+    def is_applied(self, connection):
+        return table_exists(connection, self.table)
+
+    def apply(self, ddl):
+        if ddl.dialect == 'mysql':
+            # A new table has no writers to block
+            ddl.run(self.ddl)
+            return
+        for statement in translate_ddl(self.ddl, ddl.dialect):
+            ddl.run(statement)
+        if ddl.dialect == 'duckdb':
+            # Sequences stand in for AUTO_INCREMENT, as in DuckDBBackend.load
+            for table, column in auto_increment_columns(self.ddl):
+                ddl.run(f"CREATE SEQUENCE seq_{table} START 1")
+                ddl.run(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT nextval('seq_{table}')")
+            if not ddl.dry_run:
+                ddl.connection.load_sequences()
+
+class AddColumn:
+    """Add a column; INSTANT (metadata only) where MySQL supports it."""
+
+    def __init__(self, table, column, definition):
+        self.table = table
+        self.column = column
+        self.definition = definition
+
+    def describe(self):
+        return f"ALTER TABLE {self.table} ADD COLUMN {self.column} {self.definition}"
+
+    def is_applied(self, connection):
+        return self.column in table_columns(connection, self.table)
+
+    def apply(self, ddl):
+        if ddl.dialect == 'mysql':
+            ddl.alter(self.table, f"ADD COLUMN {self.column} {self.definition}", ('INSTANT', 'INPLACE'))
+            return
+        definition = translate_column(f"{self.column} {self.definition}", ddl.dialect)
+        if ddl.dialect == 'duckdb':
+            # DuckDB cannot add a column with constraints; analytical copies do without
+            definition = re.sub(r"\s+NOT\s+NULL\b", "", definition, flags=re.IGNORECASE)
+        ddl.run(f"ALTER TABLE {self.table} ADD COLUMN {definition}")
+
+class AddIndex:
+    """
+    Add a secondary index. Already applied if any index of the table starts
+    with the same columns (e.g. the one MySQL creates for a foreign key).
+    """
+
+    def __init__(self, table, name, columns):
+        self.table = table
+        self.name = name
+        self.columns = tuple(columns)
+
+    def describe(self):
+        return f"ALTER TABLE {self.table} ADD INDEX {self.name} ({', '.join(self.columns)})"
+
+    def is_applied(self, connection):
+        return any(columns[:len(self.columns)] == self.columns
+                   for columns in table_indexes(connection, self.table).values())
+
+    def apply(self, ddl):
+        if ddl.dialect == 'mysql':
+            ddl.alter(self.table, f"ADD INDEX {self.name} ({', '.join(self.columns)})")
+            return
+        # Embedded index names are per database, as in translate_ddl
+        ddl.run(f"CREATE INDEX {self.table}_{self.name} ON {self.table} ({', '.join(self.columns)})")
+
+class DropIndex:
+    """Drop a secondary index another index now covers. Applied once it is gone."""
+
+    def __init__(self, table, name):
+        self.table = table
+        self.name = name
+
+    def _index_name(self, dialect):
+        # Embedded index names are per database, as in AddIndex
+        return self.name if dialect == 'mysql' else f"{self.table}_{self.name}"
+
+    def describe(self):
+        return f"ALTER TABLE {self.table} DROP INDEX {self.name}"
+
+    def is_applied(self, connection):
+        return self._index_name(_dialect(connection)) not in table_indexes(connection, self.table)
+
+    def apply(self, ddl):
+        if ddl.dialect == 'mysql':
+            ddl.alter(self.table, f"DROP INDEX {self.name}")
+            return
+        ddl.run(f"DROP INDEX {self._index_name(ddl.dialect)}")
+
+class CreateTriggers:
+    """Create triggers, replacing any of the same name whose definition differs."""
+
+    def __init__(self, statements):
+        self.statements = list(statements)
+
+    def describe(self):
+        return "\n".join(_normalize(statement) for statement in self.statements)
+
+    def _outdated(self, connection):
+        outdated = []
+        for statement in self.statements:
+            name = re.match(r"^CREATE\s+TRIGGER\s+(\w+)", statement, re.IGNORECASE).group(1)
+            expected = translate_ddl(statement, _dialect(connection)) if _dialect(connection) != 'mysql' else [statement]
+            if not expected:
+                continue
+            current = trigger_definition(connection, name)
+            if current is None or _normalize(current) != _normalize(expected[0]):
+                outdated.append((name, expected[0], current is not None))
+        return outdated
+
+    def is_applied(self, connection):
+        return not self._outdated(connection)
+
+    def apply(self, ddl):
+        for name, statement, exists in self._outdated(ddl.connection):
+            if not exists:
+                ddl.run(statement)
+                continue
+            table = re.search(r"\bON\s+(\w+)", statement, re.IGNORECASE).group(1)
+            if ddl.dialect == 'mysql':
+                # Replace under a write lock so no write slips through without the trigger
+                ddl.run(f"LOCK TABLES {table} WRITE")
+                try:
+                    ddl.run(f"DROP TRIGGER {name}")
+                    ddl.run(statement)
+                finally:
+                    ddl.run("UNLOCK TABLES")
+            else:
+                ddl.run(f"DROP TRIGGER {name}")
+                ddl.run(statement)
+
+class RunStatement:
+    """Run an idempotent data statement (e.g. INSERT IGNORE seed rows) every time."""
+
+    def __init__(self, sql):
+        self.sql = sql.strip()
+
+    def describe(self):
+        return _normalize(self.sql)
+
+    def is_applied(self, connection):
+        return False
+
+    def apply(self, ddl):
+        ddl.run(self.sql)
+
+class WhileTable:
+    """
+    Run a step only while `table` exists (or, with exists=False, only while
+    it is missing). It describes itself as the wrapped step, so guarding a
+    step that has shipped keeps its migration's checksum.
+    """
+
+    def __init__(self, table, step, exists=True):
+        self.table = table
+        self.step = step
+        self.exists = exists
+
+    def describe(self):
+        return self.step.describe()
+
+    def is_applied(self, connection):
+        return table_exists(connection, self.table) != self.exists or self.step.is_applied(connection)
+
+    def apply(self, ddl):
+        self.step.apply(ddl)
+
+class TableOptions:
+    """
+    Set a table's InnoDB ROW_FORMAT and KEY_BLOCK_SIZE (0 for the default).
+    The table is rebuilt in place with LOCK=NONE. Embedded engines have no
+    such options, so it never applies there.
+    """
+
+    def __init__(self, table, row_format, key_block_size=0):
+        self.table = table
+        self.row_format = row_format.upper()
+        self.key_block_size = key_block_size
+
+    def describe(self):
+        return f"ALTER TABLE {self.table} ROW_FORMAT={self.row_format} KEY_BLOCK_SIZE={self.key_block_size}"
+
+    def is_applied(self, connection):
+        if _dialect(connection) != 'mysql':
+            return True
+        return table_options(connection, self.table) == (self.row_format, self.key_block_size)
+
+    def apply(self, ddl):
+        if self.row_format == 'COMPRESSED' and not ddl.dry_run:
+            per_table = _fetch(ddl.connection, "SELECT @@innodb_file_per_table as per_table")[0]['per_table']
+            if not per_table:
+                raise MigrationError("ROW_FORMAT=COMPRESSED needs innodb_file_per_table = ON")
+        ddl.alter(self.table, f"ROW_FORMAT={self.row_format} KEY_BLOCK_SIZE={self.key_block_size}")
+
+# =====================================================
+# MIGRATIONS
+# =====================================================
+
+class Migration:
+    """A numbered schema change made of idempotent steps."""
+
+    __slots__ = ('version', 'name', 'steps')
+
+    def __init__(self, version, name, steps):
+        self.version = version
+        self.name = name
+        self.steps = steps
+
+    @property
+    def checksum(self):
+        text = "\n".join(step.describe() for step in self.steps)
+        return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+    def __repr__(self):
+        return f"Migration({self.version}, {self.name!r})"
+
+# Tables with a Table_Version counter, and the tables a delete on each parent
+# cascades into (FK cascades do not fire the children's own triggers), as
+# migrations 2 and 12 installed them
+VERSIONED_TABLES = ['God', 'Olympian', 'Chthonic_God', 'Primordial', 'Demigod', 'Monster', 'Beast', 'Titan',
+                    'Spirit', 'Quest', 'Divine_Artifact', 'Encounters', 'Combat_Encounter']
+DELETE_CASCADES = {
+    'God': ['Olympian', 'Chthonic_God', 'Primordial'],
+    'Demigod': ['Encounters', 'Combat_Encounter'],
+    'Monster': ['Encounters', 'Combat_Encounter', 'Beast', 'Titan', 'Spirit'],
+    'Quest': ['Combat_Encounter'],
+    'Divine_Artifact': ['Combat_Encounter'],
+}
+
+# The counters of schema.sql: migration 13 adds Sighting_Log, which the
+# analytics sync reloads when it changes
+TRACKED_TABLES = VERSIONED_TABLES + ['Sighting_Log']
+TRACKED_DELETE_CASCADES = dict(DELETE_CASCADES,
+                               Demigod=DELETE_CASCADES['Demigod'] + ['Sighting_Log'],
+                               Monster=DELETE_CASCADES['Monster'] + ['Sighting_Log'])
+
+# Tables whose rows feed a monster's dossier
+DOSSIER_SOURCES = ['Beast', 'Titan', 'Spirit', 'Known_Weaknesses', 'Common_Habitats', 'Encounters', 'Combat_Encounter']
+
+# Slots each table's change counter is split over; a write bumps the slot of
+# its connection, so concurrent writers to one table rarely share a row.
+# Migration 12 keeps the pre-slot counts in one extra slot, VERSION_SLOTS.
+VERSION_SLOTS = 16
+
+def version_trigger_ddl(slotted=True, tables=TRACKED_TABLES, cascades=TRACKED_DELETE_CASCADES):
+    """
+    The Table_Version_Slot counter triggers of schema.sql (with slotted
+    False, migration 2's single-row Table_Version triggers).
+    """
+    statements = []
+    for table in tables:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            names = [table] + (cascades.get(table, []) if event == 'DELETE' else [])
+            target = f"= '{table}'" if len(names) == 1 else "IN (" + ", ".join(f"'{name}'" for name in names) + ")"
+            if slotted:
+                update = (f"UPDATE Table_Version_Slot SET Version = Version + 1 "
+                          f"WHERE Table_Name {target} AND Slot = CONNECTION_ID() % {VERSION_SLOTS}")
+            else:
+                update = f"UPDATE Table_Version SET Version = Version + 1 WHERE Table_Name {target}"
+            statements.append(
+                f"CREATE TRIGGER trg_{table.lower()}_{event.lower()}_version AFTER {event} ON {table} "
+                f"FOR EACH ROW {update}"
+            )
+    return statements
+
+def dossier_trigger_ddl():
+    """The Monster_Dossier invalidation triggers of schema.sql."""
+    conditions = {
+        'INSERT': "= NEW.Monster_ID",
+        'UPDATE': "IN (OLD.Monster_ID, NEW.Monster_ID)",
+        'DELETE': "= OLD.Monster_ID",
+    }
+    events = [('Monster', 'UPDATE')] + [(table, event) for table in DOSSIER_SOURCES for event in conditions]
+    return [
+        f"CREATE TRIGGER trg_{table.lower()}_{event.lower()}_dossier AFTER {event} ON {table} "
+        f"FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID {conditions[event]}"
+        for table, event in events
+    ]
+
+# Hero_Profile sources: tables holding the hero key, and tables whose rows are
+# copied into the profiles of the heroes that reference them (key, via table, via column)
+PROFILE_SOURCES = {'Known_Abilities': 'Hero_ID', 'Quest_Log': 'Hero_ID', 'Encounters': 'Hero_ID',
+                   'Divine_Artifact': 'Current_Wielder'}
+PROFILE_LOOKUPS = {
+    'God': ('Divine_ID', 'Demigod', 'Divine_Parent_ID'),
+    'Quest': ('Quest_ID', 'Quest_Log', 'Quest_ID'),
+    'Monster': ('Monster_ID', 'Encounters', 'Monster_ID'),
+}
+
+def profile_trigger_ddl():
+    """The Hero_Profile invalidation triggers of schema.sql."""
+    conditions = {
+        'INSERT': "= NEW.{column}",
+        'UPDATE': "IN (OLD.{column}, NEW.{column})",
+        'DELETE': "= OLD.{column}",
+    }
+    statements = [
+        "CREATE TRIGGER trg_demigod_update_profile AFTER UPDATE ON Demigod "
+        "FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID IN (OLD.Hero_ID, NEW.Hero_ID)"
+    ]
+    for table, column in PROFILE_SOURCES.items():
+        for event, condition in conditions.items():
+            statements.append(
+                f"CREATE TRIGGER trg_{table.lower()}_{event.lower()}_profile AFTER {event} ON {table} "
+                f"FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID {condition.format(column=column)}"
+            )
+    # Deletes run BEFORE so the referencing rows are still there (the FK
+    # cascade or SET NULL that follows does not fire their triggers)
+    for table, (key, via, via_column) in PROFILE_LOOKUPS.items():
+        for timing, event in (('AFTER', 'UPDATE'), ('BEFORE', 'DELETE')):
+            statements.append(
+                f"CREATE TRIGGER trg_{table.lower()}_{event.lower()}_profile {timing} {event} ON {table} "
+                f"FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID IN ("
+                f"SELECT Hero_ID FROM {via} WHERE {via_column} {conditions[event].format(column=key)})"
+            )
+    return statements
+
+# Report_Sketch sources: sketch group and day of a row, and the events logged
+SKETCH_DAY_SOURCES = {
+    'Encounters': ('encounter', "{row}.Encounter_Date", ('INSERT', 'UPDATE', 'DELETE')),
+    'Combat_Encounter': ('encounter', "DATE({row}.Combat_Date)", ('INSERT', 'UPDATE', 'DELETE')),
+    'Quest_Log': ('quest', "(SELECT Start_Date FROM Quest WHERE Quest_ID = {row}.Quest_ID)",
+                  ('INSERT', 'UPDATE', 'DELETE')),
+    'Quest': ('quest', "{row}.Start_Date", ('UPDATE', 'DELETE')),
+}
+
+_QUEST_DAYS_OF_HERO = ("SELECT 'quest', q.Start_Date FROM Quest_Log ql JOIN Quest q ON ql.Quest_ID = q.Quest_ID "
+                       "WHERE ql.Hero_ID = {hero}")
+_QUEST_DAYS_OF_PARENT = ("SELECT 'quest', q.Start_Date FROM Demigod d JOIN Quest_Log ql ON d.Hero_ID = ql.Hero_ID "
+                         "JOIN Quest q ON ql.Quest_ID = q.Quest_ID WHERE d.Divine_Parent_ID = {parent}")
+_ENCOUNTER_DAYS = ("SELECT 'encounter', Encounter_Date FROM Encounters WHERE {column} = {key} "
+                   "UNION SELECT 'encounter', DATE(Combat_Date) FROM Combat_Encounter WHERE {column} = {key}")
+
+def sketch_trigger_ddl():
+    """The Sketch_Change logging triggers of schema.sql."""
+    insert = "INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date) "
+    statements = []
+    for table, (group, day, events) in SKETCH_DAY_SOURCES.items():
+        for event in events:
+            rows = {'INSERT': ['NEW'], 'UPDATE': ['OLD', 'NEW'], 'DELETE': ['OLD']}[event]
+            values = ", ".join(f"('{group}', {day.format(row=row)})" for row in rows)
+            statements.append(
+                f"CREATE TRIGGER trg_{table.lower()}_{event.lower()}_sketch AFTER {event} ON {table} "
+                f"FOR EACH ROW {insert}VALUES {values}"
+            )
+    # Changes reaching the sources through FK cascades and SET NULL, which fire
+    # no triggers; deletes run BEFORE, while the cascaded rows are still there
+    parent_changed = ("(OLD.Divine_Parent_ID <> NEW.Divine_Parent_ID "
+                      "OR (OLD.Divine_Parent_ID IS NULL) <> (NEW.Divine_Parent_ID IS NULL))")
+    statements += [
+        "CREATE TRIGGER trg_demigod_update_sketch AFTER UPDATE ON Demigod FOR EACH ROW "
+        f"{insert}{_QUEST_DAYS_OF_HERO.format(hero='NEW.Hero_ID')} AND {parent_changed}",
+        "CREATE TRIGGER trg_demigod_delete_sketch BEFORE DELETE ON Demigod FOR EACH ROW "
+        f"{insert}{_QUEST_DAYS_OF_HERO.format(hero='OLD.Hero_ID')} "
+        f"UNION {_ENCOUNTER_DAYS.format(column='Hero_ID', key='OLD.Hero_ID')}",
+        "CREATE TRIGGER trg_monster_delete_sketch BEFORE DELETE ON Monster FOR EACH ROW "
+        f"{insert}{_ENCOUNTER_DAYS.format(column='Monster_ID', key='OLD.Monster_ID')}",
+        "CREATE TRIGGER trg_god_update_sketch AFTER UPDATE ON God FOR EACH ROW "
+        f"{insert}{_QUEST_DAYS_OF_PARENT.format(parent='NEW.Divine_ID')} AND OLD.Divine_ID <> NEW.Divine_ID",
+        "CREATE TRIGGER trg_god_delete_sketch BEFORE DELETE ON God FOR EACH ROW "
+        f"{insert}{_QUEST_DAYS_OF_PARENT.format(parent='OLD.Divine_ID')}",
+    ]
+    return statements
+
+# Runs before the delete so the hero's encounters are still there to read
+DEMIGOD_DELETE_DOSSIER_TRIGGER = """
+    CREATE TRIGGER trg_demigod_delete_dossier BEFORE DELETE ON Demigod
+        FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID IN (
+            SELECT Monster_ID FROM Encounters WHERE Hero_ID = OLD.Hero_ID
+            UNION SELECT Monster_ID FROM Combat_Encounter WHERE Hero_ID = OLD.Hero_ID)
+""".strip()
+
+# Append only: a migration's steps are never edited once it has shipped
+MIGRATIONS = [
+    Migration(1, "Row versions for optimistic locking", [
+        AddColumn('Demigod', 'Row_Version', "INT NOT NULL DEFAULT 0"),
+        AddColumn('Quest', 'Row_Version', "INT NOT NULL DEFAULT 0"),
+        AddColumn('Divine_Artifact', 'Row_Version', "INT NOT NULL DEFAULT 0"),
+    ]),
+    Migration(2, "Change tracking counters", [
+        WhileTable('Table_Version_Slot', CreateTable("""
+            CREATE TABLE Table_Version (
+                Table_Name VARCHAR(64) PRIMARY KEY,
+                Version BIGINT UNSIGNED NOT NULL DEFAULT 0
+            ) ENGINE=InnoDB
+        """), exists=False),
+        # Databases that already have migration 12's slotted counters (e.g.
+        # created from the current schema.sql) skip the single-row ones
+        WhileTable('Table_Version_Slot', RunStatement("INSERT IGNORE INTO Table_Version (Table_Name) VALUES "
+                                                      + ", ".join(f"('{table}')" for table in VERSIONED_TABLES)),
+                   exists=False),
+        WhileTable('Table_Version_Slot', CreateTriggers(version_trigger_ddl(slotted=False, tables=VERSIONED_TABLES,
+                                                                              cascades=DELETE_CASCADES)),
+                   exists=False),
+    ]),
+    Migration(3, "Hero profile documents", [
+        CreateTable("""
+            CREATE TABLE Hero_Profile (
+                Hero_ID INT PRIMARY KEY,
+                Profile JSON NOT NULL,
+                Updated_At DATETIME NOT NULL,
+                FOREIGN KEY (Hero_ID) REFERENCES Demigod(Hero_ID)
+                    ON DELETE CASCADE
+                    ON UPDATE CASCADE
+            ) ENGINE=InnoDB
+        """),
+    ]),
+    Migration(4, "Artifact ownership history", [
+        CreateTable("""
+            CREATE TABLE Artifact_Ownership (
+                Ownership_ID INT AUTO_INCREMENT PRIMARY KEY,
+                Artifact_ID INT NOT NULL,
+                Hero_ID INT NULL,
+                Valid_From DATETIME NOT NULL,
+                Valid_To DATETIME NOT NULL DEFAULT '9999-12-31 23:59:59',
+                FOREIGN KEY (Artifact_ID) REFERENCES Divine_Artifact(Artifact_ID)
+                    ON DELETE CASCADE
+                    ON UPDATE CASCADE,
+                FOREIGN KEY (Hero_ID) REFERENCES Demigod(Hero_ID)
+                    ON DELETE SET NULL
+                    ON UPDATE CASCADE,
+                CHECK (Valid_To >= Valid_From),
+                INDEX idx_artifact_interval (Artifact_ID, Valid_From, Valid_To, Hero_ID),
+                INDEX idx_hero_interval (Hero_ID, Valid_From)
+            ) ENGINE=InnoDB
+        """),
+        # History starts now for artifacts already being wielded
+        RunStatement("""
+            INSERT INTO Artifact_Ownership (Artifact_ID, Hero_ID, Valid_From)
+            SELECT a.Artifact_ID, a.Current_Wielder, CURRENT_TIMESTAMP
+            FROM Divine_Artifact a
+            WHERE a.Current_Wielder IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM Artifact_Ownership o WHERE o.Artifact_ID = a.Artifact_ID)
+        """),
+    ]),
+    Migration(5, "Monster dossiers", [
+        CreateTable("""
+            CREATE TABLE Monster_Dossier (
+                Monster_ID INT PRIMARY KEY,
+                Species VARCHAR(100) NOT NULL,
+                Threat_Level INT NOT NULL,
+                Monster_Type VARCHAR(20),
+                Weaknesses TEXT,
+                Habitats TEXT,
+                Times_Encountered INT NOT NULL DEFAULT 0,
+                Combat_Count INT NOT NULL DEFAULT 0,
+                Dossier JSON NOT NULL,
+                Updated_At DATETIME NOT NULL,
+                FOREIGN KEY (Monster_ID) REFERENCES Monster(Monster_ID)
+                    ON DELETE CASCADE
+                    ON UPDATE CASCADE,
+                INDEX idx_threat_encounters (Threat_Level, Times_Encountered)
+            ) ENGINE=InnoDB
+        """),
+        CreateTriggers(dossier_trigger_ddl()),
+    ]),
+    Migration(6, "Report sketches and quest start-date index", [
+        CreateTable("""
+            CREATE TABLE Report_Sketch (
+                Sketch_Name VARCHAR(64) NOT NULL,
+                Sketch_Date DATE NOT NULL,
+                Entity_ID INT NOT NULL,
+                Sketch BLOB NOT NULL,
+                Item_Count INT NOT NULL,
+                Updated_At DATETIME NOT NULL,
+                PRIMARY KEY (Sketch_Name, Sketch_Date, Entity_ID)
+            ) ENGINE=InnoDB
+        """),
+        AddIndex('Quest', 'idx_start_date', ['Start_Date']),
+    ]),
+    Migration(7, "Write journal idempotency keys", [
+        CreateTable("""
+            CREATE TABLE Journal_Applied (
+                Idempotency_Key CHAR(32) PRIMARY KEY,
+                Operation VARCHAR(64) NOT NULL,
+                Result VARCHAR(255),
+                Applied_At DATETIME NOT NULL,
+                INDEX idx_applied_at (Applied_At)
+            ) ENGINE=InnoDB
+        """),
+    ]),
+    Migration(8, "Quest lookup indexes on combat and quest log", [
+        AddIndex('Combat_Encounter', 'idx_quest', ['Quest_ID']),
+        AddIndex('Quest_Log', 'idx_quest_hero', ['Quest_ID', 'Hero_ID']),
+    ]),
+    Migration(9, "Invalidate dossiers when a demigod is deleted", [
+        CreateTriggers([DEMIGOD_DELETE_DOSSIER_TRIGGER]),
+    ]),
+    Migration(10, "Hero profile invalidation triggers", [
+        CreateTriggers(profile_trigger_ddl()),
+    ]),
+    Migration(11, "Sketch change log", [
+        CreateTable("""
+            CREATE TABLE Sketch_Change (
+                Change_ID INT AUTO_INCREMENT PRIMARY KEY,
+                Sketch_Group VARCHAR(20) NOT NULL,
+                Sketch_Date DATE NULL,
+                INDEX idx_group (Sketch_Group, Change_ID)
+            ) ENGINE=InnoDB
+        """),
+        CreateTriggers(sketch_trigger_ddl()),
+    ]),
+    Migration(12, "Slotted change counters", [
+        CreateTable("""
+            CREATE TABLE Table_Version_Slot (
+                Table_Name VARCHAR(64) NOT NULL,
+                Slot INT NOT NULL,
+                Version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+                PRIMARY KEY (Table_Name, Slot)
+            ) ENGINE=InnoDB
+        """),
+        # Every step that reads or drops Table_Version is skipped once it is
+        # gone, so a run interrupted after the DROP is simply run again (and a
+        # database created from schema.sql keeps its triggers as they are)
+        WhileTable('Table_Version', RunStatement(f"""
+            INSERT IGNORE INTO Table_Version_Slot (Table_Name, Slot)
+            WITH RECURSIVE slots (Slot) AS (SELECT 0 UNION ALL SELECT Slot + 1 FROM slots WHERE Slot < {VERSION_SLOTS - 1})
+            SELECT t.Table_Name, s.Slot FROM Table_Version t CROSS JOIN slots s
+        """)),
+        WhileTable('Table_Version', CreateTriggers(version_trigger_ddl(tables=VERSIONED_TABLES,
+                                                                       cascades=DELETE_CASCADES))),
+        # Counts bumped before the triggers moved carry over, so versions never
+        # go back. They go into an extra slot no trigger writes, and INSERT
+        # IGNORE makes a re-run a no-op instead of adding them twice.
+        WhileTable('Table_Version', RunStatement(f"""
+            INSERT IGNORE INTO Table_Version_Slot (Table_Name, Slot, Version)
+            SELECT Table_Name, {VERSION_SLOTS}, Version FROM Table_Version
+        """)),
+        WhileTable('Table_Version', RunStatement("DROP TABLE Table_Version")),
+    ]),
+    Migration(13, "Sighting log change counter", [
+        RunStatement(f"""
+            INSERT IGNORE INTO Table_Version_Slot (Table_Name, Slot)
+            WITH RECURSIVE slots (Slot) AS (SELECT 0 UNION ALL SELECT Slot + 1 FROM slots WHERE Slot < {VERSION_SLOTS - 1})
+            SELECT 'Sighting_Log', Slot FROM slots
+        """),
+        CreateTriggers(version_trigger_ddl()),
+    ]),
+    Migration(14, "Artifact holding index ordered by ownership", [
+        AddIndex('Artifact_Ownership', 'idx_artifact_holding',
+                 ['Artifact_ID', 'Valid_From', 'Ownership_ID', 'Valid_To', 'Hero_ID']),
+        DropIndex('Artifact_Ownership', 'idx_artifact_interval'),
+    ]),
+]
+
+# =====================================================
+# APPLYING MIGRATIONS
+# =====================================================
+
+def applied_migrations(connection):
+    """{version: Schema_Migration row} ({} before the first migration)."""
+    if not table_exists(connection, 'Schema_Migration'):
+        return {}
+    rows = _fetch(connection, "SELECT * FROM Schema_Migration ORDER BY Version")
+    connection.commit()
+    return {row['Version']: row for row in rows}
+
+def pending_migrations(connection, target=None):
+    applied = applied_migrations(connection)
+    return [migration for migration in MIGRATIONS
+            if migration.version not in applied and (target is None or migration.version <= target)]
+
+def migrate(connection, target=None, dry_run=False, **options):
+    """
+    Apply pending migrations up to `target` (default: all) in version order.
+    Returns [(migration, statements run)]; with dry_run, what would run.
+    options are passed on to OnlineDDL (chunk_rows, chunk_pause, max_threads_running).
+    """
+    mysql = _dialect(connection) == 'mysql'
+    if mysql and not dry_run:
+        locked = _fetch(connection, "SELECT GET_LOCK(%s, 0) as locked", (MIGRATION_LOCK,))[0]['locked']
+        if not locked:
+            raise MigrationError("Another migration run holds the migration lock")
+    try:
+        results = []
+        tracking = CreateTable(SCHEMA_MIGRATION_DDL)
+        if not tracking.is_applied(connection):
+            tracking.apply(OnlineDDL(connection, dry_run=dry_run, **options))
+        for migration in pending_migrations(connection, target):
+            ddl = OnlineDDL(connection, dry_run=dry_run, **options)
+            started = time.monotonic()
+            for step in migration.steps:
+                if not step.is_applied(connection):
+                    step.apply(ddl)
+            if not dry_run:
+                ddl._execute("""
+                    INSERT INTO Schema_Migration (Version, Name, Checksum, Applied_At, Duration_Ms)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, (migration.version, migration.name, migration.checksum, datetime.now(),
+                      int((time.monotonic() - started) * 1000)))
+            results.append((migration, ddl.statements))
+        return results
+    finally:
+        if mysql and not dry_run:
+            _fetch(connection, "SELECT RELEASE_LOCK(%s) as released", (MIGRATION_LOCK,))
+            connection.commit()
+
+def migration_status(connection):
+    """(migration, Schema_Migration row or None, checksum changed since applied) per migration."""
+    applied = applied_migrations(connection)
+    status = []
+    for migration in MIGRATIONS:
+        row = applied.get(migration.version)
+        status.append((migration, row, row is not None and row['Checksum'] != migration.checksum))
+    return status
+
+# =====================================================
+# TEXT COMPRESSION
+# =====================================================
+
+# Tables whose long TEXT columns (Notes, Full_Text, Objective, Description)
+# take most of the buffer pool. Compression is opt-in: it trades CPU on every
+# page read and write for memory and disk.
+COMPRESSED_TABLES = ['Combat_Encounter', 'Prophecy', 'Quest', 'Divine_Artifact']
+# Compressed page size (KB): 16 KB pages are stored, and cached, in 8 KB
+COMPRESSED_KEY_BLOCK_SIZE = 8
+
+def set_text_compression(connection, enabled=True, tables=COMPRESSED_TABLES, dry_run=False, **options):
+    """
+    Switch the text-heavy tables to ROW_FORMAT=COMPRESSED, or back to DYNAMIC.
+    InnoDB decompresses pages as it reads them, so queries, LEFT() previews
+    and LIKE searches see plain text and the application is unchanged.
+    Does nothing on embedded backends. Returns the statements run.
+    """
+    ddl = OnlineDDL(connection, dry_run=dry_run, **options)
+    for table in tables:
+        if enabled:
+            step = TableOptions(table, 'COMPRESSED', COMPRESSED_KEY_BLOCK_SIZE)
+        else:
+            step = TableOptions(table, 'DYNAMIC')
+        if not step.is_applied(connection):
+            step.apply(ddl)
+    return ddl.statements
+
+def compression_status(connection, tables=COMPRESSED_TABLES):
+    """
+    Row format and on-disk size of each table, plus InnoDB's compression
+    counters per page size as (KB, compressions, compressions that fit).
+    Compressions that do not fit split the page, so a low success rate
+    means KEY_BLOCK_SIZE is too small for the data. The counters need the
+    PROCESS privilege and are [] without it.
+    """
+    rows = _fetch(connection, f"""
+        SELECT TABLE_NAME, ROUND((DATA_LENGTH + INDEX_LENGTH) / 1048576, 1) as Size_MB
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({", ".join(["%s"] * len(tables))})
+    """, tables)
+    sizes = {row['TABLE_NAME']: row['Size_MB'] for row in rows}
+    status = [(table, *table_options(connection, table), sizes[table]) for table in tables if table in sizes]
+    try:
+        counters = [(row['page_size'] // 1024, row['compress_ops'], row['compress_ops_ok'])
+                    for row in _fetch(connection, "SELECT * FROM information_schema.INNODB_CMP")
+                    if row['compress_ops']]
+    except pymysql.Error:
+        counters = []
+    connection.commit()
+    return status, counters
+
+# =====================================================
+# COMMAND LINE
+# =====================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations to the Olympian Codex.")
+    parser.add_argument("command", choices=["status", "migrate", "compress", "decompress"])
+    parser.add_argument("--backend", choices=["mysql", "sqlite", "duckdb"], default="mysql")
+    parser.add_argument("--db-path", help="Database file of an embedded backend")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--database", default="olympian_codex_db")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password")
+    parser.add_argument("--to", type=int, dest="target", help="Stop after this version")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--chunk-pause", type=float, default=CHUNK_PAUSE)
+    parser.add_argument("--max-threads-running", type=int, default=MAX_THREADS_RUNNING)
+    parser.add_argument("--dry-run", action="store_true", help="Print what would change without changing it")
+    args = parser.parse_args()
+    if args.command in ("compress", "decompress") and args.backend != "mysql":
+        parser.error("Page compression is only available on MySQL")
+
+    if args.backend == "mysql":
+        password = args.password if args.password is not None else getpass.getpass("MySQL password: ")
+        connection = MySQLBackend(args.host, args.user, password, args.database).connect()
+    else:
+        if not args.db_path:
+            parser.error("--db-path is required for embedded backends")
+        connection = open_embedded(args.backend, args.db_path)
+    try:
+        if args.command == "status":
+            for migration, row, changed in migration_status(connection):
+                state = f"applied {row['Applied_At']:%Y-%m-%d %H:%M:%S}" if row else "pending"
+                note = "  (steps changed since applied)" if changed else ""
+                print(f"{migration.version:>4}  {state:<28}{migration.name}{note}")
+            if args.backend == "mysql":
+                status, counters = compression_status(connection)
+                print()
+                for table, row_format, key_block_size, size_mb in status:
+                    block = f" KEY_BLOCK_SIZE={key_block_size}" if key_block_size else ""
+                    print(f"{table:<18} ROW_FORMAT={row_format}{block}, {size_mb} MB")
+                for page_kb, operations, fitted in counters:
+                    print(f"{page_kb} KB pages: {operations} compression(s), {fitted / operations:.0%} fit")
+        elif args.command in ("compress", "decompress"):
+            statements = set_text_compression(connection, args.command == "compress", dry_run=args.dry_run,
+                                              chunk_rows=args.chunk_rows, chunk_pause=args.chunk_pause,
+                                              max_threads_running=args.max_threads_running)
+            if not statements:
+                print("Nothing to change")
+            for statement in statements:
+                print(_normalize(statement) + ";")
+        else:
+            results = migrate(connection, args.target, args.dry_run, chunk_rows=args.chunk_rows,
+                              chunk_pause=args.chunk_pause, max_threads_running=args.max_threads_running)
+            if not results:
+                print("Schema is up to date")
+            for migration, statements in results:
+                verb = "would apply" if args.dry_run else "applied"
+                print(f"-- {verb} {migration.version}: {migration.name}")
+                for statement in statements:
+                    print(_normalize(statement) + ";")
+    finally:
+        connection.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""
+The Olympian Codex Database - Partition Manager
+Team 42: RNA
+
+Manages monthly RANGE partitions of the event tables on MySQL:
+
+    Combat_Encounter  by Combat_Date
+    Encounters        by Encounter_Date
+    Sighting_Log      by Sighting_Timestamp
+
+Hot queries only touch recent months, so date predicates prune to a few small
+partitions, and cold months can be moved out of the database as a whole:
+'maintain' exports partitions older than the retention window to
+zstd-compressed Parquet files (<archive dir>/<table>/<partition>.parquet) and
+drops them. A partition's rows are swapped out with EXCHANGE PARTITION before
+they are exported, so no write is lost in between, and since that fires no
+triggers the change counters, hero profiles, monster dossiers and sketch days
+the rows fed are invalidated in the same run. The analytics store (analytics_sync.py) loads those files, so
+archived history stays queryable by every read function pointed at the store.
+
+InnoDB does not support foreign keys on partitioned tables. 'enable' therefore
+replaces the event tables' foreign keys with triggers that perform the same
+checks on insert and update (errno 1452 on a missing parent), the ON DELETE
+actions and ON UPDATE CASCADE. The triggers are installed before the first
+foreign key is dropped, so no write goes unchecked while tables are being
+partitioned.
+
+Archived rows are out of MySQL: the query builder answers date ranges that
+start before the retention window from the analytics store instead.
+
+Usage:
+    python partition_manager.py --user root status
+    python partition_manager.py --user root enable [--dry-run]
+    python partition_manager.py --user root maintain [--months-ahead 3] [--retention-months 24] [--dry-run]
+"""
+
+import argparse
+import getpass
+import os
+import re
+from datetime import date
+
+from backends import MySQLBackend
+from migrations import DOSSIER_SOURCES, PROFILE_SOURCES, SKETCH_DAY_SOURCES, VERSION_SLOTS
+
+# Archived partitions are the only copy of their rows once dropped, so they
+# live in the user's data directory rather than the source tree; set
+# OLYMPIAN_CODEX_ARCHIVE_DIR (or pass --archive-dir) to keep them elsewhere
+ARCHIVE_DIR_ENV = "OLYMPIAN_CODEX_ARCHIVE_DIR"
+DEFAULT_ARCHIVE_DIR = os.environ.get(ARCHIVE_DIR_ENV) or os.path.join(
+    os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share"),
+    "olympian_codex", "archive"
+)
+
+# Months of empty partitions kept ahead of today
+PARTITION_MONTHS_AHEAD = 3
+# Months of history kept in MySQL; older partitions are archived
+RETENTION_MONTHS = 24
+
+# table -> (partitioning column, new primary key or None if it already
+# includes the column, as MySQL requires of every unique key)
+PARTITIONED_TABLES = {
+    'Combat_Encounter': ('Combat_Date', ('Encounter_ID', 'Combat_Date')),
+    'Encounters': ('Encounter_Date', None),
+    'Sighting_Log': ('Sighting_Timestamp', None),
+}
+
+# Foreign keys of the event tables, enforced by triggers once partitioned:
+# (child table, column, parent table, parent key, ON DELETE action); all of
+# them are ON UPDATE CASCADE
+EVENT_REFERENCES = [
+    ('Combat_Encounter', 'Hero_ID', 'Demigod', 'Hero_ID', 'CASCADE'),
+    ('Combat_Encounter', 'Artifact_ID', 'Divine_Artifact', 'Artifact_ID', 'SET NULL'),
+    ('Combat_Encounter', 'Monster_ID', 'Monster', 'Monster_ID', 'CASCADE'),
+    ('Combat_Encounter', 'Quest_ID', 'Quest', 'Quest_ID', 'SET NULL'),
+    ('Encounters', 'Hero_ID', 'Demigod', 'Hero_ID', 'CASCADE'),
+    ('Encounters', 'Monster_ID', 'Monster', 'Monster_ID', 'CASCADE'),
+    ('Sighting_Log', 'Monster_ID', 'Monster', 'Monster_ID', 'CASCADE'),
+    ('Sighting_Log', 'Reported_By', 'Demigod', 'Hero_ID', 'SET NULL'),
+]
+
+FUTURE_PARTITION = 'p_future'
+# Unpartitioned copy of an event table that a partition is exchanged into before archiving
+STAGE_SUFFIX = '_archive_stage'
+_MONTHLY_PARTITION = re.compile(r"^p(\d{4})(\d{2})$")
+
+# =====================================================
+# PARTITION NAMING
+# =====================================================
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month):
+    """Monthly partitions are named pYYYYMM."""
+    return f"p{month:%Y%m}"
+
+def partition_month(name):
+    """Inverse of partition_name; None for p_future or foreign names."""
+    match = _MONTHLY_PARTITION.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+def partition_definition(month):
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN (TO_DAYS('{add_months(month, 1)}'))"
+
+def _month_range(first, last):
+    """Months from first to last inclusive."""
+    months, month = [], first
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+# =====================================================
+# INSPECTION
+# =====================================================
+
+def list_partitions(connection, table):
+    """Partitions of a table in order, with InnoDB's estimated row counts ([] if unpartitioned)."""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT PARTITION_NAME as Partition_Name, TABLE_ROWS as Estimated_Rows
+            FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+        """, (table,))
+        return cursor.fetchall()
+
+def _foreign_key_names(cursor, table):
+    cursor.execute("""
+        SELECT CONSTRAINT_NAME
+        FROM information_schema.REFERENTIAL_CONSTRAINTS
+        WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return [row['CONSTRAINT_NAME'] for row in cursor.fetchall()]
+
+# =====================================================
+# ENABLING PARTITIONING
+# =====================================================
+
+def referential_trigger_ddl(references=EVENT_REFERENCES):
+    """
+    Triggers standing in for the event tables' foreign keys: BEFORE INSERT/UPDATE
+    checks on each child table, and BEFORE DELETE actions and AFTER UPDATE key
+    cascades on each parent table.
+    """
+    statements = []
+    for child in PARTITIONED_TABLES:
+        checks = []
+        for table, column, parent, parent_key, _ in references:
+            if table != child:
+                continue
+            checks.append(
+                f"IF NEW.{column} IS NOT NULL AND NOT EXISTS "
+                f"(SELECT 1 FROM {parent} WHERE {parent_key} = NEW.{column}) THEN "
+                f"SIGNAL SQLSTATE '23000' SET MYSQL_ERRNO = 1452, "
+                f"MESSAGE_TEXT = 'Cannot add or update a child row: {child}.{column} references a missing {parent}'; "
+                f"END IF;"
+            )
+        for event in ('INSERT', 'UPDATE'):
+            statements.append(f"DROP TRIGGER IF EXISTS trg_{child.lower()}_{event.lower()}_fk")
+            statements.append(
+                f"CREATE TRIGGER trg_{child.lower()}_{event.lower()}_fk BEFORE {event} ON {child} "
+                f"FOR EACH ROW BEGIN {' '.join(checks)} END"
+            )
+
+    parents = []
+    for _, _, parent, _, _ in references:
+        if parent not in parents:
+            parents.append(parent)
+    for parent in parents:
+        actions = []
+        for child, column, table, parent_key, on_delete in references:
+            if table != parent:
+                continue
+            if on_delete == 'CASCADE':
+                actions.append(f"DELETE FROM {child} WHERE {column} = OLD.{parent_key};")
+            else:
+                actions.append(f"UPDATE {child} SET {column} = NULL WHERE {column} = OLD.{parent_key};")
+        statements.append(f"DROP TRIGGER IF EXISTS trg_{parent.lower()}_delete_events")
+        statements.append(
+            f"CREATE TRIGGER trg_{parent.lower()}_delete_events BEFORE DELETE ON {parent} "
+            f"FOR EACH ROW BEGIN {' '.join(actions)} END"
+        )
+        # AFTER, so the child rows' own checks find the parent's new key
+        parent_key = next(key for _, _, table, key, _ in references if table == parent)
+        cascades = [f"UPDATE {child} SET {column} = NEW.{parent_key} WHERE {column} = OLD.{parent_key};"
+                    for child, column, table, _, _ in references if table == parent]
+        statements.append(f"DROP TRIGGER IF EXISTS trg_{parent.lower()}_update_events")
+        statements.append(
+            f"CREATE TRIGGER trg_{parent.lower()}_update_events AFTER UPDATE ON {parent} "
+            f"FOR EACH ROW BEGIN IF NEW.{parent_key} <> OLD.{parent_key} THEN {' '.join(cascades)} END IF; END"
+        )
+    return statements
+
+def enable_partitioning_ddl(connection, table, months_ahead=PARTITION_MONTHS_AHEAD, today=None):
+    """
+    DDL converting one event table to monthly partitions: drop its foreign
+    keys, widen the primary key to include the partitioning column, and
+    partition from the month of its oldest row up to months_ahead.
+    """
+    column, primary_key = PARTITIONED_TABLES[table]
+    current = month_start(today or date.today())
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN({column}) as oldest FROM {table}")
+        oldest = cursor.fetchone()['oldest']
+        foreign_keys = _foreign_key_names(cursor, table)
+
+    statements = []
+    if foreign_keys:
+        drops = ", ".join(f"DROP FOREIGN KEY {name}" for name in foreign_keys)
+        statements.append(f"ALTER TABLE {table} {drops}")
+    if primary_key:
+        statements.append(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY ({', '.join(primary_key)})")
+
+    first = month_start(oldest) if oldest else current
+    months = _month_range(first, add_months(current, months_ahead))
+    definitions = [partition_definition(month) for month in months]
+    definitions.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE")
+    statements.append(
+        f"ALTER TABLE {table} PARTITION BY RANGE (TO_DAYS({column})) (\n    "
+        + ",\n    ".join(definitions) + "\n)"
+    )
+    return statements
+
+def enable_partitioning(connection, months_ahead=PARTITION_MONTHS_AHEAD, dry_run=False):
+    """Partition every event table that is not partitioned yet. Returns the DDL run."""
+    statements = []
+    pending = [table for table in PARTITIONED_TABLES if not list_partitions(connection, table)]
+    if pending:
+        # Triggers first: until each foreign key is dropped they only repeat
+        # its work, and afterwards no write slips through unchecked
+        statements.extend(referential_trigger_ddl())
+    for table in pending:
+        statements.extend(enable_partitioning_ddl(connection, table, months_ahead))
+    _run(connection, statements, dry_run)
+    return statements
+
+# =====================================================
+# MAINTENANCE
+# =====================================================
+
+def ensure_future_partitions(connection, table, months_ahead=PARTITION_MONTHS_AHEAD, today=None, dry_run=False):
+    """Split p_future so empty monthly partitions exist months_ahead past today."""
+    months = [partition_month(p['Partition_Name']) for p in list_partitions(connection, table)]
+    months = [month for month in months if month]
+    if not months:
+        return []
+    target = add_months(month_start(today or date.today()), months_ahead)
+    missing = _month_range(add_months(max(months), 1), target)
+    if not missing:
+        return []
+    definitions = [partition_definition(month) for month in missing]
+    definitions.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE")
+    statements = [
+        f"ALTER TABLE {table} REORGANIZE PARTITION {FUTURE_PARTITION} INTO (\n    "
+        + ",\n    ".join(definitions) + "\n)"
+    ]
+    _run(connection, statements, dry_run)
+    return statements
+
+def archive_path(table, partition, archive_dir=DEFAULT_ARCHIVE_DIR):
+    """
+    A file name for a partition's archive that is not taken yet: rows found in
+    a partition after it was first archived go to <partition>_1.parquet, ...
+    """
+    path = os.path.join(archive_dir, table, f"{partition}.parquet")
+    suffix = 0
+    while os.path.exists(path):
+        suffix += 1
+        path = os.path.join(archive_dir, table, f"{partition}_{suffix}.parquet")
+    return path
+
+def archive_files(table, archive_dir=DEFAULT_ARCHIVE_DIR):
+    """Archived partition files of a table, oldest first."""
+    directory = os.path.join(archive_dir, table)
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.endswith(".parquet")]
+
+def archived_rows_invalidation_sql(table, stage):
+    """
+    What the triggers would have done for the rows moved into `stage`, which
+    leave the table by EXCHANGE PARTITION without firing any: bump the table's
+    change counter and drop the profiles, dossiers and sketch days they fed.
+    """
+    statements = [
+        f"UPDATE Table_Version_Slot SET Version = Version + 1 "
+        f"WHERE Table_Name = '{table}' AND Slot = CONNECTION_ID() % {VERSION_SLOTS}"
+    ]
+    if table in PROFILE_SOURCES:
+        statements.append(f"DELETE FROM Hero_Profile WHERE Hero_ID IN (SELECT {PROFILE_SOURCES[table]} FROM {stage})")
+    if table in DOSSIER_SOURCES:
+        statements.append(f"DELETE FROM Monster_Dossier WHERE Monster_ID IN (SELECT Monster_ID FROM {stage})")
+    if table in SKETCH_DAY_SOURCES:
+        group, day, _ = SKETCH_DAY_SOURCES[table]
+        statements.append(f"INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date) "
+                          f"SELECT DISTINCT '{group}', {day.format(row=stage)} FROM {stage}")
+    return statements
+
+def _stage_table(connection, table):
+    """The table's staging table, created if missing (a crashed run may have left one with rows)."""
+    stage = table + STAGE_SUFFIX
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT COUNT(*) as n FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (stage,))
+        exists = cursor.fetchone()['n']
+    if not exists:
+        _run(connection, [f"CREATE TABLE {stage} LIKE {table}", f"ALTER TABLE {stage} REMOVE PARTITIONING"])
+    return stage
+
+def _write_archive(rows, path):
+    """
+    Write rows to a zstd-compressed Parquet file and verify the row count.
+    The file is written under a temporary name and renamed once complete.
+    """
+    import duckdb
+    import pandas as pd
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = path + ".tmp"
+    frame = pd.DataFrame(rows).convert_dtypes()
+    writer = duckdb.connect()
+    try:
+        writer.register('partition_rows', frame)
+        writer.execute(f"COPY partition_rows TO '{temporary}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+        written = writer.execute(f"SELECT COUNT(*) FROM read_parquet('{temporary}')").fetchone()[0]
+    finally:
+        writer.close()
+    if written != len(rows):
+        os.remove(temporary)
+        raise RuntimeError(f"Archive {path} wrote {written} of {len(rows)} rows")
+    os.replace(temporary, path)
+
+def archive_partition(connection, table, partition, archive_dir=DEFAULT_ARCHIVE_DIR):
+    """
+    Move one partition's rows to a zstd-compressed Parquet file, then drop the
+    partition. Returns the number of rows archived.
+
+    The rows leave the table with EXCHANGE PARTITION into an empty staging
+    table, an atomic swap, so nothing written meanwhile is read half way or
+    dropped unseen. The partition is dropped under a write lock only once it
+    is still empty; rows written into it since the swap go through another
+    round. A run interrupted after the swap leaves the rows in the staging
+    table, and the next run's swap puts them back before archiving again.
+    """
+    archived = 0
+    while True:
+        stage = _stage_table(connection, table)
+        _run(connection, [f"ALTER TABLE {table} EXCHANGE PARTITION {partition} WITH TABLE {stage}"])
+        _run(connection, archived_rows_invalidation_sql(table, stage))
+        connection.commit()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT * FROM {stage}")
+            rows = cursor.fetchall()
+        if rows:
+            _write_archive(rows, archive_path(table, partition, archive_dir))
+            archived += len(rows)
+        _run(connection, [f"DROP TABLE {stage}"])
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLES {table} WRITE")
+            try:
+                cursor.execute(f"SELECT COUNT(*) as n FROM {table} PARTITION ({partition})")
+                if cursor.fetchone()['n'] == 0:
+                    cursor.execute(f"ALTER TABLE {table} DROP PARTITION {partition}")
+                    return archived
+            finally:
+                cursor.execute("UNLOCK TABLES")
+
+def retention_cutoff(retention_months=RETENTION_MONTHS, today=None):
+    """First day of the oldest month kept in MySQL; older partitions are archived."""
+    return add_months(month_start(today or date.today()), -retention_months)
+
+def archive_cold_partitions(connection, retention_months=RETENTION_MONTHS, archive_dir=DEFAULT_ARCHIVE_DIR,
+                            today=None, dry_run=False):
+    """Archive and drop every monthly partition older than the retention window."""
+    cutoff = retention_cutoff(retention_months, today)
+    archived = []
+    for table in PARTITIONED_TABLES:
+        for partition in list_partitions(connection, table):
+            month = partition_month(partition['Partition_Name'])
+            if month is None or month >= cutoff:
+                continue
+            rows = 0 if dry_run else archive_partition(connection, table, partition['Partition_Name'], archive_dir)
+            archived.append((table, partition['Partition_Name'], rows))
+    return archived
+
+def maintain(connection, months_ahead=PARTITION_MONTHS_AHEAD, retention_months=RETENTION_MONTHS,
+             archive_dir=DEFAULT_ARCHIVE_DIR, dry_run=False):
+    """Periodic job: add upcoming partitions, then archive cold ones."""
+    statements = []
+    for table in PARTITIONED_TABLES:
+        statements.extend(ensure_future_partitions(connection, table, months_ahead, dry_run=dry_run))
+    archived = archive_cold_partitions(connection, retention_months, archive_dir, dry_run=dry_run)
+    return statements, archived
+
+def _run(connection, statements, dry_run=False):
+    if dry_run:
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage partitions of the Olympian Codex event tables.")
+    parser.add_argument("command", choices=["status", "enable", "maintain"])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--database", default="olympian_codex_db")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password")
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--retention-months", type=int, default=RETENTION_MONTHS)
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR)
+    parser.add_argument("--dry-run", action="store_true", help="Print what would change without changing it")
+    args = parser.parse_args()
+
+    password = args.password if args.password is not None else getpass.getpass("MySQL password: ")
+    connection = MySQLBackend(args.host, args.user, password, args.database).connect()
+    try:
+        if args.command == "status":
+            for table in PARTITIONED_TABLES:
+                partitions = list_partitions(connection, table)
+                if not partitions:
+                    print(f"{table}: not partitioned")
+                    continue
+                print(f"{table}: {len(partitions)} partition(s), {len(archive_files(table, args.archive_dir))} archived")
+                for partition in partitions:
+                    print(f"    {partition['Partition_Name']:<10} ~{partition['Estimated_Rows']} row(s)")
+        elif args.command == "enable":
+            for statement in enable_partitioning(connection, args.months_ahead, args.dry_run):
+                print(statement + ";")
+        else:
+            statements, archived = maintain(connection, args.months_ahead, args.retention_months,
+                                            args.archive_dir, args.dry_run)
+            for statement in statements:
+                print(statement + ";")
+            for table, partition, rows in archived:
+                verb = "would archive" if args.dry_run else f"archived {rows} row(s) from"
+                print(f"{verb} {table}.{partition}")
+    finally:
+        connection.close()
+
+if __name__ == "__main__":
+    main()
@@ -411,6 +411,30 @@ INSERT INTO Divine_Artifact (Artifact_ID, Name, Description, Current_Wielder) VA
 (19, 'Yankee Cap', 'Cap of invisibility from Athena', 2),
 (20, 'Festus', 'Mechanical bronze dragon', 15);
 
+-- =====================================================
+-- POPULATE ARTIFACT_OWNERSHIP TABLE
+-- =====================================================
+
+-- Current holdings (open-ended intervals)
+INSERT INTO Artifact_Ownership (Ownership_ID, Artifact_ID, Hero_ID, Valid_From) VALUES
+(1, 1, 1, '2005-06-01 00:00:00'),
+(2, 2, 2, '2000-01-15 00:00:00'),
+(3, 3, 3, '2003-12-21 00:00:00'),
+(4, 4, 4, '2006-03-10 00:00:00'),
+(6, 6, 6, '2000-07-04 00:00:00'),
+(8, 12, 13, '2010-10-12 00:00:00'),
+(9, 15, 16, '2010-06-01 00:00:00'),
+(10, 16, 17, '2010-06-01 00:00:00'),
+(11, 17, 18, '2005-07-08 00:00:00'),
+(12, 18, 9, '2006-08-22 00:00:00'),
+(13, 19, 2, '2000-01-15 00:00:00'),
+(14, 20, 15, '2010-10-12 00:00:00');
+
+-- Past holdings of artifacts that are now unwielded
+INSERT INTO Artifact_Ownership (Ownership_ID, Artifact_ID, Hero_ID, Valid_From, Valid_To) VALUES
+(5, 5, 5, '2001-06-01 00:00:00', '2009-08-18 14:00:00'),
+(7, 11, 14, '2010-10-12 00:00:00', '2010-12-21 00:00:00');
+
 -- =====================================================
 -- POPULATE MAGICAL_PROPERTIES TABLE
 -- =====================================================
@@ -588,6 +612,8 @@ SELECT 'Sighting Logs', COUNT(*) FROM Sighting_Log
 UNION ALL
 SELECT 'Known Abilities', COUNT(*) FROM Known_Abilities
 UNION ALL
+SELECT 'Artifact Ownership Records', COUNT(*) FROM Artifact_Ownership
+UNION ALL
 SELECT 'Combat Encounters', COUNT(*) FROM Combat_Encounter
 UNION ALL
 SELECT 'Rescue Missions', COUNT(*) FROM Rescue_Mission;
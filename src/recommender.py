@@ -0,0 +1,137 @@
+"""
+The Olympian Codex Database - Outcome Matrices
+Team 42: RNA
+
+Win/encounter count matrices behind the artifact recommendations, e.g.
+monster species x artifact and monster species x hero.
+
+Counts grow in place as combat rows arrive (rows and columns are added as
+new keys appear), and a quest's expected monsters are scored against every
+column at once: the expected species' rows are smoothed and combined with
+one weighted matrix product.
+
+Smoothing is empirical Bayes: a cell with few encounters is pulled toward
+its column's overall win rate, which is itself pulled toward the win rate
+over all cells, so one lucky fight does not put an artifact on top.
+"""
+
+import numpy as np
+
+# Pseudo-encounters of prior evidence added to every cell and column
+PRIOR_STRENGTH = 5.0
+
+class OutcomeMatrix:
+    """Win and encounter counts per (row key, column key) pair."""
+
+    __slots__ = ('row_index', 'column_index', 'column_keys', 'wins', 'totals',
+                 'column_wins', 'column_totals')
+
+    def __init__(self):
+        self.row_index = {}
+        self.column_index = {}
+        self.column_keys = []
+        # int32 counts: 8 bytes per cell for both, e.g. 8 MB for 100 species x 10K heroes
+        self.wins = np.zeros((0, 0), dtype=np.int32)
+        self.totals = np.zeros((0, 0), dtype=np.int32)
+        # Per-column sums, kept alongside so priors never scan the whole matrix
+        self.column_wins = np.zeros(0, dtype=np.int64)
+        self.column_totals = np.zeros(0, dtype=np.int64)
+
+    @property
+    def shape(self):
+        return len(self.row_index), len(self.column_index)
+
+    def _position(self, index, key, keys=None):
+        position = index.get(key)
+        if position is None:
+            position = index[key] = len(index)
+            if keys is not None:
+                keys.append(key)
+        return position
+
+    def _grow(self):
+        """Make room for all known keys, doubling capacity so appends stay amortized O(1)."""
+        rows, columns = self.shape
+        capacity_rows, capacity_columns = self.wins.shape
+        if rows <= capacity_rows and columns <= capacity_columns:
+            return
+        new_shape = (max(rows, 2 * capacity_rows, 8), max(columns, 2 * capacity_columns, 8))
+        for name in ('wins', 'totals'):
+            grown = np.zeros(new_shape, dtype=np.int32)
+            grown[:capacity_rows, :capacity_columns] = getattr(self, name)
+            setattr(self, name, grown)
+        for name in ('column_wins', 'column_totals'):
+            grown = np.zeros(new_shape[1], dtype=np.int64)
+            grown[:capacity_columns] = getattr(self, name)
+            setattr(self, name, grown)
+
+    def add(self, outcomes):
+        """Count (row key, column key, won) outcomes; outcomes with a None column key are skipped."""
+        outcomes = [outcome for outcome in outcomes if outcome[1] is not None]
+        if not outcomes:
+            return 0
+        rows = np.fromiter((self._position(self.row_index, row) for row, _, _ in outcomes),
+                           dtype=np.intp, count=len(outcomes))
+        columns = np.fromiter((self._position(self.column_index, column, self.column_keys)
+                               for _, column, _ in outcomes),
+                              dtype=np.intp, count=len(outcomes))
+        won = np.fromiter((bool(won) for _, _, won in outcomes), dtype=np.int32, count=len(outcomes))
+        self._grow()
+        # add.at accumulates repeated (row, column) pairs, unlike fancy-index +=
+        np.add.at(self.totals, (rows, columns), 1)
+        np.add.at(self.wins, (rows, columns), won)
+        np.add.at(self.column_totals, columns, 1)
+        np.add.at(self.column_wins, columns, won)
+        return len(outcomes)
+
+    def column_priors(self, columns, strength=PRIOR_STRENGTH):
+        """Win rates of the given column positions over all rows, smoothed toward the overall win rate."""
+        count = self.shape[1]
+        overall = (self.column_wins[:count].sum() + 1) / (self.column_totals[:count].sum() + 2)
+        return (self.column_wins[columns] + strength * overall) / (self.column_totals[columns] + strength)
+
+    def score(self, row_weights, keys=None, strength=PRIOR_STRENGTH):
+        """
+        Expected win probability of each column against a weighted mix of row
+        keys (e.g. {species: expected count}), and the encounters behind it.
+        Row keys never seen contribute their column's prior. Scores every
+        column, or only `keys` (unknown ones are left out).
+        Returns (column positions, probabilities, encounters), aligned.
+        """
+        if keys is None:
+            columns = np.arange(self.shape[1])
+        else:
+            columns = np.array([self.column_index[key] for key in keys if key in self.column_index],
+                               dtype=np.intp)
+        total_weight = float(sum(row_weights.values()))
+        if not len(columns) or total_weight <= 0:
+            return columns, np.zeros(0), np.zeros(0, dtype=np.int64)
+        prior = self.column_priors(columns, strength)
+        known = [(self.row_index[key], weight) for key, weight in row_weights.items()
+                 if key in self.row_index]
+        rows = np.array([row for row, _ in known], dtype=np.intp)
+        weights = np.array([weight for _, weight in known], dtype=float)
+
+        wins, totals = self.wins[np.ix_(rows, columns)], self.totals[np.ix_(rows, columns)]
+        cells = (wins + strength * prior) / (totals + strength)
+        probabilities = (weights @ cells + (total_weight - weights.sum()) * prior) / total_weight
+        return columns, probabilities, totals.sum(axis=0)
+
+    def rank(self, row_weights, limit=None, strength=PRIOR_STRENGTH):
+        """
+        The best `limit` columns as (column key, probability, encounters),
+        best first; ties go to the column with more encounters behind it.
+        """
+        columns, probabilities, encounters = self.score(row_weights, strength=strength)
+        order = np.arange(len(columns))
+        if limit is not None and limit < len(columns):
+            # Partial selection first: only the top candidates are sorted
+            cutoff = -np.partition(-probabilities, limit - 1)[limit - 1]
+            order = np.flatnonzero(probabilities >= cutoff)
+        order = order[np.lexsort((-encounters[order], -probabilities[order]))][:limit]
+        return [(self.column_keys[columns[i]], float(probabilities[i]), int(encounters[i])) for i in order]
+
+    def probabilities(self, row_weights, keys, strength=PRIOR_STRENGTH):
+        """{column key: expected win probability} for the given keys."""
+        columns, probabilities, _ = self.score(row_weights, keys, strength)
+        return {self.column_keys[column]: float(p) for column, p in zip(columns, probabilities)}
@@ -0,0 +1,251 @@
+"""
+The Olympian Codex Database - Row Models
+Team 42: RNA
+
+Compact row types returned by every cursor in place of per-row dicts.
+
+A result set's columns are fixed, so each distinct column list gets one
+generated class whose values live in __slots__: rows carry no per-instance
+dict and no repeated key strings. Rows still read like the DictCursor rows
+they replace (row['Name'], row.get(...), row.items()) and also by attribute
+(row.Name). Rows of a query that reads a single entity table are typed
+after it, e.g. isinstance(row, Demigod) for SELECT ... FROM Demigod.
+Subclass tables type their rows as subclasses of the parent entity, so a
+Titan row is also a Monster.
+
+rows_to_frame() builds a DataFrame column by column from a row list
+without materialising a dict per row.
+"""
+
+import keyword
+import re
+from functools import lru_cache, partial
+
+import pymysql.cursors
+
+# =====================================================
+# ROW TYPES
+# =====================================================
+
+class Row:
+    """A result row: fixed fields stored in __slots__, read like a dict or by attribute."""
+
+    __slots__ = ()
+    _fields = ()
+    _entity = None
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self._fields:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __eq__(self, other):
+        if isinstance(other, Row):
+            return self._fields == other._fields and self.values() == other.values()
+        if isinstance(other, dict):
+            return self._asdict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ', '.join(f"{field}={getattr(self, field)!r}" for field in self._fields)
+        return f"{type(self).__name__}({values})"
+
+    def __reduce__(self):
+        return _rebuild_row, (self._entity, self._fields, self.values())
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._fields else default
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return tuple(getattr(self, field) for field in self._fields)
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in self._fields]
+
+    def _asdict(self):
+        return dict(self.items())
+
+# Entity row types: rows of a query over a single entity table subclass these
+class God(Row):
+    __slots__ = ()
+
+class Demigod(Row):
+    __slots__ = ()
+
+class Monster(Row):
+    __slots__ = ()
+
+class Prophecy(Row):
+    __slots__ = ()
+
+class Quest(Row):
+    __slots__ = ()
+
+class DivineArtifact(Row):
+    __slots__ = ()
+
+class CombatEncounter(Row):
+    __slots__ = ()
+
+class Encounter(Row):
+    __slots__ = ()
+
+class Sighting(Row):
+    __slots__ = ()
+
+# Subclass hierarchies: God -> Olympian / Chthonic_God / Primordial,
+# Monster -> Beast / Titan / Spirit
+class Olympian(God):
+    __slots__ = ()
+
+class ChthonicGod(God):
+    __slots__ = ()
+
+class Primordial(God):
+    __slots__ = ()
+
+class Beast(Monster):
+    __slots__ = ()
+
+class Titan(Monster):
+    __slots__ = ()
+
+class Spirit(Monster):
+    __slots__ = ()
+
+ENTITY_TABLES = {
+    'God': God,
+    'Demigod': Demigod,
+    'Monster': Monster,
+    'Prophecy': Prophecy,
+    'Quest': Quest,
+    'Divine_Artifact': DivineArtifact,
+    'Combat_Encounter': CombatEncounter,
+    'Encounters': Encounter,
+    'Sighting_Log': Sighting,
+    'Olympian': Olympian,
+    'Chthonic_God': ChthonicGod,
+    'Primordial': Primordial,
+    'Beast': Beast,
+    'Titan': Titan,
+    'Spirit': Spirit,
+}
+
+_FROM_TABLE = re.compile(r"\bFROM\s+(\w+)", re.IGNORECASE)
+_JOIN = re.compile(r"\bJOIN\b", re.IGNORECASE)
+
+def source_entity(sql):
+    """The entity table a query reads, or None for joins, subqueries and non-entity tables."""
+    tables = set(_FROM_TABLE.findall(sql))
+    if len(tables) != 1 or _JOIN.search(sql):
+        return None
+    table = tables.pop()
+    return table if table in ENTITY_TABLES else None
+
+def _valid_fields(fields):
+    return (len(set(fields)) == len(fields)
+            and all(field.isidentifier() and not keyword.iskeyword(field)
+                    and not field.startswith('_') and not hasattr(Row, field)
+                    for field in fields))
+
+def _dict_row(fields, *values):
+    return dict(zip(fields, values))
+
+@lru_cache(maxsize=1024)
+def row_type(entity, fields):
+    """
+    The row class for one result shape (entity table or None, column names).
+    Column names that cannot be slots (duplicates, expressions without an
+    alias) fall back to plain dict rows.
+    """
+    if not _valid_fields(fields):
+        return partial(_dict_row, fields)
+    base = ENTITY_TABLES.get(entity, Row)
+    # Generated like namedtuple: a plain __init__ assigning each slot
+    parameters = ', '.join(fields)
+    body = '\n'.join(f"    self.{field} = {field}" for field in fields) or "    pass"
+    namespace = {}
+    exec(f"def __init__(self, {parameters}):\n{body}", namespace)
+    return type(base.__name__, (base,), {
+        '__slots__': fields,
+        '__init__': namespace['__init__'],
+        '_fields': fields,
+        '_entity': entity,
+    })
+
+def _rebuild_row(entity, fields, values):
+    return row_type(entity, fields)(*values)
+
+# =====================================================
+# CURSORS
+# =====================================================
+
+class RowCursorMixin:
+    """PyMySQL cursor mixin returning row models instead of dicts."""
+
+    def _query(self, q):
+        self._row_entity = source_entity(q)
+        return super()._query(q)
+
+    def _do_get_result(self):
+        super()._do_get_result()
+        self._row_type = None
+        if self.description:
+            fields = []
+            for f in self._result.fields:
+                # Same disambiguation of repeated names as DictCursor
+                name = f.name
+                if name in fields:
+                    name = f.table_name + "." + name
+                fields.append(name)
+            self._row_type = row_type(self._row_entity, tuple(fields))
+        if self._row_type and self._rows:
+            self._rows = [self._conv_row(r) for r in self._rows]
+
+    def _conv_row(self, row):
+        if row is None:
+            return None
+        return self._row_type(*row)
+
+class RowCursor(RowCursorMixin, pymysql.cursors.Cursor):
+    """Buffered cursor returning row models; the app's default cursor class."""
+
+# =====================================================
+# DATAFRAME CONVERSION
+# =====================================================
+
+def rows_to_frame(rows, columns=None):
+    """
+    Build a DataFrame from fetched rows, one column list at a time.
+    Rows of different shapes (e.g. mixed subclass entities) need explicit
+    columns; a row without one of them gets None there.
+    Plain dicts (e.g. decoded profile documents) are passed to pandas as-is.
+    """
+    import pandas as pd
+
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    if not isinstance(rows[0], Row):
+        return pd.DataFrame(rows, columns=columns)
+    fields = columns or rows[0]._fields
+    return pd.DataFrame({field: [getattr(row, field, None) for row in rows] for field in fields},
+                        columns=list(fields))
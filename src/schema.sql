@@ -34,6 +34,7 @@ CREATE TABLE Demigod (
     Fatal_Flaw VARCHAR(100),
     Date_of_Arrival DATE,
     Status ENUM('Active', 'Deceased', 'Missing', 'Retired') NOT NULL DEFAULT 'Active',
+    Row_Version INT NOT NULL DEFAULT 0,  -- Optimistic locking: bumped by every update
     FOREIGN KEY (Divine_Parent_ID) REFERENCES God(Divine_ID) 
         ON DELETE SET NULL  -- Resolves deletion anomaly
         ON UPDATE CASCADE,
@@ -70,12 +71,14 @@ CREATE TABLE Quest (
     Start_Date DATE,
     End_Date DATE,
     Outcome ENUM('Success', 'Failure', 'Ongoing', 'Abandoned') DEFAULT 'Ongoing',
+    Row_Version INT NOT NULL DEFAULT 0,  -- Optimistic locking: bumped by every update
     FOREIGN KEY (Prophecy_ID) REFERENCES Prophecy(Prophecy_ID)
         ON DELETE RESTRICT  -- Cannot delete a prophecy if quest exists
         ON UPDATE CASCADE,
     CHECK (End_Date IS NULL OR End_Date >= Start_Date),
     INDEX idx_prophecy (Prophecy_ID),
-    INDEX idx_outcome (Outcome)
+    INDEX idx_outcome (Outcome),
+    INDEX idx_start_date (Start_Date)
 ) ENGINE=InnoDB;
 
 -- Table: Divine_Artifact
@@ -85,6 +88,7 @@ CREATE TABLE Divine_Artifact (
     Name VARCHAR(100) NOT NULL UNIQUE,
     Description TEXT,
     Current_Wielder INT NULL,  -- Can be unwielded
+    Row_Version INT NOT NULL DEFAULT 0,  -- Optimistic locking: bumped by every update
     FOREIGN KEY (Current_Wielder) REFERENCES Demigod(Hero_ID)
         ON DELETE SET NULL  -- Artifact becomes unwielded if hero dies/deleted
         ON UPDATE CASCADE,
@@ -183,11 +187,13 @@ CREATE TABLE Quest_Log (
         ON UPDATE CASCADE,
     FOREIGN KEY (Quest_ID) REFERENCES Quest(Quest_ID)
         ON DELETE CASCADE  -- If quest deleted, remove all participant logs
-        ON UPDATE CASCADE
+        ON UPDATE CASCADE,
+    INDEX idx_quest_hero (Quest_ID, Hero_ID)  -- Participants of a quest, without touching the rows
 ) ENGINE=InnoDB;
 
 -- Table: Sighting_Log
 -- Weak entity: Tracks specific monster sightings
+-- Partitioned monthly in production by partition_manager.py (as are Encounters and Combat_Encounter)
 CREATE TABLE Sighting_Log (
     Monster_ID INT,
     Sighting_Timestamp DATETIME,
@@ -300,7 +306,8 @@ CREATE TABLE Combat_Encounter (
         ON UPDATE CASCADE,
     INDEX idx_combat_date (Combat_Date),
     INDEX idx_hero (Hero_ID),
-    INDEX idx_monster (Monster_ID)
+    INDEX idx_monster (Monster_ID),
+    INDEX idx_quest (Quest_ID)
 ) ENGINE=InnoDB;
 
 -- Table: Rescue_Mission
@@ -330,6 +337,533 @@ CREATE TABLE Rescue_Mission (
     INDEX idx_quest (Quest_ID)
 ) ENGINE=InnoDB;
 
+-- =====================================================
+-- TEMPORAL TABLES
+-- =====================================================
+
+-- Table: Artifact_Ownership
+-- History of Divine_Artifact.Current_Wielder as half-open validity intervals
+-- [Valid_From, Valid_To); the current holding is open-ended (Valid_To = 9999-12-31).
+-- Intervals of one artifact never overlap, so the holder at time T is the
+-- latest interval with Valid_From <= T, found by one probe of idx_artifact_holding.
+-- Changes in the same second leave zero-length intervals; Ownership_ID orders them.
+CREATE TABLE Artifact_Ownership (
+    Ownership_ID INT AUTO_INCREMENT PRIMARY KEY,
+    Artifact_ID INT NOT NULL,
+    Hero_ID INT NULL,  -- NULL once the holder's record is deleted
+    Valid_From DATETIME NOT NULL,
+    Valid_To DATETIME NOT NULL DEFAULT '9999-12-31 23:59:59',
+    FOREIGN KEY (Artifact_ID) REFERENCES Divine_Artifact(Artifact_ID)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE,
+    FOREIGN KEY (Hero_ID) REFERENCES Demigod(Hero_ID)
+        ON DELETE SET NULL  -- Preserve the history even if the holder is deleted
+        ON UPDATE CASCADE,
+    CHECK (Valid_To >= Valid_From),
+    INDEX idx_artifact_holding (Artifact_ID, Valid_From, Ownership_ID, Valid_To, Hero_ID),
+    INDEX idx_hero_interval (Hero_ID, Valid_From)
+) ENGINE=InnoDB;
+
+-- =====================================================
+-- PRECOMPUTED DOCUMENTS
+-- =====================================================
+
+-- Table: Hero_Profile
+-- Denormalized per-hero document (parent, abilities, artifacts, quests, encounter summary)
+-- Rebuilt by the application on every write that touches a hero; the triggers
+-- below drop a profile whenever one of its sources changes and the next read rebuilds it
+CREATE TABLE Hero_Profile (
+    Hero_ID INT PRIMARY KEY,
+    Profile JSON NOT NULL,
+    Updated_At DATETIME NOT NULL,
+    FOREIGN KEY (Hero_ID) REFERENCES Demigod(Hero_ID)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+-- Profile invalidation. Deletes of a God, Quest or Monster run BEFORE the
+-- delete, while the rows that link it to heroes are still there (the cascade
+-- or SET NULL that follows does not fire their triggers).
+CREATE TRIGGER trg_demigod_update_profile AFTER UPDATE ON Demigod
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID IN (OLD.Hero_ID, NEW.Hero_ID);
+
+CREATE TRIGGER trg_known_abilities_insert_profile AFTER INSERT ON Known_Abilities
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID = NEW.Hero_ID;
+
+CREATE TRIGGER trg_known_abilities_update_profile AFTER UPDATE ON Known_Abilities
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID IN (OLD.Hero_ID, NEW.Hero_ID);
+
+CREATE TRIGGER trg_known_abilities_delete_profile AFTER DELETE ON Known_Abilities
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID = OLD.Hero_ID;
+
+CREATE TRIGGER trg_quest_log_insert_profile AFTER INSERT ON Quest_Log
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID = NEW.Hero_ID;
+
+CREATE TRIGGER trg_quest_log_update_profile AFTER UPDATE ON Quest_Log
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID IN (OLD.Hero_ID, NEW.Hero_ID);
+
+CREATE TRIGGER trg_quest_log_delete_profile AFTER DELETE ON Quest_Log
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID = OLD.Hero_ID;
+
+CREATE TRIGGER trg_encounters_insert_profile AFTER INSERT ON Encounters
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID = NEW.Hero_ID;
+
+CREATE TRIGGER trg_encounters_update_profile AFTER UPDATE ON Encounters
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID IN (OLD.Hero_ID, NEW.Hero_ID);
+
+CREATE TRIGGER trg_encounters_delete_profile AFTER DELETE ON Encounters
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID = OLD.Hero_ID;
+
+CREATE TRIGGER trg_divine_artifact_insert_profile AFTER INSERT ON Divine_Artifact
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID = NEW.Current_Wielder;
+
+CREATE TRIGGER trg_divine_artifact_update_profile AFTER UPDATE ON Divine_Artifact
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID IN (OLD.Current_Wielder, NEW.Current_Wielder);
+
+CREATE TRIGGER trg_divine_artifact_delete_profile AFTER DELETE ON Divine_Artifact
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID = OLD.Current_Wielder;
+
+CREATE TRIGGER trg_god_update_profile AFTER UPDATE ON God
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID IN (SELECT Hero_ID FROM Demigod WHERE Divine_Parent_ID IN (OLD.Divine_ID, NEW.Divine_ID));
+
+CREATE TRIGGER trg_god_delete_profile BEFORE DELETE ON God
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID IN (SELECT Hero_ID FROM Demigod WHERE Divine_Parent_ID = OLD.Divine_ID);
+
+CREATE TRIGGER trg_quest_update_profile AFTER UPDATE ON Quest
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID IN (SELECT Hero_ID FROM Quest_Log WHERE Quest_ID IN (OLD.Quest_ID, NEW.Quest_ID));
+
+CREATE TRIGGER trg_quest_delete_profile BEFORE DELETE ON Quest
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID IN (SELECT Hero_ID FROM Quest_Log WHERE Quest_ID = OLD.Quest_ID);
+
+CREATE TRIGGER trg_monster_update_profile AFTER UPDATE ON Monster
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID IN (SELECT Hero_ID FROM Encounters WHERE Monster_ID IN (OLD.Monster_ID, NEW.Monster_ID));
+
+CREATE TRIGGER trg_monster_delete_profile BEFORE DELETE ON Monster
+    FOR EACH ROW DELETE FROM Hero_Profile WHERE Hero_ID IN (SELECT Hero_ID FROM Encounters WHERE Monster_ID = OLD.Monster_ID);
+
+-- Table: Monster_Dossier
+-- Denormalized per-monster briefing (subclass attributes, weaknesses, habitats,
+-- encounter and combat summaries) served by threat-level range without joining
+-- the multi-valued tables. Built by the application; the triggers below drop a
+-- dossier whenever one of its sources changes and the next read rebuilds it.
+CREATE TABLE Monster_Dossier (
+    Monster_ID INT PRIMARY KEY,
+    Species VARCHAR(100) NOT NULL,
+    Threat_Level INT NOT NULL,
+    Monster_Type VARCHAR(20),  -- Beast, Titan, Spirit or NULL
+    Weaknesses TEXT,
+    Habitats TEXT,
+    Times_Encountered INT NOT NULL DEFAULT 0,  -- Distinct heroes encountered
+    Combat_Count INT NOT NULL DEFAULT 0,
+    Dossier JSON NOT NULL,
+    Updated_At DATETIME NOT NULL,
+    FOREIGN KEY (Monster_ID) REFERENCES Monster(Monster_ID)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE,
+    INDEX idx_threat_encounters (Threat_Level, Times_Encountered)
+) ENGINE=InnoDB;
+
+-- Dossier invalidation. FK cascades do not fire triggers: a Monster delete drops
+-- the dossier itself, and a Demigod delete drops the dossiers of the monsters it
+-- met before its encounters and combat rows cascade away.
+CREATE TRIGGER trg_monster_update_dossier AFTER UPDATE ON Monster
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID IN (OLD.Monster_ID, NEW.Monster_ID);
+
+CREATE TRIGGER trg_beast_insert_dossier AFTER INSERT ON Beast
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = NEW.Monster_ID;
+
+CREATE TRIGGER trg_beast_update_dossier AFTER UPDATE ON Beast
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID IN (OLD.Monster_ID, NEW.Monster_ID);
+
+CREATE TRIGGER trg_beast_delete_dossier AFTER DELETE ON Beast
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = OLD.Monster_ID;
+
+CREATE TRIGGER trg_titan_insert_dossier AFTER INSERT ON Titan
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = NEW.Monster_ID;
+
+CREATE TRIGGER trg_titan_update_dossier AFTER UPDATE ON Titan
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID IN (OLD.Monster_ID, NEW.Monster_ID);
+
+CREATE TRIGGER trg_titan_delete_dossier AFTER DELETE ON Titan
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = OLD.Monster_ID;
+
+CREATE TRIGGER trg_spirit_insert_dossier AFTER INSERT ON Spirit
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = NEW.Monster_ID;
+
+CREATE TRIGGER trg_spirit_update_dossier AFTER UPDATE ON Spirit
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID IN (OLD.Monster_ID, NEW.Monster_ID);
+
+CREATE TRIGGER trg_spirit_delete_dossier AFTER DELETE ON Spirit
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = OLD.Monster_ID;
+
+CREATE TRIGGER trg_known_weaknesses_insert_dossier AFTER INSERT ON Known_Weaknesses
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = NEW.Monster_ID;
+
+CREATE TRIGGER trg_known_weaknesses_update_dossier AFTER UPDATE ON Known_Weaknesses
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID IN (OLD.Monster_ID, NEW.Monster_ID);
+
+CREATE TRIGGER trg_known_weaknesses_delete_dossier AFTER DELETE ON Known_Weaknesses
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = OLD.Monster_ID;
+
+CREATE TRIGGER trg_common_habitats_insert_dossier AFTER INSERT ON Common_Habitats
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = NEW.Monster_ID;
+
+CREATE TRIGGER trg_common_habitats_update_dossier AFTER UPDATE ON Common_Habitats
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID IN (OLD.Monster_ID, NEW.Monster_ID);
+
+CREATE TRIGGER trg_common_habitats_delete_dossier AFTER DELETE ON Common_Habitats
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = OLD.Monster_ID;
+
+CREATE TRIGGER trg_encounters_insert_dossier AFTER INSERT ON Encounters
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = NEW.Monster_ID;
+
+CREATE TRIGGER trg_encounters_update_dossier AFTER UPDATE ON Encounters
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID IN (OLD.Monster_ID, NEW.Monster_ID);
+
+CREATE TRIGGER trg_encounters_delete_dossier AFTER DELETE ON Encounters
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = OLD.Monster_ID;
+
+CREATE TRIGGER trg_combat_encounter_insert_dossier AFTER INSERT ON Combat_Encounter
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = NEW.Monster_ID;
+
+CREATE TRIGGER trg_combat_encounter_update_dossier AFTER UPDATE ON Combat_Encounter
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID IN (OLD.Monster_ID, NEW.Monster_ID);
+
+CREATE TRIGGER trg_combat_encounter_delete_dossier AFTER DELETE ON Combat_Encounter
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID = OLD.Monster_ID;
+
+CREATE TRIGGER trg_demigod_delete_dossier BEFORE DELETE ON Demigod
+    FOR EACH ROW DELETE FROM Monster_Dossier WHERE Monster_ID IN (
+        SELECT Monster_ID FROM Encounters WHERE Hero_ID = OLD.Hero_ID
+        UNION SELECT Monster_ID FROM Combat_Encounter WHERE Hero_ID = OLD.Hero_ID);
+
+-- Table: Report_Sketch
+-- Mergeable summaries (HyperLogLog distinct counts, t-digest quantiles) per
+-- entity per day for approximate reports; any date range is answered by
+-- merging its days. Maintained by the application (see sketches.py).
+CREATE TABLE Report_Sketch (
+    Sketch_Name VARCHAR(64) NOT NULL,
+    Sketch_Date DATE NOT NULL,
+    Entity_ID INT NOT NULL,
+    Sketch BLOB NOT NULL,
+    Item_Count INT NOT NULL,  -- Values added; an upper bound for distinct counts
+    Updated_At DATETIME NOT NULL,
+    PRIMARY KEY (Sketch_Name, Sketch_Date, Entity_ID)
+) ENGINE=InnoDB;
+
+-- Table: Sketch_Change
+-- Days whose sketches are out of date, logged by the triggers below when a
+-- sketch source row changes ('quest' or 'encounter' group). Merging a group
+-- first rebuilds its logged days and removes the entries it read. Append-only,
+-- so concurrent writers never wait on each other's entries.
+CREATE TABLE Sketch_Change (
+    Change_ID INT AUTO_INCREMENT PRIMARY KEY,
+    Sketch_Group VARCHAR(20) NOT NULL,
+    Sketch_Date DATE NULL,  -- NULL when the source row has no day; nothing to rebuild
+    INDEX idx_group (Sketch_Group, Change_ID)
+) ENGINE=InnoDB;
+
+-- Sketch change logging. FK cascades and SET NULL fire no triggers, so deletes
+-- of a Demigod, Monster or God log the days of the rows they are about to
+-- cascade into, and parent changes log the days of the affected heroes' quests.
+CREATE TRIGGER trg_encounters_insert_sketch AFTER INSERT ON Encounters
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date) VALUES ('encounter', NEW.Encounter_Date);
+
+CREATE TRIGGER trg_encounters_update_sketch AFTER UPDATE ON Encounters
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date) VALUES ('encounter', OLD.Encounter_Date), ('encounter', NEW.Encounter_Date);
+
+CREATE TRIGGER trg_encounters_delete_sketch AFTER DELETE ON Encounters
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date) VALUES ('encounter', OLD.Encounter_Date);
+
+CREATE TRIGGER trg_combat_encounter_insert_sketch AFTER INSERT ON Combat_Encounter
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date) VALUES ('encounter', DATE(NEW.Combat_Date));
+
+CREATE TRIGGER trg_combat_encounter_update_sketch AFTER UPDATE ON Combat_Encounter
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date) VALUES ('encounter', DATE(OLD.Combat_Date)), ('encounter', DATE(NEW.Combat_Date));
+
+CREATE TRIGGER trg_combat_encounter_delete_sketch AFTER DELETE ON Combat_Encounter
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date) VALUES ('encounter', DATE(OLD.Combat_Date));
+
+CREATE TRIGGER trg_quest_log_insert_sketch AFTER INSERT ON Quest_Log
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date) VALUES ('quest', (SELECT Start_Date FROM Quest WHERE Quest_ID = NEW.Quest_ID));
+
+CREATE TRIGGER trg_quest_log_update_sketch AFTER UPDATE ON Quest_Log
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date) VALUES ('quest', (SELECT Start_Date FROM Quest WHERE Quest_ID = OLD.Quest_ID)), ('quest', (SELECT Start_Date FROM Quest WHERE Quest_ID = NEW.Quest_ID));
+
+CREATE TRIGGER trg_quest_log_delete_sketch AFTER DELETE ON Quest_Log
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date) VALUES ('quest', (SELECT Start_Date FROM Quest WHERE Quest_ID = OLD.Quest_ID));
+
+CREATE TRIGGER trg_quest_update_sketch AFTER UPDATE ON Quest
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date) VALUES ('quest', OLD.Start_Date), ('quest', NEW.Start_Date);
+
+CREATE TRIGGER trg_quest_delete_sketch AFTER DELETE ON Quest
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date) VALUES ('quest', OLD.Start_Date);
+
+CREATE TRIGGER trg_demigod_update_sketch AFTER UPDATE ON Demigod
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date)
+        SELECT 'quest', q.Start_Date FROM Quest_Log ql JOIN Quest q ON ql.Quest_ID = q.Quest_ID WHERE ql.Hero_ID = NEW.Hero_ID
+        AND (OLD.Divine_Parent_ID <> NEW.Divine_Parent_ID OR (OLD.Divine_Parent_ID IS NULL) <> (NEW.Divine_Parent_ID IS NULL));
+
+CREATE TRIGGER trg_demigod_delete_sketch BEFORE DELETE ON Demigod
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date)
+        SELECT 'quest', q.Start_Date FROM Quest_Log ql JOIN Quest q ON ql.Quest_ID = q.Quest_ID WHERE ql.Hero_ID = OLD.Hero_ID
+        UNION SELECT 'encounter', Encounter_Date FROM Encounters WHERE Hero_ID = OLD.Hero_ID
+        UNION SELECT 'encounter', DATE(Combat_Date) FROM Combat_Encounter WHERE Hero_ID = OLD.Hero_ID;
+
+CREATE TRIGGER trg_monster_delete_sketch BEFORE DELETE ON Monster
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date)
+        SELECT 'encounter', Encounter_Date FROM Encounters WHERE Monster_ID = OLD.Monster_ID
+        UNION SELECT 'encounter', DATE(Combat_Date) FROM Combat_Encounter WHERE Monster_ID = OLD.Monster_ID;
+
+CREATE TRIGGER trg_god_update_sketch AFTER UPDATE ON God
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date)
+        SELECT 'quest', q.Start_Date FROM Demigod d JOIN Quest_Log ql ON d.Hero_ID = ql.Hero_ID JOIN Quest q ON ql.Quest_ID = q.Quest_ID WHERE d.Divine_Parent_ID = NEW.Divine_ID
+        AND OLD.Divine_ID <> NEW.Divine_ID;
+
+CREATE TRIGGER trg_god_delete_sketch BEFORE DELETE ON God
+    FOR EACH ROW INSERT INTO Sketch_Change (Sketch_Group, Sketch_Date)
+        SELECT 'quest', q.Start_Date FROM Demigod d JOIN Quest_Log ql ON d.Hero_ID = ql.Hero_ID JOIN Quest q ON ql.Quest_ID = q.Quest_ID WHERE d.Divine_Parent_ID = OLD.Divine_ID;
+
+-- =====================================================
+-- WRITE JOURNAL
+-- =====================================================
+
+-- Table: Journal_Applied
+-- Idempotency keys of writes replayed from the application's local write
+-- journal (see write_journal.py). A key is inserted in the same transaction
+-- as its write, so a write that committed just before a crash is recognised
+-- on replay instead of being applied twice. Purged after a week.
+CREATE TABLE Journal_Applied (
+    Idempotency_Key CHAR(32) PRIMARY KEY,
+    Operation VARCHAR(64) NOT NULL,
+    Result VARCHAR(255),  -- The write's result (e.g. a new Hero_ID), returned on a repeat replay
+    Applied_At DATETIME NOT NULL,
+    INDEX idx_applied_at (Applied_At)
+) ENGINE=InnoDB;
+
+-- =====================================================
+-- CHANGE TRACKING
+-- =====================================================
+
+-- Table: Table_Version_Slot
+-- Per-table change counters bumped by triggers on every write. Each table's
+-- counter is split over 16 slots and a write bumps the slot of its
+-- connection (CONNECTION_ID() % 16), so concurrent writers to one table
+-- rarely wait on the same row. A table's version is the sum of its slots.
+-- Readers (e.g. the live dashboard) compare versions to decide what to re-query.
+CREATE TABLE Table_Version_Slot (
+    Table_Name VARCHAR(64) NOT NULL,
+    Slot INT NOT NULL,
+    Version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    PRIMARY KEY (Table_Name, Slot)
+) ENGINE=InnoDB;
+
+INSERT INTO Table_Version_Slot (Table_Name, Slot)
+WITH RECURSIVE slots (Slot) AS (SELECT 0 UNION ALL SELECT Slot + 1 FROM slots WHERE Slot < 15)
+SELECT t.Table_Name, s.Slot
+FROM (SELECT 'God' AS Table_Name
+      UNION ALL SELECT 'Olympian'
+      UNION ALL SELECT 'Chthonic_God'
+      UNION ALL SELECT 'Primordial'
+      UNION ALL SELECT 'Demigod'
+      UNION ALL SELECT 'Monster'
+      UNION ALL SELECT 'Beast'
+      UNION ALL SELECT 'Titan'
+      UNION ALL SELECT 'Spirit'
+      UNION ALL SELECT 'Quest'
+      UNION ALL SELECT 'Divine_Artifact'
+      UNION ALL SELECT 'Encounters'
+      UNION ALL SELECT 'Combat_Encounter'
+      UNION ALL SELECT 'Sighting_Log') t
+CROSS JOIN slots s;
+
+-- FK cascades do not fire triggers, so deletes on a parent table also bump
+-- the counters of child tables whose rows they cascade into.
+
+CREATE TRIGGER trg_god_insert_version AFTER INSERT ON God
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'God' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_god_update_version AFTER UPDATE ON God
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'God' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_god_delete_version AFTER DELETE ON God
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name IN ('God', 'Olympian', 'Chthonic_God', 'Primordial') AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_olympian_insert_version AFTER INSERT ON Olympian
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Olympian' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_olympian_update_version AFTER UPDATE ON Olympian
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Olympian' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_olympian_delete_version AFTER DELETE ON Olympian
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Olympian' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_chthonic_god_insert_version AFTER INSERT ON Chthonic_God
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Chthonic_God' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_chthonic_god_update_version AFTER UPDATE ON Chthonic_God
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Chthonic_God' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_chthonic_god_delete_version AFTER DELETE ON Chthonic_God
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Chthonic_God' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_primordial_insert_version AFTER INSERT ON Primordial
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Primordial' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_primordial_update_version AFTER UPDATE ON Primordial
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Primordial' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_primordial_delete_version AFTER DELETE ON Primordial
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Primordial' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_demigod_insert_version AFTER INSERT ON Demigod
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Demigod' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_demigod_update_version AFTER UPDATE ON Demigod
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Demigod' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_demigod_delete_version AFTER DELETE ON Demigod
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name IN ('Demigod', 'Encounters', 'Combat_Encounter', 'Sighting_Log') AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_monster_insert_version AFTER INSERT ON Monster
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Monster' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_monster_update_version AFTER UPDATE ON Monster
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Monster' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_monster_delete_version AFTER DELETE ON Monster
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name IN ('Monster', 'Encounters', 'Combat_Encounter', 'Beast', 'Titan', 'Spirit', 'Sighting_Log') AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_beast_insert_version AFTER INSERT ON Beast
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Beast' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_beast_update_version AFTER UPDATE ON Beast
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Beast' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_beast_delete_version AFTER DELETE ON Beast
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Beast' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_titan_insert_version AFTER INSERT ON Titan
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Titan' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_titan_update_version AFTER UPDATE ON Titan
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Titan' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_titan_delete_version AFTER DELETE ON Titan
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Titan' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_spirit_insert_version AFTER INSERT ON Spirit
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Spirit' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_spirit_update_version AFTER UPDATE ON Spirit
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Spirit' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_spirit_delete_version AFTER DELETE ON Spirit
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Spirit' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_quest_insert_version AFTER INSERT ON Quest
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Quest' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_quest_update_version AFTER UPDATE ON Quest
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Quest' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_quest_delete_version AFTER DELETE ON Quest
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name IN ('Quest', 'Combat_Encounter') AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_divine_artifact_insert_version AFTER INSERT ON Divine_Artifact
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Divine_Artifact' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_divine_artifact_update_version AFTER UPDATE ON Divine_Artifact
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Divine_Artifact' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_divine_artifact_delete_version AFTER DELETE ON Divine_Artifact
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name IN ('Divine_Artifact', 'Combat_Encounter') AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_encounters_insert_version AFTER INSERT ON Encounters
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Encounters' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_encounters_update_version AFTER UPDATE ON Encounters
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Encounters' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_encounters_delete_version AFTER DELETE ON Encounters
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Encounters' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_combat_encounter_insert_version AFTER INSERT ON Combat_Encounter
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Combat_Encounter' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_combat_encounter_update_version AFTER UPDATE ON Combat_Encounter
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Combat_Encounter' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_combat_encounter_delete_version AFTER DELETE ON Combat_Encounter
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Combat_Encounter' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_sighting_log_insert_version AFTER INSERT ON Sighting_Log
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Sighting_Log' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_sighting_log_update_version AFTER UPDATE ON Sighting_Log
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Sighting_Log' AND Slot = CONNECTION_ID() % 16;
+
+CREATE TRIGGER trg_sighting_log_delete_version AFTER DELETE ON Sighting_Log
+    FOR EACH ROW UPDATE Table_Version_Slot SET Version = Version + 1
+    WHERE Table_Name = 'Sighting_Log' AND Slot = CONNECTION_ID() % 16;
+
+-- =====================================================
+-- SCHEMA VERSIONS
+-- =====================================================
+
+-- Table: Schema_Migration
+-- Versions of migrations.py applied to this database. A database created
+-- from this script already has every change; 'migrations.py migrate' finds
+-- them present and only records the versions.
+CREATE TABLE Schema_Migration (
+    Version INT PRIMARY KEY,
+    Name VARCHAR(100) NOT NULL,
+    Checksum CHAR(16) NOT NULL,  -- Of the migration's steps, to spot edits after release
+    Applied_At DATETIME NOT NULL,
+    Duration_Ms INT NOT NULL
+) ENGINE=InnoDB;
+
 -- =====================================================
 -- END OF SCHEMA
 -- =====================================================
@@ -0,0 +1,651 @@
+"""
+The Olympian Codex Database - Hero Sharding
+Team 42: RNA
+
+Splits the hero-centric tables across several databases by Hero_ID:
+
+    Demigod, Known_Abilities, Quest_Log, Encounters, Combat_Encounter,
+    Rescue_Mission, Hero_Profile
+
+A hero and every row keyed by it live on exactly one shard, chosen by a
+shard map (Hero_ID modulo the shard count, or Hero_ID ranges). All other
+tables (God, Monster, Divine_Artifact, Quest, Prophecy, ...) are small
+dimension tables replicated on every shard, so hero-side joins stay local.
+Quest and Prophecy are replicated as well: a quest's participants can live
+on any shard.
+
+ShardedDatabase routes hero-keyed reads and writes to the owning shard,
+applies writes to replicated tables on every shard, and runs cross-shard
+queries scatter-gather: the same partial aggregate runs on every shard in
+parallel and the partials are merged here. Counts and sums add up across
+shards, and so do distinct counts of heroes (a hero is on one shard only);
+distinct counts of replicated keys such as quests are merged as sets.
+
+Replicated tables cannot hold foreign keys to Demigod rows on other shards
+(Divine_Artifact.Current_Wielder, Sighting_Log.Reported_By,
+Artifact_Ownership.Hero_ID). Those keys are dropped and their ON DELETE SET
+NULL is applied by delete_hero() on every shard.
+
+Each shard starts as a full copy of the database (restore the same dump on
+every instance); 'prepare' drops the cross-shard keys and deletes the heroes
+the shard does not own. 'check' builds embedded SQLite stand-ins from the
+sample data and compares the sharded reports with a single database.
+
+Usage:
+    python sharding.py --user root --shard db1/olympian_codex_db --shard db2/olympian_codex_db status
+    python sharding.py --user root --shard db1:3306/olympian_codex_db --shard db2:3307/olympian_codex_db prepare [--dry-run]
+    python sharding.py --user root --shard ... --bounds 5000 report
+    python sharding.py check [--shards 3] [--bounds 4,8] [--backend duckdb]
+"""
+
+import argparse
+import getpass
+import os
+import re
+import sys
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, ROUND_HALF_UP
+
+import pymysql
+
+from backends import (MySQLBackend, POPULATE_PATH, SCHEMA_PATH, create_backend, load_sql_files,
+                      run_sql_script, split_sql_script)
+
+# Tables keyed by Hero_ID, split across shards (Demigod last: children are pruned first)
+HERO_TABLES = ('Known_Abilities', 'Quest_Log', 'Encounters', 'Combat_Encounter',
+               'Rescue_Mission', 'Hero_Profile', 'Demigod')
+
+# Replicated tables referencing heroes on any shard: (table, column, ON DELETE action)
+HERO_REFERENCES = [
+    ('Divine_Artifact', 'Current_Wielder', 'SET NULL'),
+    ('Sighting_Log', 'Reported_By', 'SET NULL'),
+    ('Artifact_Ownership', 'Hero_ID', 'SET NULL'),
+]
+
+# Preview length of quest objectives in the reports (main_app.TEXT_PREVIEW_CHARS)
+PREVIEW_CHARS = 80
+
+# Attempts at inserting a hero before giving up on Hero_ID collisions
+HERO_ID_RETRIES = 5
+
+# =====================================================
+# SHARD MAPS
+# =====================================================
+
+class HashShardMap:
+    """Hero_ID modulo the shard count: sequential ids spread round-robin."""
+
+    def __init__(self, count):
+        if count < 1:
+            raise ValueError("a shard map needs at least one shard")
+        self.count = int(count)
+
+    def shard_of(self, hero_id):
+        return int(hero_id) % self.count
+
+    def predicate(self, shard):
+        """SQL condition selecting the Hero_IDs a shard owns."""
+        return f"Hero_ID % {self.count} = {int(shard)}"
+
+    def __repr__(self):
+        return f"HashShardMap({self.count})"
+
+class RangeShardMap:
+    """
+    Hero_ID ranges split at ascending bounds: shard 0 holds ids below
+    bounds[0], shard i ids in [bounds[i-1], bounds[i]), the last shard the
+    rest. New heroes take the highest ids, so they all land on the last shard
+    until it is split.
+    """
+
+    def __init__(self, bounds):
+        bounds = [int(bound) for bound in bounds]
+        if bounds != sorted(set(bounds)):
+            raise ValueError(f"range bounds must be strictly ascending: {bounds}")
+        self.bounds = bounds
+        self.count = len(bounds) + 1
+
+    def shard_of(self, hero_id):
+        return bisect_right(self.bounds, int(hero_id))
+
+    def predicate(self, shard):
+        shard = int(shard)
+        conditions = []
+        if shard > 0:
+            conditions.append(f"Hero_ID >= {self.bounds[shard - 1]}")
+        if shard < len(self.bounds):
+            conditions.append(f"Hero_ID < {self.bounds[shard]}")
+        return " AND ".join(conditions) or "1 = 1"
+
+    def __repr__(self):
+        return f"RangeShardMap({self.bounds})"
+
+def make_shard_map(count, bounds=None):
+    """A RangeShardMap when bounds are given (count must agree), else a HashShardMap."""
+    if not bounds:
+        return HashShardMap(count)
+    shard_map = RangeShardMap(bounds)
+    if count is not None and shard_map.count != count:
+        raise ValueError(f"{len(shard_map.bounds)} bound(s) make {shard_map.count} shards, not {count}")
+    return shard_map
+
+# =====================================================
+# SHARDED DATABASE
+# =====================================================
+
+class ShardedDatabase:
+    """
+    One connection per shard plus the shard map routing Hero_IDs to them.
+    Like a single connection, an instance is used by one thread at a time;
+    it runs its own threads only to query shards in parallel.
+    """
+
+    def __init__(self, connections, shard_map):
+        if len(connections) != shard_map.count:
+            raise ValueError(f"{shard_map!r} needs {shard_map.count} connection(s), got {len(connections)}")
+        self.connections = list(connections)
+        self.shard_map = shard_map
+        self._pool = ThreadPoolExecutor(max_workers=len(self.connections), thread_name_prefix="shard")
+
+    def close(self):
+        self._pool.shutdown()
+        for connection in self.connections:
+            connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---- routing ----
+
+    def shard_for(self, hero_id):
+        return self.shard_map.shard_of(hero_id)
+
+    def connection_for(self, hero_id):
+        return self.connections[self.shard_for(hero_id)]
+
+    def group_by_shard(self, hero_ids):
+        """{shard: [hero ids it owns]} for the given ids."""
+        groups = {}
+        for hero_id in hero_ids:
+            groups.setdefault(self.shard_for(hero_id), []).append(hero_id)
+        return groups
+
+    # ---- writes ----
+
+    def _transaction(self, connection, work):
+        try:
+            with connection.cursor() as cursor:
+                result = work(cursor)
+            connection.commit()
+            return result
+        except Exception:
+            connection.rollback()
+            raise
+
+    def hero_transaction(self, hero_id, work):
+        """Run work(cursor) in one transaction on the shard owning hero_id; returns its result."""
+        return self._transaction(self.connection_for(hero_id), work)
+
+    def replicated_transaction(self, work):
+        """
+        Apply a write to the replicated tables on every shard: work(cursor)
+        runs on each shard, and all shards commit only if it succeeded on all
+        of them. The commits themselves are not atomic across shards; a shard
+        failing at commit time is left behind and reported by the error.
+        Returns the per-shard results.
+        """
+        results = []
+        try:
+            for connection in self.connections:
+                with connection.cursor() as cursor:
+                    results.append(work(cursor))
+        except Exception:
+            for connection in self.connections:
+                connection.rollback()
+            raise
+        for connection in self.connections:
+            connection.commit()
+        return results
+
+    def allocate_hero_id(self):
+        """The next Hero_ID across all shards (callers retry on a duplicate key)."""
+        partials = self.scatter("SELECT MAX(Hero_ID) as Max_ID FROM Demigod")
+        return max((rows[0]['Max_ID'] or 0 for rows in partials if rows), default=0) + 1
+
+    def insert_demigod(self, values):
+        """
+        Insert a Demigod row ({column: value}, without Hero_ID) on the shard its
+        new Hero_ID maps to. The id decides the shard, so two writers taking the
+        same id collide on one shard's primary key; the loser takes the next id.
+        Returns the Hero_ID.
+        """
+        columns = ['Hero_ID'] + list(values)
+        sql = (f"INSERT INTO Demigod ({', '.join(columns)}) "
+               f"VALUES ({', '.join(['%s'] * len(columns))})")
+        for attempt in range(HERO_ID_RETRIES):
+            hero_id = self.allocate_hero_id()
+            try:
+                self.hero_transaction(hero_id, lambda cursor: cursor.execute(sql, [hero_id, *values.values()]))
+                return hero_id
+            except pymysql.err.IntegrityError as e:
+                if e.args[0] != 1062 or attempt == HERO_ID_RETRIES - 1:
+                    raise
+
+    def delete_hero(self, hero_id):
+        """
+        Delete a hero: the owning shard cascades to its hero-keyed rows, then
+        every shard applies ON DELETE SET NULL to the replicated references.
+        Returns True if the hero existed.
+        """
+        deleted = self.hero_transaction(
+            hero_id, lambda cursor: cursor.execute("DELETE FROM Demigod WHERE Hero_ID = %s", (hero_id,))
+        )
+        if deleted:
+            def detach(cursor):
+                for table, column, _ in HERO_REFERENCES:
+                    cursor.execute(f"UPDATE {table} SET {column} = NULL WHERE {column} = %s", (hero_id,))
+            self.replicated_transaction(detach)
+        return bool(deleted)
+
+    # ---- reads ----
+
+    def _read(self, connection, sql, params):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        finally:
+            # End the read transaction so the next scatter sees fresh data
+            connection.commit()
+
+    def scatter(self, sql, params=(), shards=None):
+        """Run a read on every shard (or the given ones) in parallel; one row list per shard."""
+        shards = range(len(self.connections)) if shards is None else list(shards)
+        futures = [self._pool.submit(self._read, self.connections[shard], sql, params) for shard in shards]
+        return [future.result() for future in futures]
+
+    def gather(self, sql, params=(), shards=None):
+        """scatter() with the shards' rows concatenated."""
+        return [row for rows in self.scatter(sql, params, shards) for row in rows]
+
+    def query_heroes(self, sql, hero_ids, params=()):
+        """
+        Run a hero-keyed read only on the shards owning the given heroes. The
+        SQL has an {ids} slot for the IN list of each shard's heroes, e.g.
+        "SELECT * FROM Known_Abilities WHERE Hero_ID IN ({ids})"; params
+        come after the ids.
+        """
+        groups = self.group_by_shard(hero_ids)
+        futures = [
+            self._pool.submit(self._read, self.connections[shard],
+                              sql.format(ids=', '.join(['%s'] * len(ids))), (*ids, *params))
+            for shard, ids in groups.items()
+        ]
+        return [row for future in futures for row in future.result()]
+
+# =====================================================
+# MERGE-SIDE AGGREGATION
+# =====================================================
+
+def merge_grouped(rows, keys, sums=(), distinct=()):
+    """
+    Fold per-shard partial aggregates: rows with equal `keys` become one dict.
+    `sums` columns are added up (COUNT/SUM partials, and COUNT(DISTINCT
+    Hero_ID), which never overlaps across shards); `distinct` columns hold one
+    value per row and are collected into sets. Other columns keep the first
+    row's value. Groups come back in first-seen order.
+    """
+    groups = {}
+    for row in rows:
+        key = tuple(row[column] for column in keys)
+        merged = groups.get(key)
+        if merged is None:
+            merged = groups[key] = dict(row.items())
+            for column in sums:
+                merged[column] = 0
+            for column in distinct:
+                merged[column] = set()
+        for column in sums:
+            merged[column] += int(row[column] or 0)
+        for column in distinct:
+            if row[column] is not None:
+                merged[column].add(row[column])
+    return list(groups.values())
+
+def percentage(part, total):
+    """part / total as a percentage rounded like MySQL's ROUND(x, 2)."""
+    if not total:
+        return 0.0
+    return float((Decimal(part) * 100 / Decimal(total)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+# =====================================================
+# SHARDED REPORTS
+# =====================================================
+
+_QUEST_PARENT_JOINS = """
+    FROM God g
+    JOIN Demigod d ON g.Divine_ID = d.Divine_Parent_ID
+    JOIN Quest_Log ql ON d.Hero_ID = ql.Hero_ID
+    JOIN Quest q ON ql.Quest_ID = q.Quest_ID
+"""
+
+def report_quests_by_divine_parent(db, preview_chars=PREVIEW_CHARS):
+    """
+    Analysis Report 1 over all shards. Hero counts and participation sums add
+    up per god; the god's distinct quests and objectives are merged as sets.
+    """
+    totals = merge_grouped(db.gather(f"""
+        SELECT
+            g.Divine_ID,
+            g.Name as Divine_Parent,
+            g.Domain,
+            COUNT(DISTINCT d.Hero_ID) as Children_Participated,
+            SUM(CASE WHEN q.Outcome = 'Success' THEN 1 ELSE 0 END) as Successful_Quests
+        {_QUEST_PARENT_JOINS}
+        GROUP BY g.Divine_ID, g.Name, g.Domain
+    """), keys=('Divine_ID',), sums=('Children_Participated', 'Successful_Quests'))
+    quests = {
+        row['Divine_ID']: row for row in merge_grouped(db.gather(f"""
+            SELECT DISTINCT g.Divine_ID, q.Quest_ID, LEFT(q.Objective, %s) as Objective
+            {_QUEST_PARENT_JOINS}
+        """, (preview_chars,)), keys=('Divine_ID',), distinct=('Quest_ID', 'Objective'))
+    }
+    results = []
+    for row in totals:
+        god_quests = quests[row['Divine_ID']]
+        results.append({
+            'Divine_Parent': row['Divine_Parent'],
+            'Domain': row['Domain'],
+            'Total_Quests': len(god_quests['Quest_ID']),
+            'Children_Participated': row['Children_Participated'],
+            'Successful_Quests': row['Successful_Quests'],
+            'Quest_Objectives': ' | '.join(sorted(god_quests['Objective'])),
+        })
+    results.sort(key=lambda row: (-row['Total_Quests'], -row['Successful_Quests']))
+    return results
+
+def report_demigod_artifact_success_rate(db, monster_species=None):
+    """
+    Analysis Report 2 over all shards. Per-hero groups are shard-local and
+    only re-sorted; per-species groups add up their encounter counts.
+    """
+    victories = "SUM(CASE WHEN ce.Result = 'Hero Victory' THEN 1 ELSE 0 END)"
+    if monster_species:
+        results = [dict(row.items()) for row in db.gather(f"""
+            SELECT
+                CONCAT(d.First_Name, ' ', d.Last_Name) as Demigod_Name,
+                a.Name as Artifact_Used,
+                m.Species as Monster_Species,
+                COUNT(*) as Total_Encounters,
+                {victories} as Victories
+            FROM Combat_Encounter ce
+            JOIN Demigod d ON ce.Hero_ID = d.Hero_ID
+            JOIN Divine_Artifact a ON ce.Artifact_ID = a.Artifact_ID
+            JOIN Monster m ON ce.Monster_ID = m.Monster_ID
+            WHERE m.Species = %s
+            GROUP BY d.Hero_ID, d.First_Name, d.Last_Name, a.Artifact_ID, a.Name, m.Species
+        """, (monster_species,))]
+        order = lambda row: (-row['Success_Rate_Percentage'], -row['Total_Encounters'])
+    else:
+        results = merge_grouped(db.gather(f"""
+            SELECT
+                m.Species as Monster_Species,
+                a.Artifact_ID,
+                a.Name as Artifact_Used,
+                COUNT(*) as Total_Encounters,
+                {victories} as Victories
+            FROM Combat_Encounter ce
+            JOIN Divine_Artifact a ON ce.Artifact_ID = a.Artifact_ID
+            JOIN Monster m ON ce.Monster_ID = m.Monster_ID
+            GROUP BY m.Species, a.Artifact_ID, a.Name
+        """), keys=('Monster_Species', 'Artifact_ID'), sums=('Total_Encounters', 'Victories'))
+        for row in results:
+            del row['Artifact_ID']
+        order = lambda row: (row['Monster_Species'], -row['Success_Rate_Percentage'])
+    for row in results:
+        row['Total_Encounters'] = int(row['Total_Encounters'] or 0)
+        row['Victories'] = int(row['Victories'] or 0)
+        row['Success_Rate_Percentage'] = percentage(row['Victories'], row['Total_Encounters'])
+    results.sort(key=order)
+    return results
+
+def report_prophecy_monster_correlation(db):
+    """Analysis Report 3 over all shards: encounter counts per prophecy, quest and species add up."""
+    results = merge_grouped(db.gather("""
+        SELECT
+            p.Prophecy_ID,
+            LEFT(p.Full_Text, 100) as Prophecy_Text,
+            p.Status as Prophecy_Status,
+            q.Quest_ID,
+            LEFT(q.Objective, 100) as Quest_Objective,
+            m.Species as Monster_Species,
+            m.Threat_Level,
+            COUNT(*) as Encounter_Count
+        FROM Prophecy p
+        JOIN Quest q ON p.Prophecy_ID = q.Prophecy_ID
+        JOIN Combat_Encounter ce ON q.Quest_ID = ce.Quest_ID
+        JOIN Monster m ON ce.Monster_ID = m.Monster_ID
+        GROUP BY p.Prophecy_ID, Prophecy_Text, p.Status, q.Quest_ID, Quest_Objective, m.Species, m.Threat_Level
+    """), keys=('Prophecy_ID', 'Quest_ID', 'Monster_Species', 'Threat_Level'), sums=('Encounter_Count',))
+    for row in results:
+        del row['Quest_ID']
+    results.sort(key=lambda row: (row['Prophecy_ID'], -row['Encounter_Count']))
+    return results
+
+SHARDED_REPORTS = {
+    'quests_by_divine_parent': report_quests_by_divine_parent,
+    'artifact_success_rate': report_demigod_artifact_success_rate,
+    'prophecy_monster_correlation': report_prophecy_monster_correlation,
+}
+
+# =====================================================
+# SHARD PREPARATION
+# =====================================================
+
+def prune_statements(shard_map, shard):
+    """DELETEs removing the heroes (and their rows) a shard does not own."""
+    return [f"DELETE FROM {table} WHERE NOT ({shard_map.predicate(shard)})" for table in HERO_TABLES]
+
+def shard_row_counts(db):
+    """{table: [row count per shard]} for the hero tables."""
+    counts = {}
+    for table in reversed(HERO_TABLES):
+        partials = db.scatter(f"SELECT COUNT(*) as count FROM {table}")
+        counts[table] = [int(rows[0]['count']) for rows in partials]
+    return counts
+
+def strip_hero_references(script):
+    """schema.sql without the foreign keys from replicated tables to Demigod, as one script."""
+    statements = []
+    for statement in split_sql_script(script):
+        table = re.match(r"^CREATE\s+TABLE\s+(\w+)", statement, re.IGNORECASE)
+        for referencing, column, _ in HERO_REFERENCES:
+            if table and table.group(1) == referencing:
+                statement = re.sub(
+                    rf",\s*FOREIGN\s+KEY\s*\(\s*{column}\s*\)\s*REFERENCES\s+Demigod\s*\(\s*\w+\s*\)"
+                    r"(?:\s+ON\s+(?:DELETE|UPDATE)\s+(?:SET\s+NULL|CASCADE|RESTRICT|NO\s+ACTION))*",
+                    "", statement, flags=re.IGNORECASE
+                )
+        statements.append(statement)
+    return ";\n".join(statements)
+
+def open_embedded_shards(shard_map, kind='sqlite', directory=None):
+    """
+    Embedded stand-ins for the shard instances: each one loads the schema
+    (without cross-shard keys) and the sample data, then drops the heroes it
+    does not own. In memory unless a directory is given; existing shard files
+    there are reused as they are.
+    """
+    connections = []
+    for shard in range(shard_map.count):
+        path = os.path.join(directory, f"shard_{shard}.{kind}") if directory else ':memory:'
+        backend = create_backend(kind, path=path)
+        connection = backend.connect()
+        if not backend.is_loaded(connection):
+            if kind == 'sqlite':
+                # Load and prune without cascades; the kept rows are consistent again afterwards
+                connection.raw.execute("PRAGMA foreign_keys = OFF")
+                with open(SCHEMA_PATH, encoding='utf-8') as f:
+                    run_sql_script(connection, strip_hero_references(f.read()))
+                load_sql_files(connection, [POPULATE_PATH])
+            else:
+                # DuckDB copies carry no foreign keys at all
+                backend.load(connection)
+            with connection.cursor() as cursor:
+                for statement in prune_statements(shard_map, shard):
+                    cursor.execute(statement)
+            connection.commit()
+            if kind == 'sqlite':
+                connection.raw.execute("PRAGMA foreign_keys = ON")
+        connections.append(connection)
+    return ShardedDatabase(connections, shard_map)
+
+def prepare_shard_ddl(connection):
+    """
+    Statements turning a full MySQL copy into a shard's schema: drop the
+    replicated tables' foreign keys to Demigod, and if Sighting_Log is
+    partitioned, re-create partition_manager's key triggers without its
+    Reported_By check.
+    """
+    from partition_manager import EVENT_REFERENCES, list_partitions, referential_trigger_ddl
+
+    statements = []
+    with connection.cursor() as cursor:
+        for table, column, _ in HERO_REFERENCES:
+            cursor.execute("""
+                SELECT CONSTRAINT_NAME
+                FROM information_schema.KEY_COLUMN_USAGE
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+                    AND REFERENCED_TABLE_NAME = 'Demigod'
+            """, (table, column))
+            statements.extend(f"ALTER TABLE {table} DROP FOREIGN KEY {row['CONSTRAINT_NAME']}"
+                              for row in cursor.fetchall())
+    if list_partitions(connection, 'Sighting_Log'):
+        local = [reference for reference in EVENT_REFERENCES
+                 if reference[2] != 'Demigod' or reference[0] in HERO_TABLES]
+        statements.extend(referential_trigger_ddl(local))
+    return statements
+
+def prepare_shard(connection, shard_map, shard, dry_run=False):
+    """Turn a full copy into shard `shard`; returns the statements (not run on a dry run)."""
+    statements = prepare_shard_ddl(connection) + prune_statements(shard_map, shard)
+    if not dry_run:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        connection.commit()
+    return statements
+
+# =====================================================
+# CONSISTENCY CHECK
+# =====================================================
+
+def _normalized(rows):
+    """A report as a multiset of rows (order-free; GROUP_CONCAT lists compared as sets)."""
+    normalized = Counter()
+    for row in rows:
+        items = []
+        for column, value in sorted(row.items()):
+            if column == 'Quest_Objectives' and value is not None:
+                value = frozenset(value.split(' | '))
+            items.append((column, value))
+        normalized[tuple(items)] += 1
+    return normalized
+
+def check_sharding(shard_map, kind='sqlite'):
+    """
+    Build embedded shards and a single reference database from the sample
+    data and compare hero placement and every sharded report. Returns a list
+    of problems (empty when consistent).
+    """
+    problems = []
+    with open_embedded_shards(HashShardMap(1), kind) as single, open_embedded_shards(shard_map, kind) as db:
+        expected = shard_row_counts(single)
+        for table, counts in shard_row_counts(db).items():
+            if sum(counts) != expected[table][0]:
+                problems.append(f"{table}: {sum(counts)} row(s) across shards, {expected[table][0]} unsharded")
+        for shard, rows in enumerate(db.scatter("SELECT Hero_ID FROM Demigod")):
+            misplaced = [row['Hero_ID'] for row in rows if db.shard_for(row['Hero_ID']) != shard]
+            if misplaced:
+                problems.append(f"shard {shard} holds heroes it does not own: {misplaced}")
+
+        species = [row['Species'] for row in single.gather("SELECT DISTINCT Species FROM Monster")]
+        cases = [(name, ()) for name in SHARDED_REPORTS]
+        cases += [('artifact_success_rate', (name,)) for name in species]
+        for name, args in cases:
+            report = SHARDED_REPORTS[name]
+            if _normalized(report(db, *args)) != _normalized(report(single, *args)):
+                problems.append(f"{name}{args or ''}: sharded result differs from the single database")
+    return problems
+
+# =====================================================
+# COMMAND LINE
+# =====================================================
+
+def _parse_shard(spec):
+    """HOST[:PORT]/DATABASE"""
+    match = re.match(r"^([^:/]+)(?::(\d+))?/(\w+)$", spec)
+    if not match:
+        raise argparse.ArgumentTypeError(f"expected HOST[:PORT]/DATABASE, got {spec!r}")
+    host, port, database = match.groups()
+    return host, int(port) if port else 3306, database
+
+def _parse_bounds(text):
+    return [int(bound) for bound in text.split(',') if bound.strip()]
+
+def _print_rows(rows):
+    for row in rows:
+        print("    " + ", ".join(f"{column}={value}" for column, value in row.items()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Shard the Olympian Codex hero tables by Hero_ID.")
+    parser.add_argument("command", choices=["status", "prepare", "report", "check"])
+    parser.add_argument("--shard", action="append", type=_parse_shard, default=[],
+                        help="A MySQL shard as HOST[:PORT]/DATABASE, in shard order (repeat per shard)")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password")
+    parser.add_argument("--bounds", type=_parse_bounds,
+                        help="Comma-separated Hero_ID range bounds (default: Hero_ID modulo the shard count)")
+    parser.add_argument("--shards", type=int, default=3, help="Embedded shard count for 'check'")
+    parser.add_argument("--backend", choices=["sqlite", "duckdb"], default="sqlite",
+                        help="Embedded engine for 'check'")
+    parser.add_argument("--dry-run", action="store_true", help="Print what 'prepare' would run without running it")
+    args = parser.parse_args()
+
+    if args.command == "check":
+        shard_map = make_shard_map(None if args.bounds else args.shards, args.bounds)
+        problems = check_sharding(shard_map, args.backend)
+        for problem in problems:
+            print(f"FAIL {problem}")
+        print(f"{shard_map!r} on {args.backend}: {'OK' if not problems else f'{len(problems)} problem(s)'}")
+        sys.exit(1 if problems else 0)
+
+    if not args.shard:
+        parser.error(f"'{args.command}' needs at least one --shard")
+    shard_map = make_shard_map(len(args.shard), args.bounds)
+    password = args.password if args.password is not None else getpass.getpass("MySQL password: ")
+    connections = [MySQLBackend(host, args.user, password, database, port=port).connect()
+                   for host, port, database in args.shard]
+    with ShardedDatabase(connections, shard_map) as db:
+        if args.command == "status":
+            print(f"{shard_map!r}")
+            for table, counts in shard_row_counts(db).items():
+                print(f"{table:<18} " + "  ".join(f"shard {i}: {count}" for i, count in enumerate(counts)))
+        elif args.command == "prepare":
+            for shard, connection in enumerate(db.connections):
+                print(f"-- shard {shard} ({args.shard[shard][0]}/{args.shard[shard][2]})")
+                for statement in prepare_shard(connection, shard_map, shard, args.dry_run):
+                    print(statement + ";")
+        else:
+            for name, report in SHARDED_REPORTS.items():
+                rows = report(db)
+                print(f"{name}: {len(rows)} row(s)")
+                _print_rows(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+The Olympian Codex Database - Text Similarity
+Team 42: RNA
+
+MinHash / LSH index for finding near-identical texts (e.g. re-issued
+prophecies) without comparing every pair.
+
+Each text is reduced to its set of character shingles (SHINGLE_CHARS-long
+substrings of the normalized text). A MinHash signature keeps, for each of
+NUM_PERM hash functions, the smallest hash over the shingles; the share of
+equal positions in two signatures estimates the Jaccard similarity of
+their shingle sets.
+
+Signatures are cut into BANDS bands. Texts sharing any band land in the
+same bucket and become candidates, so a lookup only compares a handful of
+signatures. With 32 bands of 4 rows, pairs at 0.4 similarity are found
+~87% of the time and pairs at 0.7 or more nearly always.
+"""
+
+import re
+import zlib
+
+import numpy as np
+
+SHINGLE_CHARS = 5
+NUM_PERM = 128
+BANDS = 32
+
+_SHIFT = np.uint64(32)
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+def shingles(text, size=SHINGLE_CHARS):
+    """Distinct character shingles of the case-folded text with punctuation removed."""
+    text = " ".join(_NON_WORD.sub(" ", str(text).casefold()).split())
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+def jaccard(a, b):
+    """Exact Jaccard similarity of two sets."""
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+class MinHashIndex:
+    """LSH index over MinHash signatures of texts keyed by integer ids."""
+
+    __slots__ = ('num_perm', 'bands', '_a', '_b', '_signatures', '_buckets')
+
+    def __init__(self, entries=(), num_perm=NUM_PERM, bands=BANDS, seed=42):
+        """Bulk-build from (id, text) pairs."""
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: h(x) = ((a * x + b) mod 2^64) >> 32 with odd a,
+        # so uint64 wrap-around does the modulo
+        self._a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self._signatures = {}
+        self._buckets = [{} for _ in range(bands)]
+        entries = [(entity_id, text) for entity_id, text in entries if text is not None]
+        for (entity_id, _), signature in zip(entries, self.signatures(text for _, text in entries)):
+            self._insert(entity_id, signature)
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, entity_id):
+        return entity_id in self._signatures
+
+    def signature(self, text):
+        """MinHash signature of a text: NUM_PERM uint32 minima."""
+        return self.signatures([text])[0]
+
+    def signatures(self, texts, chunk_shingles=1 << 16):
+        """
+        Signatures of many texts, hashed in chunks of concatenated shingles so
+        a bulk build costs a few large array operations instead of one per text.
+        """
+        hashed = [np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles(text)), dtype=np.uint64)
+                  for text in texts]
+        result = np.full((len(hashed), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        start = 0
+        while start < len(hashed):
+            # Whole texts per chunk, at least one
+            end, size = start, 0
+            while end < len(hashed) and (end == start or size + len(hashed[end]) <= chunk_shingles):
+                size += len(hashed[end])
+                end += 1
+            rows = [i for i in range(start, end) if len(hashed[i])]
+            if rows:
+                hashes = np.concatenate([hashed[i] for i in rows])
+                offsets = np.cumsum([0] + [len(hashed[i]) for i in rows[:-1]])
+                values = (np.outer(self._a, hashes) + self._b[:, None]) >> _SHIFT
+                result[rows] = np.minimum.reduceat(values, offsets, axis=1).T
+            start = end
+        return result
+
+    def _band_keys(self, signature):
+        rows = self.num_perm // self.bands
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+
+    def add(self, entity_id, text):
+        """Index a text, replacing any earlier text for the id."""
+        self.remove(entity_id)
+        self._insert(entity_id, self.signature(text))
+
+    def _insert(self, entity_id, signature):
+        self._signatures[entity_id] = signature
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(key, set()).add(entity_id)
+
+    def remove(self, entity_id):
+        """Drop an entry; unknown ids are ignored."""
+        signature = self._signatures.pop(entity_id, None)
+        if signature is None:
+            return
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            bucket = buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entity_id)
+                if not bucket:
+                    del buckets[key]
+
+    def _matches(self, signature, threshold, exclude=None):
+        candidates = set()
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            candidates |= buckets.get(key, set())
+        candidates.discard(exclude)
+        matches = []
+        for candidate in candidates:
+            similarity = float(np.mean(self._signatures[candidate] == signature))
+            if similarity >= threshold:
+                matches.append((candidate, similarity))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches
+
+    def query(self, text, threshold=0.5):
+        """(id, estimated similarity) of indexed texts similar to `text`, most similar first."""
+        return self._matches(self.signature(text), threshold)
+
+    def similar_to(self, entity_id, threshold=0.5):
+        """Like query(), for an indexed id (the id itself is left out)."""
+        signature = self._signatures.get(entity_id)
+        if signature is None:
+            return []
+        return self._matches(signature, threshold, exclude=entity_id)
+
+    def groups(self, threshold=0.5):
+        """
+        Clusters of ids linked by similarity >= threshold (connected
+        components over candidate pairs), largest first; singletons left out.
+        """
+        parent = {}
+
+        def find(entity_id):
+            root = entity_id
+            while parent.get(root, root) != root:
+                root = parent[root]
+            parent[entity_id] = root
+            return root
+
+        for buckets in self._buckets:
+            for bucket in buckets.values():
+                if len(bucket) < 2:
+                    continue
+                members = sorted(bucket)
+                for i, first in enumerate(members):
+                    for second in members[i + 1:]:
+                        if find(first) == find(second):
+                            continue
+                        if np.mean(self._signatures[first] == self._signatures[second]) >= threshold:
+                            parent[find(second)] = find(first)
+
+        clusters = {}
+        for entity_id in parent:
+            clusters.setdefault(find(entity_id), set()).add(entity_id)
+        return sorted((sorted(cluster) for cluster in clusters.values() if len(cluster) > 1),
+                      key=lambda cluster: (-len(cluster), cluster[0]))
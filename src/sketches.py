@@ -0,0 +1,204 @@
+"""
+The Olympian Codex Database - Sketches
+Team 42: RNA
+
+Mergeable summaries for approximate report aggregates.
+
+    HyperLogLog  - distinct counts in a fixed 2^p registers, with a
+                   standard error of 1.04 / sqrt(2^p)
+    TDigest      - quantiles from a bounded list of weighted centroids,
+                   accurate at the tails
+
+Both merge losslessly with sketches of the same kind, so summaries stored
+per entity and per day can be combined for any date range. Sketches
+serialize to compact zlib-compressed bytes for storage in a BLOB column.
+"""
+
+import math
+import struct
+import zlib
+from hashlib import blake2b
+
+# =====================================================
+# HYPERLOGLOG
+# =====================================================
+
+# 2^11 registers: 2048 bytes uncompressed, ~2.3% standard error
+HLL_PRECISION = 11
+
+def _hash64(value):
+    """Stable 64-bit hash (Python's hash() is salted per process)."""
+    return int.from_bytes(blake2b(str(value).encode(), digest_size=8).digest(), 'big')
+
+class HyperLogLog:
+    """Approximate distinct counter."""
+
+    __slots__ = ('p', 'registers')
+
+    def __init__(self, p=HLL_PRECISION, registers=None):
+        self.p = p
+        self.registers = bytearray(registers) if registers is not None else bytearray(1 << p)
+
+    def add(self, value):
+        h = _hash64(value)
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        # Position of the first 1-bit in the remaining bits
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other):
+        """Fold another sketch of the same precision into this one."""
+        if other.p != self.p:
+            raise ValueError(f"cannot merge HyperLogLog sketches of precision {self.p} and {other.p}")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        """Estimated number of distinct values added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction: linear counting over the empty registers
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+    @property
+    def standard_error(self):
+        """Relative standard error of count()."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def to_bytes(self):
+        return zlib.compress(bytes([self.p]) + bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data):
+        raw = zlib.decompress(data)
+        return cls(raw[0], raw[1:])
+
+# =====================================================
+# T-DIGEST
+# =====================================================
+
+# Centroid budget: ~compression centroids after compressing
+TDIGEST_COMPRESSION = 100
+
+class TDigest:
+    """Approximate quantiles (merging t-digest with the k1 scale function)."""
+
+    __slots__ = ('compression', 'centroids', '_buffer')
+
+    def __init__(self, compression=TDIGEST_COMPRESSION, centroids=None):
+        self.compression = compression
+        # Sorted [mean, weight] pairs
+        self.centroids = [list(c) for c in centroids] if centroids else []
+        self._buffer = []
+
+    def add(self, value, weight=1):
+        self._buffer.append([float(value), weight])
+        if len(self._buffer) > 5 * self.compression:
+            self._compress()
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other):
+        other._compress()
+        self._buffer.extend(list(c) for c in other.centroids)
+        self._compress()
+        return self
+
+    @property
+    def total(self):
+        return sum(w for _, w in self.centroids) + sum(w for _, w in self._buffer)
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted(self.centroids + self._buffer)
+        self._buffer = []
+        total = sum(w for _, w in points)
+        merged = [list(points[0])]
+        seen = 0
+        k_low = self._k(0)
+        for mean, weight in points[1:]:
+            current = merged[-1]
+            q_high = (seen + current[1] + weight) / total
+            if self._k(min(q_high, 1.0)) - k_low <= 1:
+                current[0] += (mean - current[0]) * weight / (current[1] + weight)
+                current[1] += weight
+            else:
+                seen += current[1]
+                k_low = self._k(seen / total)
+                merged.append([mean, weight])
+        self.centroids = merged
+
+    def _locate(self, q):
+        """Index of the centroid holding quantile q and its centre's cumulative weight."""
+        self._compress()
+        target = q * self.total
+        cumulative = 0
+        for i, (_, weight) in enumerate(self.centroids):
+            if cumulative + weight >= target:
+                return i, cumulative + weight / 2
+            cumulative += weight
+        return len(self.centroids) - 1, cumulative - self.centroids[-1][1] / 2
+
+    def quantile(self, q):
+        """Estimated value at quantile q (0..1); None for an empty digest."""
+        self._compress()
+        if not self.centroids:
+            return None
+        if len(self.centroids) == 1:
+            return self.centroids[0][0]
+        total = self.total
+        i, centre = self._locate(q)
+        target = q * total
+        # Interpolate between neighbouring centroid means
+        if target < centre and i > 0:
+            prev_centre = centre - (self.centroids[i - 1][1] + self.centroids[i][1]) / 2
+            left, right = self.centroids[i - 1][0], self.centroids[i][0]
+            return left + (right - left) * (target - prev_centre) / (centre - prev_centre)
+        if target > centre and i < len(self.centroids) - 1:
+            next_centre = centre + (self.centroids[i][1] + self.centroids[i + 1][1]) / 2
+            left, right = self.centroids[i][0], self.centroids[i + 1][0]
+            return left + (right - left) * (target - centre) / (next_centre - centre)
+        return self.centroids[i][0]
+
+    def rank_error(self, q):
+        """
+        Bound on the rank error of quantile(q) as a fraction of the total:
+        half the weight of the centroid the quantile falls in (0 when exact).
+        """
+        self._compress()
+        if not self.centroids:
+            return None
+        i, _ = self._locate(q)
+        weight = self.centroids[i][1]
+        return 0.0 if weight <= 1 else weight / 2 / self.total
+
+    def to_bytes(self):
+        self._compress()
+        flat = [value for centroid in self.centroids for value in centroid]
+        return zlib.compress(struct.pack(f"<d{len(flat)}d", self.compression, *flat))
+
+    @classmethod
+    def from_bytes(cls, data):
+        raw = zlib.decompress(data)
+        values = struct.unpack(f"<{len(raw) // 8}d", raw)
+        return cls(values[0], zip(values[1::2], values[2::2]))
+
+SKETCH_TYPES = {'hll': HyperLogLog, 'tdigest': TDigest}
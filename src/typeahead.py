@@ -0,0 +1,101 @@
+"""
+The Olympian Codex Database - Typeahead Index
+Team 42: RNA
+
+In-memory prefix index behind the search-as-you-type pickers.
+
+Every indexed text contributes one search term per word: the text from
+that word on, case-folded and cut to TERM_CHARS. Terms are kept in one
+sorted list (ids in a parallel array), so a lookup is a bisect to the
+first term with the typed prefix followed by a short forward scan:
+"jack" finds "Percy Jackson" through its term "jackson".
+
+Inserts and removals are a bisect plus a list insert/delete each, so the
+index is kept current incrementally instead of being rebuilt on writes.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Longest term stored per word; longer typed prefixes are matched on this many characters
+TERM_CHARS = 40
+
+def normalize(text):
+    """Case-fold and collapse whitespace."""
+    return " ".join(str(text).casefold().split())
+
+def _terms(text):
+    """The distinct search terms of a text: its suffixes starting at each word."""
+    text = normalize(text)
+    starts = [0] + [i + 1 for i, char in enumerate(text) if char == " "]
+    return sorted({text[start:start + TERM_CHARS] for start in starts if start < len(text)})
+
+class PrefixIndex:
+    """Sorted-array prefix index mapping search terms to integer ids."""
+
+    __slots__ = ('_keys', '_ids', '_texts')
+
+    def __init__(self, entries=()):
+        """Bulk-build from (id, text) pairs with a single sort."""
+        self._texts = {}
+        pairs = []
+        for entity_id, text in entries:
+            if text is None:
+                continue
+            self._texts[entity_id] = text
+            pairs.extend((term, entity_id) for term in _terms(text))
+        pairs.sort()
+        self._keys = [term for term, _ in pairs]
+        self._ids = array('q', (entity_id for _, entity_id in pairs))
+
+    def __len__(self):
+        return len(self._texts)
+
+    def __contains__(self, entity_id):
+        return entity_id in self._texts
+
+    def add(self, entity_id, text):
+        """Index a new entry, replacing any earlier text for the id."""
+        self.remove(entity_id)
+        if text is None:
+            return
+        self._texts[entity_id] = text
+        for term in _terms(text):
+            # Equal terms stay ordered by id, like the bulk build
+            lo, hi = bisect_left(self._keys, term), bisect_right(self._keys, term)
+            position = lo
+            while position < hi and self._ids[position] < entity_id:
+                position += 1
+            self._keys.insert(position, term)
+            self._ids.insert(position, entity_id)
+
+    def remove(self, entity_id):
+        """Drop an entry; unknown ids are ignored."""
+        text = self._texts.pop(entity_id, None)
+        if text is None:
+            return
+        for term in _terms(text):
+            position = bisect_left(self._keys, term)
+            while position < len(self._keys) and self._keys[position] == term:
+                if self._ids[position] == entity_id:
+                    del self._keys[position]
+                    del self._ids[position]
+                    break
+                position += 1
+
+    def search(self, prefix, limit=20):
+        """
+        Ids of up to `limit` entries with a word starting with `prefix`
+        (the prefix may span several words), in term order.
+        """
+        prefix = normalize(prefix)[:TERM_CHARS]
+        if not prefix:
+            return []
+        found = {}
+        position = bisect_left(self._keys, prefix)
+        while position < len(self._keys) and len(found) < limit:
+            if not self._keys[position].startswith(prefix):
+                break
+            found.setdefault(self._ids[position], None)
+            position += 1
+        return list(found)
@@ -0,0 +1,360 @@
+"""
+The Olympian Codex Database - Write Journal
+Team 42: RNA
+
+Durable local journal for writes that must not wait on (or be lost to) a
+slow or unavailable database.
+
+A write is appended to the journal file and fsynced before it is
+acknowledged, so it survives database outages and app restarts. A replay
+worker applies journaled writes to the database one at a time in
+submission order. While the database is unreachable the worker backs off
+and retries the same write; a write the database refuses (a missing
+parent row, a concurrent change) is set aside as a conflict for review and
+the worker moves on.
+
+Every write carries an idempotency key. The application records the key in
+the same transaction as the write, so a write that committed just before a
+crash (but was never marked applied here) is recognised and not applied
+twice.
+
+File format: one record per line, "<crc32 hex> <json>". A write record holds
+the sequence number, key, operation name, arguments and submission time; a
+state record moves a write to 'applied', 'conflict', 'dismissed' or back to
+'pending'. A torn last line (crash mid-append) fails its checksum and is
+dropped on load. State records are flushed but not fsynced: losing one only
+means the write is looked up by its key again.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, date
+from decimal import Decimal
+
+# Records in the file before settled writes are compacted away
+COMPACT_RECORDS = 10_000
+# Replay backoff while the database is unavailable (seconds, doubled per failure)
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+# Idle worker wake-up interval (seconds)
+IDLE_INTERVAL = 5.0
+
+# =====================================================
+# RECORD ENCODING
+# =====================================================
+
+def _encode(value):
+    """JSON-ready form of write arguments, tagging dates and decimals so they round-trip."""
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'$date': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'$decimal': str(value)}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+def _decode(obj):
+    if '$datetime' in obj:
+        return datetime.fromisoformat(obj['$datetime'])
+    if '$date' in obj:
+        return date.fromisoformat(obj['$date'])
+    if '$decimal' in obj:
+        return Decimal(obj['$decimal'])
+    return obj
+
+def _record_line(record):
+    payload = json.dumps(_encode(record), separators=(',', ':')).encode()
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+def _parse_line(line):
+    """The record on a line, or None if it is torn or corrupt."""
+    if len(line) < 10 or not line.endswith(b"\n") or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload, object_hook=_decode)
+    except ValueError:
+        return None
+
+# =====================================================
+# JOURNAL
+# =====================================================
+
+class JournalEntry:
+    """One journaled write: operation(*args, **kwargs) plus its replay state."""
+
+    __slots__ = ('seq', 'key', 'operation', 'args', 'kwargs', 'submitted_at', 'state', 'result')
+
+    def __init__(self, seq, key, operation, args, kwargs, submitted_at, state='pending', result=None):
+        self.seq = seq
+        self.key = key
+        self.operation = operation
+        self.args = list(args)
+        self.kwargs = dict(kwargs)
+        self.submitted_at = submitted_at
+        self.state = state
+        self.result = result
+
+    def __repr__(self):
+        return f"JournalEntry(seq={self.seq}, {self.operation}, state={self.state!r}, key={self.key[:8]})"
+
+class WriteJournal:
+    """
+    Append-only journal file of pending writes. Only writes still pending or
+    in conflict are kept in memory; applied and dismissed ones live on in the
+    file until it is compacted.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._changed = threading.Condition(threading.Lock())
+        self._entries = {}  # key -> pending or conflicted entry
+        self._next_seq = 1
+        self._records = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+        self._file = open(path, 'ab')
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                record = _parse_line(line)
+                if record is None:
+                    # Everything after a torn record is unusable
+                    break
+                valid_bytes += len(line)
+                self._records += 1
+                self._apply_record(record)
+        if valid_bytes < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_bytes)
+
+    def _apply_record(self, record):
+        if 'operation' in record:
+            entry = JournalEntry(record['seq'], record['key'], record['operation'], record['args'],
+                                 record['kwargs'], record['submitted_at'])
+            self._entries[entry.key] = entry
+            self._next_seq = max(self._next_seq, entry.seq + 1)
+            return
+        entry = self._entries.get(record['key'])
+        if entry is None:
+            return
+        entry.state, entry.result = record['state'], record.get('result')
+        if entry.state in ('applied', 'dismissed'):
+            del self._entries[entry.key]
+
+    def _write(self, record, sync):
+        self._file.write(_record_line(record))
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        self._records += 1
+
+    def __len__(self):
+        with self._changed:
+            return sum(1 for entry in self._entries.values() if entry.state == 'pending')
+
+    def append(self, operation, args=(), kwargs=None, key=None):
+        """
+        Durably record a write and return its entry. Returns once the record
+        is fsynced. Appending a key that is still pending or in conflict
+        returns the existing entry instead of a second write.
+        """
+        with self._changed:
+            key = key or uuid.uuid4().hex
+            if key in self._entries:
+                return self._entries[key]
+            entry = JournalEntry(self._next_seq, key, operation, args, kwargs or {}, datetime.now())
+            self._write({'seq': entry.seq, 'key': key, 'operation': operation, 'args': entry.args,
+                         'kwargs': entry.kwargs, 'submitted_at': entry.submitted_at}, sync=True)
+            self._next_seq += 1
+            self._entries[key] = entry
+            self._changed.notify_all()
+            return entry
+
+    def _set_state(self, entry, state, result=None):
+        with self._changed:
+            self._write({'key': entry.key, 'state': state, 'result': result}, sync=False)
+            entry.state, entry.result = state, result
+            if state in ('applied', 'dismissed'):
+                self._entries.pop(entry.key, None)
+            else:
+                self._entries[entry.key] = entry
+            self._changed.notify_all()
+
+    def mark(self, entry, state, result=None):
+        """Record the outcome of replaying a write: 'applied' or 'conflict'."""
+        self._set_state(entry, state, result)
+
+    def retry(self, entry):
+        """Queue a conflicted write again (it keeps its place by sequence number)."""
+        self._set_state(entry, 'pending')
+
+    def dismiss(self, entry):
+        """Give up on a conflicted write."""
+        self._set_state(entry, 'dismissed', entry.result)
+
+    def _by_state(self, state):
+        with self._changed:
+            return sorted((entry for entry in self._entries.values() if entry.state == state),
+                          key=lambda entry: entry.seq)
+
+    def pending(self):
+        """Writes waiting to be applied, oldest first."""
+        return self._by_state('pending')
+
+    def conflicts(self):
+        """Writes the database refused, oldest first."""
+        return self._by_state('conflict')
+
+    def next_pending(self):
+        pending = self.pending()
+        return pending[0] if pending else None
+
+    def wait(self, entry, timeout):
+        """Wait up to `timeout` seconds for a write to leave the pending state; returns its state."""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while entry.state == 'pending':
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            return entry.state
+
+    def compact(self, min_records=COMPACT_RECORDS):
+        """
+        Rewrite the file with only the writes still pending or in conflict,
+        once settled records dominate it. The new file is fsynced and renamed
+        over the old one, so a crash leaves one of the two intact.
+        """
+        with self._changed:
+            if self._records < min_records or self._records < 2 * len(self._entries) + 1:
+                return False
+            temporary = self.path + ".compact"
+            entries = sorted(self._entries.values(), key=lambda entry: entry.seq)
+            with open(temporary, 'wb') as f:
+                for entry in entries:
+                    f.write(_record_line({'seq': entry.seq, 'key': entry.key, 'operation': entry.operation,
+                                          'args': entry.args, 'kwargs': entry.kwargs,
+                                          'submitted_at': entry.submitted_at}))
+                    if entry.state != 'pending':
+                        f.write(_record_line({'key': entry.key, 'state': entry.state, 'result': entry.result}))
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(temporary, self.path)
+            if hasattr(os, 'O_DIRECTORY'):
+                # Make the rename itself durable
+                directory = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_DIRECTORY)
+                try:
+                    os.fsync(directory)
+                finally:
+                    os.close(directory)
+            self._file = open(self.path, 'ab')
+            self._records = sum(2 if entry.state != 'pending' else 1 for entry in entries)
+            return True
+
+    def close(self):
+        with self._changed:
+            self._file.close()
+
+# =====================================================
+# REPLAY
+# =====================================================
+
+def replay_pending(journal, connection, apply):
+    """
+    Apply pending writes in order on `connection` until none are left or the
+    database fails. apply(connection, entry) returns (state, result) with
+    state 'applied' or 'conflict', and raises if the database is unavailable.
+    Returns the error that stopped the replay, or None.
+    """
+    while True:
+        entry = journal.next_pending()
+        if entry is None:
+            return None
+        try:
+            state, result = apply(connection, entry)
+        except Exception as e:
+            return e
+        journal.mark(entry, state, result)
+
+class JournalReplayer:
+    """
+    Daemon thread replaying a journal on its own connection. connect() opens
+    that connection (again after a failure); on_idle(connection), if given,
+    runs whenever the journal is drained.
+    """
+
+    def __init__(self, journal, connect, apply, on_idle=None):
+        self.journal = journal
+        self.connect = connect
+        self.apply = apply
+        self.on_idle = on_idle
+        self.last_error = None
+        self.retry_at = None
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="write-journal-replay", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop = True
+        self._wake.set()
+        self._thread.join()
+
+    def _run(self):
+        connection = None
+        delay = RETRY_BASE_DELAY
+        while not self._stop:
+            try:
+                if connection is None:
+                    connection = self.connect()
+                error = replay_pending(self.journal, connection, self.apply)
+                if error is not None:
+                    raise error
+                self.last_error = self.retry_at = None
+                delay = RETRY_BASE_DELAY
+                if self.on_idle:
+                    self.on_idle(connection)
+                self.journal.compact()
+                self._wake.wait(IDLE_INTERVAL)
+                self._wake.clear()
+            except Exception as e:
+                # Database unavailable: drop the connection and retry the same write later
+                self.last_error = str(e)
+                self.retry_at = datetime.now().timestamp() + delay
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                    connection = None
+                self._wake.wait(delay)
+                self._wake.clear()
+                delay = min(delay * 2, RETRY_MAX_DELAY)
+        if connection is not None:
+            connection.close()